@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from udpcp.protocol import packet
+from udpcp.protocol._utils import specification
+
+implementations = {
+    'python': (specification._decode, specification._encode, specification._checksum),
+}
+
+if specification._speedups is not None:
+    implementations['speedups'] = (
+        specification._speedups.decode,
+        specification._speedups.encode,
+        specification._speedups.checksum,
+    )
+
+
+@pytest.fixture(params=sorted(implementations))
+def codec(request, monkeypatch):
+
+    decode, encode, checksum = implementations[request.param]
+
+    monkeypatch.setattr(specification, 'decode', decode)
+    monkeypatch.setattr(specification, 'encode', encode)
+    monkeypatch.setattr(specification, 'checksum', checksum)
+
+    return request.param
+
+
+def pytest_benchmark_update_machine_info(config, machine_info):
+
+    machine_info['udpcp'] = {
+        'speedups': specification._speedups is not None,
+        'no_speedups': os.environ.get('UDPCP_NO_SPEEDUPS', ''),
+        'compiled': not packet.__file__.endswith('.py'),
+    }
@@ -0,0 +1,78 @@
+import pytest
+
+from udpcp.protocol import Packet, ChecksumMode, TransferMode
+from udpcp.protocol._utils import specification
+
+PAYLOAD_SIZES = [0, 64, 1024, 16384, 65535 - specification.header_size]
+
+checksum_modes = pytest.mark.parametrize(
+    'checksum_mode',
+    list(ChecksumMode),
+    ids=lambda mode: mode.name,
+)
+
+payload_sizes = pytest.mark.parametrize(
+    'payload_size',
+    PAYLOAD_SIZES,
+    ids=lambda size: f'{size}B',
+)
+
+
+def _data(checksum_mode: ChecksumMode, payload_data: bytes = b'dummy') -> Packet:
+
+    return Packet.data(
+        checksum_mode=checksum_mode,
+        transfer_mode=TransferMode.AckEveryPacket,
+        fragment_amount=10,
+        fragment_number=5,
+        message_id=12345,
+        payload_data=payload_data,
+    )
+
+
+@checksum_modes
+@payload_sizes
+def test_from_bytes(benchmark, codec, checksum_mode, payload_size):
+
+    data = _data(checksum_mode, bytes(payload_size)).as_bytes
+
+    benchmark.group = f'from_bytes-{checksum_mode.name}'
+    benchmark(Packet.from_bytes, data)
+
+
+@checksum_modes
+@payload_sizes
+def test_as_bytes(benchmark, codec, checksum_mode, payload_size):
+
+    packet = _data(checksum_mode, bytes(payload_size))
+
+    benchmark.group = f'as_bytes-{checksum_mode.name}'
+    benchmark(bytes, packet)
+
+
+@checksum_modes
+@payload_sizes
+def test_data(benchmark, codec, checksum_mode, payload_size):
+
+    payload_data = bytes(payload_size)
+
+    benchmark.group = f'data-{checksum_mode.name}'
+    benchmark(_data, checksum_mode, payload_data)
+
+
+@checksum_modes
+def test_ack(benchmark, codec, checksum_mode):
+
+    packet = _data(checksum_mode)
+
+    benchmark.group = f'ack-{checksum_mode.name}'
+    benchmark(Packet.ack, packet)
+
+
+@payload_sizes
+def test_checksum(benchmark, payload_size):
+
+    data = _data(ChecksumMode.Enabled, bytes(payload_size)).as_bytes
+
+    benchmark.group = 'checksum'
+    benchmark(specification.wire_checksum, data)
@@ -0,0 +1,53 @@
+from udpcp.protocol import Packet, ChecksumMode, TransferMode, iter_packets
+
+# Run under both builds (UDPCP_MYPYC=1 and plain) and compare the saved results,
+# the udpcp.compiled machine info entry tells the two apart.
+
+
+def _data(payload_data: bytes = b'dummy') -> Packet:
+
+    return Packet.data(
+        checksum_mode=ChecksumMode.Enabled,
+        transfer_mode=TransferMode.AckEveryPacket,
+        fragment_amount=10,
+        fragment_number=5,
+        message_id=12345,
+        payload_data=payload_data,
+    )
+
+
+def _inspect(packet: Packet) -> tuple:
+
+    return (
+        packet.message_type,
+        packet.transfer_mode,
+        packet.checksum_mode,
+        packet.fragment_amount,
+        packet.fragment_number,
+        packet.message_id,
+        packet.is_data,
+        packet.is_last,
+        packet.is_ack_needed,
+    )
+
+
+def test_properties(benchmark):
+
+    benchmark.group = 'compiled-properties'
+    benchmark(_inspect, _data())
+
+
+def test_round_trip(benchmark):
+
+    packet = _data(bytes(64))
+
+    benchmark.group = 'compiled-round-trip'
+    benchmark(lambda: Packet.ack(Packet.from_bytes(packet.as_bytes)))
+
+
+def test_iter_packets(benchmark):
+
+    stream = b''.join(_data(bytes(64)).as_bytes for _ in range(100))
+
+    benchmark.group = 'compiled-iter-packets'
+    benchmark(lambda: [_inspect(packet) for packet in iter_packets(stream)])
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from udpcp import sim
+from udpcp.congestion import CongestionControl
+
+MESSAGES = 200
+SIZE = 8000
+
+
+def _transfer(congestion):
+
+    async def scenario(network):
+
+        server = await network.open_endpoint(fragment_size=1000)
+        client = await network.open_endpoint(
+            fragment_size=1000, timeout=0.05, retries=10, congestion=congestion,
+        )
+
+        start = network.loop.time()
+        results = await asyncio.gather(
+            *(client.send(server.local_address, bytes(SIZE)) for _ in range(MESSAGES)),
+            return_exceptions=True,
+        )
+        elapsed = network.loop.time() - start
+
+        delivered = sum(result is None for result in results)
+
+        return delivered * SIZE / elapsed, client.statistics.retransmissions
+
+    link = sim.Link(latency=0.01, bandwidth=1e6, queue=20000)
+
+    return sim.run(scenario, seed=1, link=link)
+
+
+@pytest.mark.parametrize('congestion', [None, CongestionControl()], ids=['none', 'aimd'])
+def test_goodput(benchmark, congestion):
+
+    goodput, retransmissions = benchmark.pedantic(_transfer, args=(congestion,), rounds=1)
+
+    benchmark.group = 'congestion'
+    benchmark.extra_info['goodput'] = goodput
+    benchmark.extra_info['retransmissions'] = retransmissions
@@ -0,0 +1,40 @@
+import pytest
+
+from udpcp.core import Connection
+from udpcp.protocol import TransferMode, ChecksumMode
+
+MESSAGES = 20000
+
+
+def _exchange(mode, size):
+
+    sender = Connection(fragment_size=1000, checksum_mode=ChecksumMode.Disabled)
+    receiver = Connection(fragment_size=1000, checksum_mode=ChecksumMode.Disabled)
+    data = bytes(size)
+    now = 0.0
+
+    for _ in range(MESSAGES):
+
+        _, datagrams = sender.send(data, now, mode)
+        replies = []
+
+        for datagram in datagrams:
+            replies.extend(receiver.receive_datagram(datagram, now)[0])
+
+        for reply in replies:
+            sender.receive_datagram(reply, now)
+
+        now += 0.001
+
+    assert sender.outstanding == 0
+    assert receiver.statistics.delivered_messages == MESSAGES
+
+
+@pytest.mark.parametrize('size', [64, 5000])
+@pytest.mark.parametrize('mode', list(TransferMode), ids=lambda mode: mode.name)
+def test_exchange(benchmark, mode, size):
+
+    benchmark.pedantic(_exchange, args=(mode, size), rounds=3)
+
+    benchmark.group = 'core'
+    benchmark.extra_info['messages_per_second'] = MESSAGES / benchmark.stats.stats.mean
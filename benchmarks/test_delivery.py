@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from udpcp.endpoint import Endpoint
+from udpcp.protocol import Packet, TransferMode, ChecksumMode
+
+MESSAGES = 100000
+PEERS = 100
+
+
+class _Transport(asyncio.DatagramTransport):
+
+    def sendto(self, data, addr=None):
+
+        pass
+
+    def get_extra_info(self, name, default=None):
+
+        return ('127.0.0.1', 10000) if name == 'sockname' else default
+
+
+def _datagrams():
+
+    datagrams = []
+
+    for index in range(MESSAGES):
+
+        packet = Packet.data(
+            transfer_mode=TransferMode.AckNone,
+            checksum_mode=ChecksumMode.Disabled,
+            fragment_amount=1,
+            fragment_number=0,
+            message_id=index // PEERS + 1,
+            payload_data=bytes(64),
+        )
+
+        datagrams.append((packet.as_bytes, ('127.0.0.1', 20000 + index % PEERS)))
+
+    return datagrams
+
+
+DATAGRAMS = _datagrams()
+
+
+def _deliver(mode):
+
+    loop = asyncio.new_event_loop()
+
+    try:
+        asyncio.set_event_loop(loop)
+
+        endpoint = Endpoint()
+        endpoint.connection_made(_Transport())
+        received = 0
+
+        def callback(message):
+
+            nonlocal received
+            received += 1
+
+        async def consumer(messages):
+
+            nonlocal received
+            received += len(messages)
+
+        async def consume():
+
+            consuming = asyncio.ensure_future(endpoint.consume(consumer, batch=1024))
+            await asyncio.sleep(0)
+
+            for data, address in DATAGRAMS:
+                endpoint.datagram_received(data, address)
+
+            while received < MESSAGES:
+                await asyncio.sleep(0)
+
+            consuming.cancel()
+
+        if mode == 'handler':
+            endpoint.handler = lambda address, message: callback(None)
+        elif mode == 'callback':
+            endpoint.callback = callback
+
+        if mode == 'consume':
+            loop.run_until_complete(consume())
+        else:
+            for data, address in DATAGRAMS:
+                endpoint.datagram_received(data, address)
+
+        assert received == MESSAGES
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+@pytest.mark.parametrize('mode', ['handler', 'callback', 'consume'])
+def test_delivery(benchmark, mode):
+
+    benchmark.pedantic(_deliver, args=(mode,), rounds=5)
+
+    benchmark.group = 'delivery'
+    benchmark.extra_info['messages_per_second'] = MESSAGES / benchmark.stats.stats.mean
+    benchmark.extra_info['nanoseconds_per_message'] = benchmark.stats.stats.mean / MESSAGES * 1e9
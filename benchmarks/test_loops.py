@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from udpcp import loops
+from udpcp.endpoint import open_endpoint
+from udpcp.threaded import ThreadedEndpoint
+from udpcp.protocol import TransferMode
+
+MESSAGES = 2048
+WINDOW = 32
+
+WORKLOADS = {
+    'round_trip': (64, 1),
+    'ack_heavy': (16000, WINDOW),
+}
+
+
+def _asyncio(loop, size, rounds, window):
+
+    async def main():
+
+        server = await open_endpoint()
+        client = await open_endpoint(fragment_size=1000)
+        address = server.local_address
+        data = bytes(size)
+
+        for _ in range(rounds):
+            await asyncio.gather(*(
+                client.send(address, data, TransferMode.AckEveryPacket) for _ in range(window)
+            ))
+
+        client.close()
+        server.close()
+
+        return server.statistics.delivered_messages
+
+    return loops.run(main, loop)
+
+
+def _selectors(size, rounds, window):
+
+    with ThreadedEndpoint() as server, ThreadedEndpoint(fragment_size=1000) as client:
+
+        address = server.local_address
+        data = bytes(size)
+
+        for _ in range(rounds):
+
+            futures = [
+                client.send(address, data, TransferMode.AckEveryPacket) for _ in range(window)
+            ]
+
+            for future in futures:
+                future.result(10.0)
+
+        return server.connection(client.local_address).statistics.delivered_messages
+
+
+@pytest.mark.parametrize('workload', sorted(WORKLOADS))
+@pytest.mark.parametrize('loop', [*loops.LOOPS, 'selectors'])
+def test_loop(benchmark, loop, workload):
+
+    if loop != 'selectors' and loop not in loops.available():
+        pytest.skip(f'{loop} is not installed')
+
+    size, window = WORKLOADS[workload]
+    rounds, remainder = divmod(MESSAGES, window)
+
+    assert not remainder, f'{MESSAGES} messages do not fill whole windows of {window}'
+
+    if loop == 'selectors':
+        delivered = benchmark.pedantic(_selectors, args=(size, rounds, window), rounds=3)
+    else:
+        delivered = benchmark.pedantic(_asyncio, args=(loop, size, rounds, window), rounds=3)
+
+    assert delivered == MESSAGES
+
+    benchmark.group = f'loops-{workload}'
+    benchmark.extra_info['messages_per_second'] = MESSAGES / benchmark.stats.stats.mean
@@ -0,0 +1,96 @@
+import gc
+import tracemalloc
+
+import pytest
+
+from udpcp.protocol import Packet, ChecksumMode, TransferMode, CompactPacket, PacketTable
+
+PACKETS = 100_000
+
+
+def _wire_images():
+
+    return [
+        Packet.data(
+            checksum_mode=ChecksumMode.Enabled,
+            transfer_mode=TransferMode.AckEveryPacket,
+            fragment_amount=255,
+            fragment_number=index % 255,
+            message_id=index % 0xFFFF + 1,
+            payload_data=b'dummy',
+        ).as_bytes
+        for index in range(PACKETS)
+    ]
+
+
+def _measure(build, images):
+
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        stored = build(images)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del stored
+
+    return size / len(images)
+
+
+def _packets(images):
+
+    return [Packet.from_bytes(image) for image in images]
+
+
+def _compact_packets(images):
+
+    return [CompactPacket.from_bytes(image) for image in images]
+
+
+def _table(images):
+
+    return PacketTable(CompactPacket.from_bytes(image) for image in images)
+
+
+@pytest.fixture(scope='module')
+def images():
+
+    return _wire_images()
+
+
+@pytest.mark.parametrize('build', [
+    _packets,
+    _compact_packets,
+    _table,
+], ids=['packet', 'compact', 'table'])
+def test_memory_per_packet(benchmark, images, build):
+
+    bytes_per_packet = _measure(build, images)
+
+    benchmark.group = 'memory'
+    benchmark.extra_info['bytes_per_packet'] = bytes_per_packet
+    benchmark.pedantic(build, args=(images,), rounds=1, iterations=1)
+
+
+def test_memory_compact_smaller(images):
+
+    packets = _measure(_packets, images)
+    compact = _measure(_compact_packets, images)
+    table = _measure(_table, images)
+
+    assert table < compact < packets
+
+
+@pytest.mark.parametrize('packet_class', [Packet, CompactPacket], ids=lambda cls: cls.__name__)
+def test_field_access(benchmark, packet_class, images):
+
+    packet = packet_class.from_bytes(images[0])
+
+    def access():
+
+        return packet.fragment_number, packet.message_id, packet.transfer_mode
+
+    benchmark.group = 'field-access'
+    benchmark(access)
@@ -0,0 +1,135 @@
+import typing
+import timeit
+import asyncio
+
+import pytest
+
+from udpcp import sim
+from udpcp.endpoint import Endpoint
+from udpcp.metrics import Registry
+from udpcp.protocol import Packet, MessageType, ChecksumMode, TransferMode
+
+PEER = ('127.0.0.1', 5000)
+
+# share of round trip time that enabled metrics may add
+OVERHEAD_BUDGET = 0.05
+ROUNDS = 500
+SAMPLES = 60
+
+
+class _Transport(asyncio.DatagramTransport):
+
+    def sendto(self, data, addr=None):
+
+        pass
+
+    def get_extra_info(self, name, default=None):
+
+        return ('127.0.0.1', 4000) if name == 'sockname' else default
+
+
+def _ack(message_id: int) -> bytes:
+
+    return Packet(
+        message_type=MessageType.Ack,
+        transfer_mode=TransferMode.AckNone,
+        checksum_mode=ChecksumMode.Enabled,
+        is_duplicate=False,
+        fragment_amount=1,
+        fragment_number=0,
+        message_id=message_id,
+        message_data_length=0,
+        payload_data=b'',
+    ).as_bytes
+
+
+@pytest.fixture
+def loop():
+
+    loop = sim.VirtualEventLoop()
+    asyncio.set_event_loop(loop)
+
+    yield loop
+
+    asyncio.set_event_loop(None)
+    loop.close()
+
+
+def _round_trip(enabled):
+
+    endpoint = Endpoint(metrics=Registry() if enabled else None)
+    endpoint.connection_made(_Transport())
+
+    acks = [_ack(message_id) for message_id in range(1, 0x10000)]
+    data = [
+        Packet.data(
+            transfer_mode=TransferMode.AckNone,
+            checksum_mode=ChecksumMode.Enabled,
+            fragment_amount=1,
+            fragment_number=0,
+            message_id=message_id,
+            payload_data=b'dummy',
+        ).as_bytes
+        for message_id in range(1, 0x10000)
+    ]
+    state = {'index': 0}
+
+    def round_trip():
+
+        index = state['index']
+        state['index'] = (index + 1) % len(acks)
+
+        endpoint.send(PEER, b'dummy')
+        endpoint.datagram_received(acks[index], PEER)
+        endpoint.datagram_received(data[index], PEER)
+
+        # let the completed message ids expire before they are reused
+        if not state['index']:
+            asyncio.get_event_loop().run_until_complete(asyncio.sleep(10.0))
+
+    return round_trip
+
+
+@pytest.mark.parametrize('enabled', [False, True], ids=['disabled', 'enabled'])
+def test_round_trip(benchmark, loop, enabled):
+
+    benchmark.group = 'metrics-round-trip'
+    benchmark(_round_trip(enabled))
+
+
+def test_overhead(loop):
+
+    # each variant is built twice, first and last, so creation order can't favour either
+    variants = [(False, _round_trip(False)), (True, _round_trip(True))]
+    variants += [(enabled, _round_trip(enabled)) for enabled, _ in reversed(variants)]
+    timings: typing.List[typing.List[float]] = [[] for _ in variants]
+
+    # interleaved in small samples so that every variant sees the same machine noise
+    for _ in range(SAMPLES):
+        for (_, function), samples in zip(variants, timings):
+            samples.append(timeit.timeit(function, number=ROUNDS))
+
+    best = {False: 0.0, True: 0.0}
+
+    for (enabled, _), samples in zip(variants, timings):
+        best[enabled] += min(samples)
+
+    ratio = best[True] / best[False]
+
+    assert ratio < 1 + OVERHEAD_BUDGET, f'metrics cost {ratio - 1:.1%} per round trip'
+
+
+def test_counter_inc(benchmark):
+
+    counter = Registry().counter('packets_total', 'Packets.')
+
+    benchmark.group = 'metrics-primitives'
+    benchmark(counter.inc)
+
+
+def test_histogram_observe(benchmark):
+
+    histogram = Registry().histogram('latency_seconds', 'Latency.')
+
+    benchmark.group = 'metrics-primitives'
+    benchmark(histogram.observe, 0.003)
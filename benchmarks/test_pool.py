@@ -0,0 +1,133 @@
+import gc
+import time
+import socket
+
+import pytest
+
+from udpcp.protocol import Packet, ChecksumMode, TransferMode, PacketPool
+
+BATCH = 64
+BATCHES = 100
+BACKLOG = 1024
+
+
+class GarbageCollectorMonitor:
+
+    def __init__(self) -> None:
+
+        self.collections = 0
+        self.pause = 0.0
+        self._start = 0.0
+
+    def __enter__(self):
+
+        gc.collect()
+        gc.callbacks.append(self._callback)
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+
+        gc.callbacks.remove(self._callback)
+
+    def _callback(self, phase: str, info: dict) -> None:
+
+        if phase == 'start':
+            self._start = time.perf_counter()
+        else:
+            self.collections += 1
+            self.pause += time.perf_counter() - self._start
+
+
+@pytest.fixture
+def sockets():
+
+    sender, receiver = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+    with sender, receiver:
+        yield sender, receiver
+
+
+@pytest.fixture
+def data():
+
+    return Packet.data(
+        checksum_mode=ChecksumMode.Enabled,
+        transfer_mode=TransferMode.AckEveryPacket,
+        fragment_amount=10,
+        fragment_number=5,
+        message_id=12345,
+        payload_data=bytes(1024),
+    ).as_bytes
+
+
+def _receive_packets(sender, receiver, data):
+
+    backlog = []
+
+    for _ in range(BATCHES):
+
+        for _ in range(BATCH):
+            sender.send(data)
+
+        for _ in range(BATCH):
+            backlog.append(Packet.from_bytes(receiver.recv(65535)))
+
+        if len(backlog) >= BACKLOG:
+            backlog.clear()
+
+
+def _release(backlog):
+
+    for packet in backlog:
+        packet.release()
+
+    backlog.clear()
+
+
+def _receive_pooled(sender, receiver, data, pool):
+
+    backlog = []
+
+    for _ in range(BATCHES):
+
+        for _ in range(BATCH):
+            sender.send(data)
+
+        for _ in range(BATCH):
+            packet, _ = pool.receive(receiver)
+            backlog.append(packet)
+
+        if len(backlog) >= BACKLOG:
+            _release(backlog)
+
+    _release(backlog)
+
+
+def test_receive_packets(benchmark, sockets, data):
+
+    sender, receiver = sockets
+
+    with GarbageCollectorMonitor() as monitor:
+        benchmark(_receive_packets, sender, receiver, data)
+
+    benchmark.group = 'receive'
+    benchmark.extra_info['packets_per_round'] = BATCH * BATCHES
+    benchmark.extra_info['gc_collections'] = monitor.collections
+    benchmark.extra_info['gc_pause'] = monitor.pause
+
+
+@pytest.mark.parametrize('debug', [False, True], ids=['release', 'debug'])
+def test_receive_pooled(benchmark, sockets, data, debug):
+
+    sender, receiver = sockets
+    pool = PacketPool(size=BACKLOG, capacity=len(data), debug=debug)
+
+    with GarbageCollectorMonitor() as monitor:
+        benchmark(_receive_pooled, sender, receiver, data, pool)
+
+    benchmark.group = 'receive'
+    benchmark.extra_info['packets_per_round'] = BATCH * BATCHES
+    benchmark.extra_info['gc_collections'] = monitor.collections
+    benchmark.extra_info['gc_pause'] = monitor.pause
+    benchmark.extra_info['allocated'] = pool.allocated
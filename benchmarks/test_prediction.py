@@ -0,0 +1,49 @@
+import pytest
+
+from udpcp.protocol import Packet, HeaderPredictor, ChecksumMode, TransferMode
+
+PEER = ('127.0.0.1', 10000)
+
+
+def _stream(checksum_mode, payload_size):
+
+    return [
+        Packet.data(
+            transfer_mode=TransferMode.AckEveryPacket,
+            checksum_mode=checksum_mode,
+            fragment_amount=255,
+            fragment_number=number,
+            message_id=message_id,
+            payload_data=bytes(payload_size),
+        ).as_bytes
+        for message_id in range(1, 5)
+        for number in range(255)
+    ]
+
+
+def _decode(stream):
+
+    try_from_bytes = Packet.try_from_bytes
+
+    for data in stream:
+        try_from_bytes(data)
+
+
+def _predict(stream):
+
+    try_from_bytes = HeaderPredictor().try_from_bytes
+
+    for data in stream:
+        try_from_bytes(data, PEER)
+
+
+@pytest.mark.parametrize('checksum_mode', list(ChecksumMode), ids=lambda mode: mode.name)
+@pytest.mark.parametrize('payload_size', [64, 1024], ids=lambda size: f'{size}B')
+@pytest.mark.parametrize('decoder', [_decode, _predict], ids=['full', 'predicted'])
+def test_stream(benchmark, codec, checksum_mode, payload_size, decoder):
+
+    stream = _stream(checksum_mode, payload_size)
+
+    benchmark.group = f'prediction-{checksum_mode.name}-{payload_size}B'
+    benchmark(decoder, stream)
+    benchmark.extra_info['packets_per_second'] = len(stream) / benchmark.stats.stats.mean
@@ -0,0 +1,33 @@
+import asyncio
+
+from udpcp import sim
+
+MESSAGES = 2000
+
+
+def _transfer():
+
+    async def scenario(network):
+
+        server = await network.open_endpoint()
+        client = await network.open_endpoint(fragment_size=1000, timeout=0.05, retries=20)
+
+        address = server.local_address
+
+        for _ in range(MESSAGES // 10):
+            await asyncio.gather(*(client.send(address, bytes(5000)) for _ in range(10)))
+
+        return network.statistics.sent
+
+    link = sim.Link(latency=0.01, jitter=0.005, loss=0.01, bandwidth=1e7)
+
+    return sim.run(scenario, seed=1, link=link)
+
+
+def test_transfer(benchmark):
+
+    packets = benchmark.pedantic(_transfer, rounds=3)
+
+    benchmark.group = 'sim'
+    benchmark.extra_info['packets'] = packets
+    benchmark.extra_info['packets_per_second'] = packets / benchmark.stats.stats.mean
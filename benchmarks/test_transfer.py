@@ -0,0 +1,67 @@
+import os
+import asyncio
+import resource
+
+from udpcp import sim
+from udpcp.transfer import send_file, FileReceiver
+
+FILE_SIZE = int(os.environ.get('UDPCP_BENCHMARK_FILE_SIZE', 256 << 20))
+MEMORY_LIMIT = 64 << 20
+
+
+def _memory():
+
+    with open('/proc/self/statm') as handle:
+        return int(handle.read().split()[1]) * resource.getpagesize()
+
+
+def _transfer(source, directory):
+
+    async def scenario(network):
+
+        sender = await network.open_endpoint(fragment_size=60000)
+        receiver = FileReceiver(await network.open_endpoint(fragment_size=60000), directory)
+
+        baseline = peak = _memory()
+
+        async def sample():
+
+            nonlocal peak
+
+            while True:
+                peak = max(peak, _memory())
+                await asyncio.sleep(0.001)
+
+        sampler = asyncio.ensure_future(sample())
+        sending = asyncio.ensure_future(send_file(sender, receiver.endpoint.local_address, source))
+
+        received = await receiver.receive()
+        await sending
+
+        sampler.cancel()
+
+        sender.close()
+        receiver.endpoint.close()
+
+        os.unlink(received.path)
+
+        return peak - baseline
+
+    return sim.run(scenario)
+
+
+def test_transfer_memory(benchmark, tmp_path):
+
+    source = tmp_path / 'source.bin'
+
+    with open(str(source), 'wb') as handle:
+        handle.truncate(FILE_SIZE)
+
+    growth = benchmark.pedantic(_transfer, args=(str(source), str(tmp_path)), rounds=1)
+
+    benchmark.group = 'transfer'
+    benchmark.extra_info['file_size'] = FILE_SIZE
+    benchmark.extra_info['memory_growth'] = growth
+    benchmark.extra_info['bytes_per_second'] = FILE_SIZE / benchmark.stats.stats.mean
+
+    assert growth < MEMORY_LIMIT
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from udpcp.endpoint import open_endpoint
+
+ROUND_TRIPS = 1000
+MESSAGES = 200
+MESSAGE_SIZE = 256 << 10
+WINDOW = 16
+
+TRANSPORTS = {
+    'udp': ('udp://127.0.0.1:0', {}),
+    'udp-64k': ('udp://127.0.0.1:0', {'fragment_size': 65000}),
+    'unix': ('unix:', {}),
+}
+
+
+async def _pair(transport):
+
+    address, options = TRANSPORTS[transport]
+
+    server = await open_endpoint(address, handler=lambda address, message: None, **options)
+    client = await open_endpoint(address, **options)
+
+    return server, client
+
+
+def _run(coroutine):
+
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def _latency(transport):
+
+    server, client = await _pair(transport)
+
+    for _ in range(ROUND_TRIPS):
+        await client.send(server.local_address, bytes(64))
+
+    client.close()
+    server.close()
+
+
+async def _throughput(transport):
+
+    server, client = await _pair(transport)
+    message = bytes(MESSAGE_SIZE)
+
+    for _ in range(MESSAGES // WINDOW):
+        await asyncio.gather(*(client.send(server.local_address, message) for _ in range(WINDOW)))
+
+    client.close()
+    server.close()
+
+
+@pytest.mark.parametrize('transport', list(TRANSPORTS))
+def test_latency(benchmark, transport):
+
+    benchmark.pedantic(lambda: _run(_latency(transport)), rounds=3)
+
+    benchmark.group = 'transport-latency'
+    benchmark.extra_info['round_trip_seconds'] = benchmark.stats.stats.mean / ROUND_TRIPS
+
+
+@pytest.mark.parametrize('transport', list(TRANSPORTS))
+def test_throughput(benchmark, transport):
+
+    benchmark.pedantic(lambda: _run(_throughput(transport)), rounds=3)
+
+    benchmark.group = 'transport-throughput'
+    benchmark.extra_info['bytes_per_second'] = (
+        MESSAGES * MESSAGE_SIZE / benchmark.stats.stats.mean
+    )
@@ -1,7 +1,42 @@
 import os
 import codecs
 
-from setuptools import setup, find_packages
+from setuptools import setup, find_packages, Extension
+
+# Statically typed protocol modules which may be compiled with mypyc,
+# enabled with UDPCP_MYPYC=1 at build time. mypy has to be installed
+# before the build starts, it can't come from an extra of this package.
+MYPYC_MODULES = [
+    'udpcp/protocol/packet.py',
+    'udpcp/protocol/message_type.py',
+    'udpcp/protocol/transfer_mode.py',
+    'udpcp/protocol/checksum_mode.py',
+    'udpcp/protocol/decode_status.py',
+    'udpcp/protocol/_utils/properties.py',
+    'udpcp/protocol/_utils/specification.py',
+]
+
+
+def ext_modules():
+
+    extensions = [
+        Extension(
+            'udpcp.protocol._speedups',
+            sources=['src/udpcp/protocol/_speedups.c'],
+            optional=True,
+        ),
+    ]
+
+    if os.environ.get('UDPCP_MYPYC'):
+        from mypyc.build import mypycify
+
+        # src is itself a package, so module names are resolved against it explicitly
+        os.environ['MYPYPATH'] = 'src'
+
+        paths = [os.path.join('src', module) for module in MYPYC_MODULES]
+        extensions += mypycify(['--explicit-package-bases', *paths])
+
+    return extensions
 
 
 def main():
@@ -20,21 +55,23 @@ def main():
             'Intended Audience :: Developers',
             'Natural Language :: English',
             'Operating System :: POSIX',
-            'Programming Language :: Python :: 3.6',
             'Programming Language :: Python :: 3.7',
             'Topic :: Software Development :: Libraries',
             'Topic :: System :: Networking',
         ],
-        install_requires=[
-            'bitarray>=0.8.3',
-        ],
         extras_require={
+            'benchmark': [
+                'pytest-benchmark>=3.1.0',
+            ],
             'lint': [
                 'flake8>=3.5.0',
             ],
             'mypy': [
                 'mypy>=0.620'
             ],
+            'uvloop': [
+                'uvloop>=0.11.0',
+            ],
             'test': [
                 'pytest>=3.4.0',
                 'pytest-cov>=2.5.1',
@@ -43,6 +80,7 @@ def main():
         use_scm_version={
             'write_to': os.path.join('src/udpcp/_version.py'),
         },
+        python_requires='>=3.7',
         platforms=[
             'linux',
         ],
@@ -53,6 +91,10 @@ def main():
         package_dir={
             '': 'src',
         },
+        package_data={
+            'udpcp.protocol': ['_speedups.pyi'],
+        },
+        ext_modules=ext_modules(),
     )
 
 
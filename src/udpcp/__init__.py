@@ -1,3 +1,34 @@
 __all__ = [
     'protocol',
+    'core',
+    'pcap',
+    'analyze',
+    'endpoint',
+    'loops',
+    'threaded',
+    'multicast',
+    'loadgen',
+    'sim',
+    'metrics',
+    'scheduler',
+    'congestion',
+    'overload',
+    'delivery',
+    'stream',
+    'transfer',
 ]
+
+import importlib
+
+
+def __getattr__(name: str):
+
+    if name in __all__:
+        return importlib.import_module(f'{__name__}.{name}')
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,514 @@
+__all__ = [
+    'Histogram',
+    'Statistics',
+    'Analyzer',
+    'analyze',
+    'main',
+]
+
+import sys
+import json
+import typing
+import argparse
+import multiprocessing
+
+from . import pcap
+from .protocol import Packet, DecodeStatus
+from .protocol._utils import specification
+
+FlowKey = typing.Tuple[pcap.Address, pcap.Address, int]
+FragmentKey = typing.Tuple[pcap.Address, pcap.Address, int, int]
+
+header_size = specification.header_size
+
+_SWEEP_INTERVAL = 65536
+_INCOMPLETE_SAMPLES = 10
+
+_HISTOGRAM_PRECISION_BITS = 4
+_HISTOGRAM_PRECISION = 1 << _HISTOGRAM_PRECISION_BITS
+_HISTOGRAM_BUCKETS = 64 * _HISTOGRAM_PRECISION
+
+
+class Histogram:
+
+    __slots__ = [
+        'buckets',
+        'count',
+        'total',
+        'maximum',
+    ]
+
+    def __init__(self) -> None:
+
+        self.buckets = [0] * _HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, value: float) -> None:
+
+        # capture clocks can step backwards between a packet and its ack
+        value = max(value, 0.0)
+        microseconds = int(value * 1e6)
+
+        if microseconds < 2 * _HISTOGRAM_PRECISION:
+            index = microseconds
+        else:
+            shift = microseconds.bit_length() - _HISTOGRAM_PRECISION_BITS - 1
+            index = min(shift * _HISTOGRAM_PRECISION + (microseconds >> shift),
+                        _HISTOGRAM_BUCKETS - 1)
+
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += value
+
+        if value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other: 'Histogram') -> None:
+
+        self.buckets = [mine + theirs for mine, theirs in zip(self.buckets, other.buckets)]
+        self.count += other.count
+        self.total += other.total
+        self.maximum = max(self.maximum, other.maximum)
+
+    def quantile(self, quantile: float) -> float:
+
+        if not self.count:
+            return 0.0
+
+        rank = quantile * self.count
+        seen = 0
+
+        for index, count in enumerate(self.buckets):
+
+            seen += count
+
+            if seen >= rank and count:
+
+                if index < 2 * _HISTOGRAM_PRECISION:
+                    upper = index + 1
+                else:
+                    shift = index // _HISTOGRAM_PRECISION - 1
+                    upper = (index % _HISTOGRAM_PRECISION + _HISTOGRAM_PRECISION + 1) << shift
+
+                return min(upper / 1e6, self.maximum)
+
+        return self.maximum
+
+    @property
+    def mean(self) -> float:
+
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self) -> typing.Dict[str, float]:
+
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'p50': self.quantile(0.50),
+            'p90': self.quantile(0.90),
+            'p99': self.quantile(0.99),
+            'max': self.maximum,
+        }
+
+
+class Statistics:
+
+    __slots__ = [
+        'datagrams',
+        'data_packets',
+        'ack_packets',
+        'sync_packets',
+        'invalid_packets',
+        'decode_errors',
+        'retransmissions',
+        'duplicate_acks',
+        'flows',
+        'completed_messages',
+        'incomplete_reassemblies',
+        'unacknowledged_fragments',
+        'incomplete_samples',
+        'ack_latency',
+    ]
+
+    def __init__(self) -> None:
+
+        self.datagrams = 0
+        self.data_packets = 0
+        self.ack_packets = 0
+        self.sync_packets = 0
+        self.invalid_packets = 0
+        self.decode_errors = [0] * len(DecodeStatus)
+        self.retransmissions = 0
+        self.duplicate_acks = 0
+        self.flows = 0
+        self.completed_messages = 0
+        self.incomplete_reassemblies = 0
+        self.unacknowledged_fragments = 0
+        self.incomplete_samples: typing.List[typing.Tuple[FlowKey, int, int]] = []
+        self.ack_latency = Histogram()
+
+    @property
+    def checksum_failures(self) -> int:
+
+        return self.decode_errors[DecodeStatus.BadChecksum]
+
+    @property
+    def malformed_packets(self) -> int:
+
+        return sum(self.decode_errors) - self.checksum_failures
+
+    @property
+    def retransmission_rate(self) -> float:
+
+        return self.retransmissions / self.data_packets if self.data_packets else 0.0
+
+    def merge(self, other: 'Statistics') -> None:
+
+        for name in self.__slots__:
+
+            if name == 'ack_latency':
+                self.ack_latency.merge(other.ack_latency)
+            elif name == 'incomplete_samples':
+                samples = self.incomplete_samples + other.incomplete_samples
+                self.incomplete_samples = samples[:_INCOMPLETE_SAMPLES]
+            elif name == 'decode_errors':
+                self.decode_errors = [
+                    mine + theirs for mine, theirs in zip(self.decode_errors, other.decode_errors)
+                ]
+            else:
+                setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+
+        result: typing.Dict[str, typing.Any] = {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if name not in ('ack_latency', 'incomplete_samples', 'decode_errors')
+        }
+
+        result['malformed_packets'] = self.malformed_packets
+        result['checksum_failures'] = self.checksum_failures
+        result['decode_errors'] = {
+            status.name: self.decode_errors[status] for status in DecodeStatus if status
+        }
+        result['retransmission_rate'] = self.retransmission_rate
+        result['ack_latency'] = self.ack_latency.as_dict()
+        result['incomplete_samples'] = [
+            {
+                'source': f'{source[0]}:{source[1]}',
+                'destination': f'{destination[0]}:{destination[1]}',
+                'message_id': message_id,
+                'received': received,
+                'fragment_amount': fragment_amount,
+            }
+            for (source, destination, message_id), received, fragment_amount
+            in self.incomplete_samples
+        ]
+
+        return result
+
+    def report(self) -> str:
+
+        latency = self.ack_latency
+
+        lines = [
+            f'datagrams:                {self.datagrams}',
+            f'data packets:             {self.data_packets}',
+            f'ack packets:              {self.ack_packets}',
+            f'sync packets:             {self.sync_packets}',
+            f'invalid packets:          {self.invalid_packets}',
+            f'malformed packets:        {self.malformed_packets}',
+            f'checksum failures:        {self.checksum_failures}',
+            *(
+                f'  {status.name + ":":23} {self.decode_errors[status]}'
+                for status in DecodeStatus
+                if status and self.decode_errors[status]
+            ),
+            f'retransmissions:          {self.retransmissions} '
+            f'({self.retransmission_rate:.2%})',
+            f'duplicate acks:           {self.duplicate_acks}',
+            f'flows:                    {self.flows}',
+            f'completed messages:       {self.completed_messages}',
+            f'incomplete reassemblies:  {self.incomplete_reassemblies}',
+            f'unacknowledged fragments: {self.unacknowledged_fragments}',
+            f'ack latency:              '
+            f'count={latency.count} '
+            f'mean={latency.mean * 1e3:.3f}ms '
+            f'p50={latency.quantile(0.50) * 1e3:.3f}ms '
+            f'p90={latency.quantile(0.90) * 1e3:.3f}ms '
+            f'p99={latency.quantile(0.99) * 1e3:.3f}ms '
+            f'max={latency.maximum * 1e3:.3f}ms',
+        ]
+
+        for (source, destination, message_id), received, fragment_amount \
+                in self.incomplete_samples:
+            lines.append(
+                f'  incomplete: {source[0]}:{source[1]} -> {destination[0]}:{destination[1]} '
+                f'message_id={message_id} fragments={received}/{fragment_amount}'
+            )
+
+        return '\n'.join(lines)
+
+
+class _Flow:
+
+    __slots__ = [
+        'fragment_amount',
+        'received',
+        'last_seen',
+        'completed',
+    ]
+
+    def __init__(self, fragment_amount: int, timestamp: float) -> None:
+
+        self.fragment_amount = fragment_amount
+        self.received = 0
+        self.last_seen = timestamp
+        self.completed = False
+
+
+class Analyzer:
+
+    def __init__(
+        self,
+        timeout: float = 5.0,
+        shards: int = 1,
+        shard: int = 0,
+    ) -> None:
+
+        self._timeout = timeout
+        self._shards = shards
+        self._shard = shard
+        self._flows: typing.Dict[FlowKey, _Flow] = {}
+        self._pending: typing.Dict[FragmentKey, typing.Tuple[float, bool]] = {}
+        self._now = 0.0
+        self._since_sweep = 0
+
+        self.statistics = Statistics()
+
+    def feed(self, datagram: pcap.Datagram) -> None:
+
+        payload = datagram.payload
+        source = datagram.source
+        destination = datagram.destination
+
+        if self._shards > 1:
+
+            message_id = payload[8] << 8 | payload[9] if len(payload) >= header_size else 0
+
+            if (message_id + source[1] + destination[1]) % self._shards != self._shard:
+                return
+
+        statistics = self.statistics
+        statistics.datagrams += 1
+
+        self._now = datagram.timestamp
+        self._since_sweep += 1
+
+        if self._since_sweep >= _SWEEP_INTERVAL:
+            self._sweep(self._now - self._timeout)
+
+        status, packet = Packet.try_from_bytes(payload)
+
+        if packet is None:
+            statistics.decode_errors[status] += 1
+            return
+
+        if packet.is_ack:
+            self._ack(packet, source, destination)
+        elif packet.is_sync:
+            statistics.sync_packets += 1
+        elif packet.is_data:
+            self._data(packet, source, destination)
+        else:
+            statistics.invalid_packets += 1
+
+    def finish(self) -> Statistics:
+
+        self._sweep(float('inf'))
+
+        return self.statistics
+
+    def _data(
+        self,
+        packet: Packet,
+        source: pcap.Address,
+        destination: pcap.Address,
+    ) -> None:
+
+        statistics = self.statistics
+        statistics.data_packets += 1
+
+        key = (source, destination, packet.message_id)
+        flow = self._flows.get(key)
+
+        if flow is None or flow.fragment_amount != packet.fragment_amount:
+
+            if flow is not None and not flow.completed:
+                self._incomplete(key, flow)
+
+            flow = self._flows[key] = _Flow(packet.fragment_amount, self._now)
+            statistics.flows += 1
+
+        bit = 1 << packet.fragment_number
+        retransmission = bool(flow.received & bit)
+
+        if retransmission or flow.completed:
+            statistics.retransmissions += 1
+
+        flow.received |= bit
+        flow.last_seen = self._now
+
+        if not flow.completed and flow.received == (1 << flow.fragment_amount) - 1:
+            flow.completed = True
+            statistics.completed_messages += 1
+
+        if packet.is_ack_needed:
+
+            fragment = (source, destination, packet.message_id, packet.fragment_number)
+            pending = self._pending.get(fragment)
+
+            self._pending[fragment] = (
+                pending[0] if pending is not None else self._now,
+                retransmission or pending is not None,
+            )
+
+    def _ack(
+        self,
+        packet: Packet,
+        source: pcap.Address,
+        destination: pcap.Address,
+    ) -> None:
+
+        statistics = self.statistics
+        statistics.ack_packets += 1
+
+        if packet.is_duplicate:
+            statistics.duplicate_acks += 1
+
+        fragment = (destination, source, packet.message_id, packet.fragment_number)
+        pending = self._pending.pop(fragment, None)
+
+        if pending is None:
+            return
+
+        sent, retransmitted = pending
+
+        if not retransmitted:
+            statistics.ack_latency.add(self._now - sent)
+
+    def _incomplete(self, key: FlowKey, flow: _Flow) -> None:
+
+        statistics = self.statistics
+        statistics.incomplete_reassemblies += 1
+
+        if len(statistics.incomplete_samples) < _INCOMPLETE_SAMPLES:
+            statistics.incomplete_samples.append(
+                (key, bin(flow.received).count('1'), flow.fragment_amount),
+            )
+
+    def _sweep(self, deadline: float) -> None:
+
+        self._since_sweep = 0
+
+        expired = [key for key, flow in self._flows.items() if flow.last_seen < deadline]
+
+        for key in expired:
+
+            flow = self._flows.pop(key)
+
+            if not flow.completed:
+                self._incomplete(key, flow)
+
+        unacknowledged = [
+            fragment
+            for fragment, (sent, _) in self._pending.items()
+            if sent < deadline
+        ]
+
+        for fragment in unacknowledged:
+            del self._pending[fragment]
+
+        self.statistics.unacknowledged_fragments += len(unacknowledged)
+
+
+def _analyze_shard(
+    path: str,
+    ports: typing.Optional[typing.List[int]],
+    timeout: float,
+    shards: int,
+    shard: int,
+) -> Statistics:
+
+    analyzer = Analyzer(timeout, shards, shard)
+
+    with pcap.Reader(path, ports) as reader:
+        for datagram in reader:
+            analyzer.feed(datagram)
+
+    return analyzer.finish()
+
+
+def analyze(
+    path: str,
+    ports: typing.Optional[typing.Iterable[int]] = None,
+    timeout: float = 5.0,
+    jobs: int = 1,
+) -> Statistics:
+
+    ports = list(ports) if ports is not None else None
+
+    if jobs <= 1:
+        return _analyze_shard(path, ports, timeout, 1, 0)
+
+    with multiprocessing.Pool(jobs) as pool:
+        results = pool.starmap(
+            _analyze_shard,
+            [(path, ports, timeout, jobs, shard) for shard in range(jobs)],
+        )
+
+    statistics = Statistics()
+
+    for result in results:
+        statistics.merge(result)
+
+    return statistics
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+
+    parser = argparse.ArgumentParser(
+        prog='python -m udpcp.analyze',
+        description='Offline UDPCP capture analyzer.',
+    )
+
+    parser.add_argument('capture', help='pcap or pcapng capture file')
+    parser.add_argument('-p', '--port', dest='ports', type=int, action='append',
+                        help='UDP port carrying UDPCP traffic (repeatable, default: all)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='number of worker processes, sharded by flow')
+    parser.add_argument('-t', '--timeout', type=float, default=5.0,
+                        help='seconds after which idle flows and pending acks expire')
+    parser.add_argument('--json', action='store_true',
+                        help='print statistics as JSON')
+
+    arguments = parser.parse_args(argv)
+
+    try:
+        statistics = analyze(arguments.capture, arguments.ports, arguments.timeout, arguments.jobs)
+    except (OSError, ValueError) as error:
+        print(f'error: {error}', file=sys.stderr)
+        return 1
+
+    if arguments.json:
+        print(json.dumps(statistics.as_dict(), indent=2))
+    else:
+        print(statistics.report())
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,358 @@
+__all__ = [
+    'CongestionControl',
+    'Pacer',
+]
+
+import asyncio
+import collections
+import typing
+
+from .scheduler import Priority
+
+Address = typing.Any
+Release = typing.Callable[[Address, bytes, Priority, typing.Any, int], typing.Optional[bool]]
+
+
+class CongestionControl:
+
+    __slots__ = [
+        'initial_window',
+        'min_window',
+        'max_window',
+        'beta',
+        'gain',
+        'rate',
+        'burst',
+        'idle_timeout',
+    ]
+
+    def __init__(
+        self,
+        initial_window: int = 10,
+        min_window: int = 2,
+        max_window: int = 1024,
+        beta: float = 0.5,
+        gain: float = 1.25,
+        rate: typing.Optional[float] = None,
+        burst: int = 10,
+        idle_timeout: float = 60.0,
+    ) -> None:
+
+        if not 1 <= min_window <= initial_window <= max_window:
+            raise ValueError(
+                f'Couldn\'t create congestion control: '
+                f'invalid window bounds ({min_window}, {initial_window}, {max_window}).'
+            )
+
+        if not 0 < beta < 1:
+            raise ValueError(
+                f'Couldn\'t create congestion control: '
+                f'invalid decrease factor ({beta}).'
+            )
+
+        if gain <= 0:
+            raise ValueError(
+                f'Couldn\'t create congestion control: '
+                f'invalid pacing gain ({gain}).'
+            )
+
+        if rate is not None and rate <= 0:
+            raise ValueError(
+                f'Couldn\'t create congestion control: '
+                f'invalid rate ({rate}).'
+            )
+
+        if burst < 1:
+            raise ValueError(
+                f'Couldn\'t create congestion control: '
+                f'invalid burst ({burst}).'
+            )
+
+        if idle_timeout <= 0:
+            raise ValueError(
+                f'Couldn\'t create congestion control: '
+                f'invalid idle timeout ({idle_timeout}).'
+            )
+
+        self.initial_window = initial_window
+        self.min_window = min_window
+        self.max_window = max_window
+        self.beta = beta
+        self.gain = gain
+        self.rate = rate
+        self.burst = burst
+        self.idle_timeout = idle_timeout
+
+
+class _Peer:
+
+    __slots__ = [
+        'address',
+        'queues',
+        'length',
+        'window',
+        'threshold',
+        'in_flight',
+        'tokens',
+        'refilled',
+        'min_rtt',
+        'recovery_until',
+        'timer',
+        'active',
+    ]
+
+    def __init__(self, address: Address, config: CongestionControl, tokens: float) -> None:
+
+        self.address = address
+        self.queues: typing.List[typing.Deque[typing.Tuple[bytes, typing.Any, int]]] = [
+            collections.deque() for _ in Priority
+        ]
+        self.length = 0
+        self.window = float(config.initial_window)
+        self.threshold = float(config.max_window)
+        self.in_flight = 0
+        self.tokens = tokens
+        self.refilled = 0.0
+        self.min_rtt: typing.Optional[float] = None
+        self.recovery_until = 0.0
+        self.timer: typing.Optional[asyncio.TimerHandle] = None
+        self.active = 0.0
+
+
+class Pacer:
+
+    def __init__(
+        self,
+        config: CongestionControl,
+        loop: asyncio.AbstractEventLoop,
+        release: Release,
+        datagram_size: int,
+        capacities: typing.Optional[typing.Mapping[Priority, int]] = None,
+    ) -> None:
+
+        self.config = config
+        self.loop = loop
+        self.datagram_size = datagram_size
+        self.capacities = [(capacities or {}).get(priority) for priority in Priority]
+        self.dropped = 0
+
+        self._release = release
+        self._peers: typing.Dict[Address, _Peer] = {}
+        self._pruned = loop.time()
+
+    def __len__(self) -> int:
+
+        return sum(peer.length for peer in self._peers.values())
+
+    @property
+    def peers(self) -> int:
+
+        return len(self._peers)
+
+    def window(self, address: Address) -> float:
+
+        peer = self._peers.get(address)
+
+        return peer.window if peer is not None else float(self.config.initial_window)
+
+    def rate(self, address: Address) -> typing.Optional[float]:
+
+        peer = self._peers.get(address)
+
+        return self._rate(peer) if peer is not None else self.config.rate
+
+    def enqueue(
+        self,
+        address: Address,
+        packet: bytes,
+        priority: Priority,
+        token: typing.Any = None,
+        number: int = 0,
+    ) -> bool:
+
+        peer = self._peer(address)
+        queue = peer.queues[priority]
+        capacity = self.capacities[priority]
+
+        queue.append((packet, token, number))
+        peer.length += 1
+
+        kept = True
+
+        if capacity is not None and len(queue) > capacity and queue[0][1] is None:
+            queue.popleft()
+            peer.length -= 1
+            self.dropped += 1
+            kept = False
+
+        if peer.timer is None:
+            self._drain(peer)
+
+        return kept
+
+    def acked(
+        self,
+        address: Address,
+        count: int,
+        rtt: typing.Optional[float],
+        duplicate: bool,
+    ) -> None:
+
+        peer = self._peer(address)
+        peer.in_flight = max(peer.in_flight - count, 0)
+
+        if rtt is not None and (peer.min_rtt is None or rtt < peer.min_rtt):
+            peer.min_rtt = rtt
+
+        if duplicate:
+            self._decrease(peer)
+        elif peer.window < peer.threshold:
+            peer.window = min(peer.window + 1, self.config.max_window)
+        else:
+            peer.window = min(peer.window + 1 / peer.window, self.config.max_window)
+
+        if peer.timer is None:
+            self._drain(peer)
+
+    def lost(self, address: Address, count: int) -> None:
+
+        peer = self._peer(address)
+        peer.in_flight = max(peer.in_flight - count, 0)
+
+        self._decrease(peer)
+
+    def forget(self, address: Address, count: int) -> None:
+
+        peer = self._peers.get(address)
+
+        if peer is None:
+            return
+
+        peer.in_flight = max(peer.in_flight - count, 0)
+
+        if peer.timer is None:
+            self._drain(peer)
+
+    def clear(self) -> None:
+
+        for peer in self._peers.values():
+            if peer.timer is not None:
+                peer.timer.cancel()
+
+        self._peers.clear()
+
+    def _peer(self, address: Address) -> _Peer:
+
+        now = self.loop.time()
+
+        if now - self._pruned >= self.config.idle_timeout:
+            self._prune(now)
+
+        peer = self._peers.get(address)
+
+        if peer is None:
+            peer = self._peers[address] = _Peer(address, self.config, self._burst())
+            peer.refilled = now
+
+        peer.active = now
+
+        return peer
+
+    def _prune(self, now: float) -> None:
+
+        deadline = now - self.config.idle_timeout
+
+        self._pruned = now
+        self._peers = {
+            address: peer
+            for address, peer in self._peers.items()
+            if peer.length or peer.timer is not None or peer.active > deadline
+        }
+
+    def _burst(self) -> float:
+
+        return float(self.config.burst * self.datagram_size)
+
+    def _rate(self, peer: _Peer) -> typing.Optional[float]:
+
+        config = self.config
+
+        if peer.min_rtt is None or not peer.min_rtt:
+            return config.rate
+
+        rate = config.gain * peer.window * self.datagram_size / peer.min_rtt
+
+        return rate if config.rate is None else min(rate, config.rate)
+
+    def _decrease(self, peer: _Peer) -> None:
+
+        now = self.loop.time()
+
+        if now < peer.recovery_until:
+            return
+
+        peer.threshold = max(peer.window * self.config.beta, float(self.config.min_window))
+        peer.window = peer.threshold
+        peer.recovery_until = now + (peer.min_rtt or 0.0)
+
+    def _refill(self, peer: _Peer) -> typing.Optional[float]:
+
+        rate = self._rate(peer)
+
+        if rate is not None:
+            now = self.loop.time()
+            peer.tokens = min(peer.tokens + (now - peer.refilled) * rate, self._burst())
+            peer.refilled = now
+
+        return rate
+
+    def _wake(self, peer: _Peer) -> None:
+
+        peer.timer = None
+
+        self._refill(peer)
+        peer.tokens = max(peer.tokens, 0.0)
+
+        self._drain(peer)
+
+    def _drain(self, peer: _Peer) -> None:
+
+        rate = self._refill(peer)
+        queues = peer.queues
+
+        while peer.length:
+
+            # window-limited heads only block their own priority, untracked
+            # traffic of lower priorities keeps flowing
+            limited = peer.in_flight >= int(peer.window)
+            priority = next(
+                (
+                    priority for priority, queue in enumerate(queues)
+                    if queue and not (limited and queue[0][1] is not None)
+                ),
+                None,
+            )
+
+            if priority is None:
+                return
+
+            queue = queues[priority]
+            packet, token, number = queue[0]
+
+            if rate is not None and peer.tokens < 0:
+                peer.timer = self.loop.call_later(-peer.tokens / rate, self._wake, peer)
+                return
+
+            queue.popleft()
+            peer.length -= 1
+
+            counted = self._release(peer.address, packet, Priority(priority), token, number)
+
+            if counted is None:
+                continue
+
+            if rate is not None:
+                peer.tokens -= len(packet)
+
+            if counted:
+                peer.in_flight += 1
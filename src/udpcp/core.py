@@ -0,0 +1,756 @@
+__all__ = [
+    'Connection',
+    'Statistics',
+    'Event',
+    'MessageReceived',
+    'MessageAcknowledged',
+    'MessageFailed',
+    'MessageRetransmitted',
+    'ReassemblyExpired',
+    'PacketRejected',
+    'DEFAULT_FRAGMENT_SIZE',
+]
+
+import heapq
+import collections
+import typing
+
+from .protocol import Packet, ChecksumMode, TransferMode, DecodeStatus
+from .delivery import BufferPool
+
+Buffer = typing.Union[bytes, bytearray, memoryview]
+
+DEFAULT_FRAGMENT_SIZE = 1460
+
+_MAX_FRAGMENT_SIZE = 65535
+_MAX_FRAGMENT_AMOUNT = 255
+_MAX_MESSAGE_ID = 0xFFFF
+
+_OUTGOING = 0
+_REASSEMBLY = 1
+
+
+class Event:
+
+    __slots__ = [
+        'message_id',
+    ]
+
+    def __init__(self, message_id: int) -> None:
+
+        self.message_id = message_id
+
+
+class MessageReceived(Event):
+
+    __slots__ = [
+        'transfer_mode',
+        'data',
+        'buffer',
+    ]
+
+    def __init__(
+        self,
+        message_id: int,
+        transfer_mode: TransferMode,
+        data: Buffer,
+        buffer: typing.Optional[bytearray] = None,
+    ) -> None:
+
+        super().__init__(message_id)
+
+        self.transfer_mode = transfer_mode
+        self.data = data
+        self.buffer = buffer
+
+
+class MessageAcknowledged(Event):
+
+    __slots__ = [
+        'retransmitted',
+    ]
+
+    def __init__(self, message_id: int, retransmitted: bool) -> None:
+
+        super().__init__(message_id)
+
+        self.retransmitted = retransmitted
+
+
+class MessageFailed(Event):
+
+    __slots__ = [
+        'error',
+    ]
+
+    def __init__(self, message_id: int, error: Exception) -> None:
+
+        super().__init__(message_id)
+
+        self.error = error
+
+
+class MessageRetransmitted(Event):
+
+    __slots__ = [
+        'numbers',
+    ]
+
+    def __init__(self, message_id: int, numbers: typing.Sequence[int]) -> None:
+
+        super().__init__(message_id)
+
+        self.numbers = numbers
+
+
+class ReassemblyExpired(Event):
+
+    __slots__ = [
+        'missing',
+    ]
+
+    def __init__(self, message_id: int, missing: int) -> None:
+
+        super().__init__(message_id)
+
+        self.missing = missing
+
+
+class PacketRejected(Event):
+
+    __slots__ = [
+        'status',
+    ]
+
+    def __init__(self, status: DecodeStatus) -> None:
+
+        super().__init__(0)
+
+        self.status = status
+
+
+Output = typing.Tuple[typing.List[bytes], typing.List[Event]]
+
+
+class Statistics:
+
+    __slots__ = [
+        'sent_packets',
+        'received_packets',
+        'invalid_packets',
+        'sent_messages',
+        'delivered_messages',
+        'failed_messages',
+        'expired_reassemblies',
+        'retransmissions',
+        'duplicate_packets',
+        'sent_acks',
+        'received_acks',
+        'decode_errors',
+    ]
+
+    def __init__(self) -> None:
+
+        self.sent_packets = 0
+        self.received_packets = 0
+        self.invalid_packets = 0
+        self.sent_messages = 0
+        self.delivered_messages = 0
+        self.failed_messages = 0
+        self.expired_reassemblies = 0
+        self.retransmissions = 0
+        self.duplicate_packets = 0
+        self.sent_acks = 0
+        self.received_acks = 0
+        self.decode_errors = [0] * len(DecodeStatus)
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+
+        result: typing.Dict[str, typing.Any] = {
+            name: getattr(self, name)
+            for cls in reversed(type(self).__mro__)
+            for name in getattr(cls, '__slots__', ())
+            if name != 'decode_errors'
+        }
+
+        result['decode_errors'] = {
+            status.name: self.decode_errors[status] for status in DecodeStatus if status
+        }
+
+        return result
+
+
+class _Outgoing:
+
+    __slots__ = [
+        'message_id',
+        'transfer_mode',
+        'packets',
+        'pending',
+        'deadline',
+        'timeout',
+        'retries',
+        'deferred',
+    ]
+
+    def __init__(
+        self,
+        message_id: int,
+        transfer_mode: TransferMode,
+        packets: typing.List[bytes],
+        pending: typing.Set[int],
+        deadline: typing.Optional[float],
+        timeout: float,
+        retries: int,
+        deferred: bool,
+    ) -> None:
+
+        self.message_id = message_id
+        self.transfer_mode = transfer_mode
+        self.packets = packets
+        self.pending = pending
+        self.deadline = deadline
+        self.timeout = timeout
+        self.retries = retries
+        self.deferred = deferred
+
+
+class _Reassembly:
+
+    __slots__ = [
+        'received',
+        'missing',
+        'stride',
+        'buffer',
+        'tail',
+        'length',
+        'last',
+        'deadline',
+    ]
+
+    def __init__(self, fragment_amount: int, deadline: float) -> None:
+
+        self.received = bytearray(fragment_amount)
+        self.missing = fragment_amount
+        self.stride: typing.Optional[int] = None
+        self.buffer: typing.Optional[bytearray] = None
+        self.tail: typing.Optional[Buffer] = None
+        self.length = 0
+        self.last: typing.Optional[Packet] = None
+        self.deadline = deadline
+
+
+class Connection:
+
+    def __init__(
+        self,
+        fragment_size: int = DEFAULT_FRAGMENT_SIZE,
+        checksum_mode: ChecksumMode = ChecksumMode.Enabled,
+        timeout: float = 0.2,
+        retries: int = 5,
+        reassembly_timeout: float = 5.0,
+        statistics: typing.Optional[Statistics] = None,
+        buffers: typing.Optional[BufferPool] = None,
+    ) -> None:
+
+        if not 0 < fragment_size <= _MAX_FRAGMENT_SIZE:
+            raise ValueError(
+                f'Couldn\'t create connection: '
+                f'invalid fragment size ({fragment_size}).'
+            )
+
+        self._fragment_size = fragment_size
+        self._checksum_mode = checksum_mode
+        self._timeout = timeout
+        self._retries = retries
+        self._reassembly_timeout = reassembly_timeout
+        self._buffers = buffers
+
+        self._message_id = 0
+        self._sent_at = float('-inf')
+        self._outgoing: typing.Dict[int, _Outgoing] = {}
+        self._reassemblies: typing.Dict[int, _Reassembly] = {}
+        self._completed: typing.Dict[int, float] = {}
+        self._expiries: typing.Deque[typing.Tuple[float, int]] = collections.deque()
+        self._timers: typing.List[typing.Tuple[float, int, int]] = []
+
+        self._datagrams: typing.List[bytes] = []
+        self._events: typing.List[Event] = []
+
+        self.statistics = Statistics() if statistics is None else statistics
+
+    @property
+    def fragment_size(self) -> int:
+
+        return self._fragment_size
+
+    @property
+    def max_message_size(self) -> int:
+
+        return self._fragment_size * _MAX_FRAGMENT_AMOUNT
+
+    @property
+    def outstanding(self) -> int:
+
+        return len(self._outgoing)
+
+    @property
+    def reassembling(self) -> int:
+
+        return len(self._reassemblies)
+
+    def is_pending(self, message_id: int, fragment_number: int) -> bool:
+
+        outgoing = self._outgoing.get(message_id)
+
+        return outgoing is not None and fragment_number in outgoing.pending
+
+    def is_known(self, message_id: int) -> bool:
+
+        return message_id in self._completed or message_id in self._reassemblies
+
+    def idle(self, now: float) -> bool:
+
+        # message ids restart once the state is dropped, so the peer must have
+        # forgotten the last ones it completed before they can be reused
+        return (
+            not self._outgoing and not self._reassemblies and not self._completed
+            and now - self._sent_at >= self._reassembly_timeout
+        )
+
+    def get_timer(self) -> typing.Optional[float]:
+
+        timers = self._timers
+
+        while timers and not self._is_armed(*timers[0]):
+            heapq.heappop(timers)
+
+        deadline = timers[0][0] if timers else None
+
+        if self._expiries and (deadline is None or self._expiries[0][0] < deadline):
+            deadline = self._expiries[0][0]
+
+        return deadline
+
+    def sync(self, now: float, deferred: bool = False) -> typing.List[bytes]:
+
+        packet = Packet.sync(self._checksum_mode)
+
+        self._submit(0, TransferMode.AckEveryPacket, [packet.as_bytes], {0}, now, deferred)
+
+        datagrams, self._datagrams = self._datagrams, []
+
+        return datagrams
+
+    def send(
+        self,
+        data: typing.Union[bytes, bytearray, memoryview],
+        now: float,
+        transfer_mode: TransferMode = TransferMode.AckEveryPacket,
+        deferred: bool = False,
+    ) -> typing.Tuple[int, typing.List[bytes]]:
+
+        fragment_size = self._fragment_size
+        fragment_amount = max(1, -(-len(data) // fragment_size))
+
+        if fragment_amount > _MAX_FRAGMENT_AMOUNT:
+            raise ValueError(
+                f'Couldn\'t send message: '
+                f'message too large ({len(data)} > {self.max_message_size}).'
+            )
+
+        message_id = self._message_id = self._message_id % _MAX_MESSAGE_ID + 1
+
+        view = memoryview(data)
+        packets = [
+            Packet.data(
+                transfer_mode=transfer_mode,
+                checksum_mode=self._checksum_mode,
+                fragment_amount=fragment_amount,
+                fragment_number=fragment_number,
+                message_id=message_id,
+                payload_data=typing.cast(bytes, view[offset:offset + fragment_size]),
+            ).as_bytes
+            for fragment_number, offset in enumerate(range(0, len(view) or 1, fragment_size))
+        ]
+
+        if transfer_mode is TransferMode.AckEveryPacket:
+            pending = set(range(fragment_amount))
+        elif transfer_mode is TransferMode.AckLastFragmentOnly:
+            pending = {fragment_amount - 1}
+        else:
+            pending = set()
+
+        self.statistics.sent_messages += 1
+        self._submit(message_id, transfer_mode, packets, pending, now, deferred)
+
+        datagrams, self._datagrams = self._datagrams, []
+
+        return message_id, datagrams
+
+    def released(self, message_id: int, now: float) -> None:
+
+        outgoing = self._outgoing.get(message_id)
+
+        if outgoing is None:
+            return
+
+        self._sent_at = now
+
+        outgoing.deadline = now + outgoing.timeout
+        self._arm(outgoing.deadline, _OUTGOING, message_id)
+
+    def receive_datagram(self, data: bytes, now: float) -> Output:
+
+        self.statistics.received_packets += 1
+
+        status, packet = Packet.try_from_bytes(data)
+
+        if packet is None:
+            self._reject(status)
+            return self._flush()
+
+        return self.receive_packet(packet, now)
+
+    def receive_packet(self, packet: Packet, now: float) -> Output:
+
+        if packet.is_data:
+            if packet.is_fragment_valid:
+                self._fragment(packet, now)
+            else:
+                self._reject(DecodeStatus.InvalidFragment)
+        elif packet.is_ack:
+            self._acknowledged(packet)
+        elif packet.is_sync:
+            self._ack(packet, False)
+        else:
+            self.statistics.invalid_packets += 1
+
+        return self._flush()
+
+    def timer_expired(self, now: float) -> Output:
+
+        timers = self._timers
+
+        while timers and timers[0][0] <= now:
+
+            deadline, kind, message_id = heapq.heappop(timers)
+
+            if not self._is_armed(deadline, kind, message_id):
+                continue
+
+            if kind == _OUTGOING:
+                self._expired(self._outgoing[message_id], now)
+            else:
+                self._abandon(message_id)
+
+        completed = self._completed
+        expiries = self._expiries
+
+        while expiries and expiries[0][0] <= now:
+
+            deadline, message_id = expiries.popleft()
+
+            if completed.get(message_id) == deadline:
+                del completed[message_id]
+
+        return self._flush()
+
+    def abort(self, error: Exception) -> Output:
+
+        for outgoing in list(self._outgoing.values()):
+            self._finish(outgoing, error)
+
+        for message_id in list(self._reassemblies):
+            self._discard(message_id)
+
+        self._completed.clear()
+        self._expiries.clear()
+        self._timers.clear()
+
+        return self._flush()
+
+    def _flush(self) -> Output:
+
+        datagrams, self._datagrams = self._datagrams, []
+        events, self._events = self._events, []
+
+        return datagrams, events
+
+    def _is_armed(self, deadline: float, kind: int, message_id: int) -> bool:
+
+        state: typing.Union[_Outgoing, _Reassembly, None]
+
+        if kind == _OUTGOING:
+            state = self._outgoing.get(message_id)
+        else:
+            state = self._reassemblies.get(message_id)
+
+        return state is not None and state.deadline == deadline
+
+    def _arm(self, deadline: float, kind: int, message_id: int) -> None:
+
+        heapq.heappush(self._timers, (deadline, kind, message_id))
+
+    def _submit(
+        self,
+        message_id: int,
+        transfer_mode: TransferMode,
+        packets: typing.List[bytes],
+        pending: typing.Set[int],
+        now: float,
+        deferred: bool,
+    ) -> None:
+
+        previous = self._outgoing.get(message_id)
+
+        if previous is not None:
+            self._finish(previous, ConnectionError(
+                f'Couldn\'t send message: message id was reused ({message_id}).'
+            ))
+
+        self.statistics.sent_packets += len(packets)
+        self._datagrams.extend(packets)
+        self._sent_at = now
+
+        if not pending:
+            return
+
+        # deferred messages are put on the wire by the caller, whose timer only
+        # starts once it reports them released
+        deadline = None if deferred else now + self._timeout
+
+        self._outgoing[message_id] = _Outgoing(
+            message_id, transfer_mode, packets, pending, deadline, self._timeout, self._retries,
+            deferred,
+        )
+
+        if deadline is not None:
+            self._arm(deadline, _OUTGOING, message_id)
+
+    def _expired(self, outgoing: _Outgoing, now: float) -> None:
+
+        if not outgoing.retries:
+            self._finish(outgoing, TimeoutError(
+                f'Couldn\'t send message: '
+                f'no acknowledgement after {self._retries} retransmissions '
+                f'(message_id={outgoing.message_id}).'
+            ))
+            return
+
+        if outgoing.transfer_mode is TransferMode.AckEveryPacket:
+            numbers: typing.Sequence[int] = sorted(outgoing.pending)
+        else:
+            numbers = range(len(outgoing.packets))
+
+        self.statistics.sent_packets += len(numbers)
+        self.statistics.retransmissions += len(numbers)
+
+        outgoing.retries -= 1
+        outgoing.timeout *= 2
+
+        if outgoing.deferred:
+            outgoing.deadline = None
+            self._events.append(MessageRetransmitted(outgoing.message_id, numbers))
+            return
+
+        outgoing.deadline = now + outgoing.timeout
+        self._sent_at = now
+
+        self._datagrams.extend(outgoing.packets[number] for number in numbers)
+        self._arm(outgoing.deadline, _OUTGOING, outgoing.message_id)
+
+    def _finish(self, outgoing: _Outgoing, error: typing.Optional[Exception] = None) -> None:
+
+        del self._outgoing[outgoing.message_id]
+
+        if error is None:
+            retransmitted = outgoing.retries != self._retries
+            self._events.append(MessageAcknowledged(outgoing.message_id, retransmitted))
+        else:
+            self.statistics.failed_messages += 1
+            self._events.append(MessageFailed(outgoing.message_id, error))
+
+    def _acknowledged(self, packet: Packet) -> None:
+
+        self.statistics.received_acks += 1
+
+        outgoing = self._outgoing.get(packet.message_id)
+
+        if outgoing is None or packet.fragment_number not in outgoing.pending:
+            return
+
+        outgoing.pending.discard(packet.fragment_number)
+
+        if not outgoing.pending:
+            self._finish(outgoing)
+
+    def _ack(self, packet: Packet, is_duplicate: bool) -> None:
+
+        self._datagrams.append(Packet.ack(packet, is_duplicate).as_bytes)
+        self.statistics.sent_acks += 1
+
+    def _reject(self, status: DecodeStatus) -> None:
+
+        self.statistics.invalid_packets += 1
+        self.statistics.decode_errors[status] += 1
+        self._events.append(PacketRejected(status))
+
+    def _fragment(self, packet: Packet, now: float) -> None:
+
+        message_id = packet.message_id
+
+        if message_id in self._completed:
+            self.statistics.duplicate_packets += 1
+
+            if packet.is_ack_needed:
+                self._ack(packet, True)
+
+            return
+
+        fragment_amount = packet.fragment_amount
+        reassembly = self._reassemblies.get(message_id)
+
+        if reassembly is None or len(reassembly.received) != fragment_amount:
+
+            if reassembly is not None:
+                self._discard(message_id)
+
+            if fragment_amount == 1:
+
+                if packet.is_ack_needed:
+                    self._ack(packet, False)
+
+                payload = packet.payload_data
+
+                if self._buffers is None:
+                    payload = bytes(payload)
+
+                self._complete(packet, payload, None, now)
+
+                return
+
+            deadline = now + self._reassembly_timeout
+            reassembly = self._reassemblies[message_id] = _Reassembly(fragment_amount, deadline)
+            self._arm(deadline, _REASSEMBLY, message_id)
+
+        fragment_number = packet.fragment_number
+        duplicate = bool(reassembly.received[fragment_number])
+
+        if duplicate:
+            self.statistics.duplicate_packets += 1
+        elif not self._place(reassembly, fragment_number, packet.payload_data):
+            self.statistics.invalid_packets += 1
+            return
+        else:
+            reassembly.received[fragment_number] = 1
+            reassembly.missing -= 1
+
+            if packet.is_last:
+                reassembly.last = packet
+
+        if packet.transfer_mode is TransferMode.AckEveryPacket:
+            self._ack(packet, duplicate)
+
+        if reassembly.missing:
+            return
+
+        if packet.transfer_mode is TransferMode.AckLastFragmentOnly:
+            assert reassembly.last is not None
+            self._ack(reassembly.last, False)
+
+        del self._reassemblies[message_id]
+
+        buffer = reassembly.buffer
+        assert buffer is not None and reassembly.stride is not None
+
+        length = (fragment_amount - 1) * reassembly.stride + reassembly.length
+
+        if self._buffers is None:
+            self._complete(packet, bytes(memoryview(buffer)[:length]), None, now)
+        else:
+            self._complete(packet, memoryview(buffer)[:length], buffer, now)
+
+    def _place(self, reassembly: _Reassembly, fragment_number: int, payload: Buffer) -> bool:
+
+        # every fragment but the last one is exactly as long as the first one
+        # seen, so each lands at a fixed offset in a single buffer
+        last = len(reassembly.received) - 1
+        size = len(payload)
+        stride = reassembly.stride
+
+        if fragment_number < last:
+
+            if stride is None:
+
+                tail = reassembly.tail
+
+                if tail is not None and len(tail) > size:
+                    return False
+
+                reassembly.stride = stride = size
+                reassembly.buffer = self._acquire(stride * (last + 1))
+
+                if tail is not None:
+                    reassembly.buffer[last * stride:last * stride + len(tail)] = tail
+                    reassembly.tail = None
+
+            elif size != stride:
+                return False
+
+        else:
+
+            if stride is None:
+                reassembly.tail = payload
+                reassembly.length = size
+                return True
+
+            if size > stride:
+                return False
+
+            reassembly.length = size
+
+        assert reassembly.buffer is not None
+
+        offset = fragment_number * stride
+        reassembly.buffer[offset:offset + size] = payload
+
+        return True
+
+    def _acquire(self, size: int) -> bytearray:
+
+        return bytearray(size) if self._buffers is None else self._buffers.acquire(size)
+
+    def _complete(
+        self,
+        packet: Packet,
+        data: Buffer,
+        buffer: typing.Optional[bytearray],
+        now: float,
+    ) -> None:
+
+        deadline = now + self._reassembly_timeout
+
+        self._completed[packet.message_id] = deadline
+        self._expiries.append((deadline, packet.message_id))
+
+        self.statistics.delivered_messages += 1
+        self._events.append(
+            MessageReceived(packet.message_id, packet.transfer_mode, data, buffer),
+        )
+
+    def _discard(self, message_id: int) -> _Reassembly:
+
+        reassembly = self._reassemblies.pop(message_id)
+
+        if reassembly.buffer is not None and self._buffers is not None:
+            self._buffers.release(reassembly.buffer)
+
+        return reassembly
+
+    def _abandon(self, message_id: int) -> None:
+
+        reassembly = self._discard(message_id)
+
+        self.statistics.expired_reassemblies += 1
+        self._events.append(ReassemblyExpired(message_id, reassembly.missing))
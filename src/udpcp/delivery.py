@@ -0,0 +1,98 @@
+__all__ = [
+    'Message',
+    'BufferPool',
+]
+
+import typing
+
+from .protocol import TransferMode
+
+Address = typing.Any
+
+
+class BufferPool:
+
+    __slots__ = [
+        '_size',
+        '_max_capacity',
+        '_free',
+        'allocated',
+        'reused',
+    ]
+
+    def __init__(self, size: int = 16, max_capacity: int = 16 << 20) -> None:
+
+        self._size = size
+        self._max_capacity = max_capacity
+        self._free: typing.Dict[int, typing.List[bytearray]] = {}
+
+        self.allocated = 0
+        self.reused = 0
+
+    def __len__(self) -> int:
+
+        return sum(len(buffers) for buffers in self._free.values())
+
+    def acquire(self, length: int) -> bytearray:
+
+        capacity = 1 << max(length - 1, 0).bit_length()
+        buffers = self._free.get(capacity)
+
+        if buffers:
+            self.reused += 1
+            return buffers.pop()
+
+        self.allocated += 1
+
+        return bytearray(capacity)
+
+    def release(self, buffer: bytearray) -> None:
+
+        capacity = len(buffer)
+
+        if capacity > self._max_capacity:
+            return
+
+        buffers = self._free.setdefault(capacity, [])
+
+        if len(buffers) < self._size:
+            buffers.append(buffer)
+
+
+class Message:
+
+    __slots__ = [
+        'address',
+        'message_id',
+        'transfer_mode',
+        'data',
+        '_buffer',
+        '_pool',
+    ]
+
+    def __init__(
+        self,
+        address: Address,
+        message_id: int,
+        transfer_mode: TransferMode,
+        data: memoryview,
+        buffer: typing.Optional[bytearray] = None,
+        pool: typing.Optional[BufferPool] = None,
+    ) -> None:
+
+        self.address = address
+        self.message_id = message_id
+        self.transfer_mode = transfer_mode
+        self.data = data
+
+        self._buffer = buffer
+        self._pool = pool
+
+    def release(self) -> None:
+
+        self.data.release()
+
+        buffer, self._buffer = self._buffer, None
+
+        if buffer is not None and self._pool is not None:
+            self._pool.release(buffer)
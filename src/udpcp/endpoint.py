@@ -0,0 +1,1165 @@
+__all__ = [
+    'Endpoint',
+    'Statistics',
+    'open_endpoint',
+    'parse_address',
+    'format_address',
+    'DEFAULT_FRAGMENT_SIZE',
+    'DEFAULT_TELEMETRY_CAPACITY',
+    'MIN_BUFFER_SIZE',
+    'MAX_BUFFER_SIZE',
+]
+
+import os
+import socket
+import asyncio
+import functools
+import collections
+import typing
+
+from .core import (
+    Connection,
+    Statistics as ConnectionStatistics,
+    MessageReceived,
+    MessageAcknowledged,
+    MessageFailed,
+    MessageRetransmitted,
+    Output,
+    DEFAULT_FRAGMENT_SIZE,
+)
+from .metrics import Registry, Histogram
+from .protocol import Packet, ChecksumMode, TransferMode, DecodeStatus
+from .protocol.prediction import HeaderPredictor
+from .protocol._utils.specification import header_size
+from .scheduler import Scheduler, Priority
+from .congestion import CongestionControl, Pacer
+from .overload import Shedding, OverflowReader, set_buffer_size
+from .delivery import Message, BufferPool
+
+Address = typing.Any
+Handler = typing.Callable[[Address, bytes], None]
+Callback = typing.Callable[[Message], None]
+Consumer = typing.Callable[[typing.List[Message]], typing.Awaitable[None]]
+
+DEFAULT_TELEMETRY_CAPACITY = 256
+MIN_BUFFER_SIZE = 1 << 20
+MAX_BUFFER_SIZE = 16 << 20
+
+_MAX_FRAGMENT_SIZE = 65535
+_SCHEMES = ('udp:', 'unix:')
+_READ_ONLY = hasattr(memoryview, 'toreadonly')
+_MAX_UDP_PAYLOAD = {
+    socket.AF_INET: 65507,
+    socket.AF_INET6: 65527,
+}
+_MAX_FRAGMENT_AMOUNT = 255
+_LATENCY_BATCH = 4096
+
+_STATISTICS_HELP = {
+    'sent_packets': 'Data and sync packets transmitted, including retransmissions.',
+    'received_packets': 'Datagrams received.',
+    'invalid_packets': 'Datagrams that failed to decode or carried an invalid packet.',
+    'sent_messages': 'Messages submitted for sending.',
+    'delivered_messages': 'Reassembled messages delivered to the application.',
+    'failed_messages': 'Messages that were never acknowledged.',
+    'expired_reassemblies': 'Partial messages dropped after the reassembly timeout.',
+    'retransmissions': 'Packets retransmitted after an acknowledgement timeout.',
+    'duplicate_packets': 'Data packets received more than once.',
+    'sent_acks': 'Acknowledgements transmitted.',
+    'received_acks': 'Acknowledgements received.',
+    'dropped_packets': 'Packets dropped from a full drop-oldest send queue.',
+    'kernel_drops': 'Datagrams dropped by the kernel because the receive buffer was full.',
+    'shed_unreliable': 'AckNone data packets dropped by the overload policy.',
+    'shed_reassemblies': 'Data packets dropped under overload instead of starting a reassembly.',
+}
+
+
+class Statistics(ConnectionStatistics):
+
+    __slots__ = [
+        'dropped_packets',
+        'kernel_drops',
+        'shed_unreliable',
+        'shed_reassemblies',
+    ]
+
+    def __init__(self) -> None:
+
+        super().__init__()
+
+        self.dropped_packets = 0
+        self.kernel_drops = 0
+        self.shed_unreliable = 0
+        self.shed_reassemblies = 0
+
+
+class _Outgoing:
+
+    __slots__ = [
+        'address',
+        'message_id',
+        'priority',
+        'packets',
+        'future',
+        'sent_at',
+        'released_at',
+        'queued',
+        'flight',
+        'sampled',
+        'retransmitted',
+    ]
+
+    def __init__(
+        self,
+        address: Address,
+        message_id: int,
+        priority: Priority,
+        packets: typing.List[bytes],
+        future: 'asyncio.Future[None]',
+        sent_at: float,
+    ) -> None:
+
+        self.address = address
+        self.message_id = message_id
+        self.priority = priority
+        self.packets = packets
+        self.future = future
+        self.sent_at = sent_at
+        self.released_at: typing.Optional[float] = None
+        self.queued: typing.Set[int] = set()
+        self.flight = 0
+        self.sampled = False
+        self.retransmitted = False
+
+
+class Endpoint(asyncio.DatagramProtocol):
+
+    def __init__(
+        self,
+        handler: typing.Optional[Handler] = None,
+        fragment_size: int = DEFAULT_FRAGMENT_SIZE,
+        checksum_mode: ChecksumMode = ChecksumMode.Enabled,
+        timeout: float = 0.2,
+        retries: int = 5,
+        reassembly_timeout: float = 5.0,
+        metrics: typing.Optional[Registry] = None,
+        telemetry_capacity: int = DEFAULT_TELEMETRY_CAPACITY,
+        congestion: typing.Optional[CongestionControl] = None,
+        receive_buffer: typing.Optional[int] = None,
+        send_buffer: typing.Optional[int] = None,
+        shedding: typing.Optional[Shedding] = None,
+        prediction: bool = True,
+    ) -> None:
+
+        if not 0 < fragment_size <= _MAX_FRAGMENT_SIZE:
+            raise ValueError(
+                f'Couldn\'t create endpoint: '
+                f'invalid fragment size ({fragment_size}).'
+            )
+
+        for size in (receive_buffer, send_buffer):
+            if size is not None and size < 0:
+                raise ValueError(
+                    f'Couldn\'t create endpoint: '
+                    f'invalid socket buffer size ({size}).'
+                )
+
+        if receive_buffer is None or send_buffer is None:
+
+            size = 4 * _MAX_FRAGMENT_AMOUNT * (fragment_size + header_size)
+            size = min(max(size, MIN_BUFFER_SIZE), MAX_BUFFER_SIZE)
+
+            receive_buffer = size if receive_buffer is None else receive_buffer
+            send_buffer = size if send_buffer is None else send_buffer
+
+        self._handler = handler
+        self._fragment_size = fragment_size
+        self._checksum_mode = checksum_mode
+        self._timeout = timeout
+        self._retries = retries
+        self._reassembly_timeout = reassembly_timeout
+
+        self._loop: typing.Optional[asyncio.AbstractEventLoop] = None
+        self._transport: typing.Optional[asyncio.DatagramTransport] = None
+        self._closed: typing.Optional[asyncio.Future[None]] = None
+        self._queue: typing.Deque[typing.Tuple[Address, bytes]] = collections.deque()
+        self._waiter: typing.Optional[asyncio.Future[None]] = None
+        self._close_callbacks: typing.List[typing.Callable[[], None]] = []
+
+        self._scheduler = Scheduler(
+            fragment_size + header_size, {Priority.Telemetry: telemetry_capacity},
+        )
+        self._paused = False
+        self._telemetry_capacity = telemetry_capacity
+        self._congestion = congestion
+        self._pacer: typing.Optional[Pacer] = None
+
+        self._receive_buffer = receive_buffer
+        self._send_buffer = send_buffer
+        self._buffer_sizes: typing.Tuple[typing.Optional[int], typing.Optional[int]] = (None, None)
+        self._reader: typing.Optional[OverflowReader] = None
+        self._shedding = shedding
+        self._overflowed_at = float('-inf')
+
+        self._connections: typing.Dict[Address, Connection] = {}
+        self._timers: typing.Dict[Address, asyncio.TimerHandle] = {}
+        self._evictor: typing.Optional[asyncio.TimerHandle] = None
+        self._outgoing: typing.Dict[typing.Tuple[Address, int], _Outgoing] = {}
+        self._reassembling = 0
+
+        self._buffers = BufferPool()
+        self._callback: typing.Optional[Callback] = None
+        self._batch: typing.Deque[Message] = collections.deque()
+        self._consumer: typing.Optional[asyncio.Future[None]] = None
+        self._consuming = False
+
+        self._predictor = HeaderPredictor() if prediction else None
+
+        self._metrics = metrics
+        self._collector: typing.Optional[typing.Callable[[], None]] = None
+        self._ack_latency: typing.Optional[Histogram] = None
+        self._latencies: typing.List[float] = []
+
+        self.statistics = Statistics()
+
+    @property
+    def handler(self) -> typing.Optional[Handler]:
+
+        return self._handler
+
+    @handler.setter
+    def handler(self, handler: typing.Optional[Handler]) -> None:
+
+        self._handler = handler
+
+    @property
+    def callback(self) -> typing.Optional[Callback]:
+
+        return self._callback
+
+    @callback.setter
+    def callback(self, callback: typing.Optional[Callback]) -> None:
+
+        self._callback = callback
+
+    @property
+    def buffers(self) -> BufferPool:
+
+        return self._buffers
+
+    @property
+    def fragment_size(self) -> int:
+
+        return self._fragment_size
+
+    @property
+    def max_message_size(self) -> int:
+
+        return self._fragment_size * _MAX_FRAGMENT_AMOUNT
+
+    @property
+    def local_address(self) -> Address:
+
+        assert self._transport is not None
+
+        return self._transport.get_extra_info('sockname')
+
+    @property
+    def outstanding(self) -> int:
+
+        return len(self._outgoing)
+
+    @property
+    def reassembling(self) -> int:
+
+        return self._reassembling
+
+    @property
+    def queued(self) -> int:
+
+        return len(self._scheduler) + (len(self._pacer) if self._pacer is not None else 0)
+
+    @property
+    def predictor(self) -> typing.Optional[HeaderPredictor]:
+
+        return self._predictor
+
+    @property
+    def pacer(self) -> typing.Optional[Pacer]:
+
+        return self._pacer
+
+    @property
+    def receive_buffer_size(self) -> typing.Optional[int]:
+
+        return self._buffer_sizes[0]
+
+    @property
+    def send_buffer_size(self) -> typing.Optional[int]:
+
+        return self._buffer_sizes[1]
+
+    @property
+    def overloaded(self) -> bool:
+
+        shedding = self._shedding
+
+        if shedding is None or self._loop is None:
+            return False
+
+        return (
+            self._reassembling >= shedding.max_reassemblies
+            or len(self._queue) + len(self._batch) >= shedding.max_backlog
+            or self._loop.time() - self._overflowed_at < shedding.hold
+        )
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+
+        self._loop = asyncio.get_event_loop()
+        self._transport = typing.cast(asyncio.DatagramTransport, transport)
+        self._closed = self._loop.create_future()
+        self._scheduler.clock = self._loop.time
+
+        if self._congestion is not None:
+            self._pacer = Pacer(
+                self._congestion,
+                self._loop,
+                self._released,
+                self._fragment_size + header_size,
+                {Priority.Telemetry: self._telemetry_capacity},
+            )
+
+        sock = transport.get_extra_info('socket')
+
+        if sock is not None:
+            self._buffer_sizes = (
+                set_buffer_size(sock, socket.SO_RCVBUF, self._receive_buffer),
+                set_buffer_size(sock, socket.SO_SNDBUF, self._send_buffer),
+            )
+            self._reader = OverflowReader.attach(
+                self._loop, transport, self, self._overflowed, self._fragment_size + header_size,
+            )
+
+        if self._metrics is not None:
+            self._instrument(self._metrics)
+
+    def connection_lost(self, exc: typing.Optional[Exception]) -> None:
+
+        error = exc if exc is not None else ConnectionError(
+            'Couldn\'t send message: endpoint was closed.'
+        )
+
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+        for address, connection in self._connections.items():
+            assert self._loop is not None
+            self._handle(address, connection, connection.abort(error), self._loop.time())
+
+        if self._pacer is not None:
+            self._pacer.clear()
+
+        for timer in self._timers.values():
+            timer.cancel()
+
+        if self._evictor is not None:
+            self._evictor.cancel()
+            self._evictor = None
+
+        self._connections.clear()
+        self._timers.clear()
+        self._reassembling = 0
+        self._scheduler.clear()
+
+        if self._predictor is not None:
+            self._predictor.clear()
+
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+        if self._consumer is not None and not self._consumer.done():
+            self._consumer.set_result(None)
+
+        if self._closed is not None and not self._closed.done():
+            self._closed.set_result(None)
+
+        for callback in self._close_callbacks:
+            callback()
+
+        self._close_callbacks.clear()
+
+        if self._collector is not None:
+            assert self._metrics is not None
+            self._observe_latencies()
+            self._metrics.remove_collector(self._collector)
+            self._metrics.remove({'endpoint': format_address(self.local_address)})
+            self._collector = None
+
+    def error_received(self, exc: Exception) -> None:
+
+        pass
+
+    def pause_writing(self) -> None:
+
+        self._paused = True
+
+    def resume_writing(self) -> None:
+
+        self._paused = False
+        self._drain()
+
+    def close(self) -> None:
+
+        if self._transport is not None:
+            self._transport.close()
+
+    def add_close_callback(self, callback: typing.Callable[[], None]) -> None:
+
+        if self._closed is not None and self._closed.done():
+            callback()
+            return
+
+        self._close_callbacks.append(callback)
+
+    async def wait_closed(self) -> None:
+
+        if self._closed is not None:
+            await self._closed
+
+    def sync(self, address: Address) -> 'asyncio.Future[None]':
+
+        if isinstance(address, str) and address.startswith(_SCHEMES):
+            address = parse_address(address)
+
+        address = _peer(address)
+
+        self._check()
+
+        connection = self._connection(address)
+
+        assert self._loop is not None
+
+        packets = connection.sync(self._loop.time(), deferred=True)
+
+        return self._submit(address, connection, 0, Priority.Control, packets, True)
+
+    def send(
+        self,
+        address: Address,
+        data: typing.Union[bytes, bytearray, memoryview],
+        transfer_mode: TransferMode = TransferMode.AckEveryPacket,
+        priority: typing.Optional[Priority] = None,
+    ) -> 'asyncio.Future[None]':
+
+        if isinstance(address, str) and address.startswith(_SCHEMES):
+            address = parse_address(address)
+
+        address = _peer(address)
+
+        if priority is None:
+            is_telemetry = transfer_mode is TransferMode.AckNone
+            priority = Priority.Telemetry if is_telemetry else Priority.Normal
+
+        self._check()
+
+        connection = self._connection(address)
+
+        assert self._loop is not None
+
+        message_id, packets = connection.send(data, self._loop.time(), transfer_mode, deferred=True)
+
+        return self._submit(
+            address, connection, message_id, priority, packets,
+            transfer_mode is not TransferMode.AckNone,
+        )
+
+    async def receive(self) -> typing.Tuple[Address, bytes]:
+
+        while not self._queue:
+
+            if self._closed is None or self._closed.done():
+                raise ConnectionError('Couldn\'t receive message: endpoint was closed.')
+
+            assert self._loop is not None
+
+            self._waiter = self._loop.create_future()
+            await self._waiter
+            self._waiter = None
+
+        return self._queue.popleft()
+
+    async def consume(self, consumer: Consumer, batch: int = 64) -> None:
+
+        if self._consuming:
+            raise RuntimeError('Couldn\'t consume messages: endpoint already has a consumer.')
+
+        messages: typing.List[Message] = []
+        pending = self._batch
+
+        self._consuming = True
+
+        try:
+            while True:
+
+                while not pending:
+
+                    if self._closed is None or self._closed.done():
+                        return
+
+                    assert self._loop is not None
+
+                    self._consumer = self._loop.create_future()
+                    await self._consumer
+                    self._consumer = None
+
+                for _ in range(min(batch, len(pending))):
+                    messages.append(pending.popleft())
+
+                try:
+                    await consumer(messages)
+                finally:
+                    for message in messages:
+                        message.release()
+
+                    messages.clear()
+        finally:
+            self._consuming = False
+            self._consumer = None
+
+            while pending:
+                pending.popleft().release()
+
+    def datagram_received(self, data: bytes, address: Address) -> None:
+
+        address = _peer(address)
+        statistics = self.statistics
+        statistics.received_packets += 1
+
+        predictor = self._predictor
+
+        if predictor is None:
+            status, packet = Packet.try_from_bytes(data)
+        else:
+            status, packet = predictor.try_from_bytes(data, address)
+
+        if packet is None:
+            statistics.invalid_packets += 1
+            statistics.decode_errors[status] += 1
+            return
+
+        assert self._loop is not None
+
+        now = self._loop.time()
+
+        if packet.is_data:
+
+            if self._shedding is not None and self._shed(packet, address):
+                return
+
+            connection = self._connection(address)
+            reassembling = connection.reassembling
+
+            self._handle(address, connection, connection.receive_packet(packet, now), now)
+            self._reassembling += connection.reassembling - reassembling
+
+        else:
+
+            connection = self._connection(address)
+
+            if self._pacer is not None and packet.is_ack:
+                self._acknowledged(packet, address, connection)
+
+            self._handle(address, connection, connection.receive_packet(packet, now), now)
+
+        self._schedule(address, connection)
+
+    def _check(self) -> None:
+
+        if self._loop is None or self._closed is None or self._closed.done():
+            raise ConnectionError('Couldn\'t send message: endpoint is not connected.')
+
+    def _connection(self, address: Address) -> Connection:
+
+        connection = self._connections.get(address)
+
+        if connection is None:
+
+            assert self._loop is not None
+
+            connection = self._connections[address] = Connection(
+                self._fragment_size, self._checksum_mode, self._timeout, self._retries,
+                self._reassembly_timeout, self.statistics, self._buffers,
+            )
+
+            if self._evictor is None:
+                self._evictor = self._loop.call_later(self._reassembly_timeout, self._evict)
+
+        return connection
+
+    def _submit(
+        self,
+        address: Address,
+        connection: Connection,
+        message_id: int,
+        priority: Priority,
+        packets: typing.List[bytes],
+        pending: bool,
+    ) -> 'asyncio.Future[None]':
+
+        assert self._loop is not None
+
+        key = (address, message_id)
+        now = self._loop.time()
+
+        # the connection failed the message which used this id before; settle it
+        # now so that failure can't be taken for one of the new message
+        if key in self._outgoing:
+            self._handle(address, connection, connection.timer_expired(now), now)
+
+        future = self._loop.create_future()
+        outgoing = _Outgoing(address, message_id, priority, packets, future, now)
+
+        if pending:
+            self._outgoing[key] = outgoing
+
+        if self._pacer is None:
+
+            self._transmit(address, packets, priority)
+
+            if pending:
+                connection.released(message_id, now)
+                self._schedule(address, connection)
+
+        elif pending:
+            self._pace(outgoing, range(len(packets)))
+        else:
+            for packet in packets:
+                if not self._pacer.enqueue(address, packet, priority):
+                    self.statistics.dropped_packets += 1
+
+        if not pending:
+            future.set_result(None)
+
+        return future
+
+    def _pace(self, outgoing: _Outgoing, numbers: typing.Iterable[int]) -> None:
+
+        assert self._pacer is not None
+
+        queued = outgoing.queued
+
+        for number in numbers:
+
+            if number in queued:
+                continue
+
+            queued.add(number)
+            self._pacer.enqueue(
+                outgoing.address, outgoing.packets[number], outgoing.priority, outgoing, number,
+            )
+
+    def _released(
+        self,
+        address: Address,
+        packet: bytes,
+        priority: Priority,
+        outgoing: typing.Optional[_Outgoing],
+        number: int,
+    ) -> typing.Optional[bool]:
+
+        if outgoing is None:
+            self._transmit(address, [packet], priority)
+            return False
+
+        if outgoing.future.done():
+            return None
+
+        assert self._loop is not None
+
+        now = self._loop.time()
+        connection = self._connections[address]
+        counted = connection.is_pending(outgoing.message_id, number)
+
+        if counted:
+            outgoing.flight += 1
+
+        if outgoing.released_at is None:
+            outgoing.released_at = now
+
+        self._transmit(address, [packet], priority)
+
+        outgoing.queued.discard(number)
+
+        connection.released(outgoing.message_id, now)
+        self._schedule(address, connection)
+
+        return counted
+
+    def _instrument(self, registry: Registry) -> None:
+
+        labels = {'endpoint': format_address(self.local_address)}
+        statistics = self.statistics
+
+        counters = [
+            (registry.counter(f'{name}_total', help, labels), name)
+            for name, help in _STATISTICS_HELP.items()
+        ]
+
+        outstanding = registry.gauge(
+            'outstanding_messages', 'Messages waiting for acknowledgement.', labels,
+        )
+        reassembling = registry.gauge(
+            'reassembly_backlog', 'Partially received messages.', labels,
+        )
+        queued = registry.gauge(
+            'send_queue_packets', 'Packets waiting in the send scheduler.', labels,
+        )
+        overloaded = registry.gauge(
+            'receive_overloaded', 'Whether the overload policy is shedding traffic.', labels,
+        )
+
+        predictor = self._predictor
+        predicted = registry.counter(
+            'predicted_packets_total', 'Datagrams decoded by the header prediction fast path.',
+            labels,
+        )
+        hit_ratio = registry.gauge(
+            'header_prediction_hit_ratio', 'Share of datagrams decoded by header prediction.',
+            labels,
+        )
+
+        decode_errors = [
+            (registry.counter(
+                'decode_errors_total',
+                'Datagrams rejected by the decoder, by reason.',
+                dict(labels, reason=status.name),
+            ), status)
+            for status in DecodeStatus
+            if status
+        ]
+
+        def collect() -> None:
+
+            self._observe_latencies()
+
+            for counter, name in counters:
+                counter.value = getattr(statistics, name)
+
+            for counter, status in decode_errors:
+                counter.value = statistics.decode_errors[status]
+
+            outstanding.value = len(self._outgoing)
+            reassembling.value = self._reassembling
+            queued.value = self.queued
+            overloaded.value = int(self.overloaded)
+
+            if predictor is not None:
+                predicted.value = predictor.hits
+                hit_ratio.value = predictor.hit_rate
+
+        self._ack_latency = registry.histogram(
+            'ack_latency_seconds',
+            'Time from first transmission to final acknowledgement of a message.',
+            labels,
+        )
+        self._scheduler.delays = [
+            registry.histogram(
+                'send_queue_delay_seconds',
+                'Time packets waited in the send scheduler while the transport was paused.',
+                dict(labels, priority=priority.name),
+            )
+            for priority in Priority
+        ]
+        self._collector = collect
+
+        registry.add_collector(collect)
+
+    def _transmit(
+        self,
+        address: Address,
+        packets: typing.Iterable[bytes],
+        priority: Priority,
+    ) -> None:
+
+        assert self._transport is not None
+
+        sendto = self._transport.sendto
+        scheduler = self._scheduler
+        statistics = self.statistics
+
+        for packet in packets:
+            if not self._paused and not scheduler:
+                sendto(packet, address)
+            elif not scheduler.push(address, packet, priority):
+                statistics.dropped_packets += 1
+
+        if scheduler:
+            self._drain()
+
+    def _drain(self) -> None:
+
+        assert self._transport is not None
+
+        sendto = self._transport.sendto
+        scheduler = self._scheduler
+
+        while scheduler and not self._paused:
+
+            item = scheduler.pop()
+            assert item is not None
+
+            address, packet = item
+            sendto(packet, address)
+
+    def _schedule(self, address: Address, connection: Connection) -> None:
+
+        deadline = connection.get_timer()
+
+        if deadline is None:
+            return
+
+        timer = self._timers.get(address)
+
+        if timer is not None:
+
+            if timer.when() <= deadline:
+                return
+
+            timer.cancel()
+
+        assert self._loop is not None
+
+        self._timers[address] = self._loop.call_at(deadline, self._fire, address, deadline)
+
+    def _fire(self, address: Address, deadline: float) -> None:
+
+        assert self._loop is not None
+
+        del self._timers[address]
+
+        connection = self._connections[address]
+        reassembling = connection.reassembling
+
+        # the loop runs timers up to a clock tick early, the connection only
+        # expires what is due
+        now = max(self._loop.time(), deadline)
+
+        self._handle(address, connection, connection.timer_expired(now), now)
+        self._reassembling += connection.reassembling - reassembling
+        self._schedule(address, connection)
+
+    def _evict(self) -> None:
+
+        assert self._loop is not None
+
+        now = self._loop.time()
+        connections = self._connections
+        idle = [address for address, connection in connections.items() if connection.idle(now)]
+
+        for address in idle:
+
+            del connections[address]
+
+            timer = self._timers.pop(address, None)
+
+            if timer is not None:
+                timer.cancel()
+
+        self._evictor = \
+            self._loop.call_later(self._reassembly_timeout, self._evict) if connections else None
+
+    def _handle(
+        self,
+        address: Address,
+        connection: Connection,
+        output: Output,
+        now: float,
+    ) -> None:
+
+        datagrams, events = output
+
+        if datagrams:
+            self._transmit(address, datagrams, Priority.Control)
+
+        for event in events:
+            if isinstance(event, MessageReceived):
+                self._deliver(address, event)
+            elif isinstance(event, MessageAcknowledged):
+                self._finish(address, event.message_id, now, None, event.retransmitted)
+            elif isinstance(event, MessageFailed):
+                self._finish(address, event.message_id, now, event.error)
+            elif isinstance(event, MessageRetransmitted):
+                self._retransmit(address, connection, event, now)
+
+    def _retransmit(
+        self,
+        address: Address,
+        connection: Connection,
+        event: MessageRetransmitted,
+        now: float,
+    ) -> None:
+
+        outgoing = self._outgoing[(address, event.message_id)]
+        outgoing.retransmitted = True
+
+        if self._pacer is not None:
+            self._pacer.lost(address, outgoing.flight)
+            outgoing.flight = 0
+            self._pace(outgoing, event.numbers)
+            return
+
+        packets = [outgoing.packets[number] for number in event.numbers]
+
+        self._transmit(address, packets, outgoing.priority)
+        connection.released(event.message_id, now)
+
+    def _finish(
+        self,
+        address: Address,
+        message_id: int,
+        now: float,
+        error: typing.Optional[Exception] = None,
+        retransmitted: bool = False,
+    ) -> None:
+
+        outgoing = self._outgoing.pop((address, message_id), None)
+
+        if outgoing is None:
+            return
+
+        if self._pacer is not None and outgoing.flight:
+            self._pacer.forget(address, outgoing.flight)
+            outgoing.flight = 0
+
+        if outgoing.future.done():
+            return
+
+        if error is None:
+
+            if self._ack_latency is not None and not retransmitted:
+
+                latencies = self._latencies
+                latencies.append(now - outgoing.sent_at)
+
+                # a histogram update per acknowledgement is a noticeable share of
+                # the round trip, samples are folded in when collected instead
+                if len(latencies) >= _LATENCY_BATCH:
+                    self._observe_latencies()
+
+            outgoing.future.set_result(None)
+        else:
+            outgoing.future.set_exception(error)
+
+    def _observe_latencies(self) -> None:
+
+        if self._latencies:
+            assert self._ack_latency is not None
+            self._ack_latency.observe_many(self._latencies)
+            self._latencies.clear()
+
+    def _acknowledged(self, packet: Packet, address: Address, connection: Connection) -> None:
+
+        outgoing = self._outgoing.get((address, packet.message_id))
+
+        if outgoing is None or not connection.is_pending(packet.message_id, packet.fragment_number):
+            return
+
+        assert self._pacer is not None and self._loop is not None
+
+        count = 1 if outgoing.flight else 0
+        rtt = None
+
+        if not outgoing.sampled and not outgoing.retransmitted:
+            assert outgoing.released_at is not None
+            outgoing.sampled = True
+            rtt = self._loop.time() - outgoing.released_at
+
+        outgoing.flight -= count
+        self._pacer.acked(address, count, rtt, packet.is_duplicate)
+
+    def _overflowed(self, dropped: int) -> None:
+
+        assert self._loop is not None
+
+        self.statistics.kernel_drops += dropped
+        self._overflowed_at = self._loop.time()
+
+    def _shed(self, packet: Packet, address: Address) -> bool:
+
+        if not self.overloaded or not packet.is_fragment_valid:
+            return False
+
+        if packet.transfer_mode is TransferMode.AckNone:
+            self.statistics.shed_unreliable += 1
+            return True
+
+        connection = self._connections.get(address)
+
+        if connection is not None and connection.is_known(packet.message_id):
+            return False
+
+        self.statistics.shed_reassemblies += 1
+
+        return True
+
+    def _deliver(self, address: Address, event: MessageReceived) -> None:
+
+        data = event.data
+        buffer = event.buffer
+
+        if self._callback is not None or self._consuming:
+
+            view = memoryview(data)
+
+            if _READ_ONLY and not view.readonly:
+                view = view.toreadonly()  # type: ignore
+
+            message = Message(
+                address, event.message_id, event.transfer_mode, view, buffer, self._buffers,
+            )
+
+            if self._callback is None:
+                self._batch.append(message)
+
+                if self._consumer is not None and not self._consumer.done():
+                    self._consumer.set_result(None)
+
+                return
+
+            try:
+                self._callback(message)
+            finally:
+                message.release()
+
+            return
+
+        if buffer is not None:
+            data = bytes(data)
+            self._buffers.release(buffer)
+
+        message_bytes = typing.cast(bytes, data)
+
+        if self._handler is not None:
+            self._handler(address, message_bytes)
+            return
+
+        self._enqueue(address, message_bytes)
+
+    def _enqueue(self, address: Address, message: bytes) -> None:
+
+        self._queue.append((address, message))
+
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+
+def parse_address(address: Address) -> Address:
+
+    if not isinstance(address, str):
+        return address
+
+    scheme, separator, rest = address.partition(':')
+
+    if not separator or scheme not in ('udp', 'unix'):
+        raise ValueError(
+            f'Couldn\'t parse address: '
+            f'unknown scheme ({address}).'
+        )
+
+    if rest.startswith('//'):
+        rest = rest[2:]
+
+    if scheme == 'unix':
+        return b'\0' + rest[1:].encode() if rest.startswith('@') else rest
+
+    host, separator, port = rest.rpartition(':')
+
+    if not separator or not port.isdigit():
+        raise ValueError(
+            f'Couldn\'t parse address: '
+            f'invalid host and port ({address}).'
+        )
+
+    return host.strip('[]'), int(port)
+
+
+def _peer(address: Address) -> Address:
+
+    # The kernel reports IPv6 peers as (host, port, flowinfo, scope_id), callers
+    # usually name them as (host, port); both must map to the same state.
+    if type(address) is tuple and len(address) == 4 and not address[2] and not address[3]:
+        return address[:2]
+
+    return address
+
+
+def format_address(address: Address) -> str:
+
+    if isinstance(address, bytes):
+        return f'unix:@{address[1:].decode(errors="replace")}'
+
+    if isinstance(address, str):
+        return f'unix:{address}'
+
+    host, port, *_ = address
+
+    return f'[{host}]:{port}' if ':' in host else f'{host}:{port}'
+
+
+def _unlink(path: str) -> None:
+
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+async def open_endpoint(
+    local_address: Address = ('127.0.0.1', 0),
+    handler: typing.Optional[Handler] = None,
+    **kwargs: typing.Any,
+) -> Endpoint:
+
+    loop = asyncio.get_event_loop()
+    local_address = parse_address(local_address)
+
+    if isinstance(local_address, tuple):
+
+        transport, endpoint = await loop.create_datagram_endpoint(
+            lambda: Endpoint(handler, **kwargs),
+            local_addr=local_address,
+        )
+
+        limit = _MAX_UDP_PAYLOAD.get(transport.get_extra_info('socket').family, 65507)
+
+        if endpoint.fragment_size + header_size > limit:
+            transport.close()
+            raise ValueError(
+                f'Couldn\'t open endpoint: '
+                f'fragment size exceeds UDP payload limit '
+                f'({endpoint.fragment_size} > {limit - header_size}).'
+            )
+
+        return endpoint
+
+    kwargs.setdefault('fragment_size', _MAX_FRAGMENT_SIZE)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+    try:
+        sock.bind(local_address)
+        sock.setblocking(False)
+    except OSError:
+        sock.close()
+        raise
+
+    _, endpoint = await loop.create_datagram_endpoint(
+        lambda: Endpoint(handler, **kwargs),
+        sock=sock,
+    )
+
+    if isinstance(local_address, str) and local_address:
+        endpoint.add_close_callback(functools.partial(_unlink, local_address))
+
+    return endpoint
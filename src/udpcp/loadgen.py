@@ -0,0 +1,560 @@
+__all__ = [
+    'Impairment',
+    'ImpairedProtocol',
+    'Report',
+    'run',
+    'main',
+]
+
+import sys
+import json
+import random
+import struct
+import typing
+import asyncio
+import argparse
+import resource
+import functools
+import collections
+
+from .analyze import Histogram
+from .endpoint import Endpoint, DEFAULT_FRAGMENT_SIZE
+from .protocol import TransferMode
+from .congestion import CongestionControl
+
+Address = typing.Any
+
+_sequence = struct.Struct('>Q')
+
+
+class Impairment:
+
+    __slots__ = [
+        'loss',
+        'duplicate',
+        'reorder',
+        'delay',
+        'random',
+        'dropped',
+        'duplicated',
+        'reordered',
+    ]
+
+    def __init__(
+        self,
+        loss: float = 0.0,
+        duplicate: float = 0.0,
+        reorder: float = 0.0,
+        delay: float = 0.005,
+        seed: typing.Optional[int] = None,
+    ) -> None:
+
+        self.loss = loss
+        self.duplicate = duplicate
+        self.reorder = reorder
+        self.delay = delay
+        self.random = random.Random(seed)
+
+        self.dropped = 0
+        self.duplicated = 0
+        self.reordered = 0
+
+    def as_dict(self) -> typing.Dict[str, int]:
+
+        return {
+            'dropped': self.dropped,
+            'duplicated': self.duplicated,
+            'reordered': self.reordered,
+        }
+
+
+class _ImpairedTransport:
+
+    __slots__ = [
+        '_transport',
+        '_impairment',
+        '_loop',
+    ]
+
+    def __init__(
+        self,
+        transport: asyncio.DatagramTransport,
+        impairment: Impairment,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+
+        self._transport = transport
+        self._impairment = impairment
+        self._loop = loop
+
+    def sendto(self, data: bytes, address: Address = None) -> None:
+
+        impairment = self._impairment
+        chance = impairment.random.random
+
+        if chance() < impairment.loss:
+            impairment.dropped += 1
+            return
+
+        copies = 1
+
+        if chance() < impairment.duplicate:
+            impairment.duplicated += 1
+            copies = 2
+
+        for _ in range(copies):
+
+            if chance() < impairment.reorder:
+                impairment.reordered += 1
+                self._loop.call_later(impairment.delay, self._send, data, address)
+            else:
+                self._transport.sendto(data, address)
+
+    def _send(self, data: bytes, address: Address) -> None:
+
+        if not self._transport.is_closing():
+            self._transport.sendto(data, address)
+
+    def get_extra_info(self, name: str, default: typing.Any = None) -> typing.Any:
+
+        return self._transport.get_extra_info(name, default)
+
+    def is_closing(self) -> bool:
+
+        return self._transport.is_closing()
+
+    def close(self) -> None:
+
+        self._transport.close()
+
+    def abort(self) -> None:
+
+        self._transport.abort()
+
+
+class ImpairedProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, protocol: asyncio.DatagramProtocol, impairment: Impairment) -> None:
+
+        self.protocol = protocol
+        self.impairment = impairment
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+
+        impaired = _ImpairedTransport(
+            typing.cast(asyncio.DatagramTransport, transport),
+            self.impairment,
+            asyncio.get_event_loop(),
+        )
+
+        self.protocol.connection_made(typing.cast(asyncio.DatagramTransport, impaired))
+
+    def connection_lost(self, exc: typing.Optional[Exception]) -> None:
+
+        self.protocol.connection_lost(exc)
+
+    def datagram_received(self, data: bytes, address: Address) -> None:
+
+        self.protocol.datagram_received(data, address)
+
+    def error_received(self, exc: Exception) -> None:
+
+        self.protocol.error_received(exc)
+
+
+class Report:
+
+    __slots__ = [
+        'time',
+        'elapsed',
+        'sent_messages',
+        'delivered_messages',
+        'delivered_bytes',
+        'failed_messages',
+        'lost_messages',
+        'retransmissions',
+        'outstanding',
+        'reassembling',
+        'memory',
+        'memory_growth',
+        'impairment',
+        'latency',
+    ]
+
+    def __init__(self) -> None:
+
+        self.time = 0.0
+        self.elapsed = 0.0
+        self.sent_messages = 0
+        self.delivered_messages = 0
+        self.delivered_bytes = 0
+        self.failed_messages = 0
+        self.lost_messages = 0
+        self.retransmissions = 0
+        self.outstanding = 0
+        self.reassembling = 0
+        self.memory = 0
+        self.memory_growth = 0
+        self.impairment: typing.Dict[str, int] = {}
+        self.latency = Histogram()
+
+    @property
+    def throughput(self) -> float:
+
+        return self.delivered_messages / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def goodput(self) -> float:
+
+        return self.delivered_bytes / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+
+        result = {name: getattr(self, name) for name in self.__slots__ if name != 'latency'}
+
+        result['throughput'] = self.throughput
+        result['goodput'] = self.goodput
+        result['latency'] = dict(self.latency.as_dict(), p999=self.latency.quantile(0.999))
+
+        return result
+
+    def line(self) -> str:
+
+        latency = self.latency
+
+        return (
+            f'{self.time:8.1f}s '
+            f'{self.throughput:10.0f} msg/s '
+            f'{self.goodput / 1e6:8.2f} MB/s '
+            f'p50={latency.quantile(0.50) * 1e3:.3f}ms '
+            f'p99={latency.quantile(0.99) * 1e3:.3f}ms '
+            f'p999={latency.quantile(0.999) * 1e3:.3f}ms '
+            f'retransmissions={self.retransmissions} '
+            f'failed={self.failed_messages} '
+            f'lost={self.lost_messages} '
+            f'outstanding={self.outstanding} '
+            f'reassembling={self.reassembling} '
+            f'rss={self.memory / 2 ** 20:.1f}MiB '
+            f'({self.memory_growth / 2 ** 20:+.1f}MiB)'
+        )
+
+
+def _memory() -> int:
+
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _Generator:
+
+    def __init__(
+        self,
+        sizes: typing.Sequence[int],
+        modes: typing.Sequence[TransferMode],
+        lost_timeout: float,
+        seed: typing.Optional[int],
+    ) -> None:
+
+        self.sizes = sizes
+        self.modes = modes
+        self.lost_timeout = lost_timeout
+        self.random = random.Random(seed)
+        self.sequence = 0
+        self.sent_at: 'collections.OrderedDict[int, float]' = collections.OrderedDict()
+        self.report = Report()
+        self.interval = Report()
+
+    def payload(self, now: float) -> typing.Tuple[bytes, TransferMode]:
+
+        self.sequence += 1
+        self.sent_at[self.sequence] = now
+
+        size = max(self.random.choice(self.sizes), _sequence.size)
+        payload = _sequence.pack(self.sequence) + bytes(size - _sequence.size)
+
+        return payload, self.random.choice(self.modes)
+
+    def delivered(self, now: float, message: bytes) -> None:
+
+        sent_at = self.sent_at.pop(_sequence.unpack_from(message)[0], None)
+
+        for report in (self.report, self.interval):
+
+            report.delivered_messages += 1
+            report.delivered_bytes += len(message)
+
+            if sent_at is not None:
+                report.latency.add(now - sent_at)
+
+    def failed(self, sequence: int, future: 'asyncio.Future[None]') -> None:
+
+        if not future.cancelled() and future.exception() is not None:
+            # counted as failed, so it must not be counted as lost as well
+            self.sent_at.pop(sequence, None)
+            self.report.failed_messages += 1
+            self.interval.failed_messages += 1
+
+    def expire(self, now: float) -> None:
+
+        sent_at = self.sent_at
+        deadline = now - self.lost_timeout
+
+        while sent_at:
+
+            sequence, timestamp = next(iter(sent_at.items()))
+
+            if timestamp >= deadline:
+                break
+
+            del sent_at[sequence]
+            self.report.lost_messages += 1
+            self.interval.lost_messages += 1
+
+
+async def _open(
+    loop: asyncio.AbstractEventLoop,
+    impairment: Impairment,
+    handler: typing.Optional[typing.Callable[[Address, bytes], None]] = None,
+    **kwargs: typing.Any,
+) -> Endpoint:
+
+    endpoint = Endpoint(handler, **kwargs)
+
+    await loop.create_datagram_endpoint(
+        lambda: ImpairedProtocol(endpoint, impairment),
+        local_addr=('127.0.0.1', 0),
+    )
+
+    return endpoint
+
+
+async def _peer(
+    endpoint: Endpoint,
+    address: Address,
+    generator: _Generator,
+    rate: float,
+    window: int,
+    end: float,
+) -> None:
+
+    loop = asyncio.get_event_loop()
+    semaphore = asyncio.Semaphore(window)
+    start = loop.time()
+    sent = 0
+
+    def done(sequence: int, future: 'asyncio.Future[None]') -> None:
+
+        semaphore.release()
+        generator.failed(sequence, future)
+
+    while loop.time() < end:
+
+        due = int((loop.time() - start) * rate) - sent
+
+        for _ in range(due):
+
+            await semaphore.acquire()
+
+            payload, mode = generator.payload(loop.time())
+            future = endpoint.send(address, payload, mode)
+            future.add_done_callback(functools.partial(done, generator.sequence))
+
+            generator.report.sent_messages += 1
+            generator.interval.sent_messages += 1
+            sent += 1
+
+        await asyncio.sleep(0.001)
+
+
+async def run(
+    peers: int = 4,
+    duration: float = 10.0,
+    rate: float = 1000.0,
+    sizes: typing.Sequence[int] = (64, 1024, 16384),
+    modes: typing.Sequence[TransferMode] = tuple(TransferMode),
+    window: int = 64,
+    fragment_size: int = DEFAULT_FRAGMENT_SIZE,
+    timeout: float = 0.05,
+    retries: int = 5,
+    loss: float = 0.0,
+    duplicate: float = 0.0,
+    reorder: float = 0.0,
+    seed: typing.Optional[int] = None,
+    interval: float = 1.0,
+    congestion: bool = False,
+    on_report: typing.Optional[typing.Callable[[Report], None]] = None,
+) -> Report:
+
+    loop = asyncio.get_event_loop()
+    impairment = Impairment(loss, duplicate, reorder, seed=seed)
+    generator = _Generator(sizes, modes, timeout * 2 ** (retries + 1), seed)
+
+    options: typing.Dict[str, typing.Any] = {
+        'fragment_size': fragment_size,
+        'timeout': timeout,
+        'retries': retries,
+        'congestion': CongestionControl() if congestion else None,
+    }
+
+    server = await _open(
+        loop, impairment,
+        lambda address, message: generator.delivered(loop.time(), message),
+        **options,
+    )
+    clients = [await _open(loop, impairment, **options) for _ in range(peers)]
+
+    memory = _memory()
+    start = loop.time()
+    end = start + duration
+    tasks = [
+        loop.create_task(_peer(client, server.local_address, generator, rate / peers, window, end))
+        for client in clients
+    ]
+
+    def snapshot(report: Report, elapsed: float) -> Report:
+
+        report.time = loop.time() - start
+        report.elapsed = elapsed
+        report.retransmissions = sum(client.statistics.retransmissions for client in clients)
+        report.outstanding = sum(client.outstanding for client in clients)
+        report.reassembling = server.reassembling
+        report.memory = _memory()
+        report.memory_growth = report.memory - memory
+        report.impairment = impairment.as_dict()
+
+        return report
+
+    try:
+        last = start
+
+        while not all(task.done() for task in tasks):
+
+            await asyncio.sleep(min(interval, max(end - loop.time(), 0.001)))
+
+            now = loop.time()
+            generator.expire(now)
+
+            if on_report is not None and now - last >= interval:
+                on_report(snapshot(generator.interval, now - last))
+                generator.interval = Report()
+                last = now
+
+        for task in tasks:
+            task.result()
+
+        drain = loop.time() + generator.lost_timeout
+
+        while any(client.outstanding for client in clients) and loop.time() < drain:
+            await asyncio.sleep(0.01)
+
+        await asyncio.sleep(timeout)
+
+        generator.expire(float('inf'))
+    finally:
+        for endpoint in [server, *clients]:
+            endpoint.close()
+
+    return snapshot(generator.report, loop.time() - start)
+
+
+def _modes(value: str) -> typing.List[TransferMode]:
+
+    try:
+        return [TransferMode[name.strip()] for name in value.split(',')]
+    except KeyError as error:
+        raise argparse.ArgumentTypeError(f'invalid transfer mode {error}')
+
+
+def _sizes(value: str) -> typing.List[int]:
+
+    return [int(size) for size in value.split(',')]
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+
+    parser = argparse.ArgumentParser(
+        prog='python -m udpcp.loadgen',
+        description='UDPCP loopback load generator and soak test.',
+    )
+
+    parser.add_argument('-p', '--peers', type=int, default=4,
+                        help='number of sending peers')
+    parser.add_argument('-d', '--duration', type=float, default=10.0,
+                        help='test duration in seconds')
+    parser.add_argument('-r', '--rate', type=float, default=1000.0,
+                        help='total offered load in messages per second')
+    parser.add_argument('-s', '--sizes', type=_sizes, default=[64, 1024, 16384],
+                        help='comma separated message sizes in bytes')
+    parser.add_argument('-m', '--modes', type=_modes, default=list(TransferMode),
+                        help='comma separated transfer modes')
+    parser.add_argument('-w', '--window', type=int, default=64,
+                        help='maximum unacknowledged messages per peer')
+    parser.add_argument('--fragment-size', type=int, default=DEFAULT_FRAGMENT_SIZE,
+                        help='payload bytes per fragment')
+    parser.add_argument('--timeout', type=float, default=0.05,
+                        help='initial retransmission timeout in seconds')
+    parser.add_argument('--retries', type=int, default=5,
+                        help='retransmissions before a message fails')
+    parser.add_argument('--loss', type=float, default=0.0,
+                        help='probability of dropping a datagram')
+    parser.add_argument('--duplicate', type=float, default=0.0,
+                        help='probability of duplicating a datagram')
+    parser.add_argument('--reorder', type=float, default=0.0,
+                        help='probability of delaying a datagram')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='random seed for workload and impairment')
+    parser.add_argument('-i', '--interval', type=float, default=1.0,
+                        help='seconds between progress reports')
+    parser.add_argument('--congestion', action='store_true',
+                        help='pace senders with AIMD congestion control')
+    parser.add_argument('--json', action='store_true',
+                        help='print final report as JSON')
+
+    arguments = parser.parse_args(argv)
+
+    def progress(report: Report) -> None:
+
+        print(report.line(), file=sys.stderr, flush=True)
+
+    loop = asyncio.new_event_loop()
+
+    try:
+        asyncio.set_event_loop(loop)
+        report = loop.run_until_complete(run(
+            peers=arguments.peers,
+            duration=arguments.duration,
+            rate=arguments.rate,
+            sizes=arguments.sizes,
+            modes=arguments.modes,
+            window=arguments.window,
+            fragment_size=arguments.fragment_size,
+            timeout=arguments.timeout,
+            retries=arguments.retries,
+            loss=arguments.loss,
+            duplicate=arguments.duplicate,
+            reorder=arguments.reorder,
+            seed=arguments.seed,
+            interval=arguments.interval,
+            congestion=arguments.congestion,
+            on_report=progress,
+        ))
+    except (OSError, ValueError) as error:
+        print(f'error: {error}', file=sys.stderr)
+        return 1
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+    if arguments.json:
+        print(json.dumps(report.as_dict(), indent=2))
+    else:
+        print(report.line())
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+__all__ = [
+    'LOOPS',
+    'available',
+    'new_event_loop',
+    'run',
+]
+
+import typing
+import asyncio
+import importlib
+
+T = typing.TypeVar('T')
+LoopFactory = typing.Callable[[], asyncio.AbstractEventLoop]
+
+LOOPS = (
+    'asyncio',
+    'uvloop',
+)
+
+
+def _factory(name: str) -> LoopFactory:
+
+    if name == 'asyncio':
+        return asyncio.new_event_loop
+
+    if name not in LOOPS:
+        raise ValueError(
+            f'Couldn\'t create event loop: '
+            f'unknown loop ({name}).'
+        )
+
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        raise ImportError(
+            f'Couldn\'t create event loop: '
+            f'{name} is not installed.'
+        ) from None
+
+    return typing.cast(LoopFactory, module.new_event_loop)
+
+
+def available() -> typing.List[str]:
+
+    names = []
+
+    for name in LOOPS:
+        try:
+            _factory(name)
+        except ImportError:
+            continue
+
+        names.append(name)
+
+    return names
+
+
+def new_event_loop(
+    loop: typing.Union[str, LoopFactory] = 'asyncio',
+) -> asyncio.AbstractEventLoop:
+
+    factory = _factory(loop) if isinstance(loop, str) else loop
+
+    return factory()
+
+
+def run(
+    main: typing.Callable[[], typing.Awaitable[T]],
+    loop: typing.Union[str, LoopFactory] = 'asyncio',
+) -> T:
+
+    instance = new_event_loop(loop)
+
+    try:
+        asyncio.set_event_loop(instance)
+        return instance.run_until_complete(main())
+    finally:
+        asyncio.set_event_loop(None)
+        instance.close()
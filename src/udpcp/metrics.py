@@ -0,0 +1,339 @@
+__all__ = [
+    'Registry',
+    'Counter',
+    'Gauge',
+    'Histogram',
+    'Sink',
+    'DEFAULT_BUCKETS',
+]
+
+import os
+import array
+import bisect
+import typing
+
+Labels = typing.Dict[str, str]
+Sink = typing.Callable[['Registry'], None]
+
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0,
+)
+
+
+class _Metric:
+
+    __slots__ = [
+        'name',
+        'help',
+        'kind',
+        'labels',
+        'index',
+        'size',
+        '_values',
+    ]
+
+    def __init__(
+        self,
+        registry: 'Registry',
+        name: str,
+        help: str,
+        kind: str,
+        labels: Labels,
+        size: int,
+    ) -> None:
+
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labels = labels
+        self.index = registry._allocate(size)
+        self.size = size
+        self._values = registry.values
+
+
+class Counter(_Metric):
+
+    __slots__ = ()
+
+    def inc(self, amount: float = 1) -> None:
+
+        self._values[self.index] += amount
+
+    @property
+    def value(self) -> float:
+
+        return self._values[self.index]
+
+    @value.setter
+    def value(self, value: float) -> None:
+
+        self._values[self.index] = value
+
+
+class Gauge(Counter):
+
+    __slots__ = ()
+
+    def dec(self, amount: float = 1) -> None:
+
+        self._values[self.index] -= amount
+
+
+class Histogram(_Metric):
+
+    __slots__ = [
+        'bounds',
+    ]
+
+    def __init__(
+        self,
+        registry: 'Registry',
+        name: str,
+        help: str,
+        labels: Labels,
+        bounds: typing.Sequence[float],
+    ) -> None:
+
+        super().__init__(registry, name, help, 'histogram', labels, len(bounds) + 3)
+
+        self.bounds = tuple(bounds)
+
+    def observe(self, value: float) -> None:
+
+        values = self._values
+        index = self.index
+
+        values[index + bisect.bisect_left(self.bounds, value)] += 1
+        values[index + len(self.bounds) + 1] += value
+        values[index + len(self.bounds) + 2] += 1
+
+    def observe_many(self, observed: typing.Sequence[float]) -> None:
+
+        values = self._values
+        index = self.index
+        bounds = self.bounds
+
+        # sorting once beats a bisection per value, bucket i holds the values
+        # in (bounds[i - 1], bounds[i]] just like observe places them
+        ordered = sorted(observed)
+        previous = 0
+
+        for offset, bound in enumerate(bounds):
+            position = bisect.bisect_right(ordered, bound, previous)
+            values[index + offset] += position - previous
+            previous = position
+
+        values[index + len(bounds)] += len(ordered) - previous
+        values[index + len(bounds) + 1] += sum(ordered)
+        values[index + len(bounds) + 2] += len(ordered)
+
+    @property
+    def buckets(self) -> typing.List[float]:
+
+        return list(self._values[self.index:self.index + len(self.bounds) + 1])
+
+    @property
+    def sum(self) -> float:
+
+        return self._values[self.index + len(self.bounds) + 1]
+
+    @property
+    def count(self) -> float:
+
+        return self._values[self.index + len(self.bounds) + 2]
+
+
+def _escape(value: str) -> str:
+
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: typing.Optional[Labels] = None) -> str:
+
+    merged = dict(labels, **extra) if extra else labels
+
+    if not merged:
+        return ''
+
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in merged.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+
+    if value.is_integer() and abs(value) < 2 ** 53:
+        return str(int(value))
+
+    return repr(value)
+
+
+class Registry:
+
+    def __init__(self, namespace: str = 'udpcp') -> None:
+
+        self.namespace = namespace
+        self.values = array.array('d')
+
+        self._metrics: typing.List[_Metric] = []
+        self._collectors: typing.List[typing.Callable[[], None]] = []
+        self._sinks: typing.List[Sink] = []
+
+    def _allocate(self, size: int) -> int:
+
+        index = len(self.values)
+        self.values.extend([0.0] * size)
+
+        return index
+
+    def _name(self, name: str) -> str:
+
+        return f'{self.namespace}_{name}' if self.namespace else name
+
+    def counter(self, name: str, help: str, labels: typing.Optional[Labels] = None) -> Counter:
+
+        metric = Counter(self, self._name(name), help, 'counter', labels or {}, 1)
+        self._metrics.append(metric)
+
+        return metric
+
+    def gauge(self, name: str, help: str, labels: typing.Optional[Labels] = None) -> Gauge:
+
+        metric = Gauge(self, self._name(name), help, 'gauge', labels or {}, 1)
+        self._metrics.append(metric)
+
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: typing.Optional[Labels] = None,
+        buckets: typing.Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+
+        metric = Histogram(self, self._name(name), help, labels or {}, sorted(buckets))
+        self._metrics.append(metric)
+
+        return metric
+
+    def remove(self, labels: Labels) -> None:
+
+        # Removed metrics keep a private copy of their values so late
+        # updates through held references can't touch the shared array.
+        kept: typing.List[_Metric] = []
+        values = self.values
+        compacted = array.array('d')
+
+        for metric in self._metrics:
+
+            chunk = values[metric.index:metric.index + metric.size]
+
+            if labels.items() <= metric.labels.items():
+                metric._values = chunk
+                metric.index = 0
+                continue
+
+            metric.index = len(compacted)
+            compacted.extend(chunk)
+            kept.append(metric)
+
+        values[:] = compacted
+        self._metrics = kept
+
+    def add_collector(self, collector: typing.Callable[[], None]) -> None:
+
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector: typing.Callable[[], None]) -> None:
+
+        self._collectors.remove(collector)
+
+    def add_sink(self, sink: Sink) -> None:
+
+        self._sinks.append(sink)
+
+    def remove_sink(self, sink: Sink) -> None:
+
+        self._sinks.remove(sink)
+
+    def collect(self) -> None:
+
+        for collector in self._collectors:
+            collector()
+
+    def flush(self) -> None:
+
+        self.collect()
+
+        for sink in self._sinks:
+            sink(self)
+
+    def snapshot(self) -> typing.Dict[str, typing.Any]:
+
+        self.collect()
+
+        result: typing.Dict[str, typing.Any] = {}
+
+        for metric in self._metrics:
+
+            key = metric.name + _format_labels(metric.labels)
+
+            if isinstance(metric, Histogram):
+                result[key] = {
+                    'buckets': dict(zip(metric.bounds + (float('inf'),), metric.buckets)),
+                    'sum': metric.sum,
+                    'count': metric.count,
+                }
+            else:
+                result[key] = metric._values[metric.index]
+
+        return result
+
+    def exposition(self) -> str:
+
+        self.collect()
+
+        families: typing.Dict[str, typing.List[_Metric]] = {}
+
+        for metric in self._metrics:
+            families.setdefault(metric.name, []).append(metric)
+
+        lines = []
+
+        for name, metrics in families.items():
+
+            lines.append(f'# HELP {name} {metrics[0].help}')
+            lines.append(f'# TYPE {name} {metrics[0].kind}')
+
+            for metric in metrics:
+
+                if not isinstance(metric, Histogram):
+                    value = _format_value(metric._values[metric.index])
+                    lines.append(f'{name}{_format_labels(metric.labels)} {value}')
+                    continue
+
+                cumulative = 0.0
+
+                for bound, count in zip(metric.bounds + (float('inf'),), metric.buckets):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    labels = _format_labels(metric.labels, {'le': le})
+                    lines.append(f'{name}_bucket{labels} {_format_value(cumulative)}')
+
+                labels = _format_labels(metric.labels)
+                lines.append(f'{name}_sum{labels} {_format_value(metric.sum)}')
+                lines.append(f'{name}_count{labels} {_format_value(metric.count)}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path: str) -> None:
+
+        temporary = f'{path}.{os.getpid()}.tmp'
+
+        with open(temporary, 'w') as handle:
+            handle.write(self.exposition())
+
+        os.replace(temporary, path)
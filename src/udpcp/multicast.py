@@ -0,0 +1,652 @@
+__all__ = [
+    'MulticastSender',
+    'MulticastReceiver',
+    'Statistics',
+    'open_sender',
+    'open_receiver',
+    'DEFAULT_CACHE_SIZE',
+]
+
+import socket
+import struct
+import typing
+import asyncio
+import collections
+
+from .endpoint import DEFAULT_FRAGMENT_SIZE, parse_address
+from .protocol import Packet, ChecksumMode, TransferMode
+
+Address = typing.Any
+Buffer = typing.Union[bytes, bytearray, memoryview]
+Handler = typing.Callable[[Address, bytes], None]
+
+DEFAULT_CACHE_SIZE = 4096
+
+_MAX_FRAGMENT_AMOUNT = 255
+_MAX_MESSAGE_ID = 0xFFFF
+
+_NACK = struct.Struct('!2sH32s')
+_NACK_MAGIC = b'NK'
+_NACK_ALL = b'\xff' * 32
+
+
+def _encode_nack(message_id: int, numbers: typing.Optional[typing.Iterable[int]]) -> bytes:
+
+    if numbers is None:
+        return _NACK.pack(_NACK_MAGIC, message_id, _NACK_ALL)
+
+    bitmap = bytearray(32)
+
+    for number in numbers:
+        bitmap[number >> 3] |= 0x80 >> (number & 7)
+
+    return _NACK.pack(_NACK_MAGIC, message_id, bytes(bitmap))
+
+
+def _decode_nack(data: bytes) -> typing.Optional[typing.Tuple[int, typing.List[int]]]:
+
+    if len(data) != _NACK.size or not data.startswith(_NACK_MAGIC):
+        return None
+
+    _, message_id, bitmap = _NACK.unpack(data)
+
+    numbers = [
+        index << 3 | bit
+        for index, byte in enumerate(bitmap) if byte
+        for bit in range(8) if byte & (0x80 >> bit)
+    ]
+
+    return message_id, [number for number in numbers if number < _MAX_FRAGMENT_AMOUNT]
+
+
+class Statistics:
+
+    __slots__ = [
+        'sent_packets',
+        'received_packets',
+        'invalid_packets',
+        'sent_messages',
+        'delivered_messages',
+        'expired_reassemblies',
+        'duplicate_packets',
+        'sent_acks',
+        'received_acks',
+        'sent_nacks',
+        'received_nacks',
+        'repairs',
+        'suppressed_repairs',
+        'missed_repairs',
+    ]
+
+    def __init__(self) -> None:
+
+        self.sent_packets = 0
+        self.received_packets = 0
+        self.invalid_packets = 0
+        self.sent_messages = 0
+        self.delivered_messages = 0
+        self.expired_reassemblies = 0
+        self.duplicate_packets = 0
+        self.sent_acks = 0
+        self.received_acks = 0
+        self.sent_nacks = 0
+        self.received_nacks = 0
+        self.repairs = 0
+        self.suppressed_repairs = 0
+        self.missed_repairs = 0
+
+    def as_dict(self) -> typing.Dict[str, int]:
+
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class MulticastSender(asyncio.DatagramProtocol):
+
+    def __init__(
+        self,
+        group: Address,
+        fragment_size: int = DEFAULT_FRAGMENT_SIZE,
+        checksum_mode: ChecksumMode = ChecksumMode.Enabled,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        holdoff: float = 0.01,
+    ) -> None:
+
+        if cache_size < _MAX_FRAGMENT_AMOUNT:
+            raise ValueError(
+                f'Couldn\'t create multicast sender: '
+                f'cache smaller than one message ({cache_size} < {_MAX_FRAGMENT_AMOUNT}).'
+            )
+
+        self._group = parse_address(group)
+        self._fragment_size = fragment_size
+        self._checksum_mode = checksum_mode
+        self._cache_size = cache_size
+        self._holdoff = holdoff
+
+        self._loop: typing.Optional[asyncio.AbstractEventLoop] = None
+        self._transport: typing.Optional[asyncio.DatagramTransport] = None
+        self._closed: typing.Optional[asyncio.Future[None]] = None
+
+        self._message_id = 0
+        self._cache: 'collections.OrderedDict[typing.Tuple[int, int], bytes]' = \
+            collections.OrderedDict()
+        self._repaired: typing.Dict[typing.Tuple[int, int], float] = {}
+        self._acks: typing.Dict[int, typing.Set[Address]] = {}
+
+        self.statistics = Statistics()
+
+    @property
+    def group(self) -> Address:
+
+        return self._group
+
+    @property
+    def local_address(self) -> Address:
+
+        assert self._transport is not None
+
+        return self._transport.get_extra_info('sockname')
+
+    @property
+    def cached(self) -> int:
+
+        return len(self._cache)
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+
+        self._loop = asyncio.get_event_loop()
+        self._transport = typing.cast(asyncio.DatagramTransport, transport)
+        self._closed = self._loop.create_future()
+
+    def connection_lost(self, exc: typing.Optional[Exception]) -> None:
+
+        if self._closed is not None and not self._closed.done():
+            self._closed.set_result(None)
+
+    def error_received(self, exc: Exception) -> None:
+
+        pass
+
+    def close(self) -> None:
+
+        if self._transport is not None:
+            self._transport.close()
+
+    async def wait_closed(self) -> None:
+
+        if self._closed is not None:
+            await self._closed
+
+    def acknowledged(self, message_id: int) -> typing.FrozenSet[Address]:
+
+        return frozenset(self._acks.get(message_id, ()))
+
+    def send(
+        self,
+        data: typing.Union[bytes, bytearray, memoryview],
+        transfer_mode: TransferMode = TransferMode.AckNone,
+    ) -> int:
+
+        if self._transport is None or self._transport.is_closing():
+            raise ConnectionError('Couldn\'t send message: sender is not connected.')
+
+        if transfer_mode is TransferMode.AckEveryPacket:
+            raise ValueError(
+                f'Couldn\'t send message: '
+                f'unsupported multicast transfer mode ({transfer_mode.name}).'
+            )
+
+        fragment_size = self._fragment_size
+        fragment_amount = max(1, -(-len(data) // fragment_size))
+
+        if fragment_amount > _MAX_FRAGMENT_AMOUNT:
+            raise ValueError(
+                f'Couldn\'t send message: '
+                f'message too large ({len(data)} > {fragment_size * _MAX_FRAGMENT_AMOUNT}).'
+            )
+
+        message_id = self._message_id = self._message_id % _MAX_MESSAGE_ID + 1
+
+        sendto = self._transport.sendto
+        cache = self._cache
+        group = self._group
+        view = memoryview(data)
+
+        self._evict(message_id)
+        self._acks[message_id] = set()
+
+        for fragment_number, offset in enumerate(range(0, len(view) or 1, fragment_size)):
+
+            packet = Packet.data(
+                transfer_mode=transfer_mode,
+                checksum_mode=self._checksum_mode,
+                fragment_amount=fragment_amount,
+                fragment_number=fragment_number,
+                message_id=message_id,
+                payload_data=typing.cast(bytes, view[offset:offset + fragment_size]),
+            ).as_bytes
+
+            cache[(message_id, fragment_number)] = packet
+            sendto(packet, group)
+
+        self._trim()
+
+        self.statistics.sent_messages += 1
+        self.statistics.sent_packets += fragment_amount
+
+        return message_id
+
+    def datagram_received(self, data: bytes, address: Address) -> None:
+
+        statistics = self.statistics
+        statistics.received_packets += 1
+
+        nack = _decode_nack(data)
+
+        if nack is not None:
+            statistics.received_nacks += 1
+            self._repair(*nack)
+            return
+
+        _, packet = Packet.try_from_bytes(data)
+
+        if packet is None or not packet.is_ack:
+            statistics.invalid_packets += 1
+            return
+
+        statistics.received_acks += 1
+
+        acks = self._acks.get(packet.message_id)
+
+        if acks is not None:
+            acks.add(address)
+
+    def _evict(self, message_id: int) -> None:
+
+        cache = self._cache
+
+        if (message_id, 0) not in cache:
+            return
+
+        for number in range(_MAX_FRAGMENT_AMOUNT):
+            if cache.pop((message_id, number), None) is None:
+                break
+
+            self._repaired.pop((message_id, number), None)
+
+        self._acks.pop(message_id, None)
+
+    def _trim(self) -> None:
+
+        cache = self._cache
+        acks = self._acks
+
+        while len(cache) > self._cache_size:
+
+            key, _ = cache.popitem(last=False)
+            self._repaired.pop(key, None)
+
+            if key[1] == 0:
+                acks.pop(key[0], None)
+
+    def _repair(self, message_id: int, numbers: typing.List[int]) -> None:
+
+        assert self._transport is not None and self._loop is not None
+
+        statistics = self.statistics
+        cache = self._cache
+        repaired = self._repaired
+        sendto = self._transport.sendto
+        now = self._loop.time()
+
+        for number in numbers:
+
+            key = (message_id, number)
+            packet = cache.get(key)
+
+            if packet is None:
+                if len(numbers) < _MAX_FRAGMENT_AMOUNT:
+                    statistics.missed_repairs += 1
+                continue
+
+            if now - repaired.get(key, float('-inf')) < self._holdoff:
+                statistics.suppressed_repairs += 1
+                continue
+
+            repaired[key] = now
+            sendto(packet, self._group)
+
+            statistics.repairs += 1
+            statistics.sent_packets += 1
+
+
+class _Reassembly:
+
+    __slots__ = [
+        'fragments',
+        'missing',
+        'last',
+        'nacks',
+        'timer',
+    ]
+
+    def __init__(self, timer: asyncio.TimerHandle) -> None:
+
+        self.fragments: typing.Optional[typing.List[typing.Optional[Buffer]]] = None
+        self.missing = 0
+        self.last: typing.Optional[Packet] = None
+        self.nacks = 0
+        self.timer = timer
+
+
+class MulticastReceiver(asyncio.DatagramProtocol):
+
+    def __init__(
+        self,
+        handler: typing.Optional[Handler] = None,
+        nack_delay: float = 0.02,
+        nack_interval: float = 0.05,
+        nack_retries: int = 5,
+        max_gap: int = 16,
+        history: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+
+        self._handler = handler
+        self._nack_delay = nack_delay
+        self._nack_interval = nack_interval
+        self._nack_retries = nack_retries
+        self._max_gap = max_gap
+        self._history = history
+
+        self._loop: typing.Optional[asyncio.AbstractEventLoop] = None
+        self._transport: typing.Optional[asyncio.DatagramTransport] = None
+        self._closed: typing.Optional[asyncio.Future[None]] = None
+        self._queue: typing.Deque[typing.Tuple[Address, bytes]] = collections.deque()
+        self._waiter: typing.Optional[asyncio.Future[None]] = None
+
+        self._last_ids: typing.Dict[Address, int] = {}
+        self._reassemblies: typing.Dict[typing.Tuple[Address, int], _Reassembly] = {}
+        self._completed: 'collections.OrderedDict[typing.Tuple[Address, int], None]' = \
+            collections.OrderedDict()
+
+        self.statistics = Statistics()
+
+    @property
+    def local_address(self) -> Address:
+
+        assert self._transport is not None
+
+        return self._transport.get_extra_info('sockname')
+
+    @property
+    def reassembling(self) -> int:
+
+        return len(self._reassemblies)
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+
+        self._loop = asyncio.get_event_loop()
+        self._transport = typing.cast(asyncio.DatagramTransport, transport)
+        self._closed = self._loop.create_future()
+
+    def connection_lost(self, exc: typing.Optional[Exception]) -> None:
+
+        for reassembly in self._reassemblies.values():
+            reassembly.timer.cancel()
+
+        self._reassemblies.clear()
+
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+        if self._closed is not None and not self._closed.done():
+            self._closed.set_result(None)
+
+    def error_received(self, exc: Exception) -> None:
+
+        pass
+
+    def close(self) -> None:
+
+        if self._transport is not None:
+            self._transport.close()
+
+    async def wait_closed(self) -> None:
+
+        if self._closed is not None:
+            await self._closed
+
+    async def receive(self) -> typing.Tuple[Address, bytes]:
+
+        while not self._queue:
+
+            if self._closed is None or self._closed.done():
+                raise ConnectionError('Couldn\'t receive message: receiver was closed.')
+
+            assert self._loop is not None
+
+            self._waiter = self._loop.create_future()
+            await self._waiter
+            self._waiter = None
+
+        return self._queue.popleft()
+
+    def datagram_received(self, data: bytes, address: Address) -> None:
+
+        statistics = self.statistics
+        statistics.received_packets += 1
+
+        _, packet = Packet.try_from_bytes(data)
+
+        if packet is None or not packet.is_data or not packet.is_fragment_valid:
+            statistics.invalid_packets += 1
+            return
+
+        key = (address, packet.message_id)
+
+        if key in self._completed:
+            statistics.duplicate_packets += 1
+            return
+
+        reassembly = self._reassemblies.get(key)
+
+        if reassembly is None:
+
+            self._advance(address, packet.message_id)
+
+            if packet.fragment_amount == 1:
+                self._complete(key, packet, bytes(packet.payload_data))
+                return
+
+            reassembly = self._track(key, self._nack_delay)
+
+        fragments = reassembly.fragments
+
+        if fragments is None or len(fragments) != packet.fragment_amount:
+            fragments = reassembly.fragments = [None] * packet.fragment_amount
+            reassembly.missing = packet.fragment_amount
+
+        fragment_number = packet.fragment_number
+
+        if fragments[fragment_number] is not None:
+            statistics.duplicate_packets += 1
+            return
+
+        fragments[fragment_number] = packet.payload_data
+        reassembly.missing -= 1
+
+        if packet.is_last:
+            reassembly.last = packet
+
+        if reassembly.missing:
+            self._rearm(key, reassembly, self._nack_delay)
+            return
+
+        reassembly.timer.cancel()
+        del self._reassemblies[key]
+
+        self._complete(
+            key, reassembly.last or packet, b''.join(typing.cast(typing.List[Buffer], fragments)),
+        )
+
+    def _advance(self, address: Address, message_id: int) -> None:
+
+        last = self._last_ids.get(address)
+
+        if last is None:
+            self._last_ids[address] = message_id
+            return
+
+        distance = (message_id - last) % _MAX_MESSAGE_ID
+
+        if not 0 < distance <= self._max_gap + 1:
+            return
+
+        self._last_ids[address] = message_id
+
+        for step in range(1, distance):
+
+            key = (address, (last + step - 1) % _MAX_MESSAGE_ID + 1)
+
+            if key not in self._reassemblies and key not in self._completed:
+                self._track(key, self._nack_delay)
+
+    def _track(self, key: typing.Tuple[Address, int], delay: float) -> _Reassembly:
+
+        assert self._loop is not None
+
+        timer = self._loop.call_later(delay, self._nack, key)
+        reassembly = self._reassemblies[key] = _Reassembly(timer)
+
+        return reassembly
+
+    def _rearm(
+        self,
+        key: typing.Tuple[Address, int],
+        reassembly: _Reassembly,
+        delay: float,
+    ) -> None:
+
+        assert self._loop is not None
+
+        reassembly.timer.cancel()
+        reassembly.timer = self._loop.call_later(delay, self._nack, key)
+
+    def _nack(self, key: typing.Tuple[Address, int]) -> None:
+
+        reassembly = self._reassemblies[key]
+
+        if reassembly.nacks >= self._nack_retries:
+            del self._reassemblies[key]
+            self.statistics.expired_reassemblies += 1
+            return
+
+        assert self._transport is not None
+
+        address, message_id = key
+        fragments = reassembly.fragments
+        numbers = None if fragments is None else [
+            number for number, fragment in enumerate(fragments) if fragment is None
+        ]
+
+        self._transport.sendto(_encode_nack(message_id, numbers), address)
+
+        reassembly.nacks += 1
+        self.statistics.sent_nacks += 1
+        self._rearm(key, reassembly, self._nack_interval)
+
+    def _complete(self, key: typing.Tuple[Address, int], packet: Packet, data: bytes) -> None:
+
+        completed = self._completed
+        completed[key] = None
+
+        if len(completed) > self._history:
+            completed.popitem(last=False)
+
+        address = key[0]
+
+        if packet.is_ack_needed:
+            assert self._transport is not None
+            self._transport.sendto(Packet.ack(packet, False).as_bytes, address)
+            self.statistics.sent_acks += 1
+
+        self.statistics.delivered_messages += 1
+
+        if self._handler is not None:
+            self._handler(address, data)
+            return
+
+        self._queue.append((address, data))
+
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+
+async def open_sender(
+    group: Address,
+    interface: str = '0.0.0.0',
+    ttl: int = 1,
+    loopback: bool = True,
+    **kwargs: typing.Any,
+) -> MulticastSender:
+
+    loop = asyncio.get_event_loop()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    try:
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, int(loopback))
+
+        if interface != '0.0.0.0':
+            sock.setsockopt(
+                socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(interface),
+            )
+
+        sock.bind((interface, 0))
+        sock.setblocking(False)
+    except OSError:
+        sock.close()
+        raise
+
+    _, sender = await loop.create_datagram_endpoint(
+        lambda: MulticastSender(group, **kwargs),
+        sock=sock,
+    )
+
+    return typing.cast(MulticastSender, sender)
+
+
+async def open_receiver(
+    group: Address,
+    handler: typing.Optional[Handler] = None,
+    interface: str = '0.0.0.0',
+    **kwargs: typing.Any,
+) -> MulticastReceiver:
+
+    loop = asyncio.get_event_loop()
+    host, port = parse_address(group)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        if hasattr(socket, 'SO_REUSEPORT'):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
+        sock.bind((host, port))
+        sock.setsockopt(
+            socket.IPPROTO_IP,
+            socket.IP_ADD_MEMBERSHIP,
+            socket.inet_aton(host) + socket.inet_aton(interface),
+        )
+        sock.setblocking(False)
+    except OSError:
+        sock.close()
+        raise
+
+    _, receiver = await loop.create_datagram_endpoint(
+        lambda: MulticastReceiver(handler, **kwargs),
+        sock=sock,
+    )
+
+    return typing.cast(MulticastReceiver, receiver)
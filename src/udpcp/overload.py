@@ -0,0 +1,195 @@
+__all__ = [
+    'Shedding',
+    'OverflowReader',
+    'set_buffer_size',
+    'SO_RXQ_OVFL',
+]
+
+import sys
+import socket
+import struct
+import typing
+import asyncio
+
+Address = typing.Any
+
+_LINUX = sys.platform.startswith('linux')
+
+SO_RXQ_OVFL = getattr(socket, 'SO_RXQ_OVFL', 40 if _LINUX else None)
+
+_FORCE = {
+    socket.SO_RCVBUF: getattr(socket, 'SO_RCVBUFFORCE', 33 if _LINUX else None),
+    socket.SO_SNDBUF: getattr(socket, 'SO_SNDBUFFORCE', 32 if _LINUX else None),
+}
+
+_COUNTER = struct.Struct('=I')
+
+
+class Shedding:
+
+    __slots__ = [
+        'max_reassemblies',
+        'max_backlog',
+        'hold',
+    ]
+
+    def __init__(
+        self,
+        max_reassemblies: int = 1024,
+        max_backlog: int = 4096,
+        hold: float = 0.1,
+    ) -> None:
+
+        if max_reassemblies < 1 or max_backlog < 1:
+            raise ValueError(
+                f'Couldn\'t create shedding policy: '
+                f'invalid limits ({max_reassemblies}, {max_backlog}).'
+            )
+
+        if hold < 0:
+            raise ValueError(
+                f'Couldn\'t create shedding policy: '
+                f'invalid hold time ({hold}).'
+            )
+
+        self.max_reassemblies = max_reassemblies
+        self.max_backlog = max_backlog
+        self.hold = hold
+
+
+def set_buffer_size(sock: typing.Any, option: int, size: int) -> int:
+
+    if sock.getsockopt(socket.SOL_SOCKET, option) < size:
+
+        force = _FORCE.get(option)
+
+        try:
+            if force is None:
+                raise PermissionError
+
+            sock.setsockopt(socket.SOL_SOCKET, force, size)
+        except OSError:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, option, size)
+            except OSError:
+                pass
+
+    return sock.getsockopt(socket.SOL_SOCKET, option)
+
+
+class OverflowReader:
+
+    __slots__ = [
+        'dropped',
+        '_loop',
+        '_socket',
+        '_protocol',
+        '_on_overflow',
+        '_size',
+        '_batch',
+        '_counter',
+        '_space',
+    ]
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        sock: socket.socket,
+        protocol: asyncio.DatagramProtocol,
+        on_overflow: typing.Callable[[int], None],
+        size: int = 65535,
+        batch: int = 64,
+    ) -> None:
+
+        if SO_RXQ_OVFL is None:
+            raise OSError('Couldn\'t read overflow counter: SO_RXQ_OVFL is not supported.')
+
+        sock.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+        sock.setblocking(False)
+
+        self.dropped = 0
+
+        self._loop = loop
+        self._socket = sock
+        self._protocol = protocol
+        self._on_overflow = on_overflow
+        self._size = size
+        self._batch = batch
+        self._counter = 0
+        self._space = socket.CMSG_SPACE(_COUNTER.size)
+
+        loop.add_reader(sock.fileno(), self._read)
+
+    @classmethod
+    def attach(
+        cls,
+        loop: asyncio.AbstractEventLoop,
+        transport: asyncio.BaseTransport,
+        protocol: asyncio.DatagramProtocol,
+        on_overflow: typing.Callable[[int], None],
+        size: int = 65535,
+    ) -> typing.Optional['OverflowReader']:
+
+        sock = transport.get_extra_info('socket')
+        pause_reading = getattr(transport, 'pause_reading', None)
+        dup = getattr(sock, 'dup', None)
+
+        if SO_RXQ_OVFL is None or dup is None or pause_reading is None:
+            return None
+
+        try:
+            duplicate = dup()
+        except OSError:
+            return None
+
+        try:
+            reader = cls(loop, duplicate, protocol, on_overflow, size)
+        except (OSError, NotImplementedError, RuntimeError):
+            duplicate.close()
+            return None
+
+        pause_reading()
+
+        return reader
+
+    def close(self) -> None:
+
+        if self._socket.fileno() < 0:
+            return
+
+        self._loop.remove_reader(self._socket.fileno())
+        self._socket.close()
+
+    def _read(self) -> None:
+
+        recvmsg = self._socket.recvmsg
+        protocol = self._protocol
+        size = self._size
+        space = self._space
+
+        for _ in range(self._batch):
+
+            try:
+                data, ancillary, _, address = recvmsg(size, space)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as error:
+                protocol.error_received(error)
+                return
+
+            for level, kind, value in ancillary:
+                if level == socket.SOL_SOCKET and kind == SO_RXQ_OVFL:
+                    self._overflowed(_COUNTER.unpack_from(value)[0])
+
+            protocol.datagram_received(data, address)
+
+    def _overflowed(self, counter: int) -> None:
+
+        dropped = (counter - self._counter) & 0xFFFFFFFF
+
+        if not dropped:
+            return
+
+        self._counter = counter
+        self.dropped += dropped
+        self._on_overflow(dropped)
@@ -0,0 +1,584 @@
+__all__ = [
+    'Datagram',
+    'Reader',
+    'Writer',
+    'read',
+    'packets',
+    'views',
+    'write',
+]
+
+import mmap
+import time
+import struct
+import socket
+import typing
+
+from .protocol import Packet, CompactPacket
+from .protocol._utils.properties import PacketProperties
+
+Address = typing.Tuple[str, int]
+
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_LINUX_SLL2 = 276
+LINKTYPE_IPV4 = 228
+LINKTYPE_IPV6 = 229
+
+_PCAP_MAGIC_USEC = 0xA1B2C3D4
+_PCAP_MAGIC_NSEC = 0xA1B23C4D
+_PCAPNG_SECTION_HEADER = 0x0A0D0D0A
+_PCAPNG_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+
+_PCAPNG_INTERFACE_DESCRIPTION = 1
+_PCAPNG_PACKET = 2
+_PCAPNG_SIMPLE_PACKET = 3
+_PCAPNG_ENHANCED_PACKET = 6
+
+_PCAPNG_OPTION_END = 0
+_PCAPNG_OPTION_TSRESOL = 9
+_PCAPNG_OPTION_TSOFFSET = 14
+
+_ETHERTYPE_IPV4 = 0x0800
+_ETHERTYPE_IPV6 = 0x86DD
+_ETHERTYPE_VLAN = (0x8100, 0x88A8, 0x9100)
+
+# AF_INET and the AF_INET6 values of Linux, NetBSD, FreeBSD and macOS
+_NULL_FAMILY_IPV4 = 2
+_NULL_FAMILIES_IPV6 = (10, 24, 28, 30)
+
+_IPPROTO_UDP = 17
+_IPV6_EXTENSION_HEADERS = (0, 43, 60)
+
+_ADDRESS_CACHE_SIZE = 4096
+
+_udp_header = struct.Struct('>HHHH')
+
+
+class Datagram(typing.NamedTuple):
+
+    timestamp: float
+    source: Address
+    destination: Address
+    payload: memoryview
+
+
+class _Interface(typing.NamedTuple):
+
+    linktype: int
+    snaplen: int
+    resolution: float
+    offset: int
+
+
+class Reader:
+
+    def __init__(
+        self,
+        path: str,
+        ports: typing.Optional[typing.Iterable[int]] = None,
+    ) -> None:
+
+        self._ports = frozenset(ports) if ports is not None else None
+        self._addresses: typing.Dict[bytes, str] = {}
+
+        with open(path, 'rb') as handle:
+
+            try:
+                self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(
+                    f'Couldn\'t read capture: '
+                    f'file is empty ({path}).'
+                ) from None
+
+        self._view = memoryview(self._mmap)
+
+        if len(self._view) < 4:
+            self.close()
+            raise ValueError(
+                f'Couldn\'t read capture: '
+                f'file is too short ({path}).'
+            )
+
+        magic = self._view[:4].tobytes()
+
+        if int.from_bytes(magic, 'little') == _PCAPNG_SECTION_HEADER:
+            self._records = self._pcapng_records
+        elif int.from_bytes(magic, 'little') in (_PCAP_MAGIC_USEC, _PCAP_MAGIC_NSEC) \
+                or int.from_bytes(magic, 'big') in (_PCAP_MAGIC_USEC, _PCAP_MAGIC_NSEC):
+            self._records = self._pcap_records
+        else:
+            self.close()
+            raise ValueError(
+                f'Couldn\'t read capture: '
+                f'unknown file format (magic = 0x{magic.hex()}).'
+            )
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+
+        self.close()
+
+    def __iter__(self) -> typing.Iterator[Datagram]:
+
+        ports = self._ports
+
+        for timestamp, linktype, frame in self._records():
+
+            datagram = self._datagram(linktype, frame)
+
+            if datagram is None:
+                continue
+
+            source, destination, payload = datagram
+
+            if ports is not None and source[1] not in ports and destination[1] not in ports:
+                continue
+
+            yield Datagram(timestamp, source, destination, payload)
+
+    def close(self) -> None:
+
+        self._view.release()
+
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def _pcap_records(self) -> typing.Iterator[typing.Tuple[float, int, memoryview]]:
+
+        view = self._view
+        magic = int.from_bytes(view[:4], 'little')
+        order = '<' if magic in (_PCAP_MAGIC_USEC, _PCAP_MAGIC_NSEC) else '>'
+
+        if order == '>':
+            magic = int.from_bytes(view[:4], 'big')
+
+        resolution = 1e-9 if magic == _PCAP_MAGIC_NSEC else 1e-6
+
+        _, _, _, _, _, linktype = struct.unpack_from(f'{order}HHiIII', view, 4)
+        record = struct.Struct(f'{order}IIII')
+
+        offset = 24
+        end = len(view)
+
+        while offset + record.size <= end:
+
+            seconds, fraction, captured, _ = record.unpack_from(view, offset)
+            offset += record.size
+
+            if offset + captured > end:
+                break
+
+            yield seconds + fraction * resolution, linktype, view[offset:offset + captured]
+
+            offset += captured
+
+    def _pcapng_records(self) -> typing.Iterator[typing.Tuple[float, int, memoryview]]:
+
+        view = self._view
+        end = len(view)
+        offset = 0
+        order = '<'
+        interfaces: typing.List[_Interface] = []
+
+        while offset + 12 <= end:
+
+            if int.from_bytes(view[offset:offset + 4], 'little') == _PCAPNG_SECTION_HEADER:
+
+                magic = int.from_bytes(view[offset + 8:offset + 12], 'little')
+                order = '<' if magic == _PCAPNG_BYTE_ORDER_MAGIC else '>'
+                interfaces = []
+
+            kind, length = struct.unpack_from(f'{order}II', view, offset)
+
+            if length < 12 or offset + length > end:
+                break
+
+            body = view[offset + 8:offset + length - 4]
+            offset += length
+
+            if kind == _PCAPNG_INTERFACE_DESCRIPTION:
+                interfaces.append(self._pcapng_interface(order, body))
+
+            elif kind == _PCAPNG_ENHANCED_PACKET and len(body) >= 20:
+
+                index, high, low, captured, _ = struct.unpack_from(f'{order}IIIII', body)
+                interface = self._pcapng_lookup(interfaces, index)
+                timestamp = (high << 32 | low) * interface.resolution + interface.offset
+
+                yield timestamp, interface.linktype, body[20:20 + captured]
+
+            elif kind == _PCAPNG_PACKET and len(body) >= 20:
+
+                index, _, high, low, captured, _ = struct.unpack_from(f'{order}HHIIII', body)
+                interface = self._pcapng_lookup(interfaces, index)
+                timestamp = (high << 32 | low) * interface.resolution + interface.offset
+
+                yield timestamp, interface.linktype, body[20:20 + captured]
+
+            elif kind == _PCAPNG_SIMPLE_PACKET and len(body) >= 4 and interfaces:
+
+                original, = struct.unpack_from(f'{order}I', body)
+                interface = interfaces[0]
+                captured = min(original, len(body) - 4)
+
+                if interface.snaplen:
+                    captured = min(captured, interface.snaplen)
+
+                yield 0.0, interface.linktype, body[4:4 + captured]
+
+    @staticmethod
+    def _pcapng_lookup(interfaces: typing.List[_Interface], index: int) -> _Interface:
+
+        if index >= len(interfaces):
+            raise ValueError(
+                f'Couldn\'t read capture: '
+                f'invalid interface index ({index} >= {len(interfaces)}).'
+            )
+
+        return interfaces[index]
+
+    @staticmethod
+    def _pcapng_interface(order: str, body: memoryview) -> _Interface:
+
+        linktype, _, snaplen = struct.unpack_from(f'{order}HHI', body)
+        resolution = 1e-6
+        timestamp_offset = 0
+        offset = 8
+
+        while offset + 4 <= len(body):
+
+            code, length = struct.unpack_from(f'{order}HH', body, offset)
+            value = body[offset + 4:offset + 4 + length]
+            offset += 4 + (length + 3) // 4 * 4
+
+            if code == _PCAPNG_OPTION_END:
+                break
+            elif code == _PCAPNG_OPTION_TSRESOL and length >= 1:
+                exponent = value[0]
+                resolution = 2.0 ** -(exponent & 0x7F) if exponent & 0x80 else 10.0 ** -exponent
+            elif code == _PCAPNG_OPTION_TSOFFSET and length >= 8:
+                timestamp_offset, = struct.unpack_from(f'{order}q', value)
+
+        return _Interface(linktype, snaplen, resolution, timestamp_offset)
+
+    def _datagram(
+        self,
+        linktype: int,
+        frame: memoryview,
+    ) -> typing.Optional[typing.Tuple[Address, Address, memoryview]]:
+
+        if linktype == LINKTYPE_ETHERNET:
+
+            if len(frame) < 14:
+                return None
+
+            ethertype = frame[12] << 8 | frame[13]
+            offset = 14
+
+            while ethertype in _ETHERTYPE_VLAN and len(frame) >= offset + 4:
+                ethertype = frame[offset + 2] << 8 | frame[offset + 3]
+                offset += 4
+
+            return self._ip(ethertype, frame[offset:])
+
+        elif linktype == LINKTYPE_LINUX_SLL:
+
+            if len(frame) < 16:
+                return None
+
+            return self._ip(frame[14] << 8 | frame[15], frame[16:])
+
+        elif linktype == LINKTYPE_LINUX_SLL2:
+
+            if len(frame) < 20:
+                return None
+
+            return self._ip(frame[0] << 8 | frame[1], frame[20:])
+
+        elif linktype == LINKTYPE_NULL:
+
+            if len(frame) < 4:
+                return None
+
+            # the family is stored in the capturing host's byte order
+            family = min(int.from_bytes(frame[:4], 'little'), int.from_bytes(frame[:4], 'big'))
+
+            if family == _NULL_FAMILY_IPV4:
+                return self._ip(_ETHERTYPE_IPV4, frame[4:])
+
+            if family in _NULL_FAMILIES_IPV6:
+                return self._ip(_ETHERTYPE_IPV6, frame[4:])
+
+            return None
+
+        elif linktype in (LINKTYPE_RAW, LINKTYPE_IPV4, LINKTYPE_IPV6, 12, 14):
+
+            if not frame:
+                return None
+
+            return self._ip(_ETHERTYPE_IPV4 if frame[0] >> 4 == 4 else _ETHERTYPE_IPV6, frame)
+
+        return None
+
+    def _ip(
+        self,
+        ethertype: int,
+        packet: memoryview,
+    ) -> typing.Optional[typing.Tuple[Address, Address, memoryview]]:
+
+        if ethertype == _ETHERTYPE_IPV4:
+
+            if len(packet) < 20 or packet[0] >> 4 != 4:
+                return None
+
+            header_length = (packet[0] & 0x0F) * 4
+            total_length = packet[2] << 8 | packet[3]
+            fragment = (packet[6] & 0x3F) << 8 | packet[7]
+
+            if packet[9] != _IPPROTO_UDP or fragment or total_length > len(packet):
+                return None
+
+            family = socket.AF_INET
+            source = packet[12:16]
+            destination = packet[16:20]
+            udp = packet[header_length:total_length]
+
+        elif ethertype == _ETHERTYPE_IPV6:
+
+            if len(packet) < 40 or packet[0] >> 4 != 6:
+                return None
+
+            next_header = packet[6]
+            offset = 40
+
+            while next_header in _IPV6_EXTENSION_HEADERS and len(packet) >= offset + 8:
+                next_header = packet[offset]
+                offset += (packet[offset + 1] + 1) * 8
+
+            if next_header != _IPPROTO_UDP:
+                return None
+
+            family = socket.AF_INET6
+            source = packet[8:24]
+            destination = packet[24:40]
+            udp = packet[offset:40 + (packet[4] << 8 | packet[5])]
+
+        else:
+            return None
+
+        if len(udp) < 8:
+            return None
+
+        source_port, destination_port, length, _ = _udp_header.unpack_from(udp)
+
+        if length < 8 or length > len(udp):
+            return None
+
+        return (
+            (self._address(family, source), source_port),
+            (self._address(family, destination), destination_port),
+            udp[8:length],
+        )
+
+    def _address(self, family: int, address: memoryview) -> str:
+
+        key = address.tobytes()
+        text = self._addresses.get(key)
+
+        if text is None:
+
+            if len(self._addresses) >= _ADDRESS_CACHE_SIZE:
+                self._addresses.clear()
+
+            text = self._addresses[key] = socket.inet_ntop(family, key)
+
+        return text
+
+
+class Writer:
+
+    def __init__(
+        self,
+        path: typing.Union[str, typing.BinaryIO],
+    ) -> None:
+
+        if isinstance(path, (str, bytes)):
+            self._handle: typing.BinaryIO = open(path, 'wb')
+            self._owned = True
+        else:
+            self._handle = path
+            self._owned = False
+
+        self._identification = 0
+        self._handle.write(struct.pack(
+            '<IHHiIII', _PCAP_MAGIC_USEC, 2, 4, 0, 0, 65535, LINKTYPE_ETHERNET,
+        ))
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+
+        self.close()
+
+    def close(self) -> None:
+
+        if self._owned:
+            self._handle.close()
+        else:
+            self._handle.flush()
+
+    def write(
+        self,
+        packet: typing.Union[PacketProperties, bytes],
+        source: Address,
+        destination: Address,
+        timestamp: typing.Optional[float] = None,
+    ) -> None:
+
+        payload = packet.as_bytes if isinstance(packet, PacketProperties) else bytes(packet)
+        frame = self._frame(payload, source, destination)
+
+        if timestamp is None:
+            timestamp = time.time()
+
+        seconds = int(timestamp)
+        microseconds = int(round((timestamp - seconds) * 1e6))
+
+        if microseconds >= 1000000:
+            seconds, microseconds = seconds + 1, microseconds - 1000000
+
+        self._handle.write(struct.pack('<IIII', seconds, microseconds, len(frame), len(frame)))
+        self._handle.write(frame)
+
+    def _frame(self, payload: bytes, source: Address, destination: Address) -> bytes:
+
+        udp_length = 8 + len(payload)
+
+        if ':' in source[0]:
+
+            if udp_length > 0xFFFF:
+                raise ValueError(
+                    f'Couldn\'t write datagram: '
+                    f'payload is too large ({len(payload)}).'
+                )
+
+            source_address = socket.inet_pton(socket.AF_INET6, source[0])
+            destination_address = socket.inet_pton(socket.AF_INET6, destination[0])
+            pseudo_header = source_address + destination_address \
+                + struct.pack('>IxxxB', udp_length, _IPPROTO_UDP)
+            ip = struct.pack('>IHBB', 6 << 28, udp_length, _IPPROTO_UDP, 64) \
+                + source_address + destination_address
+            ethertype = _ETHERTYPE_IPV6
+
+        else:
+
+            if 20 + udp_length > 0xFFFF:
+                raise ValueError(
+                    f'Couldn\'t write datagram: '
+                    f'payload is too large ({len(payload)}).'
+                )
+
+            source_address = socket.inet_pton(socket.AF_INET, source[0])
+            destination_address = socket.inet_pton(socket.AF_INET, destination[0])
+            pseudo_header = source_address + destination_address \
+                + struct.pack('>xBH', _IPPROTO_UDP, udp_length)
+            ip = struct.pack(
+                '>BBHHHBBH4s4s',
+                0x45, 0, 20 + udp_length, self._identification, 0x4000, 64, _IPPROTO_UDP, 0,
+                source_address, destination_address,
+            )
+            ip = ip[:10] + _internet_checksum(ip).to_bytes(2, 'big') + ip[12:]
+            ethertype = _ETHERTYPE_IPV4
+
+        self._identification = (self._identification + 1) & 0xFFFF
+
+        udp = _udp_header.pack(source[1], destination[1], udp_length, 0) + payload
+        checksum = _internet_checksum(pseudo_header + udp) or 0xFFFF
+        udp = udp[:6] + checksum.to_bytes(2, 'big') + udp[8:]
+
+        ethernet = b'\x02\x00\x00\x00\x00\x02' + b'\x02\x00\x00\x00\x00\x01' \
+            + ethertype.to_bytes(2, 'big')
+
+        return ethernet + ip + udp
+
+
+def _internet_checksum(data: bytes) -> int:
+
+    if len(data) % 2:
+        data += b'\x00'
+
+    total = sum(struct.unpack(f'>{len(data) // 2}H', data))
+
+    while total >> 16:
+        total = (total & 0xFFFF) + (total >> 16)
+
+    return ~total & 0xFFFF
+
+
+def read(
+    path: str,
+    ports: typing.Optional[typing.Iterable[int]] = None,
+) -> typing.Iterator[Datagram]:
+
+    with Reader(path, ports) as reader:
+        yield from reader
+
+
+def packets(
+    path: str,
+    ports: typing.Optional[typing.Iterable[int]] = None,
+    strict: bool = False,
+) -> typing.Iterator[Packet]:
+
+    for datagram in read(path, ports):
+
+        try:
+            yield Packet.from_bytes(datagram.payload.tobytes())
+        except ValueError:
+            if strict:
+                raise
+
+
+def views(
+    path: str,
+    ports: typing.Optional[typing.Iterable[int]] = None,
+    strict: bool = False,
+) -> typing.Iterator[CompactPacket]:
+
+    for datagram in read(path, ports):
+
+        try:
+            yield CompactPacket.from_bytes(datagram.payload.tobytes())
+        except ValueError:
+            if strict:
+                raise
+
+
+def write(
+    path: typing.Union[str, typing.BinaryIO],
+    packets: typing.Iterable[typing.Union[PacketProperties, bytes]],
+    source: Address = ('127.0.0.1', 4000),
+    destination: Address = ('127.0.0.1', 5000),
+    start: float = 0.0,
+    interval: float = 0.001,
+) -> int:
+
+    count = 0
+
+    with Writer(path) as writer:
+
+        for count, packet in enumerate(packets, 1):
+            writer.write(packet, source, destination, start + (count - 1) * interval)
+
+    return count
@@ -1,11 +1,22 @@
 __all__ = [
     'Packet',
+    'iter_packets',
     'MessageType',
     'TransferMode',
     'ChecksumMode',
+    'DecodeStatus',
+    'CompactPacket',
+    'PacketTable',
+    'PacketPool',
+    'PooledPacket',
+    'HeaderPredictor',
 ]
 
-from .packet import Packet
+from .packet import Packet, iter_packets
 from .message_type import MessageType
 from .transfer_mode import TransferMode
 from .checksum_mode import ChecksumMode
+from .decode_status import DecodeStatus
+from .compact import CompactPacket, PacketTable
+from .pool import PacketPool, PooledPacket
+from .prediction import HeaderPredictor
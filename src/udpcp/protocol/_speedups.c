@@ -0,0 +1,534 @@
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+
+#define HEADER_SIZE 12
+#define VERSION 2
+
+#define ADLER_BASE 65521U
+#define ADLER_NMAX 5552
+
+static PyObject *decode_table = NULL;
+static PyObject *encode_table = NULL;
+static PyObject *struct_error = NULL;
+
+enum {
+    FLAGS_MESSAGE_TYPE = 1,
+    FLAGS_TRANSFER_MODE = 3,
+    FLAGS_CHECKSUM_MODE = 4,
+};
+
+static uint32_t
+adler32_update(uint32_t adler, const unsigned char *buffer, Py_ssize_t length)
+{
+    uint32_t a = adler & 0xFFFF;
+    uint32_t b = adler >> 16;
+
+    while (length > 0) {
+        Py_ssize_t block = length < ADLER_NMAX ? length : ADLER_NMAX;
+        length -= block;
+
+        while (block--) {
+            a += *buffer++;
+            b += a;
+        }
+
+        a %= ADLER_BASE;
+        b %= ADLER_BASE;
+    }
+
+    return (b << 16) | a;
+}
+
+static int
+read_field(PyObject *object, unsigned long limit, unsigned long *value)
+{
+    *value = PyLong_AsUnsignedLong(object);
+
+    if (*value == (unsigned long)-1 && PyErr_Occurred()) {
+        PyErr_Clear();
+        PyErr_SetString(struct_error, "argument out of range");
+        return -1;
+    }
+
+    if (*value > limit) {
+        PyErr_SetString(struct_error, "argument out of range");
+        return -1;
+    }
+
+    return 0;
+}
+
+static int
+encode_flags(PyObject *message_type, PyObject *transfer_mode, PyObject *checksum_mode,
+             unsigned char *flags)
+{
+    PyObject *entry = encode_table;
+    PyObject *keys[3] = {message_type, transfer_mode, checksum_mode};
+
+    for (int index = 0; index < 3; index++) {
+        Py_ssize_t key = PyNumber_AsSsize_t(keys[index], PyExc_IndexError);
+
+        if (key == -1 && PyErr_Occurred()) {
+            return -1;
+        }
+
+        if (key < 0 || key >= PyTuple_GET_SIZE(entry)) {
+            PyErr_SetString(PyExc_IndexError, "tuple index out of range");
+            return -1;
+        }
+
+        entry = PyTuple_GET_ITEM(entry, key);
+    }
+
+    *flags = (unsigned char)(PyLong_AsLong(entry) | (VERSION << 3));
+
+    return 0;
+}
+
+static int
+build_header(PyObject *args, Py_ssize_t offset, unsigned char *header)
+{
+    PyObject *message_type = PyTuple_GET_ITEM(args, offset + 0);
+    PyObject *transfer_mode = PyTuple_GET_ITEM(args, offset + 1);
+    PyObject *checksum_mode = PyTuple_GET_ITEM(args, offset + 2);
+    PyObject *is_duplicate = PyTuple_GET_ITEM(args, offset + 3);
+    unsigned long fragment_amount;
+    unsigned long fragment_number;
+    unsigned long message_id;
+    unsigned long message_data_length;
+    int duplicate;
+
+    if (encode_flags(message_type, transfer_mode, checksum_mode, &header[4]) < 0) {
+        return -1;
+    }
+
+    duplicate = PyObject_IsTrue(is_duplicate);
+
+    if (duplicate < 0) {
+        return -1;
+    }
+
+    if (read_field(PyTuple_GET_ITEM(args, offset + 4), 0xFF, &fragment_amount) < 0 ||
+        read_field(PyTuple_GET_ITEM(args, offset + 5), 0xFF, &fragment_number) < 0 ||
+        read_field(PyTuple_GET_ITEM(args, offset + 6), 0xFFFF, &message_id) < 0 ||
+        read_field(PyTuple_GET_ITEM(args, offset + 7), 0xFFFF, &message_data_length) < 0) {
+        return -1;
+    }
+
+    header[0] = 0;
+    header[1] = 0;
+    header[2] = 0;
+    header[3] = 0;
+    header[5] = (unsigned char)(duplicate << 7);
+    header[6] = (unsigned char)fragment_amount;
+    header[7] = (unsigned char)fragment_number;
+    header[8] = (unsigned char)(message_id >> 8);
+    header[9] = (unsigned char)message_id;
+    header[10] = (unsigned char)(message_data_length >> 8);
+    header[11] = (unsigned char)message_data_length;
+
+    return 0;
+}
+
+enum {
+    STATUS_OK = 0,
+    STATUS_SHORT = 1,
+    STATUS_BAD_VERSION = 2,
+    STATUS_INVALID_FLAGS = 3,
+    STATUS_LENGTH_MISMATCH = 4,
+    STATUS_BAD_CHECKSUM = 5,
+    /* reported by receivers for data packets, never by the decoder */
+    STATUS_INVALID_FRAGMENT = 6,
+    STATUS_COUNT = 7,
+};
+
+static PyObject *statuses = NULL;
+
+static uint32_t
+read_checksum(const unsigned char *buffer)
+{
+    return (uint32_t)buffer[0] << 24 | (uint32_t)buffer[1] << 16
+        | (uint32_t)buffer[2] << 8 | (uint32_t)buffer[3];
+}
+
+static Py_ssize_t
+packet_size(const unsigned char *buffer)
+{
+    return HEADER_SIZE + (buffer[10] << 8 | buffer[11]);
+}
+
+static uint32_t
+expected_checksum(const Py_buffer *view)
+{
+    static const unsigned char zeros[4] = {0, 0, 0, 0};
+    const unsigned char *buffer = (const unsigned char *)view->buf;
+
+    if (!(buffer[4] & 0x02)) {
+        return 0;
+    }
+
+    return adler32_update(adler32_update(1, zeros, 4), buffer + 4, packet_size(buffer) - 4);
+}
+
+static int
+header_status(const Py_buffer *view, PyObject **entry)
+{
+    const unsigned char *buffer = (const unsigned char *)view->buf;
+
+    if (view->len < HEADER_SIZE) {
+        return STATUS_SHORT;
+    }
+
+    if (((buffer[4] >> 3) & 0x07) != VERSION) {
+        return STATUS_BAD_VERSION;
+    }
+
+    *entry = PyTuple_GET_ITEM(decode_table, buffer[4]);
+
+    if (PyTuple_GET_ITEM(*entry, FLAGS_MESSAGE_TYPE) == Py_None ||
+        PyTuple_GET_ITEM(*entry, FLAGS_TRANSFER_MODE) == Py_None) {
+        return STATUS_INVALID_FLAGS;
+    }
+
+    if (packet_size(buffer) > view->len) {
+        return STATUS_LENGTH_MISMATCH;
+    }
+
+    if (read_checksum(buffer) != expected_checksum(view)) {
+        return STATUS_BAD_CHECKSUM;
+    }
+
+    return STATUS_OK;
+}
+
+static PyObject *
+raise_status(int status, const Py_buffer *view)
+{
+    const unsigned char *buffer = (const unsigned char *)view->buf;
+    char flags[3];
+
+    switch (status) {
+    case STATUS_SHORT:
+        PyErr_Format(
+            PyExc_ValueError,
+            "Couldn't decode raw packet from bytes: "
+            "invalid data length (%zd < %d).",
+            view->len, HEADER_SIZE
+        );
+        break;
+    case STATUS_BAD_VERSION:
+        PyErr_Format(
+            PyExc_ValueError,
+            "Couldn't decode packet from bytes: "
+            "invalid packet protocol version (%u != %d).",
+            (unsigned int)(buffer[4] >> 3) & 0x07, VERSION
+        );
+        break;
+    case STATUS_INVALID_FLAGS:
+        snprintf(flags, sizeof(flags), "%02X", (unsigned int)buffer[4]);
+        PyErr_Format(
+            PyExc_ValueError,
+            "Couldn't decode packet from bytes: "
+            "invalid packet flags (0x%s).",
+            flags
+        );
+        break;
+    case STATUS_LENGTH_MISMATCH:
+        PyErr_Format(
+            PyExc_ValueError,
+            "Couldn't decode packet from bytes: "
+            "invalid message data length (%d > %zd).",
+            buffer[10] << 8 | buffer[11], view->len - HEADER_SIZE
+        );
+        break;
+    default:
+        PyErr_Format(
+            PyExc_ValueError,
+            "Couldn't decode packet from bytes: "
+            "invalid packet checksum (%lu != %lu).",
+            (unsigned long)read_checksum(buffer), (unsigned long)expected_checksum(view)
+        );
+        break;
+    }
+
+    return NULL;
+}
+
+static PyObject *
+check_header(const Py_buffer *view)
+{
+    PyObject *entry = NULL;
+    int status = header_status(view, &entry);
+
+    if (status != STATUS_OK) {
+        return raise_status(status, view);
+    }
+
+    return entry;
+}
+
+static PyObject *
+build_decoded(PyObject *data, const Py_buffer *view, PyObject *entry)
+{
+    const unsigned char *buffer = (const unsigned char *)view->buf;
+    PyObject *payload_data = PySequence_GetSlice(data, HEADER_SIZE, packet_size(buffer));
+
+    if (payload_data == NULL) {
+        return NULL;
+    }
+
+    return Py_BuildValue(
+        "(kOOONiiiiN)",
+        (unsigned long)read_checksum(buffer),
+        PyTuple_GET_ITEM(entry, FLAGS_MESSAGE_TYPE),
+        PyTuple_GET_ITEM(entry, FLAGS_TRANSFER_MODE),
+        PyTuple_GET_ITEM(entry, FLAGS_CHECKSUM_MODE),
+        PyBool_FromLong(buffer[5] >> 7),
+        (int)buffer[6],
+        (int)buffer[7],
+        (int)(buffer[8] << 8 | buffer[9]),
+        (int)(buffer[10] << 8 | buffer[11]),
+        payload_data
+    );
+}
+
+static PyObject *
+speedups_decode(PyObject *Py_UNUSED(module), PyObject *data)
+{
+    Py_buffer view;
+    PyObject *entry;
+    PyObject *result = NULL;
+
+    if (PyObject_GetBuffer(data, &view, PyBUF_SIMPLE) < 0) {
+        return NULL;
+    }
+
+    entry = check_header(&view);
+
+    if (entry != NULL) {
+        result = build_decoded(data, &view, entry);
+    }
+
+    PyBuffer_Release(&view);
+
+    return result;
+}
+
+static PyObject *
+speedups_try_decode(PyObject *Py_UNUSED(module), PyObject *data)
+{
+    Py_buffer view;
+    PyObject *entry = NULL;
+    PyObject *decoded;
+    int status;
+
+    if (PyObject_GetBuffer(data, &view, PyBUF_SIMPLE) < 0) {
+        return NULL;
+    }
+
+    status = header_status(&view, &entry);
+
+    if (status != STATUS_OK) {
+        PyBuffer_Release(&view);
+        return PyTuple_Pack(2, PyTuple_GET_ITEM(statuses, status), Py_None);
+    }
+
+    decoded = build_decoded(data, &view, entry);
+    PyBuffer_Release(&view);
+
+    if (decoded == NULL) {
+        return NULL;
+    }
+
+    return Py_BuildValue("(ON)", PyTuple_GET_ITEM(statuses, STATUS_OK), decoded);
+}
+
+static PyObject *
+speedups_validate(PyObject *Py_UNUSED(module), PyObject *data)
+{
+    Py_buffer view;
+    PyObject *entry;
+
+    if (PyObject_GetBuffer(data, &view, PyBUF_SIMPLE) < 0) {
+        return NULL;
+    }
+
+    entry = check_header(&view);
+    PyBuffer_Release(&view);
+
+    if (entry == NULL) {
+        return NULL;
+    }
+
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+speedups_encode(PyObject *Py_UNUSED(module), PyObject *args)
+{
+    unsigned char header[HEADER_SIZE];
+    unsigned long checksum;
+    Py_buffer payload;
+    PyObject *result;
+
+    if (PyTuple_GET_SIZE(args) != 10) {
+        PyErr_Format(PyExc_TypeError, "encode() takes exactly 10 arguments (%zd given)",
+                     PyTuple_GET_SIZE(args));
+        return NULL;
+    }
+
+    if (read_field(PyTuple_GET_ITEM(args, 0), 0xFFFFFFFFUL, &checksum) < 0 ||
+        build_header(args, 1, header) < 0) {
+        return NULL;
+    }
+
+    header[0] = (unsigned char)(checksum >> 24);
+    header[1] = (unsigned char)(checksum >> 16);
+    header[2] = (unsigned char)(checksum >> 8);
+    header[3] = (unsigned char)checksum;
+
+    if (PyObject_GetBuffer(PyTuple_GET_ITEM(args, 9), &payload, PyBUF_SIMPLE) < 0) {
+        return NULL;
+    }
+
+    result = PyBytes_FromStringAndSize(NULL, HEADER_SIZE + payload.len);
+
+    if (result != NULL) {
+        char *output = PyBytes_AS_STRING(result);
+        memcpy(output, header, HEADER_SIZE);
+        memcpy(output + HEADER_SIZE, payload.buf, payload.len);
+    }
+
+    PyBuffer_Release(&payload);
+
+    return result;
+}
+
+static PyObject *
+speedups_checksum(PyObject *Py_UNUSED(module), PyObject *args)
+{
+    unsigned char header[HEADER_SIZE];
+    Py_buffer payload;
+    uint32_t adler;
+    int enabled;
+
+    if (PyTuple_GET_SIZE(args) != 9) {
+        PyErr_Format(PyExc_TypeError, "checksum() takes exactly 9 arguments (%zd given)",
+                     PyTuple_GET_SIZE(args));
+        return NULL;
+    }
+
+    enabled = PyObject_IsTrue(PyTuple_GET_ITEM(args, 2));
+
+    if (enabled < 0) {
+        return NULL;
+    }
+
+    if (!enabled) {
+        return PyLong_FromLong(0);
+    }
+
+    if (build_header(args, 0, header) < 0) {
+        return NULL;
+    }
+
+    if (PyObject_GetBuffer(PyTuple_GET_ITEM(args, 8), &payload, PyBUF_SIMPLE) < 0) {
+        return NULL;
+    }
+
+    adler = adler32_update(1, header, HEADER_SIZE);
+    adler = adler32_update(adler, (const unsigned char *)payload.buf, payload.len);
+
+    PyBuffer_Release(&payload);
+
+    return PyLong_FromUnsignedLong(adler);
+}
+
+static PyMethodDef speedups_methods[] = {
+    {"decode", (PyCFunction)speedups_decode, METH_O, NULL},
+    {"try_decode", (PyCFunction)speedups_try_decode, METH_O, NULL},
+    {"validate", (PyCFunction)speedups_validate, METH_O, NULL},
+    {"encode", (PyCFunction)speedups_encode, METH_VARARGS, NULL},
+    {"checksum", (PyCFunction)speedups_checksum, METH_VARARGS, NULL},
+    {NULL, NULL, 0, NULL},
+};
+
+static struct PyModuleDef speedups_module = {
+    PyModuleDef_HEAD_INIT,
+    "udpcp.protocol._speedups",
+    NULL,
+    -1,
+    speedups_methods,
+    NULL,
+    NULL,
+    NULL,
+    NULL,
+};
+
+PyMODINIT_FUNC
+PyInit__speedups(void)
+{
+    PyObject *flags = PyImport_ImportModule("udpcp.protocol._utils.flags");
+    PyObject *decode_status;
+    PyObject *status_type;
+    PyObject *structure;
+
+    if (flags == NULL) {
+        return NULL;
+    }
+
+    decode_table = PyObject_GetAttrString(flags, "decode_table");
+    encode_table = PyObject_GetAttrString(flags, "encode_table");
+    Py_DECREF(flags);
+
+    if (decode_table == NULL || encode_table == NULL) {
+        return NULL;
+    }
+
+    if (!PyTuple_Check(decode_table) || PyTuple_GET_SIZE(decode_table) != 256 ||
+        !PyTuple_Check(encode_table)) {
+        PyErr_SetString(PyExc_ImportError, "unexpected flags lookup tables");
+        return NULL;
+    }
+
+    decode_status = PyImport_ImportModule("udpcp.protocol.decode_status");
+
+    if (decode_status == NULL) {
+        return NULL;
+    }
+
+    status_type = PyObject_GetAttrString(decode_status, "DecodeStatus");
+    Py_DECREF(decode_status);
+
+    if (status_type == NULL) {
+        return NULL;
+    }
+
+    statuses = PySequence_Tuple(status_type);
+    Py_DECREF(status_type);
+
+    if (statuses == NULL) {
+        return NULL;
+    }
+
+    if (PyTuple_GET_SIZE(statuses) != STATUS_COUNT) {
+        PyErr_SetString(PyExc_ImportError, "unexpected decode statuses");
+        return NULL;
+    }
+
+    structure = PyImport_ImportModule("struct");
+
+    if (structure == NULL) {
+        return NULL;
+    }
+
+    struct_error = PyObject_GetAttrString(structure, "error");
+    Py_DECREF(structure);
+
+    if (struct_error == NULL) {
+        return NULL;
+    }
+
+    return PyModule_Create(&speedups_module);
+}
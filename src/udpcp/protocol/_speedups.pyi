@@ -0,0 +1,54 @@
+from typing import Optional, Tuple, Union
+
+from .message_type import MessageType
+from .transfer_mode import TransferMode
+from .checksum_mode import ChecksumMode
+from .decode_status import DecodeStatus
+
+Buffer = Union[bytes, bytearray, memoryview]
+Decoded = Tuple[int, MessageType, TransferMode, ChecksumMode, bool, int, int, int, int, Buffer]
+
+
+def decode(
+    data: Buffer,
+) -> Decoded: ...
+
+
+def try_decode(
+    data: Buffer,
+) -> Tuple[
+    DecodeStatus,
+    Optional[Decoded],
+]: ...
+
+
+def validate(
+    data: Buffer,
+) -> None: ...
+
+
+def encode(
+    checksum: int,
+    message_type: MessageType,
+    transfer_mode: TransferMode,
+    checksum_mode: ChecksumMode,
+    is_duplicate: bool,
+    fragment_amount: int,
+    fragment_number: int,
+    message_id: int,
+    message_data_length: int,
+    payload_data: Buffer,
+) -> bytes: ...
+
+
+def checksum(
+    message_type: MessageType,
+    transfer_mode: TransferMode,
+    checksum_mode: ChecksumMode,
+    is_duplicate: bool,
+    fragment_amount: int,
+    fragment_number: int,
+    message_id: int,
+    message_data_length: int,
+    payload_data: Buffer,
+) -> int: ...
@@ -0,0 +1,14 @@
+__all__ = [
+    'mypyc_attr',
+]
+
+TYPE_CHECKING = False
+
+# mypyc reads the decorator statically, this module is never compiled so that the
+# no-op fallback keeps the interpreted build free of a mypy_extensions dependency.
+if TYPE_CHECKING:
+    from mypy_extensions import mypyc_attr
+else:
+    def mypyc_attr(*attrs, **kwattrs):
+
+        return lambda cls: cls
@@ -0,0 +1,83 @@
+__all__ = [
+    'Flags',
+    'decode_table',
+    'encode_table',
+]
+
+import collections
+
+from ..message_type import MessageType
+from ..transfer_mode import TransferMode
+from ..checksum_mode import ChecksumMode
+
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    import typing
+
+    class Flags(typing.NamedTuple):
+
+        value: int
+        message_type: typing.Optional[MessageType]
+        version: int
+        transfer_mode: typing.Optional[TransferMode]
+        checksum_mode: ChecksumMode
+        is_valid: bool
+else:
+    Flags = collections.namedtuple('Flags', (
+        'value',
+        'message_type',
+        'version',
+        'transfer_mode',
+        'checksum_mode',
+        'is_valid',
+    ))
+
+
+_message_types = {message_type.value: message_type for message_type in MessageType}
+
+
+def _decode(value: int) -> Flags:
+
+    version = (value >> 3) & 0b111
+    nbit = bool(value & 0b100)
+    cbit = bool(value & 0b010)
+    sbit = bool(value & 0b001)
+
+    decoded_message_type = _message_types.get(value >> 6)
+
+    decoded_transfer_mode: typing.Optional[TransferMode] = None
+
+    if not (nbit and sbit):
+        decoded_transfer_mode = TransferMode.from_bits(nbit, sbit)
+
+    return Flags(
+        value=value,
+        message_type=decoded_message_type,
+        version=version,
+        transfer_mode=decoded_transfer_mode,
+        checksum_mode=ChecksumMode.from_bits(cbit),
+        is_valid=decoded_message_type is not None and decoded_transfer_mode is not None,
+    )
+
+
+def _encode(message_type: int, transfer_mode: TransferMode, checksum_mode: ChecksumMode) -> int:
+
+    return message_type << 6 \
+        | transfer_mode.nbit << 2 \
+        | checksum_mode.cbit << 1 \
+        | transfer_mode.sbit
+
+
+decode_table: 'typing.Tuple[Flags, ...]' = tuple(_decode(value) for value in range(256))
+
+encode_table: 'typing.Tuple[typing.Tuple[typing.Tuple[int, ...], ...], ...]' = tuple(
+    tuple(
+        tuple(
+            _encode(message_type, transfer_mode, checksum_mode)
+            for checksum_mode in ChecksumMode
+        )
+        for transfer_mode in TransferMode
+    )
+    for message_type in range(4)
+)
@@ -0,0 +1,171 @@
+__all__ = [
+    'PacketProperties',
+]
+
+import abc
+
+from ..message_type import MessageType
+from ..transfer_mode import TransferMode
+from ..checksum_mode import ChecksumMode
+from .compiled import mypyc_attr
+
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    import typing
+
+    from . import specification
+
+
+@mypyc_attr(allow_interpreted_subclasses=True)
+class PacketProperties(metaclass=abc.ABCMeta):
+
+    __slots__ = ()
+
+    version: 'typing.ClassVar[int]'
+
+    @property
+    @abc.abstractmethod
+    def message_type(self) -> MessageType: ...
+
+    @property
+    @abc.abstractmethod
+    def checksum(self) -> int: ...
+
+    @property
+    @abc.abstractmethod
+    def transfer_mode(self) -> TransferMode: ...
+
+    @property
+    @abc.abstractmethod
+    def checksum_mode(self) -> ChecksumMode: ...
+
+    @property
+    @abc.abstractmethod
+    def is_duplicate(self) -> bool: ...
+
+    @property
+    @abc.abstractmethod
+    def fragment_amount(self) -> int: ...
+
+    @property
+    @abc.abstractmethod
+    def fragment_number(self) -> int: ...
+
+    @property
+    @abc.abstractmethod
+    def message_id(self) -> int: ...
+
+    @property
+    @abc.abstractmethod
+    def message_data_length(self) -> int: ...
+
+    @property
+    @abc.abstractmethod
+    def payload_data(self) -> 'specification.Buffer': ...
+
+    @property
+    @abc.abstractmethod
+    def header(self) -> bytes: ...
+
+    @property
+    @abc.abstractmethod
+    def as_bytes(self) -> bytes: ...
+
+    def __str__(self):
+
+        return f'packet(' \
+               f'type = {self.type}, ' \
+               f'version = {self.version}, ' \
+               f'checksum = 0x{self.checksum}, ' \
+               f'checksum_mode = {self.checksum_mode}, ' \
+               f'transfer_mode = {self.transfer_mode}, ' \
+               f'fragment_amount = {self.fragment_amount}, ' \
+               f'fragment_number = {self.fragment_number}, ' \
+               f'message_id = 0x{self.message_id}, ' \
+               f'message_data_length = {self.message_data_length}, ' \
+               f'payload_data = {self.payload_data}' \
+               f')'
+
+    def __bytes__(self):
+
+        return self.as_bytes
+
+    @property
+    def type(self) -> str:
+
+        if self.is_ack:
+            return 'ack'
+        elif self.is_sync:
+            return 'sync'
+        elif self.is_data:
+            return 'data'
+        else:
+            return 'invalid'
+
+    @property
+    def nbit(self) -> bool:
+
+        return self.transfer_mode.nbit
+
+    @property
+    def cbit(self) -> bool:
+
+        return self.checksum_mode.cbit
+
+    @property
+    def sbit(self) -> bool:
+
+        return self.transfer_mode.sbit
+
+    @property
+    def dbit(self) -> bool:
+
+        return self.is_duplicate
+
+    @property
+    def is_ack(self) -> bool:
+
+        return MessageType.Ack is self.message_type \
+               and TransferMode.AckNone is self.transfer_mode \
+               and self.message_data_length == 0
+
+    @property
+    def is_sync(self) -> bool:
+
+        return MessageType.Data is self.message_type \
+               and TransferMode.AckEveryPacket is self.transfer_mode \
+               and not self.is_duplicate \
+               and self.message_id == 0 \
+               and self.message_data_length == 0
+
+    @property
+    def is_data(self) -> bool:
+
+        return MessageType.Data is self.message_type \
+               and not self.is_duplicate \
+               and self.message_id != 0
+
+    @property
+    def is_single(self) -> bool:
+
+        return self.fragment_amount == 1 \
+            and self.fragment_number == 0
+
+    @property
+    def is_fragment_valid(self) -> bool:
+
+        return self.fragment_number < self.fragment_amount
+
+    @property
+    def is_last(self) -> bool:
+
+        return self.fragment_amount == self.fragment_number + 1
+
+    @property
+    def is_ack_needed(self) -> bool:
+
+        ack_every_packet = TransferMode.AckEveryPacket is self.transfer_mode
+        ack_last_fragment_only = TransferMode.AckLastFragmentOnly is self.transfer_mode
+
+        return ack_every_packet or (ack_last_fragment_only and self.is_last)
@@ -1,27 +1,49 @@
 __all__ = [
     'from_bytes',
     'as_bytes',
+    'decode',
+    'try_decode',
+    'describe',
+    'validate',
+    'wire_checksum',
+    'encode',
+    'checksum',
 ]
 
-import typing
-import bitarray
-import itertools
-
-RawPacket = typing.NamedTuple('packet', (
-    ('checksum', int),
-    ('message_type', int),
-    ('version', int),
-    ('nbit', bool),
-    ('cbit', bool),
-    ('sbit', bool),
-    ('dbit', bool),
-    ('reserved', int),
-    ('fragment_amount', int),
-    ('fragment_number', int),
-    ('message_id', int),
-    ('message_data_length', int),
-    ('payload_data', bytes),
-))
+import os
+import zlib
+import struct
+
+from .flags import Flags, decode_table, encode_table
+from ..message_type import MessageType
+from ..transfer_mode import TransferMode
+from ..checksum_mode import ChecksumMode
+from ..decode_status import DecodeStatus
+
+try:
+    if os.environ.get('UDPCP_NO_SPEEDUPS'):
+        raise ImportError('speedups disabled by UDPCP_NO_SPEEDUPS')
+
+    from .. import _speedups
+except ImportError:
+    _speedups = None  # type: ignore
+
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    import typing
+
+    from .properties import PacketProperties
+
+    Buffer = typing.Union[bytes, bytearray, memoryview]
+
+    DecodedHeader = typing.Tuple[
+        int, MessageType, TransferMode, ChecksumMode, bool, int, int, int, int,
+    ]
+
+    DecodedPacket = typing.Tuple[
+        int, MessageType, TransferMode, ChecksumMode, bool, int, int, int, int, Buffer,
+    ]
 
 bits_format = {
     'checksum': 32,
@@ -40,27 +62,69 @@ bits_format = {
 
 header_size = int(sum(bits_format.values()) / 8)
 
+# checksum, flags (message_type, version, nbit, cbit, sbit), dbit with reserved,
+# fragment_amount, fragment_number, message_id, message_data_length
+header_format = struct.Struct('>IBBBBHH')
+
+version = 2
 
-def _bits_as_int(bits: typing.Iterable[bool], length: int) -> int:
+_version_bits = version << 3
+_zero_checksum = zlib.adler32(bytes(4))
 
-    value = ''
+_OK = DecodeStatus.Ok
+_SHORT = DecodeStatus.Short
+_BAD_VERSION = DecodeStatus.BadVersion
+_INVALID_FLAGS = DecodeStatus.InvalidFlags
+_LENGTH_MISMATCH = DecodeStatus.LengthMismatch
+_BAD_CHECKSUM = DecodeStatus.BadChecksum
 
-    for bit in itertools.islice(bits, length):
-        value += str(int(bit))
 
-    return int(value, base=2)
+class RawPacket:
 
+    __slots__ = [
+        'checksum',
+        'flags',
+        'dbit',
+        'reserved',
+        'fragment_amount',
+        'fragment_number',
+        'message_id',
+        'message_data_length',
+        'payload_data',
+    ]
 
-def _bytes_as_ints(data: bytes, offsets: typing.Iterable[int]) \
-        -> typing.Generator[int, None, None]:
+    def __init__(
+        self,
+        checksum: int,
+        flags: Flags,
+        dbit: bool,
+        reserved: int,
+        fragment_amount: int,
+        fragment_number: int,
+        message_id: int,
+        message_data_length: int,
+        payload_data: bytes,
+    ) -> None:
 
-    bits = bitarray.bitarray()
-    bits.frombytes(data)
+        self.checksum = checksum
+        self.flags = flags
+        self.dbit = dbit
+        self.reserved = reserved
+        self.fragment_amount = fragment_amount
+        self.fragment_number = fragment_number
+        self.message_id = message_id
+        self.message_data_length = message_data_length
+        self.payload_data = payload_data
 
-    bits_iterator = iter(bits)
+    def __repr__(self) -> str:
 
-    for offset in offsets:
-        yield _bits_as_int(bits_iterator, offset)
+        return (
+            f'RawPacket(checksum={self.checksum}, flags={self.flags}, dbit={self.dbit}, '
+            f'reserved={self.reserved}, fragment_amount={self.fragment_amount}, '
+            f'fragment_number={self.fragment_number}, message_id={self.message_id}, '
+            f'message_data_length={self.message_data_length}, '
+            f'payload_data={self.payload_data!r})'
+        )
 
 
 def from_bytes(data: bytes) -> RawPacket:
@@ -71,28 +135,210 @@ def from_bytes(data: bytes) -> RawPacket:
             f'invalid data length ({len(data)} < {header_size}).'
         )
 
-    values = _bytes_as_ints(data[:header_size], bits_format.values())
+    checksum, flags, extra, fragment_amount, fragment_number, message_id, message_data_length = \
+        header_format.unpack_from(data)
+
+    return RawPacket(
+        checksum,
+        decode_table[flags],
+        extra >= 0x80,
+        extra & 0x7F,
+        fragment_amount,
+        fragment_number,
+        message_id,
+        message_data_length,
+        data[header_size:header_size + message_data_length],
+    )
+
+
+def as_bytes(packet: 'PacketProperties') -> bytes:
+
+    return encode(
+        packet.checksum,
+        packet.message_type,
+        packet.transfer_mode,
+        packet.checksum_mode,
+        packet.is_duplicate,
+        packet.fragment_amount,
+        packet.fragment_number,
+        packet.message_id,
+        packet.message_data_length,
+        packet.payload_data,
+    )
+
+
+def wire_checksum(data: 'Buffer', end: 'typing.Optional[int]' = None) -> int:
+
+    return zlib.adler32(memoryview(data)[4:end], _zero_checksum)
+
+
+def _try_check(data: 'Buffer') -> 'typing.Tuple[DecodeStatus, typing.Optional[DecodedHeader]]':
+
+    if len(data) < header_size:
+        return _SHORT, None
+
+    checksum, flags, extra, fragment_amount, fragment_number, message_id, message_data_length = \
+        header_format.unpack_from(data)
+
+    entry = decode_table[flags]
+
+    if entry.version != version:
+        return _BAD_VERSION, None
+
+    message_type = entry.message_type
+    transfer_mode = entry.transfer_mode
+
+    if message_type is None or transfer_mode is None:
+        return _INVALID_FLAGS, None
+
+    end = header_size + message_data_length
+
+    if end > len(data):
+        return _LENGTH_MISMATCH, None
+
+    if checksum != (wire_checksum(data, end) if flags & 0b010 else 0):
+        return _BAD_CHECKSUM, None
+
+    return _OK, (
+        checksum,
+        message_type,
+        transfer_mode,
+        entry.checksum_mode,
+        extra >= 0x80,
+        fragment_amount,
+        fragment_number,
+        message_id,
+        message_data_length,
+    )
+
+
+def describe(status: DecodeStatus, data: 'Buffer') -> str:
+
+    if status is DecodeStatus.Short:
+        return (
+            f'Couldn\'t decode raw packet from bytes: '
+            f'invalid data length ({len(data)} < {header_size}).'
+        )
+
+    checksum, flags, _, fragment_amount, fragment_number, _, message_data_length = \
+        header_format.unpack_from(data)
+
+    if status is DecodeStatus.BadVersion:
+        reason = f'invalid packet protocol version ({decode_table[flags].version} != {version})'
+    elif status is DecodeStatus.InvalidFlags:
+        reason = f'invalid packet flags (0x{flags:02X})'
+    elif status is DecodeStatus.LengthMismatch:
+        reason = (
+            f'invalid message data length '
+            f'({message_data_length} > {len(data) - header_size})'
+        )
+    elif status is DecodeStatus.BadChecksum:
+        end = header_size + message_data_length
+        expected = wire_checksum(data, end) if flags & 0b010 else 0
+        reason = f'invalid packet checksum ({checksum} != {expected})'
+    elif status is DecodeStatus.InvalidFragment:
+        reason = f'invalid fragment number ({fragment_number} >= {fragment_amount})'
+    else:
+        return 'Packet decoded successfully.'
+
+    return f'Couldn\'t decode packet from bytes: {reason}.'
+
+
+def _check(data: 'Buffer') -> 'DecodedHeader':
+
+    status, header = _try_check(data)
+
+    if header is None:
+        raise ValueError(describe(status, data))
+
+    return header
+
+
+def _decode(data: 'Buffer') -> 'DecodedPacket':
+
+    header = _check(data)
+
+    return (*header, data[header_size:header_size + header[8]])  # type: ignore
+
+
+def _try_decode(data: 'Buffer') -> 'typing.Tuple[DecodeStatus, typing.Optional[DecodedPacket]]':
+
+    status, header = _try_check(data)
+
+    if header is None:
+        return status, None
+
+    return status, (*header, data[header_size:header_size + header[8]])  # type: ignore
+
+
+def _validate(data: 'Buffer') -> None:
+
+    _check(data)
+
 
-    arguments: typing.Dict[str, typing.Any] = dict(zip(bits_format.keys(), values))
+def _encode(
+    checksum: int,
+    message_type: MessageType,
+    transfer_mode: TransferMode,
+    checksum_mode: ChecksumMode,
+    is_duplicate: bool,
+    fragment_amount: int,
+    fragment_number: int,
+    message_id: int,
+    message_data_length: int,
+    payload_data: 'Buffer',
+) -> bytes:
 
-    arguments['nbit'] = bool(arguments['nbit'])
-    arguments['cbit'] = bool(arguments['cbit'])
-    arguments['sbit'] = bool(arguments['sbit'])
-    arguments['dbit'] = bool(arguments['dbit'])
-    arguments['payload_data'] = data[header_size:]
+    header = header_format.pack(
+        checksum,
+        encode_table[message_type][transfer_mode][checksum_mode] | _version_bits,
+        is_duplicate << 7,
+        fragment_amount,
+        fragment_number,
+        message_id,
+        message_data_length,
+    )
 
-    return RawPacket(**arguments)
+    return header + payload_data
 
 
-def as_bytes(packet) -> bytes:
+def _checksum(
+    message_type: MessageType,
+    transfer_mode: TransferMode,
+    checksum_mode: ChecksumMode,
+    is_duplicate: bool,
+    fragment_amount: int,
+    fragment_number: int,
+    message_id: int,
+    message_data_length: int,
+    payload_data: 'Buffer',
+) -> int:
 
-    bits = bitarray.bitarray()
+    if not checksum_mode:
+        return 0
 
-    for name, length in bits_format.items():
+    header = header_format.pack(
+        0,
+        encode_table[message_type][transfer_mode][checksum_mode] | _version_bits,
+        is_duplicate << 7,
+        fragment_amount,
+        fragment_number,
+        message_id,
+        message_data_length,
+    )
 
-        value = getattr(packet, name)
+    return zlib.adler32(payload_data, zlib.adler32(header))
 
-        for bit in f'{value:0{length}b}':
-            bits.append(int(bit))
 
-    return bits.tobytes() + packet.payload_data
+if _speedups is not None:
+    decode = _speedups.decode
+    try_decode = _speedups.try_decode
+    validate = _speedups.validate
+    encode = _speedups.encode
+    checksum = _speedups.checksum
+else:
+    decode = _decode
+    try_decode = _try_decode
+    validate = _validate
+    encode = _encode
+    checksum = _checksum
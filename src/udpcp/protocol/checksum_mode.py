@@ -13,9 +13,14 @@ class ChecksumMode(enum.IntEnum):
     @classmethod
     def from_bits(cls, cbit: bool):
 
-        return cls(cbit)
+        return _from_bits[cbit]
 
     @property
     def cbit(self) -> bool:
 
-        return bool(self.value)
+        return _cbits[self]
+
+
+_from_bits = (ChecksumMode.Disabled, ChecksumMode.Enabled)
+
+_cbits = (False, True)
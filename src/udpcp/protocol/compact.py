@@ -0,0 +1,232 @@
+__all__ = [
+    'CompactPacket',
+    'PacketTable',
+]
+
+from ._utils import specification
+from ._utils.flags import decode_table
+from ._utils.properties import PacketProperties
+from .packet import Packet
+from .message_type import MessageType
+from .transfer_mode import TransferMode
+from .checksum_mode import ChecksumMode
+
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    import typing
+
+header_size = specification.header_size
+
+
+class CompactPacket(PacketProperties):
+
+    version = specification.version
+
+    __slots__ = [
+        '_header',
+        '_payload_data',
+    ]
+
+    def __init__(
+        self,
+        header: bytes,
+        payload_data: 'specification.Buffer',
+    ) -> None:
+
+        if len(header) != header_size:
+            raise ValueError(
+                f'Couldn\'t create compact packet: '
+                f'invalid header length ({len(header)} != {header_size}).'
+            )
+
+        flags = decode_table[header[4]]
+
+        if flags.version != self.version or not flags.is_valid:
+            raise ValueError(
+                f'Couldn\'t create compact packet: '
+                f'invalid header flags (0x{flags.value:02X}).'
+            )
+
+        self._header: 'typing.Any' = header
+        self._payload_data: 'typing.Any' = payload_data
+
+    @classmethod
+    def from_bytes(
+        cls,
+        data: bytes,
+    ):
+
+        end = header_size + specification.decode(data)[8]
+
+        return cls(bytes(data[:header_size]), data[header_size:end])
+
+    @classmethod
+    def from_packet(
+        cls,
+        packet: PacketProperties,
+    ):
+
+        if isinstance(packet, CompactPacket):
+            return packet
+
+        return cls(packet.header, packet.payload_data)
+
+    def to_packet(self) -> Packet:
+
+        return Packet.from_bytes(self.as_bytes)
+
+    @property
+    def message_type(self) -> MessageType:
+
+        message_type = decode_table[self._header[4]].message_type
+        assert message_type is not None
+
+        return message_type
+
+    @property
+    def checksum(self) -> int:
+
+        header = self._header
+
+        return header[0] << 24 | header[1] << 16 | header[2] << 8 | header[3]
+
+    @property
+    def transfer_mode(self) -> TransferMode:
+
+        transfer_mode = decode_table[self._header[4]].transfer_mode
+        assert transfer_mode is not None
+
+        return transfer_mode
+
+    @property
+    def checksum_mode(self) -> ChecksumMode:
+
+        return decode_table[self._header[4]].checksum_mode
+
+    @property
+    def is_duplicate(self) -> bool:
+
+        return self._header[5] >= 0x80
+
+    @property
+    def reserved(self) -> int:
+
+        return self._header[5] & 0x7F
+
+    @property
+    def fragment_amount(self) -> int:
+
+        return self._header[6]
+
+    @property
+    def fragment_number(self) -> int:
+
+        return self._header[7]
+
+    @property
+    def message_id(self) -> int:
+
+        header = self._header
+
+        return header[8] << 8 | header[9]
+
+    @property
+    def message_data_length(self) -> int:
+
+        header = self._header
+
+        return header[10] << 8 | header[11]
+
+    @property
+    def payload_data(self) -> bytes:
+
+        return self._payload_data
+
+    @property
+    def header(self) -> bytes:
+
+        return self._header
+
+    @property
+    def as_bytes(self) -> bytes:
+
+        return self._header + self._payload_data
+
+
+class PacketTable:
+
+    __slots__ = [
+        '_headers',
+        '_payloads',
+    ]
+
+    def __init__(
+        self,
+        packets: 'typing.Iterable[PacketProperties]' = (),
+    ) -> None:
+
+        self._headers = bytearray()
+        self._payloads: 'typing.List[specification.Buffer]' = []
+
+        self.extend(packets)
+
+    def __len__(self) -> int:
+
+        return len(self._payloads)
+
+    def __getitem__(self, index: int) -> CompactPacket:
+
+        payload_data = self._payloads[index]
+
+        if index < 0:
+            index += len(self._payloads)
+
+        offset = index * header_size
+
+        return CompactPacket(bytes(self._headers[offset:offset + header_size]), payload_data)
+
+    def __iter__(self) -> 'typing.Iterator[CompactPacket]':
+
+        headers = self._headers
+
+        for index, payload_data in enumerate(self._payloads):
+            offset = index * header_size
+            yield CompactPacket(bytes(headers[offset:offset + header_size]), payload_data)
+
+    def append(self, packet: PacketProperties) -> None:
+
+        header = packet.header
+
+        if len(header) != header_size:
+            raise ValueError(
+                f'Couldn\'t append packet to table: '
+                f'invalid header length ({len(header)} != {header_size}).'
+            )
+
+        self._headers += header
+        self._payloads.append(packet.payload_data)
+
+    def extend(self, packets: 'typing.Iterable[PacketProperties]') -> None:
+
+        for packet in packets:
+            self.append(packet)
+
+    def pop(self, index: int = -1) -> CompactPacket:
+
+        packet = self[index]
+
+        if index < 0:
+            index += len(self._payloads)
+
+        offset = index * header_size
+
+        del self._headers[offset:offset + header_size]
+        del self._payloads[index]
+
+        return packet
+
+    def clear(self) -> None:
+
+        self._headers.clear()
+        self._payloads.clear()
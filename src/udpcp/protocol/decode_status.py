@@ -0,0 +1,16 @@
+__all__ = [
+    'DecodeStatus',
+]
+
+import enum
+
+
+class DecodeStatus(enum.IntEnum):
+
+    Ok = 0
+    Short = 1
+    BadVersion = 2
+    InvalidFlags = 3
+    LengthMismatch = 4
+    BadChecksum = 5
+    InvalidFragment = 6
@@ -1,19 +1,26 @@
-__all__ = ['Packet']
-
-import zlib
-import typing
+__all__ = [
+    'Packet',
+    'iter_packets',
+]
 
 from ._utils import specification
+from ._utils.properties import PacketProperties
 from .message_type import MessageType
 from .transfer_mode import TransferMode
 from .checksum_mode import ChecksumMode
+from .decode_status import DecodeStatus
+
+TYPE_CHECKING = False
 
-PacketType = typing.TypeVar('PacketType', bound='Packet')
+if TYPE_CHECKING:
+    import typing
 
+    PacketType = typing.TypeVar('PacketType', bound=PacketProperties)
 
-class Packet:
 
-    version = 2
+class Packet(PacketProperties):
+
+    version: 'typing.ClassVar[int]' = specification.version
 
     __slots__ = [
         '_checksum',
@@ -38,7 +45,8 @@ class Packet:
         fragment_number: int,
         message_id: int,
         message_data_length: int,
-        payload_data: bytes,
+        payload_data: 'specification.Buffer',
+        checksum: 'typing.Optional[int]' = None,
     ) -> None:
 
         self._checksum = 0
@@ -52,65 +60,78 @@ class Packet:
         self._message_data_length = message_data_length
         self._payload_data = payload_data
 
-        self._calculate_checksum()
+        if checksum is None:
+            self._calculate_checksum()
+        else:
+            self._checksum = checksum
+
+    @classmethod
+    def from_bytes(
+        cls,
+        data: 'specification.Buffer',
+    ):
 
-    def __str__(self):
+        return cls._from_decoded(specification.decode(data))
 
-        return f'packet(' \
-               f'type = {self.type}, ' \
-               f'version = {self.version}, ' \
-               f'checksum = 0x{self.checksum}, ' \
-               f'checksum_mode = {self.checksum_mode}, ' \
-               f'transfer_mode = {self.transfer_mode}, ' \
-               f'fragment_amount = {self.fragment_amount}, ' \
-               f'fragment_number = {self.fragment_number}, ' \
-               f'message_id = 0x{self.message_id}, ' \
-               f'message_data_length = {self.message_data_length}, ' \
-               f'payload_data = {self.payload_data}' \
-               f')'
+    @classmethod
+    def split_from_bytes(
+        cls,
+        data: 'specification.Buffer',
+    ) -> 'typing.Tuple[Packet, specification.Buffer]':
 
-    def __bytes__(self):
+        decoded = specification.decode(data)
 
-        return self.as_bytes
+        return cls._from_decoded(decoded), data[specification.header_size + decoded[8]:]
 
     @classmethod
-    def from_bytes(
+    def try_from_bytes(
         cls,
-        data: bytes,
-    ):
+        data: 'specification.Buffer',
+    ) -> 'typing.Tuple[DecodeStatus, typing.Optional[Packet]]':
 
-        raw = specification.from_bytes(data)
+        status, decoded = specification.try_decode(data)
 
-        if raw.version != cls.version:
-            raise ValueError(
-                f'Couldn\'t decode packet from bytes: '
-                f'invalid packet protocol version ({raw.version} != {cls.version}).'
-            )
+        if decoded is None:
+            return status, None
 
-        instance = cls(
-            MessageType.from_int(raw.message_type),
-            TransferMode.from_bits(raw.nbit, raw.sbit),
-            ChecksumMode.from_bits(raw.cbit),
-            raw.dbit,
-            raw.fragment_amount,
-            raw.fragment_number,
-            raw.message_id,
-            raw.message_data_length,
-            raw.payload_data,
-        )
+        return status, cls._from_decoded(decoded)
 
-        if raw.checksum != instance.checksum:
-            raise ValueError(
-                f'Couldn\'t decode packet from bytes: '
-                f'invalid packet checksum ({raw.checksum} != {instance.checksum}).'
-            )
+    @classmethod
+    def _from_decoded(
+        cls,
+        decoded: 'specification.DecodedPacket',
+    ):
+
+        (
+            checksum,
+            message_type,
+            transfer_mode,
+            checksum_mode,
+            is_duplicate,
+            fragment_amount,
+            fragment_number,
+            message_id,
+            message_data_length,
+            payload_data,
+        ) = decoded
 
-        return instance
+        return cls(
+            message_type,
+            transfer_mode,
+            checksum_mode,
+            is_duplicate,
+            fragment_amount,
+            fragment_number,
+            message_id,
+            message_data_length,
+            payload_data,
+            checksum,
+        )
 
     @classmethod
     def ack(
         cls,
-        base_packet: PacketType,
+        base_packet: 'PacketType',
         is_duplicate: bool = False,
     ):
 
@@ -158,7 +179,7 @@ class Packet:
         fragment_amount: int,
         fragment_number: int,
         message_id: int,
-        payload_data: bytes,
+        payload_data: 'specification.Buffer',
     ):
 
         if message_id == 0:
@@ -197,18 +218,6 @@ class Packet:
             payload_data=payload_data
         )
 
-    @property
-    def type(self) -> str:
-
-        if self.is_ack:
-            return 'ack'
-        elif self.is_sync:
-            return 'sync'
-        elif self.is_data:
-            return 'data'
-        else:
-            return 'invalid'
-
     @property
     def message_type(self) -> MessageType:
 
@@ -229,26 +238,6 @@ class Packet:
 
         return self._checksum_mode
 
-    @property
-    def nbit(self) -> bool:
-
-        return self.transfer_mode.nbit
-
-    @property
-    def cbit(self) -> bool:
-
-        return self.checksum_mode.cbit
-
-    @property
-    def sbit(self) -> bool:
-
-        return self.transfer_mode.sbit
-
-    @property
-    def dbit(self) -> bool:
-
-        return self.is_duplicate
-
     @property
     def is_duplicate(self) -> bool:
 
@@ -280,62 +269,61 @@ class Packet:
         return self._message_data_length
 
     @property
-    def payload_data(self) -> bytes:
+    def payload_data(self) -> 'specification.Buffer':
 
         return self._payload_data
 
     @property
-    def is_ack(self) -> bool:
-
-        return MessageType.Ack is self.message_type \
-               and TransferMode.AckNone is self.transfer_mode \
-               and self.message_data_length == 0
-
-    @property
-    def is_sync(self) -> bool:
-
-        return MessageType.Data is self.message_type \
-               and TransferMode.AckEveryPacket is self.transfer_mode \
-               and not self.is_duplicate \
-               and self.message_id == 0 \
-               and self.message_data_length == 0
-
-    @property
-    def is_data(self) -> bool:
-
-        return MessageType.Data is self.message_type \
-               and not self.is_duplicate \
-               and self.message_id != 0
-
-    @property
-    def is_single(self) -> bool:
-
-        return self.fragment_amount == 1 \
-            and self.fragment_number == 0
-
-    @property
-    def is_last(self) -> bool:
-
-        return self.fragment_amount == self.fragment_number + 1
-
-    @property
-    def is_ack_needed(self) -> bool:
-
-        ack_every_packet = TransferMode.AckEveryPacket is self.transfer_mode
-        ack_last_fragment_only = TransferMode.AckLastFragmentOnly is self.transfer_mode
-
-        return ack_every_packet or (ack_last_fragment_only and self.is_last)
+    def header(self) -> bytes:
+
+        return specification.encode(
+            self._checksum,
+            self._message_type,
+            self._transfer_mode,
+            self._checksum_mode,
+            self._is_duplicate,
+            self._fragment_amount,
+            self._fragment_number,
+            self._message_id,
+            self._message_data_length,
+            b'',
+        )
 
     @property
     def as_bytes(self) -> bytes:
 
-        return specification.as_bytes(self)
+        return specification.encode(
+            self._checksum,
+            self._message_type,
+            self._transfer_mode,
+            self._checksum_mode,
+            self._is_duplicate,
+            self._fragment_amount,
+            self._fragment_number,
+            self._message_id,
+            self._message_data_length,
+            self._payload_data,
+        )
 
     def _calculate_checksum(self) -> None:
 
-        self._checksum = 0
+        self._checksum = specification.checksum(
+            self._message_type,
+            self._transfer_mode,
+            self._checksum_mode,
+            self._is_duplicate,
+            self._fragment_amount,
+            self._fragment_number,
+            self._message_id,
+            self._message_data_length,
+            self._payload_data,
+        )
+
+
+def iter_packets(buffer: 'specification.Buffer') -> 'typing.Iterator[Packet]':
 
-        if self.checksum_mode is ChecksumMode.Disabled:
-            return
+    remainder: 'specification.Buffer' = memoryview(buffer)
 
-        self._checksum = zlib.adler32(self.as_bytes, 1)
+    while remainder:
+        packet, remainder = Packet.split_from_bytes(remainder)
+        yield packet
@@ -0,0 +1,218 @@
+__all__ = [
+    'PacketPool',
+    'PooledPacket',
+]
+
+from ._utils import specification
+from .compact import CompactPacket
+
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    import socket
+    import typing
+
+header_size = specification.header_size
+
+
+class _Released:
+
+    __slots__ = ()
+
+    def _raise(self, *args, **kwargs):
+
+        raise RuntimeError(
+            'Couldn\'t access pooled packet: '
+            'packet was already released to its pool.'
+        )
+
+    __getitem__ = _raise
+    __len__ = _raise
+    __iter__ = _raise
+    __bytes__ = _raise
+    __add__ = _raise
+    __radd__ = _raise
+    __eq__ = _raise
+    tobytes = _raise
+
+
+_released = _Released()
+
+
+class PooledPacket(CompactPacket):
+
+    __slots__ = [
+        '_pool',
+        '_buffer',
+        '_view',
+        '_length',
+        '_released',
+    ]
+
+    def __init__(
+        self,
+        pool: 'PacketPool',
+        capacity: int,
+        buffer: 'typing.Optional[bytearray]' = None,
+    ) -> None:
+
+        self._pool = pool
+        self._buffer = bytearray(capacity) if buffer is None else buffer
+        self._view = memoryview(self._buffer)
+        self._length = 0
+        self._released = False
+        self._header = self._view[:header_size]
+        self._payload_data = self._view[header_size:header_size]
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+
+        self.release()
+
+    @property
+    def buffer(self) -> memoryview:
+
+        return self._view
+
+    @property
+    def header(self) -> bytes:
+
+        return bytes(self._header)
+
+    @property
+    def as_bytes(self) -> bytes:
+
+        return bytes(self._view[:self._length])
+
+    def load(self, length: int) -> None:
+
+        if self._length < 0:
+            _released._raise()
+
+        view = self._view
+        specification.validate(view[:length])
+
+        self._length = header_size + (view[10] << 8 | view[11])
+        self._payload_data = view[header_size:self._length]
+
+    def release(self) -> None:
+
+        self._pool.release(self)
+
+
+class PacketPool:
+
+    __slots__ = [
+        '_size',
+        '_capacity',
+        '_debug',
+        '_free',
+        'allocated',
+        'reused',
+    ]
+
+    def __init__(
+        self,
+        size: int = 64,
+        capacity: int = 65535,
+        debug: bool = False,
+    ) -> None:
+
+        if capacity < header_size:
+            raise ValueError(
+                f'Couldn\'t create packet pool: '
+                f'buffer capacity cannot be less than {header_size}.'
+            )
+
+        self._size = size
+        self._capacity = capacity
+        self._debug = debug
+        self._free: 'typing.List[PooledPacket]' = []
+
+        self.allocated = 0
+        self.reused = 0
+
+    def __len__(self) -> int:
+
+        return len(self._free)
+
+    @property
+    def debug(self) -> bool:
+
+        return self._debug
+
+    def acquire(self) -> PooledPacket:
+
+        if not self._free:
+            self.allocated += 1
+            return PooledPacket(self, self._capacity)
+
+        packet = self._free.pop()
+        self.reused += 1
+
+        if self._debug:
+            # hand out a fresh handle, so stale ones to the same buffer keep raising
+            stale = packet
+            packet = PooledPacket(self, self._capacity, stale._buffer)
+            stale._view = _released  # type: ignore
+
+        packet._released = False
+
+        return packet
+
+    def release(self, packet: PooledPacket) -> None:
+
+        if packet._pool is not self:
+            raise ValueError(
+                'Couldn\'t release pooled packet: '
+                'packet belongs to a different pool.'
+            )
+
+        if packet._released:
+            raise RuntimeError(
+                'Couldn\'t release pooled packet: '
+                'packet was already released to its pool.'
+            )
+
+        packet._released = True
+
+        if self._debug:
+
+            if isinstance(packet._payload_data, memoryview):
+                packet._payload_data.release()
+
+            packet._length = -1
+            packet._header = _released
+            packet._payload_data = _released
+
+        if len(self._free) < self._size:
+            self._free.append(packet)
+
+    def decode(self, data: bytes) -> PooledPacket:
+
+        packet = self.acquire()
+
+        try:
+            packet._view[:len(data)] = data
+            packet.load(len(data))
+        except BaseException:
+            self.release(packet)
+            raise
+
+        return packet
+
+    def receive(self, sock: 'socket.socket') -> 'typing.Tuple[PooledPacket, typing.Any]':
+
+        packet = self.acquire()
+
+        try:
+            length, address = sock.recvfrom_into(packet._view)
+            packet.load(length)
+        except BaseException:
+            self.release(packet)
+            raise
+
+        return packet, address
@@ -0,0 +1,167 @@
+__all__ = [
+    'HeaderPredictor',
+]
+
+import zlib
+import struct
+
+from ._utils import specification
+from .packet import Packet
+from .message_type import MessageType
+from .decode_status import DecodeStatus
+
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    import typing
+
+header_size = specification.header_size
+adler32 = zlib.adler32
+
+# checksum, skipped invariant bytes, message_data_length
+_changing = struct.Struct('>I6xH')
+
+_zero_checksum = zlib.adler32(bytes(4))
+
+_OK = DecodeStatus.Ok
+_DATA = MessageType.Data
+_MAX_FRAGMENT_AMOUNT = 255
+_MAX_MESSAGE_ID = 0xFFFF
+
+
+class _Prediction:
+
+    __slots__ = [
+        'template',
+        'transfer_mode',
+        'checksum_mode',
+        'checked',
+        'fragment_amount',
+        'fragment_number',
+        'message_id',
+    ]
+
+    def __init__(self, data: 'specification.Buffer', packet: Packet) -> None:
+
+        self.template = bytearray(data[4:10])
+        self.transfer_mode = packet.transfer_mode
+        self.checksum_mode = packet.checksum_mode
+        self.checked = bool(packet.checksum_mode)
+        self.fragment_amount = packet.fragment_amount
+        self.fragment_number = packet.fragment_number
+        self.message_id = packet.message_id
+
+        self.advance()
+
+    def advance(self) -> None:
+
+        fragment_number = self.fragment_number + 1
+
+        if fragment_number == self.fragment_amount:
+            self.message_id = message_id = self.message_id % _MAX_MESSAGE_ID + 1
+            self.template[4] = message_id >> 8
+            self.template[5] = message_id & 0xFF
+            fragment_number = 0
+
+        self.fragment_number = fragment_number
+        self.template[3] = fragment_number
+
+
+class HeaderPredictor:
+
+    __slots__ = [
+        '_predictions',
+        '_capacity',
+        'hits',
+        'misses',
+    ]
+
+    def __init__(self, capacity: int = 1024) -> None:
+
+        if capacity < 1:
+            raise ValueError(
+                f'Couldn\'t create header predictor: '
+                f'invalid capacity ({capacity}).'
+            )
+
+        self._predictions: 'typing.Dict[typing.Hashable, _Prediction]' = {}
+        self._capacity = capacity
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+
+        return len(self._predictions)
+
+    @property
+    def hit_rate(self) -> float:
+
+        total = self.hits + self.misses
+
+        return self.hits / total if total else 0.0
+
+    def forget(self, peer: 'typing.Hashable') -> None:
+
+        self._predictions.pop(peer, None)
+
+    def clear(self) -> None:
+
+        self._predictions.clear()
+
+    def try_from_bytes(
+        self,
+        data: 'specification.Buffer',
+        peer: 'typing.Hashable',
+    ) -> 'typing.Tuple[DecodeStatus, typing.Optional[Packet]]':
+
+        prediction = self._predictions.get(peer)
+
+        if prediction is not None and data[4:10] == prediction.template:
+
+            checksum, message_data_length = _changing.unpack_from(data)
+            end = header_size + message_data_length
+
+            if end <= len(data) and checksum == (
+                adler32(data[4:end], _zero_checksum) if prediction.checked else 0
+            ):
+                self.hits += 1
+
+                packet = Packet(
+                    _DATA,
+                    prediction.transfer_mode,
+                    prediction.checksum_mode,
+                    False,
+                    prediction.fragment_amount,
+                    prediction.fragment_number,
+                    prediction.message_id,
+                    message_data_length,
+                    data[header_size:end],
+                    checksum,
+                )
+
+                prediction.advance()
+
+                return _OK, packet
+
+        self.misses += 1
+
+        status, decoded = Packet.try_from_bytes(data)
+
+        if (
+            decoded is None
+            or not decoded.is_data
+            or decoded.is_duplicate
+            or not decoded.message_id
+            or not decoded.is_fragment_valid
+        ):
+            return status, decoded
+
+        predictions = self._predictions
+
+        if prediction is None and len(predictions) >= self._capacity:
+            del predictions[next(iter(predictions))]
+
+        predictions[peer] = _Prediction(data, decoded)
+
+        return status, decoded
@@ -14,29 +14,23 @@ class TransferMode(enum.IntEnum):
     @classmethod
     def from_bits(cls, nbit: bool, sbit: bool):
 
-        if nbit:
-            return cls.AckNone
-        elif sbit:
-            return cls.AckLastFragmentOnly
-        else:
-            return cls.AckEveryPacket
+        return _from_bits[nbit][sbit]
 
     @property
     def nbit(self) -> bool:
 
-        if self is self.AckNone:
-            return True
-        elif self is self.AckLastFragmentOnly:
-            return False
-        else:
-            return False
+        return _nbits[self]
 
     @property
     def sbit(self) -> bool:
 
-        if self is self.AckNone:
-            return False
-        elif self is self.AckLastFragmentOnly:
-            return True
-        else:
-            return False
+        return _sbits[self]
+
+
+_from_bits = (
+    (TransferMode.AckEveryPacket, TransferMode.AckLastFragmentOnly),
+    (TransferMode.AckNone, TransferMode.AckNone),
+)
+
+_nbits = (False, False, True)
+_sbits = (False, True, False)
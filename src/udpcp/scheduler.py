@@ -0,0 +1,187 @@
+__all__ = [
+    'Priority',
+    'Scheduler',
+]
+
+import enum
+import time
+import collections
+import typing
+
+from .metrics import Histogram
+
+Address = typing.Any
+
+
+class Priority(enum.IntEnum):
+
+    Control = 0
+    High = 1
+    Normal = 2
+    Bulk = 3
+    Telemetry = 4
+
+
+class _Queue:
+
+    __slots__ = [
+        'address',
+        'items',
+        'deficit',
+    ]
+
+    def __init__(self, address: Address) -> None:
+
+        self.address = address
+        self.items: typing.Deque[typing.Tuple[bytes, float]] = collections.deque()
+        self.deficit = 0
+
+
+class _Class:
+
+    __slots__ = [
+        'queues',
+        'active',
+        'capacity',
+    ]
+
+    def __init__(self, capacity: typing.Optional[int]) -> None:
+
+        self.queues: typing.Dict[Address, _Queue] = {}
+        self.active: typing.Deque[_Queue] = collections.deque()
+        self.capacity = capacity
+
+
+class Scheduler:
+
+    def __init__(
+        self,
+        quantum: int = 65535,
+        capacities: typing.Optional[typing.Mapping[Priority, int]] = None,
+        clock: typing.Callable[[], float] = time.monotonic,
+    ) -> None:
+
+        if quantum < 1:
+            raise ValueError(
+                f'Couldn\'t create scheduler: '
+                f'invalid quantum ({quantum}).'
+            )
+
+        capacities = capacities or {}
+
+        for priority, capacity in capacities.items():
+            if capacity < 1:
+                raise ValueError(
+                    f'Couldn\'t create scheduler: '
+                    f'invalid capacity for {priority.name} ({capacity}).'
+                )
+
+        self.quantum = quantum
+        self.clock = clock
+        self.delays: typing.Optional[typing.Sequence[Histogram]] = None
+
+        self.enqueued = [0] * len(Priority)
+        self.dequeued = [0] * len(Priority)
+        self.dropped = [0] * len(Priority)
+
+        self._classes = [_Class(capacities.get(priority)) for priority in Priority]
+        self._length = 0
+        self._bytes = 0
+
+    def __len__(self) -> int:
+
+        return self._length
+
+    @property
+    def queued_bytes(self) -> int:
+
+        return self._bytes
+
+    def queued(self, priority: Priority) -> int:
+
+        return self.enqueued[priority] - self.dequeued[priority] - self.dropped[priority]
+
+    def push(self, address: Address, packet: bytes, priority: Priority = Priority.Normal) -> bool:
+
+        traffic_class = self._classes[priority]
+        queue = traffic_class.queues.get(address)
+
+        if queue is None:
+
+            queue = traffic_class.queues[address] = _Queue(address)
+
+            if not traffic_class.active:
+                queue.deficit = self.quantum
+
+            traffic_class.active.append(queue)
+
+        queue.items.append((packet, self.clock()))
+
+        self.enqueued[priority] += 1
+        self._length += 1
+        self._bytes += len(packet)
+
+        if traffic_class.capacity is None or len(queue.items) <= traffic_class.capacity:
+            return True
+
+        dropped, _ = queue.items.popleft()
+
+        self.dropped[priority] += 1
+        self._length -= 1
+        self._bytes -= len(dropped)
+
+        return False
+
+    def pop(self) -> typing.Optional[typing.Tuple[Address, bytes]]:
+
+        if not self._length:
+            return None
+
+        for priority, traffic_class in enumerate(self._classes):
+
+            active = traffic_class.active
+
+            if not active:
+                continue
+
+            queue = active[0]
+
+            while queue.deficit < len(queue.items[0][0]):
+                active.rotate(-1)
+                queue = active[0]
+                queue.deficit += self.quantum
+
+            packet, enqueued = queue.items.popleft()
+            queue.deficit -= len(packet)
+
+            if not queue.items:
+
+                active.popleft()
+                del traffic_class.queues[queue.address]
+
+                if active:
+                    active[0].deficit += self.quantum
+
+            self.dequeued[priority] += 1
+            self._length -= 1
+            self._bytes -= len(packet)
+
+            if self.delays is not None:
+                self.delays[priority].observe(self.clock() - enqueued)
+
+            return queue.address, packet
+
+        return None
+
+    def clear(self) -> None:
+
+        for priority, traffic_class in enumerate(self._classes):
+
+            for queue in traffic_class.queues.values():
+                self.dropped[priority] += len(queue.items)
+
+            traffic_class.queues.clear()
+            traffic_class.active.clear()
+
+        self._length = 0
+        self._bytes = 0
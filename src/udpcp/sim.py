@@ -0,0 +1,342 @@
+__all__ = [
+    'VirtualEventLoop',
+    'Link',
+    'Network',
+    'Statistics',
+    'run',
+]
+
+import random
+import typing
+import asyncio
+import selectors
+
+from .endpoint import Endpoint
+
+Address = typing.Tuple[str, int]
+T = typing.TypeVar('T')
+
+
+class _VirtualSelector(selectors.SelectSelector):
+
+    def __init__(self) -> None:
+
+        super().__init__()
+
+        self.time = 0.0
+
+    def select(
+        self,
+        timeout: typing.Optional[float] = None,
+    ) -> typing.List[typing.Tuple[selectors.SelectorKey, int]]:
+
+        if timeout is None:
+            raise RuntimeError(
+                'Couldn\'t advance simulation: '
+                'no scheduled events left, event loop would block forever.'
+            )
+
+        self.time += timeout
+
+        return []
+
+
+class VirtualEventLoop(asyncio.SelectorEventLoop):
+
+    def __init__(self) -> None:
+
+        self._virtual_selector = _VirtualSelector()
+
+        super().__init__(self._virtual_selector)
+
+    def time(self) -> float:
+
+        return self._virtual_selector.time
+
+
+class Link:
+
+    __slots__ = [
+        'latency',
+        'jitter',
+        'loss',
+        'duplicate',
+        'reorder',
+        'bandwidth',
+        'queue',
+    ]
+
+    def __init__(
+        self,
+        latency: float = 0.001,
+        jitter: float = 0.0,
+        loss: float = 0.0,
+        duplicate: float = 0.0,
+        reorder: float = 0.0,
+        bandwidth: typing.Optional[float] = None,
+        queue: typing.Optional[int] = None,
+    ) -> None:
+
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.duplicate = duplicate
+        self.reorder = reorder
+        self.bandwidth = bandwidth
+        self.queue = queue
+
+
+class _Path:
+
+    __slots__ = [
+        'link',
+        'busy_until',
+    ]
+
+    def __init__(self, link: Link) -> None:
+
+        self.link = link
+        self.busy_until = 0.0
+
+
+class Statistics:
+
+    __slots__ = [
+        'sent',
+        'delivered',
+        'lost',
+        'overflowed',
+        'duplicated',
+        'reordered',
+        'unreachable',
+        'bytes',
+    ]
+
+    def __init__(self) -> None:
+
+        self.sent = 0
+        self.delivered = 0
+        self.lost = 0
+        self.overflowed = 0
+        self.duplicated = 0
+        self.reordered = 0
+        self.unreachable = 0
+        self.bytes = 0
+
+    def as_dict(self) -> typing.Dict[str, int]:
+
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class _Transport(asyncio.DatagramTransport):
+
+    def __init__(
+        self,
+        network: 'Network',
+        address: Address,
+        protocol: asyncio.DatagramProtocol,
+    ) -> None:
+
+        super().__init__()
+
+        self._network = network
+        self._address = address
+        self._protocol = protocol
+        self._closing = False
+
+    def sendto(self, data: typing.Any, addr: typing.Any = None) -> None:
+
+        if self._closing:
+            return
+
+        self._network._send(self._address, addr, bytes(data))
+
+    def get_extra_info(self, name: str, default: typing.Any = None) -> typing.Any:
+
+        if name == 'sockname':
+            return self._address
+
+        return default
+
+    def get_write_buffer_size(self) -> int:
+
+        return 0
+
+    def is_closing(self) -> bool:
+
+        return self._closing
+
+    def close(self) -> None:
+
+        if self._closing:
+            return
+
+        self._closing = True
+        self._network._close(self)
+        self._network.loop.call_soon(self._protocol.connection_lost, None)
+
+    def abort(self) -> None:
+
+        self.close()
+
+
+class Network:
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        seed: typing.Optional[int] = 0,
+        link: typing.Optional[Link] = None,
+    ) -> None:
+
+        self.loop = loop
+        self.random = random.Random(seed)
+        self.link = link if link is not None else Link()
+        self.statistics = Statistics()
+
+        self._transports: typing.Dict[Address, _Transport] = {}
+        self._paths: typing.Dict[typing.Tuple[Address, Address], _Path] = {}
+        self._links: typing.Dict[typing.Tuple[Address, Address], Link] = {}
+        self._port = 10000
+
+    def connect(
+        self,
+        source: Address,
+        destination: Address,
+        link: Link,
+        symmetric: bool = True,
+    ) -> None:
+
+        self._links[(source, destination)] = link
+        self._paths.pop((source, destination), None)
+
+        if symmetric:
+            self._links[(destination, source)] = link
+            self._paths.pop((destination, source), None)
+
+    async def create_datagram_endpoint(
+        self,
+        protocol_factory: typing.Callable[[], asyncio.DatagramProtocol],
+        local_addr: typing.Optional[Address] = None,
+    ) -> typing.Tuple[asyncio.DatagramTransport, asyncio.DatagramProtocol]:
+
+        host, port = local_addr if local_addr is not None else ('127.0.0.1', 0)
+
+        if not port:
+            self._port += 1
+            port = self._port
+
+        address = (host, port)
+
+        if address in self._transports:
+            raise OSError(f'Couldn\'t create endpoint: address already in use ({host}:{port}).')
+
+        protocol = protocol_factory()
+        transport = self._transports[address] = _Transport(self, address, protocol)
+
+        protocol.connection_made(transport)
+
+        return transport, protocol
+
+    async def open_endpoint(
+        self,
+        local_address: typing.Optional[Address] = None,
+        handler: typing.Optional[typing.Callable[[typing.Any, bytes], None]] = None,
+        **kwargs: typing.Any,
+    ) -> Endpoint:
+
+        _, endpoint = await self.create_datagram_endpoint(
+            lambda: Endpoint(handler, **kwargs),
+            local_addr=local_address,
+        )
+
+        return typing.cast(Endpoint, endpoint)
+
+    def _path(self, source: Address, destination: Address) -> _Path:
+
+        key = (source, destination)
+        path = self._paths.get(key)
+
+        if path is None:
+            path = self._paths[key] = _Path(self._links.get(key, self.link))
+
+        return path
+
+    def _send(self, source: Address, destination: Address, data: bytes) -> None:
+
+        statistics = self.statistics
+        statistics.sent += 1
+
+        path = self._path(source, destination)
+        link = path.link
+        chance = self.random.random
+        now = self.loop.time()
+
+        if link.loss and chance() < link.loss:
+            statistics.lost += 1
+            return
+
+        departure = now
+
+        if link.bandwidth is not None:
+
+            backlog = max(path.busy_until - now, 0.0) * link.bandwidth
+
+            if link.queue is not None and backlog + len(data) > link.queue:
+                statistics.overflowed += 1
+                return
+
+            departure = max(path.busy_until, now) + len(data) / link.bandwidth
+            path.busy_until = departure
+
+        copies = 1
+
+        if link.duplicate and chance() < link.duplicate:
+            statistics.duplicated += 1
+            copies = 2
+
+        for _ in range(copies):
+
+            arrival = departure + link.latency
+
+            if link.jitter:
+                arrival += chance() * link.jitter
+
+            if link.reorder and chance() < link.reorder:
+                statistics.reordered += 1
+                arrival += link.latency + link.jitter
+
+            self.loop.call_at(arrival, self._deliver, source, destination, data)
+
+    def _deliver(self, source: Address, destination: Address, data: bytes) -> None:
+
+        transport = self._transports.get(destination)
+
+        if transport is None:
+            self.statistics.unreachable += 1
+            return
+
+        self.statistics.delivered += 1
+        self.statistics.bytes += len(data)
+
+        transport._protocol.datagram_received(data, source)
+
+    def _close(self, transport: _Transport) -> None:
+
+        self._transports.pop(transport._address, None)
+
+
+def run(
+    main: typing.Callable[[Network], typing.Awaitable[T]],
+    seed: typing.Optional[int] = 0,
+    link: typing.Optional[Link] = None,
+) -> T:
+
+    loop = VirtualEventLoop()
+
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(main(Network(loop, seed, link)))
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
@@ -0,0 +1,516 @@
+__all__ = [
+    'Streams',
+    'StreamReader',
+    'StreamWriter',
+    'open_streams',
+    'DEFAULT_WINDOW',
+]
+
+import asyncio
+import collections
+import functools
+import struct
+import typing
+
+from .endpoint import Endpoint, Address, open_endpoint
+from .protocol import TransferMode
+
+Source = typing.Union[bytes, bytearray, memoryview, typing.BinaryIO, typing.AsyncIterable[bytes]]
+
+DEFAULT_WINDOW = 8
+
+# finished streams remembered to drop their late frames
+_FINISHED_HISTORY = 1024
+# credit sends before the reader gives up on the stream
+_CREDIT_ATTEMPTS = 3
+
+# kind, stream_id, sequence
+_FRAME = struct.Struct('>BII')
+
+_DATA = 0
+_END = 1
+_CREDIT = 2
+
+
+def _wake(waiter: typing.Optional['asyncio.Future[None]']) -> None:
+
+    if waiter is not None and not waiter.done():
+        waiter.set_result(None)
+
+
+class StreamWriter:
+
+    def __init__(self, streams: 'Streams', address: Address, stream_id: int) -> None:
+
+        self.address = address
+        self.stream_id = stream_id
+
+        self._streams = streams
+        self._buffer = bytearray()
+        self._sequence = 0
+        self._credit = 0
+        self._pending: typing.Set['asyncio.Future[None]'] = set()
+        self._waiter: typing.Optional[asyncio.Future[None]] = None
+        self._exception: typing.Optional[BaseException] = None
+        self._closed = False
+
+    @property
+    def in_flight(self) -> int:
+
+        return self._sequence - self._credit
+
+    async def write(self, data: typing.Union[bytes, bytearray, memoryview]) -> None:
+
+        if self._closed:
+            raise ConnectionError('Couldn\'t write to stream: stream was closed.')
+
+        chunk_size = self._streams.chunk_size
+        buffer = self._buffer
+        view = memoryview(data)
+        offset = 0
+
+        if buffer:
+
+            offset = chunk_size - len(buffer)
+            buffer += view[:offset]
+
+            if len(buffer) < chunk_size:
+                return
+
+            await self._send(_DATA, bytes(buffer))
+            buffer.clear()
+
+        while len(view) - offset >= chunk_size:
+            await self._send(_DATA, view[offset:offset + chunk_size])
+            offset += chunk_size
+
+        buffer += view[offset:]
+
+    async def write_from(self, source: Source) -> None:
+
+        chunk_size = self._streams.chunk_size
+
+        if isinstance(source, (bytes, bytearray, memoryview)):
+
+            view = memoryview(source)
+
+            for offset in range(0, len(view), chunk_size):
+                await self.write(view[offset:offset + chunk_size])
+
+        elif hasattr(source, 'read'):
+
+            read = typing.cast(typing.BinaryIO, source).read
+
+            while True:
+
+                data = read(chunk_size)
+
+                if not data:
+                    break
+
+                await self.write(data)
+
+        else:
+
+            async for data in typing.cast(typing.AsyncIterable[bytes], source):
+                await self.write(data)
+
+    async def close(self) -> None:
+
+        if self._closed:
+            return
+
+        if self._buffer:
+            await self._send(_DATA, bytes(self._buffer))
+            self._buffer.clear()
+
+        await self._send(_END, b'')
+
+        self._closed = True
+
+        try:
+            while self._pending:
+                await self._wait()
+        finally:
+            self._streams._writers.pop((self.address, self.stream_id), None)
+
+    async def _send(self, kind: int, data: typing.Union[bytes, memoryview]) -> None:
+
+        while self._sequence >= self._credit + self._streams.window:
+            await self._wait()
+
+        self._raise()
+
+        frame = _FRAME.pack(kind, self.stream_id, self._sequence) + data
+        future = self._streams.endpoint.send(self.address, frame)
+
+        self._sequence += 1
+        self._pending.add(future)
+
+        future.add_done_callback(self._sent)
+
+    def _sent(self, future: 'asyncio.Future[None]') -> None:
+
+        self._pending.discard(future)
+
+        if not future.cancelled() and future.exception() is not None:
+            self._fail(typing.cast(BaseException, future.exception()))
+
+        _wake(self._waiter)
+
+    def _credited(self, credit: int) -> None:
+
+        if credit > self._credit:
+            self._credit = credit
+            _wake(self._waiter)
+
+    def _fail(self, exception: BaseException) -> None:
+
+        if self._exception is None:
+            self._exception = exception
+
+        _wake(self._waiter)
+
+    def _raise(self) -> None:
+
+        if self._exception is not None:
+            raise self._exception
+
+    async def _wait(self) -> None:
+
+        self._raise()
+
+        self._waiter = asyncio.get_event_loop().create_future()
+        await self._waiter
+        self._waiter = None
+
+        self._raise()
+
+
+class StreamReader:
+
+    def __init__(self, streams: 'Streams', address: Address, stream_id: int) -> None:
+
+        self.address = address
+        self.stream_id = stream_id
+
+        self._streams = streams
+        self._chunks: typing.Deque[bytes] = collections.deque()
+        self._offset = 0
+        self._reorder: typing.Dict[int, typing.Tuple[int, bytes]] = {}
+        self._next = 0
+        self._eof = False
+        self._consumed = 0
+        self._credited = 0
+        self._waiter: typing.Optional[asyncio.Future[None]] = None
+        self._exception: typing.Optional[BaseException] = None
+
+    def at_eof(self) -> bool:
+
+        return self._eof and not self._chunks
+
+    async def read(self, n: int = -1) -> bytes:
+
+        if n < 0:
+
+            parts = []
+
+            while not self.at_eof():
+                parts.append(await self._chunk())
+
+            return b''.join(parts)
+
+        if not n or self.at_eof():
+            return b''
+
+        while not self._chunks:
+
+            await self._wait()
+
+            if self.at_eof():
+                return b''
+
+        chunk = self._chunks[0]
+        data = chunk[self._offset:self._offset + n]
+        self._offset += len(data)
+
+        if self._offset == len(chunk):
+            self._consume()
+
+        return data
+
+    def __aiter__(self) -> 'StreamReader':
+
+        return self
+
+    async def __anext__(self) -> bytes:
+
+        if self.at_eof():
+            raise StopAsyncIteration
+
+        data = await self._chunk()
+
+        if not data and self.at_eof():
+            raise StopAsyncIteration
+
+        return data
+
+    async def _chunk(self) -> bytes:
+
+        while not self._chunks:
+
+            if self.at_eof():
+                return b''
+
+            await self._wait()
+
+        chunk = self._chunks[0]
+        data = chunk[self._offset:] if self._offset else chunk
+
+        self._consume()
+
+        return data
+
+    def _consume(self) -> None:
+
+        self._chunks.popleft()
+        self._offset = 0
+        self._consumed += 1
+
+        if self._eof:
+            return
+
+        threshold = max(1, self._streams.window // 2)
+
+        if self._consumed - self._credited >= threshold or not self._chunks:
+            self._credited = self._consumed
+            self._streams._credit(self.address, self.stream_id, self._consumed)
+
+    def _received(self, kind: int, sequence: int, data: bytes) -> None:
+
+        if not self._next <= sequence < self._next + self._streams.window:
+            return
+
+        if sequence in self._reorder:
+            return
+
+        self._reorder[sequence] = (kind, data)
+
+        while self._next in self._reorder:
+
+            kind, data = self._reorder.pop(self._next)
+            self._next += 1
+
+            if kind == _END:
+                self._eof = True
+                self._streams._finish(self.address, self.stream_id)
+                break
+
+            self._chunks.append(data)
+
+        _wake(self._waiter)
+
+    def _fail(self, exception: BaseException) -> None:
+
+        if self._exception is None:
+            self._exception = exception
+
+        _wake(self._waiter)
+
+    async def _wait(self) -> None:
+
+        if self._exception is not None:
+            raise self._exception
+
+        self._waiter = asyncio.get_event_loop().create_future()
+        await self._waiter
+        self._waiter = None
+
+        if self._exception is not None and not self._chunks:
+            raise self._exception
+
+
+class Streams:
+
+    def __init__(
+        self,
+        endpoint: Endpoint,
+        window: int = DEFAULT_WINDOW,
+        chunk_size: typing.Optional[int] = None,
+    ) -> None:
+
+        max_chunk_size = endpoint.max_message_size - _FRAME.size
+
+        if chunk_size is None:
+            chunk_size = max_chunk_size
+
+        if not 0 < chunk_size <= max_chunk_size:
+            raise ValueError(
+                f'Couldn\'t create streams: '
+                f'invalid chunk size ({chunk_size}).'
+            )
+
+        if window < 1:
+            raise ValueError(
+                f'Couldn\'t create streams: '
+                f'invalid window ({window}).'
+            )
+
+        self.endpoint = endpoint
+        self.window = window
+        self.chunk_size = chunk_size
+
+        self._stream_ids: typing.Dict[Address, int] = {}
+        self._writers: typing.Dict[typing.Tuple[Address, int], StreamWriter] = {}
+        self._readers: typing.Dict[typing.Tuple[Address, int], StreamReader] = {}
+        self._finished: 'collections.OrderedDict[typing.Tuple[Address, int], None]' = \
+            collections.OrderedDict()
+        self._accepted: typing.Deque[StreamReader] = collections.deque()
+        self._waiter: typing.Optional[asyncio.Future[None]] = None
+        self._closed = False
+
+        endpoint.handler = self._message
+
+        endpoint.add_close_callback(self._connection_lost)
+
+    def open(self, address: Address) -> StreamWriter:
+
+        if self._closed:
+            raise ConnectionError('Couldn\'t open stream: endpoint was closed.')
+
+        stream_id = self._stream_ids.get(address, 0) + 1
+        self._stream_ids[address] = stream_id
+
+        writer = self._writers[(address, stream_id)] = StreamWriter(self, address, stream_id)
+
+        return writer
+
+    async def accept(self) -> StreamReader:
+
+        while not self._accepted:
+
+            if self._closed:
+                raise ConnectionError('Couldn\'t accept stream: endpoint was closed.')
+
+            self._waiter = asyncio.get_event_loop().create_future()
+            await self._waiter
+            self._waiter = None
+
+        return self._accepted.popleft()
+
+    async def send(self, address: Address, source: Source) -> None:
+
+        writer = self.open(address)
+
+        await writer.write_from(source)
+        await writer.close()
+
+    def _message(self, address: Address, message: bytes) -> None:
+
+        if len(message) < _FRAME.size:
+            return
+
+        kind, stream_id, sequence = _FRAME.unpack_from(message)
+        key = (address, stream_id)
+
+        if kind == _CREDIT:
+
+            writer = self._writers.get(key)
+
+            if writer is not None:
+                writer._credited(sequence)
+
+            return
+
+        if key in self._finished:
+            return
+
+        reader = self._readers.get(key)
+
+        if reader is None:
+
+            reader = self._readers[key] = StreamReader(self, address, stream_id)
+            self._accepted.append(reader)
+
+            _wake(self._waiter)
+
+        reader._received(kind, sequence, message[_FRAME.size:])
+
+    def _finish(self, address: Address, stream_id: int) -> None:
+
+        key = (address, stream_id)
+
+        self._readers.pop(key, None)
+
+        finished = self._finished
+        finished[key] = None
+
+        if len(finished) > _FINISHED_HISTORY:
+            finished.popitem(last=False)
+
+    def _credit(
+        self,
+        address: Address,
+        stream_id: int,
+        consumed: int,
+        attempts: int = _CREDIT_ATTEMPTS,
+    ) -> None:
+
+        if self._closed:
+            return
+
+        frame = _FRAME.pack(_CREDIT, stream_id, consumed)
+        future = self.endpoint.send(address, frame, TransferMode.AckEveryPacket)
+        future.add_done_callback(
+            functools.partial(self._credit_sent, address, stream_id, consumed, attempts)
+        )
+
+    def _credit_sent(
+        self,
+        address: Address,
+        stream_id: int,
+        consumed: int,
+        attempts: int,
+        future: 'asyncio.Future[None]',
+    ) -> None:
+
+        if future.cancelled() or future.exception() is None:
+            return
+
+        reader = self._readers.get((address, stream_id))
+
+        # a later credit supersedes this one
+        if reader is None or reader._credited != consumed:
+            return
+
+        if attempts > 1:
+            self._credit(address, stream_id, consumed, attempts - 1)
+            return
+
+        # without credit the writer can never make progress again
+        self._finish(address, stream_id)
+        reader._fail(typing.cast(BaseException, future.exception()))
+
+    def _connection_lost(self) -> None:
+
+        self._closed = True
+
+        error = ConnectionError('Couldn\'t transfer stream: endpoint was closed.')
+
+        for writer in self._writers.values():
+            writer._fail(error)
+
+        for reader in self._readers.values():
+            reader._fail(error)
+
+        _wake(self._waiter)
+
+
+async def open_streams(
+    local_address: Address = ('127.0.0.1', 0),
+    window: int = DEFAULT_WINDOW,
+    chunk_size: typing.Optional[int] = None,
+    **kwargs: typing.Any,
+) -> Streams:
+
+    return Streams(await open_endpoint(local_address, **kwargs), window, chunk_size)
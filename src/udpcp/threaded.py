@@ -0,0 +1,434 @@
+__all__ = [
+    'ThreadedEndpoint',
+]
+
+import time
+import heapq
+import queue
+import socket
+import typing
+import selectors
+import threading
+import concurrent.futures
+
+from .core import (
+    Connection,
+    MessageReceived,
+    MessageAcknowledged,
+    MessageFailed,
+    Output,
+    DEFAULT_FRAGMENT_SIZE,
+)
+from .endpoint import MIN_BUFFER_SIZE, MAX_BUFFER_SIZE
+from .overload import set_buffer_size
+from .protocol import TransferMode
+from .protocol._utils.specification import header_size
+
+Address = typing.Any
+Handler = typing.Callable[[Address, bytes], None]
+
+_MAX_FRAGMENT_AMOUNT = 255
+
+
+class ThreadedEndpoint:
+
+    def __init__(
+        self,
+        local_address: Address = ('127.0.0.1', 0),
+        handler: typing.Optional[Handler] = None,
+        fragment_size: int = DEFAULT_FRAGMENT_SIZE,
+        batch: int = 64,
+        receive_buffer: typing.Optional[int] = None,
+        send_buffer: typing.Optional[int] = None,
+        reassembly_timeout: float = 5.0,
+        **options: typing.Any,
+    ) -> None:
+
+        size = 4 * _MAX_FRAGMENT_AMOUNT * (fragment_size + header_size)
+        size = min(max(size, MIN_BUFFER_SIZE), MAX_BUFFER_SIZE)
+
+        self._handler = handler
+        self._fragment_size = fragment_size
+        self._batch = batch
+        self._reassembly_timeout = reassembly_timeout
+        self._options = dict(
+            options, fragment_size=fragment_size, reassembly_timeout=reassembly_timeout,
+        )
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        try:
+            self._socket.bind(local_address)
+            self._socket.setblocking(False)
+
+            if receive_buffer != 0:
+                set_buffer_size(self._socket, socket.SO_RCVBUF, receive_buffer or size)
+
+            if send_buffer != 0:
+                set_buffer_size(self._socket, socket.SO_SNDBUF, send_buffer or size)
+        except OSError:
+            self._socket.close()
+            raise
+
+        self._wakeup, self._waker = socket.socketpair()
+        self._wakeup.setblocking(False)
+        self._waker.setblocking(False)
+
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._socket, selectors.EVENT_READ)
+        self._selector.register(self._wakeup, selectors.EVENT_READ)
+
+        self._lock = threading.RLock()
+        self._connections: typing.Dict[Address, Connection] = {}
+        self._deadlines: typing.List[typing.Tuple[float, Address]] = []
+        self._armed: typing.Dict[Address, float] = {}
+        self._futures: typing.Dict[
+            typing.Tuple[Address, int], 'concurrent.futures.Future[None]'
+        ] = {}
+        self._queue: 'queue.Queue[typing.Optional[typing.Tuple[Address, bytes]]]' = queue.Queue()
+        self._closing = False
+        self._failure: typing.Optional[BaseException] = None
+        self._errors = 0
+
+        self._thread = threading.Thread(target=self._run, name='udpcp', daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> 'ThreadedEndpoint':
+
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+
+        self.close()
+
+    @property
+    def local_address(self) -> Address:
+
+        return self._socket.getsockname()
+
+    @property
+    def fragment_size(self) -> int:
+
+        return self._fragment_size
+
+    @property
+    def outstanding(self) -> int:
+
+        return len(self._futures)
+
+    @property
+    def errors(self) -> int:
+
+        return self._errors
+
+    @property
+    def is_running(self) -> bool:
+
+        return self._failure is None and self._thread.is_alive()
+
+    def connection(self, address: Address) -> Connection:
+
+        connection = self._connections.get(address)
+
+        if connection is None:
+            connection = self._connections[address] = Connection(**self._options)
+
+        return connection
+
+    def sync(self, address: Address) -> 'concurrent.futures.Future[None]':
+
+        with self._lock:
+
+            self._check()
+
+            future = self._futures.get((address, 0))
+
+            if future is not None:
+                return future
+
+            connection = self.connection(address)
+            datagrams = connection.sync(time.monotonic())
+
+            return self._submit(address, connection, 0, datagrams, True)
+
+    def send(
+        self,
+        address: Address,
+        data: typing.Union[bytes, bytearray, memoryview],
+        transfer_mode: TransferMode = TransferMode.AckEveryPacket,
+    ) -> 'concurrent.futures.Future[None]':
+
+        with self._lock:
+
+            self._check()
+
+            connection = self.connection(address)
+            message_id, datagrams = connection.send(data, time.monotonic(), transfer_mode)
+
+            return self._submit(
+                address, connection, message_id, datagrams,
+                transfer_mode is not TransferMode.AckNone,
+            )
+
+    def receive(self, timeout: typing.Optional[float] = None) -> typing.Tuple[Address, bytes]:
+
+        if self._closing and self._queue.empty():
+            raise ConnectionError('Couldn\'t receive message: endpoint was closed.')
+
+        try:
+            item = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError('Couldn\'t receive message: timed out.') from None
+
+        if item is None:
+            self._queue.put(None)
+            raise ConnectionError('Couldn\'t receive message: endpoint was closed.')
+
+        return item
+
+    def close(self) -> None:
+
+        with self._lock:
+
+            if self._closing:
+                return
+
+            self._closing = True
+
+        self._wake()
+        self._thread.join()
+
+        error = ConnectionError('Couldn\'t send message: endpoint was closed.')
+
+        self._fail(error)
+
+        self._selector.close()
+        self._socket.close()
+        self._wakeup.close()
+        self._waker.close()
+
+    def _check(self) -> None:
+
+        if self._failure is not None:
+            raise ConnectionError(
+                f'Couldn\'t send message: endpoint loop failed ({self._failure!r}).'
+            ) from self._failure
+
+        if self._closing:
+            raise ConnectionError('Couldn\'t send message: endpoint was closed.')
+
+    def _fail(self, error: BaseException) -> None:
+
+        with self._lock:
+            futures = list(self._futures.values())
+            self._futures.clear()
+
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+        self._queue.put(None)
+
+    def _submit(
+        self,
+        address: Address,
+        connection: Connection,
+        message_id: int,
+        datagrams: typing.List[bytes],
+        pending: bool,
+    ) -> 'concurrent.futures.Future[None]':
+
+        key = (address, message_id)
+        now = time.monotonic()
+
+        # the connection failed the message which used this id before; settle it
+        # now so that failure can't be taken for one of the new message
+        if key in self._futures:
+            self._handle(address, connection.timer_expired(now))
+
+        future: 'concurrent.futures.Future[None]' = concurrent.futures.Future()
+
+        if pending:
+            self._futures[key] = future
+        else:
+            future.set_result(None)
+
+        self._transmit(address, datagrams)
+        self._schedule(address, connection, now)
+        self._wake()
+
+        return future
+
+    def _wake(self) -> None:
+
+        try:
+            self._waker.send(b'\0')
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _transmit(self, address: Address, datagrams: typing.List[bytes]) -> None:
+
+        sendto = self._socket.sendto
+
+        for datagram in datagrams:
+            try:
+                sendto(datagram, address)
+            except (BlockingIOError, InterruptedError):
+                pass
+
+    def _schedule(self, address: Address, connection: Connection, now: float) -> None:
+
+        # a connection with nothing left to time out lingers for a reassembly
+        # timeout, then it's evicted unless it was used again meanwhile
+        deadline = connection.get_timer()
+
+        if deadline is None:
+            deadline = now + self._reassembly_timeout
+
+        armed = self._armed.get(address)
+
+        if armed is not None and armed <= deadline:
+            return
+
+        self._armed[address] = deadline
+        heapq.heappush(self._deadlines, (deadline, address))
+
+    def _timeout(self, now: float) -> typing.Optional[float]:
+
+        deadlines = self._deadlines
+
+        while deadlines and self._armed.get(deadlines[0][1]) != deadlines[0][0]:
+            heapq.heappop(deadlines)
+
+        return max(deadlines[0][0] - now, 0.0) if deadlines else None
+
+    def _expire(self, now: float) -> None:
+
+        deadlines = self._deadlines
+        armed = self._armed
+
+        while deadlines and deadlines[0][0] <= now:
+
+            deadline, address = heapq.heappop(deadlines)
+
+            if armed.get(address) != deadline:
+                continue
+
+            del armed[address]
+
+            connection = self._connections[address]
+
+            self._handle(address, connection.timer_expired(now))
+
+            if connection.idle(now):
+                del self._connections[address]
+            else:
+                self._schedule(address, connection, now)
+
+    def _run(self) -> None:
+
+        try:
+            self._loop()
+        except Exception as error:
+            self._failure = error
+            self._fail(ConnectionError(
+                f'Couldn\'t send message: endpoint loop failed ({error!r}).'
+            ))
+
+    def _loop(self) -> None:
+
+        select = self._selector.select
+        size = self._fragment_size + header_size
+
+        while True:
+
+            with self._lock:
+
+                if self._closing:
+                    return
+
+                timeout = self._timeout(time.monotonic())
+
+            ready = select(timeout)
+
+            with self._lock:
+
+                if self._closing:
+                    return
+
+                for key, _ in ready:
+                    if key.fileobj is self._wakeup:
+                        self._drain_wakeups()
+                    else:
+                        self._read(size)
+
+                self._expire(time.monotonic())
+
+    def _drain_wakeups(self) -> None:
+
+        try:
+            while self._wakeup.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _read(self, size: int) -> None:
+
+        recvfrom = self._socket.recvfrom
+
+        for _ in range(self._batch):
+
+            try:
+                data, address = recvfrom(size)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                continue
+
+            connection = self.connection(address)
+            now = time.monotonic()
+
+            try:
+                output = connection.receive_datagram(data, now)
+            except Exception:
+                self._errors += 1
+                continue
+
+            self._handle(address, output)
+            self._schedule(address, connection, now)
+
+    def _handle(self, address: Address, output: Output) -> None:
+
+        datagrams, events = output
+
+        if datagrams:
+            self._transmit(address, datagrams)
+
+        for event in events:
+
+            if isinstance(event, MessageReceived):
+
+                # connections without a buffer pool always deliver bytes
+                data = typing.cast(bytes, event.data)
+
+                if self._handler is not None:
+                    try:
+                        self._handler(address, data)
+                    except Exception:
+                        self._errors += 1
+                else:
+                    self._queue.put((address, data))
+
+                continue
+
+            if isinstance(event, (MessageAcknowledged, MessageFailed)):
+
+                future = self._futures.pop((address, event.message_id), None)
+
+                if future is None or future.done():
+                    continue
+
+                if isinstance(event, MessageFailed):
+                    future.set_exception(event.error)
+                else:
+                    future.set_result(None)
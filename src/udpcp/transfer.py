@@ -0,0 +1,497 @@
+__all__ = [
+    'send_file',
+    'FileReceiver',
+    'ReceivedFile',
+    'DEFAULT_CHUNK_SIZE',
+    'DEFAULT_WINDOW',
+    'DEFAULT_MAX_SIZE',
+    'DEFAULT_REPLY_TIMEOUT',
+    'DEFAULT_IDLE_TIMEOUT',
+]
+
+import os
+import mmap
+import struct
+import asyncio
+import functools
+import itertools
+import collections
+import typing
+
+from .endpoint import Endpoint, Address
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+DEFAULT_WINDOW = 8
+DEFAULT_MAX_SIZE = 1 << 32
+DEFAULT_REPLY_TIMEOUT = 10.0
+DEFAULT_IDLE_TIMEOUT = 30.0
+
+# bounds the per-transfer bookkeeping of chunks received so far
+_MAX_CHUNKS = 1 << 20
+
+# kind, transfer_id, size, chunk_size (followed by the file name)
+_OFFER = struct.Struct('>BIQI')
+# kind, transfer_id, index (followed by the chunk data)
+_CHUNK = struct.Struct('>BII')
+# kind, transfer_id
+_REPLY = struct.Struct('>BI')
+
+_KIND_OFFER = 0
+_KIND_CHUNK = 1
+_KIND_ACCEPT = 2
+_KIND_REJECT = 3
+
+_transfer_ids = itertools.count(1)
+
+
+def _discard(mapping: mmap.mmap, offset: int, length: int) -> None:
+
+    if not hasattr(mapping, 'madvise'):
+        return
+
+    start = offset - offset % mmap.PAGESIZE
+    mapping.madvise(mmap.MADV_DONTNEED, start, offset + length - start)
+
+
+class _Replies:
+
+    # Takes over the endpoint handler while transfers wait for the receiver's
+    # verdict on their offer; anything else goes on to the previous handler.
+    def __init__(self, endpoint: Endpoint) -> None:
+
+        self.endpoint = endpoint
+        self.handler = endpoint.handler
+        self.waiters: typing.Dict[int, asyncio.Future[bool]] = {}
+
+        endpoint.handler = self
+
+    @classmethod
+    def attach(cls, endpoint: Endpoint) -> '_Replies':
+
+        handler = endpoint.handler
+
+        return handler if isinstance(handler, _Replies) else cls(endpoint)
+
+    def expect(self, transfer_id: int) -> 'asyncio.Future[bool]':
+
+        waiter = self.waiters[transfer_id] = asyncio.get_event_loop().create_future()
+
+        return waiter
+
+    def forget(self, transfer_id: int) -> None:
+
+        self.waiters.pop(transfer_id, None)
+
+        if not self.waiters and self.endpoint.handler is self:
+            self.endpoint.handler = self.handler
+
+    def __call__(self, address: Address, message: bytes) -> None:
+
+        if len(message) == _REPLY.size and message[0] in (_KIND_ACCEPT, _KIND_REJECT):
+
+            kind, transfer_id = _REPLY.unpack(message)
+            waiter = self.waiters.get(transfer_id)
+
+            if waiter is not None:
+
+                if not waiter.done():
+                    waiter.set_result(kind == _KIND_ACCEPT)
+
+                return
+
+        if self.handler is not None:
+            self.handler(address, message)
+        else:
+            self.endpoint._enqueue(address, message)
+
+
+async def send_file(
+    endpoint: Endpoint,
+    address: Address,
+    path: str,
+    window: int = DEFAULT_WINDOW,
+    chunk_size: typing.Optional[int] = None,
+    reply_timeout: float = DEFAULT_REPLY_TIMEOUT,
+) -> int:
+
+    max_chunk_size = endpoint.max_message_size - _CHUNK.size
+
+    if chunk_size is None:
+        chunk_size = min(DEFAULT_CHUNK_SIZE, max_chunk_size)
+
+    if not 0 < chunk_size <= max_chunk_size:
+        raise ValueError(
+            f'Couldn\'t send file: '
+            f'invalid chunk size ({chunk_size}).'
+        )
+
+    transfer_id = next(_transfer_ids) & 0xFFFFFFFF
+
+    with open(path, 'rb') as handle:
+
+        size = os.fstat(handle.fileno()).st_size
+        name = os.path.basename(path).encode()
+
+        offer = _OFFER.pack(_KIND_OFFER, transfer_id, size, chunk_size)
+        replies = _Replies.attach(endpoint)
+        verdict = replies.expect(transfer_id)
+
+        try:
+            await endpoint.send(address, offer + name)
+            accepted = await asyncio.wait_for(verdict, reply_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f'Couldn\'t send file: '
+                f'no reply to offer after {reply_timeout} seconds.'
+            ) from None
+        finally:
+            replies.forget(transfer_id)
+
+        if not accepted:
+            raise ConnectionRefusedError('Couldn\'t send file: offer was rejected.')
+
+        if not size:
+            return 0
+
+        with mmap.mmap(handle.fileno(), size, access=mmap.ACCESS_READ) as mapping:
+
+            view = memoryview(mapping)
+            slots = asyncio.Semaphore(window)
+            pending: typing.Set[asyncio.Future[None]] = set()
+            errors: typing.List[BaseException] = []
+
+            def sent(future: 'asyncio.Future[None]', offset: int) -> None:
+
+                pending.discard(future)
+                slots.release()
+
+                if future.cancelled():
+                    return
+
+                if future.exception() is not None:
+                    errors.append(typing.cast(BaseException, future.exception()))
+                    return
+
+                _discard(mapping, offset, chunk_size)
+
+            try:
+                for index, offset in enumerate(range(0, size, chunk_size)):
+
+                    await slots.acquire()
+
+                    if errors:
+                        break
+
+                    chunk = view[offset:offset + chunk_size]
+                    future = endpoint.send(
+                        address, _CHUNK.pack(_KIND_CHUNK, transfer_id, index) + chunk,
+                    )
+                    chunk.release()
+
+                    pending.add(future)
+                    future.add_done_callback(functools.partial(sent, offset=offset))
+
+                while pending:
+                    await asyncio.wait(list(pending))
+            finally:
+                for future in pending:
+                    future.cancel()
+
+                view.release()
+
+            if errors:
+                raise errors[0]
+
+    return size
+
+
+class ReceivedFile:
+
+    __slots__ = [
+        'address',
+        'name',
+        'path',
+        'size',
+    ]
+
+    def __init__(self, address: Address, name: str, path: str, size: int) -> None:
+
+        self.address = address
+        self.name = name
+        self.path = path
+        self.size = size
+
+    def __repr__(self) -> str:
+
+        return f'{self.__class__.__name__}({self.name!r}, path={self.path!r}, size={self.size})'
+
+
+class _Incoming:
+
+    __slots__ = [
+        'file',
+        'handle',
+        'mapping',
+        'chunk_size',
+        'received',
+        'remaining',
+        'temporary',
+        'deadline',
+    ]
+
+    def __init__(self, file: ReceivedFile, chunk_size: int, deadline: float) -> None:
+
+        self.file = file
+        self.chunk_size = chunk_size
+        self.deadline = deadline
+        self.temporary = f'{file.path}.part'
+        self.handle = open(self.temporary, 'w+b')
+        self.mapping: typing.Optional[mmap.mmap] = None
+
+        count = -(-file.size // chunk_size)
+
+        self.received = bytearray(count)
+        self.remaining = count
+
+        if file.size:
+            try:
+                self.handle.truncate(file.size)
+                self.mapping = mmap.mmap(self.handle.fileno(), file.size)
+            except BaseException:
+                self.abort()
+                raise
+
+    def write(self, index: int, data: memoryview) -> None:
+
+        offset = index * self.chunk_size
+        expected = min(self.chunk_size, self.file.size - offset)
+
+        if index >= len(self.received) or self.received[index] or len(data) != expected:
+            return
+
+        assert self.mapping is not None
+
+        self.mapping[offset:offset + expected] = data
+        self.received[index] = 1
+        self.remaining -= 1
+
+        _discard(self.mapping, offset, expected)
+
+    def close(self) -> None:
+
+        if self.mapping is not None:
+            self.mapping.close()
+
+        self.handle.close()
+
+    def finish(self) -> ReceivedFile:
+
+        if self.mapping is not None:
+            self.mapping.flush()
+
+        self.close()
+        os.replace(self.temporary, self.file.path)
+
+        return self.file
+
+    def abort(self) -> None:
+
+        self.close()
+
+        try:
+            os.unlink(self.temporary)
+        except FileNotFoundError:
+            pass
+
+
+class FileReceiver:
+
+    def __init__(
+        self,
+        endpoint: Endpoint,
+        directory: str = '.',
+        max_size: int = DEFAULT_MAX_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ) -> None:
+
+        if idle_timeout <= 0:
+            raise ValueError(
+                f'Couldn\'t create file receiver: '
+                f'invalid idle timeout ({idle_timeout}).'
+            )
+
+        self.endpoint = endpoint
+        self.directory = directory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.rejected = 0
+        self.expired = 0
+
+        self._incoming: typing.Dict[typing.Tuple[Address, int], _Incoming] = {}
+        self._completed: typing.Deque[ReceivedFile] = collections.deque()
+        self._waiter: typing.Optional[asyncio.Future[None]] = None
+        self._sweeper: typing.Optional[asyncio.TimerHandle] = None
+        self._closed = False
+
+        endpoint.handler = self._message
+        endpoint.add_close_callback(self._connection_lost)
+
+    @property
+    def receiving(self) -> int:
+
+        return len(self._incoming)
+
+    async def receive(self) -> ReceivedFile:
+
+        while not self._completed:
+
+            if self._closed:
+                raise ConnectionError('Couldn\'t receive file: endpoint was closed.')
+
+            self._waiter = asyncio.get_event_loop().create_future()
+            await self._waiter
+            self._waiter = None
+
+        return self._completed.popleft()
+
+    def _message(self, address: Address, message: bytes) -> None:
+
+        if not message:
+            return
+
+        if message[0] == _KIND_CHUNK and len(message) >= _CHUNK.size:
+
+            _, transfer_id, index = _CHUNK.unpack_from(message)
+            incoming = self._incoming.get((address, transfer_id))
+
+            if incoming is None:
+                return
+
+            incoming.deadline = asyncio.get_event_loop().time() + self.idle_timeout
+
+            with memoryview(message) as view:
+                incoming.write(index, view[_CHUNK.size:])
+
+            if not incoming.remaining:
+                del self._incoming[(address, transfer_id)]
+                self._finish(incoming)
+
+        elif message[0] == _KIND_OFFER and len(message) >= _OFFER.size:
+
+            _, transfer_id, size, chunk_size = _OFFER.unpack_from(message)
+            key = (address, transfer_id)
+
+            if key in self._incoming:
+                self._incoming.pop(key).abort()
+
+            max_chunk_size = self.endpoint.max_message_size - _CHUNK.size
+
+            if not 0 < chunk_size <= max_chunk_size \
+                    or size > self.max_size or -(-size // chunk_size) > _MAX_CHUNKS:
+                self._reject(address, transfer_id)
+                return
+
+            name = os.path.basename(message[_OFFER.size:].decode(errors='replace'))
+
+            if name in ('', '.', '..'):
+                name = 'unnamed'
+
+            file = ReceivedFile(address, name, self._target(name), size)
+
+            loop = asyncio.get_event_loop()
+
+            try:
+                incoming = _Incoming(file, chunk_size, loop.time() + self.idle_timeout)
+            except (OSError, ValueError, MemoryError):
+                self._reject(address, transfer_id)
+                return
+
+            # the verdict is sent before finishing so an empty file is never refused
+            self._reply(address, _KIND_ACCEPT, transfer_id)
+
+            if not incoming.remaining:
+                self._finish(incoming)
+                return
+
+            self._incoming[key] = incoming
+
+            if self._sweeper is None:
+                self._sweeper = loop.call_at(incoming.deadline, self._sweep)
+
+    def _reply(self, address: Address, kind: int, transfer_id: int) -> None:
+
+        future = self.endpoint.send(address, _REPLY.pack(kind, transfer_id))
+        future.add_done_callback(lambda future: future.cancelled() or future.exception())
+
+    def _reject(self, address: Address, transfer_id: int) -> None:
+
+        self.rejected += 1
+        self._reply(address, _KIND_REJECT, transfer_id)
+
+    def _sweep(self) -> None:
+
+        loop = asyncio.get_event_loop()
+        now = loop.time()
+
+        for key, incoming in list(self._incoming.items()):
+            if incoming.deadline <= now:
+                del self._incoming[key]
+                incoming.abort()
+                self.expired += 1
+
+        if self._incoming:
+            deadline = min(incoming.deadline for incoming in self._incoming.values())
+            self._sweeper = loop.call_at(deadline, self._sweep)
+        else:
+            self._sweeper = None
+
+    def _target(self, name: str) -> str:
+
+        # never overwrite an existing file or another transfer's target
+        targets = {incoming.file.path for incoming in self._incoming.values()}
+        root, extension = os.path.splitext(name)
+        path = os.path.join(self.directory, name)
+
+        for number in itertools.count(1):
+
+            if path not in targets and not os.path.lexists(path) \
+                    and not os.path.lexists(f'{path}.part'):
+                break
+
+            path = os.path.join(self.directory, f'{root}-{number}{extension}')
+
+        return path
+
+    def _finish(self, incoming: _Incoming) -> None:
+
+        try:
+            file = incoming.finish()
+        except OSError:
+            incoming.abort()
+            self.rejected += 1
+            return
+
+        self._complete(file)
+
+    def _complete(self, file: ReceivedFile) -> None:
+
+        self._completed.append(file)
+
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def _connection_lost(self) -> None:
+
+        self._closed = True
+
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+        for incoming in self._incoming.values():
+            incoming.abort()
+
+        self._incoming.clear()
+
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
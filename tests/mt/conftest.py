@@ -0,0 +1,20 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def run():
+
+    def run(coroutine, timeout=10.0):
+
+        loop = asyncio.new_event_loop()
+
+        try:
+            asyncio.set_event_loop(loop)
+            return loop.run_until_complete(asyncio.wait_for(coroutine, timeout))
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+    return run
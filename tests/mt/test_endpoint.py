@@ -0,0 +1,295 @@
+import socket
+import asyncio
+
+import pytest
+
+from udpcp.endpoint import Endpoint, open_endpoint, format_address
+from udpcp.loadgen import Impairment, ImpairedProtocol
+from udpcp.protocol import Packet, MessageType, ChecksumMode, TransferMode
+
+
+async def _impaired(impairment, **kwargs):
+
+    endpoint = Endpoint(**kwargs)
+
+    await asyncio.get_event_loop().create_datagram_endpoint(
+        lambda: ImpairedProtocol(endpoint, impairment),
+        local_addr=('127.0.0.1', 0),
+    )
+
+    return endpoint
+
+
+@pytest.mark.parametrize('transfer_mode', list(TransferMode), ids=lambda mode: mode.name)
+@pytest.mark.parametrize('size', [0, 1, 100, 1000, 25500])
+def test_send_receive(transfer_mode, size, run):
+
+    async def scenario():
+
+        server = await open_endpoint()
+        client = await open_endpoint(fragment_size=100)
+        message = bytes(index % 251 for index in range(size))
+
+        await client.send(server.local_address, message, transfer_mode)
+
+        assert await server.receive() == (client.local_address, message)
+
+        client.close()
+        server.close()
+
+    run(scenario())
+
+
+def test_sync(run):
+
+    async def scenario():
+
+        server = await open_endpoint()
+        client = await open_endpoint()
+
+        await client.sync(server.local_address)
+
+        assert client.statistics.received_acks == 1
+        assert server.statistics.sent_acks == 1
+
+        client.close()
+        server.close()
+
+    run(scenario())
+
+
+@pytest.mark.skipif(not socket.has_ipv6, reason='IPv6 is not supported')
+def test_ipv6_loopback(run):
+
+    async def scenario():
+
+        try:
+            server = await open_endpoint('udp://[::1]:0')
+        except OSError:
+            pytest.skip('IPv6 loopback is not available')
+
+        client = await open_endpoint(('::1', 0), fragment_size=100)
+        port = server.local_address[1]
+
+        await client.send(f'udp://[::1]:{port}', b'dummy' * 100)
+        await client.send(server.local_address, b'dummy')
+        await client.sync(('::1', port))
+
+        address, message = await server.receive()
+
+        assert message == b'dummy' * 100
+        assert format_address(address) == format_address(client.local_address)
+        assert client.outstanding == 0
+
+        client.close()
+        server.close()
+
+    run(scenario())
+
+
+def test_handler(run):
+
+    async def scenario():
+
+        received = []
+        server = await open_endpoint(handler=lambda address, message: received.append(message))
+        client = await open_endpoint()
+
+        for index in range(10):
+            await client.send(server.local_address, bytes([index]))
+
+        assert received == [bytes([index]) for index in range(10)]
+
+        client.close()
+        server.close()
+
+    run(scenario())
+
+
+@pytest.mark.parametrize('transfer_mode', [
+    TransferMode.AckEveryPacket,
+    TransferMode.AckLastFragmentOnly,
+], ids=lambda mode: mode.name)
+def test_retransmission(transfer_mode, run):
+
+    async def scenario():
+
+        impairment = Impairment(loss=0.2, duplicate=0.1, reorder=0.1, seed=1)
+        server = await _impaired(impairment, timeout=0.01, retries=10)
+        client = await _impaired(impairment, timeout=0.01, retries=10, fragment_size=100)
+        messages = [bytes([index]) * 1000 for index in range(20)]
+
+        await asyncio.gather(*(
+            client.send(server.local_address, message, transfer_mode) for message in messages
+        ))
+
+        received = [(await server.receive())[1] for _ in messages]
+
+        assert sorted(received) == messages
+        assert client.statistics.retransmissions > 0
+        assert server.statistics.duplicate_packets > 0
+        assert client.outstanding == 0
+
+        client.close()
+        server.close()
+
+    run(scenario())
+
+
+def test_timeout(run):
+
+    async def scenario():
+
+        client = await open_endpoint(timeout=0.001, retries=2)
+        silent = await _impaired(Impairment(loss=1.0))
+
+        with pytest.raises(TimeoutError):
+            await client.send(silent.local_address, b'message')
+
+        assert client.statistics.retransmissions == 2
+        assert client.statistics.failed_messages == 1
+        assert client.outstanding == 0
+
+        client.close()
+        silent.close()
+
+    run(scenario())
+
+
+def test_message_id_reused(run):
+
+    async def scenario():
+
+        client = await open_endpoint(timeout=0.05)
+        silent = await _impaired(Impairment(loss=1.0))
+        address = silent.local_address
+
+        first = client.send(address, b'first')
+        client._connections[address]._message_id = 0
+        second = client.send(address, b'second')
+
+        with pytest.raises(ConnectionError):
+            await first
+
+        assert not second.done()
+        assert client.outstanding == 1
+
+        client.close()
+        silent.close()
+
+        with pytest.raises(ConnectionError):
+            await second
+
+    run(scenario())
+
+
+def test_reassembly_timeout(run):
+
+    async def scenario():
+
+        server = await open_endpoint(reassembly_timeout=0.01)
+        client = await open_endpoint()
+
+        first = Packet.data(
+            transfer_mode=TransferMode.AckNone,
+            checksum_mode=ChecksumMode.Enabled,
+            fragment_amount=2,
+            fragment_number=0,
+            message_id=1,
+            payload_data=b'first',
+        )
+
+        client._transport.sendto(first.as_bytes, server.local_address)
+
+        await asyncio.sleep(0.05)
+
+        assert server.reassembling == 0
+        assert server.statistics.expired_reassemblies == 1
+
+        client.close()
+        server.close()
+
+    run(scenario())
+
+
+def test_invalid_packets(run):
+
+    async def scenario():
+
+        server = await open_endpoint()
+        client = await open_endpoint()
+
+        client._transport.sendto(b'short', server.local_address)
+        await client.send(server.local_address, b'message')
+
+        assert server.statistics.invalid_packets == 1
+        assert server.statistics.as_dict()['decode_errors']['Short'] == 1
+        assert await server.receive() == (client.local_address, b'message')
+
+        client.close()
+        server.close()
+
+    run(scenario())
+
+
+@pytest.mark.parametrize('fragment_amount, fragment_number', [(2, 5), (0, 0), (1, 1)])
+def test_invalid_fragment(fragment_amount, fragment_number, run):
+
+    async def scenario():
+
+        server = await open_endpoint()
+        client = await open_endpoint()
+
+        invalid = Packet(
+            MessageType.Data, TransferMode.AckEveryPacket, ChecksumMode.Enabled, False,
+            fragment_amount, fragment_number, 1, 5, b'dummy',
+        )
+
+        client._transport.sendto(invalid.as_bytes, server.local_address)
+        await client.send(server.local_address, b'message')
+
+        assert server.statistics.invalid_packets == 1
+        assert server.statistics.as_dict()['decode_errors']['InvalidFragment'] == 1
+        assert server.reassembling == 0
+        assert await server.receive() == (client.local_address, b'message')
+
+        client.close()
+        server.close()
+
+    run(scenario())
+
+
+def test_message_too_large(run):
+
+    async def scenario():
+
+        client = await open_endpoint(fragment_size=10)
+
+        with pytest.raises(ValueError):
+            client.send(('127.0.0.1', 9), bytes(client.max_message_size + 1))
+
+        client.close()
+
+    run(scenario())
+
+
+def test_close(run):
+
+    async def scenario():
+
+        client = await open_endpoint()
+        silent = await _impaired(Impairment(loss=1.0))
+        future = client.send(silent.local_address, b'message')
+
+        client.close()
+        await client.wait_closed()
+
+        with pytest.raises(ConnectionError):
+            await future
+
+        with pytest.raises(ConnectionError):
+            await client.receive()
+
+        silent.close()
+
+    run(scenario())
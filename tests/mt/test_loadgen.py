@@ -0,0 +1,84 @@
+import json
+
+from udpcp import loadgen
+from udpcp.protocol import TransferMode
+
+
+def test_run(run):
+
+    reports = []
+    report = run(loadgen.run(
+        peers=2,
+        duration=0.5,
+        rate=400.0,
+        sizes=[10, 3000],
+        modes=[TransferMode.AckEveryPacket, TransferMode.AckLastFragmentOnly],
+        timeout=0.01,
+        retries=10,
+        loss=0.05,
+        duplicate=0.05,
+        reorder=0.05,
+        seed=1,
+        interval=0.1,
+        on_report=reports.append,
+    ))
+
+    assert reports
+    assert report.sent_messages > 0
+    assert report.delivered_messages == report.sent_messages
+    assert report.failed_messages == 0
+    assert report.lost_messages == 0
+    assert report.retransmissions > 0
+    assert report.latency.count == report.delivered_messages
+    assert report.impairment['dropped'] > 0
+
+
+def test_failed_not_lost(run):
+
+    report = run(loadgen.run(
+        peers=1,
+        duration=0.5,
+        rate=400.0,
+        sizes=[10],
+        modes=[TransferMode.AckEveryPacket],
+        timeout=0.005,
+        retries=1,
+        loss=0.6,
+        seed=1,
+        interval=0.1,
+    ))
+
+    assert report.failed_messages > 0
+    assert report.lost_messages == 0
+
+
+def test_main(capsys):
+
+    assert loadgen.main([
+        '--peers', '1',
+        '--duration', '0.2',
+        '--rate', '100',
+        '--modes', 'AckNone,AckEveryPacket',
+        '--json',
+    ]) == 0
+
+    result = json.loads(capsys.readouterr().out)
+
+    assert result['sent_messages'] > 0
+    assert result['latency']['count'] > 0
+
+
+def test_main_congestion(capsys):
+
+    assert loadgen.main([
+        '--peers', '2',
+        '--duration', '0.2',
+        '--rate', '200',
+        '--congestion',
+        '--json',
+    ]) == 0
+
+    result = json.loads(capsys.readouterr().out)
+
+    assert result['sent_messages'] > 0
+    assert result['failed_messages'] == 0
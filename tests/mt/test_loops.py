@@ -0,0 +1,253 @@
+import time
+import socket
+import asyncio
+
+import pytest
+
+from udpcp import loops
+from udpcp.endpoint import open_endpoint
+from udpcp.threaded import ThreadedEndpoint
+from udpcp.protocol import Packet, MessageType, ChecksumMode, TransferMode
+
+MESSAGE = bytes(index % 251 for index in range(5000))
+
+
+@pytest.fixture(params=loops.LOOPS)
+def loop_name(request):
+
+    if request.param not in loops.available():
+        pytest.skip(f'{request.param} is not installed')
+
+    return request.param
+
+
+def test_available():
+
+    assert loops.available()[0] == 'asyncio'
+
+
+def test_unknown_loop():
+
+    with pytest.raises(ValueError):
+        loops.new_event_loop('dummy')
+
+
+def test_loop_factory():
+
+    created = []
+
+    def factory():
+
+        loop = asyncio.new_event_loop()
+        created.append(loop)
+
+        return loop
+
+    async def main():
+
+        return asyncio.get_event_loop()
+
+    assert loops.run(main, factory) is created[0]
+    assert created[0].is_closed()
+
+
+@pytest.mark.parametrize('transfer_mode', list(TransferMode), ids=lambda mode: mode.name)
+def test_send_receive(loop_name, transfer_mode):
+
+    async def main():
+
+        server = await open_endpoint()
+        client = await open_endpoint(fragment_size=1000)
+
+        await client.sync(server.local_address)
+        await client.send(server.local_address, MESSAGE, transfer_mode)
+
+        received = await asyncio.wait_for(server.receive(), 5.0)
+
+        client.close()
+        server.close()
+
+        return received, client.local_address
+
+    (address, message), local_address = loops.run(main, loop_name)
+
+    assert address == local_address
+    assert message == MESSAGE
+
+
+@pytest.mark.parametrize('transfer_mode', list(TransferMode), ids=lambda mode: mode.name)
+def test_threaded(transfer_mode):
+
+    with ThreadedEndpoint() as server, ThreadedEndpoint(fragment_size=1000) as client:
+
+        client.sync(server.local_address).result(5.0)
+        client.send(server.local_address, MESSAGE, transfer_mode).result(5.0)
+
+        assert server.receive(5.0) == (client.local_address, MESSAGE)
+        assert client.outstanding == 0
+
+
+def test_threaded_interoperates(loop_name):
+
+    async def main():
+
+        server = await open_endpoint()
+
+        with ThreadedEndpoint(fragment_size=1000) as client:
+
+            future = client.send(server.local_address, MESSAGE)
+
+            await asyncio.wrap_future(future)
+            received = await asyncio.wait_for(server.receive(), 5.0)
+
+            await server.send(client.local_address, b'reply')
+
+            reply = await asyncio.get_event_loop().run_in_executor(None, client.receive, 5.0)
+
+        server.close()
+
+        return received[1], reply[1]
+
+    assert loops.run(main, loop_name) == (MESSAGE, b'reply')
+
+
+def test_threaded_timeout():
+
+    with ThreadedEndpoint(timeout=0.01, retries=2) as client:
+
+        with ThreadedEndpoint() as server:
+            address = server.local_address
+
+        future = client.send(address, b'data')
+
+        with pytest.raises(TimeoutError):
+            future.result(5.0)
+
+        with pytest.raises(TimeoutError):
+            client.receive(0.01)
+
+
+def test_threaded_evicts_idle_connections():
+
+    with ThreadedEndpoint(reassembly_timeout=0.05) as server:
+
+        with ThreadedEndpoint(reassembly_timeout=0.05) as client:
+
+            client.send(server.local_address, b'data').result(5.0)
+
+            assert server.receive(5.0) == (client.local_address, b'data')
+            assert client._connections and server._connections
+
+            deadline = time.monotonic() + 5.0
+
+            while (client._connections or server._connections) and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert not client._connections
+            assert not server._connections
+
+            client.send(server.local_address, b'again').result(5.0)
+
+            assert server.receive(5.0) == (client.local_address, b'again')
+
+
+def test_threaded_message_id_reused():
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as silent:
+
+        silent.bind(('127.0.0.1', 0))
+        address = silent.getsockname()
+
+        with ThreadedEndpoint(timeout=0.05) as client:
+
+            first = client.send(address, b'first')
+
+            with client._lock:
+                client._connections[address]._message_id = 0
+
+            second = client.send(address, b'second')
+
+            with pytest.raises(ConnectionError):
+                first.result(5.0)
+
+            assert not second.done()
+            assert client.outstanding == 1
+
+
+def test_threaded_closed():
+
+    endpoint = ThreadedEndpoint()
+    endpoint.close()
+    endpoint.close()
+
+    with pytest.raises(ConnectionError):
+        endpoint.send(('127.0.0.1', 9), b'data')
+
+    with pytest.raises(ConnectionError):
+        endpoint.receive()
+
+
+def test_threaded_invalid_fragment():
+
+    data = Packet(
+        MessageType.Data, TransferMode.AckEveryPacket, ChecksumMode.Enabled, False,
+        2, 5, 1, 5, b'dummy',
+    ).as_bytes
+
+    with ThreadedEndpoint() as server, ThreadedEndpoint() as client:
+
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(data, server.local_address)
+
+        client.send(server.local_address, b'data').result(5.0)
+
+        assert server.receive(5.0) == (client.local_address, b'data')
+        assert server.is_running
+
+
+def test_threaded_handler_error():
+
+    received = []
+
+    def handler(address, data):
+
+        received.append(data)
+
+        raise RuntimeError('dummy')
+
+    with ThreadedEndpoint(handler=handler) as server, ThreadedEndpoint() as client:
+
+        client.send(server.local_address, b'first').result(5.0)
+        client.send(server.local_address, b'second').result(5.0)
+
+        deadline = time.monotonic() + 5.0
+
+        while server.errors < 2 and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+        assert received == [b'first', b'second']
+        assert server.errors == 2
+        assert server.is_running
+
+
+def test_threaded_loop_failure():
+
+    def fail(size):
+
+        raise RuntimeError('dummy')
+
+    with ThreadedEndpoint() as server, ThreadedEndpoint() as client:
+
+        client._read = fail
+        future = client.send(server.local_address, b'data')
+
+        with pytest.raises(ConnectionError):
+            future.result(5.0)
+
+        with pytest.raises(ConnectionError):
+            client.receive(5.0)
+
+        with pytest.raises(ConnectionError):
+            client.send(server.local_address, b'data')
+
+        assert not client.is_running
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from udpcp.multicast import open_sender, open_receiver
+from udpcp.protocol import TransferMode
+
+GROUP = '239.255.42.99'
+MESSAGE = bytes(index % 251 for index in range(20000))
+
+
+async def _open(receivers, **kwargs):
+
+    try:
+        first = await open_receiver((GROUP, 0), interface='127.0.0.1')
+    except OSError as error:
+        pytest.skip(f'multicast is not available ({error})')
+
+    group = (GROUP, first.local_address[1])
+    others = [await open_receiver(group, interface='127.0.0.1') for _ in range(receivers - 1)]
+    sender = await open_sender(group, interface='127.0.0.1', fragment_size=1000, **kwargs)
+
+    return sender, [first, *others]
+
+
+@pytest.mark.parametrize(
+    'transfer_mode',
+    [TransferMode.AckNone, TransferMode.AckLastFragmentOnly],
+    ids=lambda mode: mode.name,
+)
+def test_fan_out(transfer_mode, run):
+
+    async def scenario():
+
+        sender, receivers = await _open(3)
+
+        message_id = sender.send(MESSAGE, transfer_mode)
+        received = [await receiver.receive() for receiver in receivers]
+
+        await asyncio.sleep(0.05)
+
+        acknowledged = sender.acknowledged(message_id), sender.statistics.received_acks
+
+        sender.close()
+
+        for receiver in receivers:
+            receiver.close()
+
+        return sender, received, acknowledged
+
+    sender, received, acknowledged = run(scenario())
+
+    assert sender.statistics.sent_packets == 20
+    assert all(message == MESSAGE for _, message in received)
+    if transfer_mode is TransferMode.AckLastFragmentOnly:
+        assert len(acknowledged[0]) == 1
+        assert acknowledged[1] == 3
+    else:
+        assert acknowledged == (frozenset(), 0)
+
+
+def test_repair(run):
+
+    async def scenario():
+
+        sender, (receiver,) = await _open(1)
+
+        transport = sender._transport
+        sendto = transport.sendto
+        sent = []
+
+        def lossy(data, address=None):
+
+            sent.append(data)
+
+            if len(sent) not in (4, 8, 20):
+                sendto(data, address)
+
+        transport.sendto = lossy
+        sender.send(MESSAGE)
+        transport.sendto = sendto
+
+        _, message = await receiver.receive()
+
+        sender.close()
+        receiver.close()
+
+        return sender.statistics, receiver.statistics, message
+
+    sender, receiver, message = run(scenario())
+
+    assert message == MESSAGE
+    assert receiver.sent_nacks >= 1
+    assert sender.repairs >= 1
@@ -0,0 +1,86 @@
+import socket
+import asyncio
+
+import pytest
+
+from udpcp.endpoint import open_endpoint, MIN_BUFFER_SIZE
+from udpcp.overload import Shedding, SO_RXQ_OVFL
+from udpcp.protocol import Packet, TransferMode, ChecksumMode
+
+
+def _default_buffer_size():
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        return sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+
+def test_buffer_sizes(run):
+
+    async def scenario():
+
+        automatic = await open_endpoint()
+        unchanged = await open_endpoint(receive_buffer=0, send_buffer=0)
+
+        sizes = [
+            automatic.receive_buffer_size,
+            automatic.send_buffer_size,
+            unchanged.receive_buffer_size,
+        ]
+
+        automatic.close()
+        unchanged.close()
+
+        return sizes
+
+    receive, send, unchanged = run(scenario())
+    default = _default_buffer_size()
+
+    assert unchanged == default
+    assert receive >= min(MIN_BUFFER_SIZE, default)
+    assert send > 0
+
+
+@pytest.mark.skipif(SO_RXQ_OVFL is None, reason='SO_RXQ_OVFL is not supported')
+def test_kernel_drops(run):
+
+    packets = [
+        Packet.data(
+            transfer_mode=TransferMode.AckNone,
+            checksum_mode=ChecksumMode.Enabled,
+            fragment_amount=1,
+            fragment_number=0,
+            message_id=message_id,
+            payload_data=bytes(1000),
+        ).as_bytes
+        for message_id in range(1, 5002)
+    ]
+
+    async def scenario():
+
+        endpoint = await open_endpoint(
+            receive_buffer=0, shedding=Shedding(hold=10.0), handler=lambda *_: None,
+        )
+
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+
+            for packet in packets[:-1]:
+                sock.sendto(packet, endpoint.local_address)
+
+            await asyncio.sleep(0.1)
+
+            sock.sendto(packets[-1], endpoint.local_address)
+            await asyncio.sleep(0.1)
+
+        endpoint.close()
+
+        return endpoint
+
+    endpoint = run(scenario())
+    statistics = endpoint.statistics
+
+    assert statistics.kernel_drops > 0
+    assert statistics.received_packets + statistics.kernel_drops == 5001
+    assert statistics.shed_unreliable > 0
+    assert statistics.received_packets == (
+        statistics.shed_unreliable + statistics.delivered_messages
+    )
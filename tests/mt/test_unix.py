@@ -0,0 +1,93 @@
+import os
+import socket
+
+import pytest
+
+from udpcp.endpoint import open_endpoint, format_address
+from udpcp.protocol import TransferMode
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='AF_UNIX is not supported')
+
+
+@pytest.mark.parametrize('transfer_mode', list(TransferMode), ids=lambda mode: mode.name)
+@pytest.mark.parametrize('size', [0, 100, 65535, 1 << 20])
+def test_send_receive(transfer_mode, size, run):
+
+    async def scenario():
+
+        server = await open_endpoint('unix:')
+        client = await open_endpoint('unix://')
+        message = bytes(index % 251 for index in range(size))
+
+        await client.send(server.local_address, message, transfer_mode)
+        address, received = await server.receive()
+
+        assert address == client.local_address
+        assert received == message
+        assert server.statistics.received_packets == max(1, -(-size // 65535))
+
+        client.close()
+        server.close()
+
+    run(scenario())
+
+
+def test_filesystem_path(tmp_path, run):
+
+    path = str(tmp_path / 'server.sock')
+
+    async def scenario():
+
+        server = await open_endpoint(f'unix:{path}')
+        client = await open_endpoint('unix:@udpcp-test-client')
+
+        assert server.local_address == path
+        assert client.local_address == b'\0udpcp-test-client'
+        assert format_address(client.local_address) == 'unix:@udpcp-test-client'
+        assert os.path.exists(path)
+
+        await client.send(f'unix://{path}', b'data')
+        await server.send('unix:@udpcp-test-client', b'reply')
+
+        assert await server.receive() == (client.local_address, b'data')
+        assert await client.receive() == (path, b'reply')
+
+        client.close()
+        server.close()
+
+        await server.wait_closed()
+
+    run(scenario())
+
+    assert not os.path.exists(path)
+
+
+def test_udp_scheme(run):
+
+    async def scenario():
+
+        server = await open_endpoint('udp://127.0.0.1:0')
+        client = await open_endpoint()
+        host, port = server.local_address
+
+        await client.send(f'udp://{host}:{port}', b'data')
+
+        assert await server.receive() == (client.local_address, b'data')
+
+        client.close()
+        server.close()
+
+    run(scenario())
+
+
+def test_udp_fragment_size_limit(run):
+
+    async def scenario():
+
+        with pytest.raises(ValueError):
+            await open_endpoint(fragment_size=65535)
+
+        endpoint = await open_endpoint('unix:', fragment_size=65535)
+        endpoint.close()
+
+    run(scenario())
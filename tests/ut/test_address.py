@@ -0,0 +1,41 @@
+import pytest
+
+from udpcp.endpoint import parse_address, format_address
+
+
+@pytest.mark.parametrize('address, expected', [
+    (('127.0.0.1', 9000), ('127.0.0.1', 9000)),
+    ('udp://127.0.0.1:9000', ('127.0.0.1', 9000)),
+    ('udp:localhost:0', ('localhost', 0)),
+    ('udp://[::1]:9000', ('::1', 9000)),
+    ('unix:', ''),
+    ('unix:///tmp/udpcp.sock', '/tmp/udpcp.sock'),
+    ('unix:relative.sock', 'relative.sock'),
+    ('unix:@udpcp', b'\0udpcp'),
+])
+def test_parse_address(address, expected):
+
+    assert parse_address(address) == expected
+
+
+@pytest.mark.parametrize('address', [
+    '/tmp/udpcp.sock',
+    'tcp://127.0.0.1:9000',
+    'udp://127.0.0.1',
+    'udp://127.0.0.1:port',
+])
+def test_parse_address_invalid(address):
+
+    with pytest.raises(ValueError):
+        parse_address(address)
+
+
+@pytest.mark.parametrize('address, expected', [
+    (('127.0.0.1', 9000), '127.0.0.1:9000'),
+    (('::1', 9000, 0, 0), '[::1]:9000'),
+    ('/tmp/udpcp.sock', 'unix:/tmp/udpcp.sock'),
+    (b'\0udpcp', 'unix:@udpcp'),
+])
+def test_format_address(address, expected):
+
+    assert format_address(address) == expected
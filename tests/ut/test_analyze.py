@@ -0,0 +1,207 @@
+import json
+
+import pytest
+
+from udpcp import pcap, analyze
+from udpcp.protocol import Packet, MessageType, ChecksumMode, TransferMode
+
+CLIENT = ('10.0.0.1', 4000)
+SERVER = ('10.0.0.2', 5000)
+
+
+def _data(
+    message_id: int,
+    fragment_amount: int = 1,
+    fragment_number: int = 0,
+    transfer_mode: TransferMode = TransferMode.AckEveryPacket,
+) -> Packet:
+
+    return Packet.data(
+        transfer_mode=transfer_mode,
+        checksum_mode=ChecksumMode.Enabled,
+        fragment_amount=fragment_amount,
+        fragment_number=fragment_number,
+        message_id=message_id,
+        payload_data=b'payload',
+    )
+
+
+def _invalid() -> Packet:
+
+    return Packet(
+        message_type=MessageType.Data,
+        transfer_mode=TransferMode.AckNone,
+        checksum_mode=ChecksumMode.Enabled,
+        is_duplicate=False,
+        fragment_amount=1,
+        fragment_number=0,
+        message_id=0,
+        message_data_length=4,
+        payload_data=b'data',
+    )
+
+
+def _corrupted(packet: Packet) -> bytes:
+
+    data = bytearray(packet.as_bytes)
+    data[-1] ^= 0xFF
+
+    return bytes(data)
+
+
+def _capture(path, frames) -> str:
+
+    with pcap.Writer(str(path)) as writer:
+        for timestamp, packet, source, destination in frames:
+            writer.write(packet, source, destination, timestamp)
+
+    return str(path)
+
+
+@pytest.fixture
+def capture(tmp_path):
+
+    first = _data(message_id=1, fragment_amount=2, fragment_number=0)
+    second = _data(message_id=1, fragment_amount=2, fragment_number=1)
+    single = _data(message_id=2)
+    lost = _data(
+        message_id=3,
+        fragment_amount=3,
+        fragment_number=0,
+        transfer_mode=TransferMode.AckNone,
+    )
+
+    return _capture(tmp_path / 'capture.pcap', [
+        (1.000, Packet.sync(ChecksumMode.Enabled), CLIENT, SERVER),
+        (1.001, Packet.ack(Packet.sync(ChecksumMode.Enabled)), SERVER, CLIENT),
+        (1.010, first, CLIENT, SERVER),
+        (1.012, Packet.ack(first), SERVER, CLIENT),
+        (1.020, second, CLIENT, SERVER),
+        (1.120, second, CLIENT, SERVER),
+        (1.121, Packet.ack(second), SERVER, CLIENT),
+        (1.122, Packet.ack(second, is_duplicate=True), SERVER, CLIENT),
+        (1.200, single, CLIENT, SERVER),
+        (1.204, Packet.ack(single), SERVER, CLIENT),
+        (1.300, lost, CLIENT, SERVER),
+        (1.400, _corrupted(single), CLIENT, SERVER),
+        (1.500, _invalid(), CLIENT, SERVER),
+        (1.600, b'short', CLIENT, SERVER),
+    ])
+
+
+def test_analyze(capture):
+
+    statistics = analyze.analyze(capture)
+
+    assert statistics.datagrams == 14
+    assert statistics.sync_packets == 1
+    assert statistics.data_packets == 5
+    assert statistics.ack_packets == 5
+    assert statistics.duplicate_acks == 1
+    assert statistics.retransmissions == 1
+    assert statistics.retransmission_rate == pytest.approx(0.2)
+    assert statistics.checksum_failures == 1
+    assert statistics.invalid_packets == 1
+    assert statistics.malformed_packets == 1
+    assert statistics.flows == 3
+    assert statistics.completed_messages == 2
+    assert statistics.incomplete_reassemblies == 1
+    assert statistics.unacknowledged_fragments == 0
+    assert statistics.incomplete_samples == [((CLIENT, SERVER, 3), 1, 3)]
+
+
+def test_analyze_ack_latency(capture):
+
+    latency = analyze.analyze(capture).ack_latency
+
+    assert latency.count == 2
+    assert latency.mean == pytest.approx(0.003)
+    assert latency.maximum == pytest.approx(0.004)
+    assert 0.002 <= latency.quantile(0.5) <= 0.004
+
+
+def test_analyze_timeout(tmp_path):
+
+    path = _capture(tmp_path / 'capture.pcap', [
+        (1.0, _data(message_id=1), CLIENT, SERVER),
+        (1.0 + 10.0, _data(message_id=1), CLIENT, SERVER),
+    ])
+
+    statistics = analyze.analyze(path, timeout=5.0)
+
+    assert statistics.flows == 1
+    assert statistics.completed_messages == 1
+    assert statistics.retransmissions == 1
+    assert statistics.unacknowledged_fragments == 1
+
+
+def test_analyze_ports(capture):
+
+    assert analyze.analyze(capture, ports=[6000]).datagrams == 0
+    assert analyze.analyze(capture, ports=[5000]).datagrams == 14
+
+
+def test_analyze_jobs(capture):
+
+    expected = analyze.analyze(capture).as_dict()
+    actual = analyze.analyze(capture, jobs=2).as_dict()
+
+    assert actual == expected
+
+
+def test_histogram():
+
+    histogram = analyze.Histogram()
+
+    assert histogram.quantile(0.5) == 0.0
+    assert histogram.mean == 0.0
+
+    for value in (0.001, 0.002, 0.004, 0.100):
+        histogram.add(value)
+
+    other = analyze.Histogram()
+    other.add(0.5)
+    histogram.merge(other)
+
+    assert histogram.count == 5
+    assert histogram.maximum == 0.5
+    assert histogram.quantile(0.0) <= histogram.quantile(0.5) <= histogram.quantile(1.0)
+    assert histogram.quantile(1.0) == 0.5
+
+
+def test_histogram_negative():
+
+    histogram = analyze.Histogram()
+    histogram.add(-0.001)
+
+    assert histogram.buckets[0] == 1
+    assert sum(histogram.buckets) == 1
+    assert histogram.total == 0.0
+    assert histogram.quantile(1.0) >= 0.0
+
+
+def test_main(capture, capsys):
+
+    assert analyze.main([capture]) == 0
+
+    output = capsys.readouterr().out
+
+    assert 'retransmissions:          1 (20.00%)' in output
+    assert 'incomplete: 10.0.0.1:4000 -> 10.0.0.2:5000 message_id=3 fragments=1/3' in output
+
+
+def test_main_json(capture, capsys):
+
+    assert analyze.main([capture, '--json', '--port', '5000']) == 0
+
+    result = json.loads(capsys.readouterr().out)
+
+    assert result['checksum_failures'] == 1
+    assert result['ack_latency']['count'] == 2
+    assert result['incomplete_samples'][0]['message_id'] == 3
+
+
+def test_main_error(tmp_path, capsys):
+
+    assert analyze.main([str(tmp_path / 'missing.pcap')]) == 1
+    assert 'error:' in capsys.readouterr().err
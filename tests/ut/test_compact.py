@@ -0,0 +1,141 @@
+import pytest
+
+from udpcp.protocol import (
+    Packet,
+    MessageType,
+    ChecksumMode,
+    TransferMode,
+    CompactPacket,
+    PacketTable,
+)
+
+FIELDS = (
+    'type',
+    'version',
+    'checksum',
+    'message_type',
+    'transfer_mode',
+    'checksum_mode',
+    'nbit',
+    'cbit',
+    'sbit',
+    'dbit',
+    'is_duplicate',
+    'fragment_amount',
+    'fragment_number',
+    'message_id',
+    'message_data_length',
+    'payload_data',
+    'is_ack',
+    'is_sync',
+    'is_data',
+    'is_single',
+    'is_last',
+    'is_ack_needed',
+    'as_bytes',
+)
+
+
+def _packets():
+
+    for checksum_mode in ChecksumMode:
+        for transfer_mode in TransferMode:
+
+            data = Packet.data(
+                checksum_mode=checksum_mode,
+                transfer_mode=transfer_mode,
+                fragment_amount=10,
+                fragment_number=9,
+                message_id=0xABCD,
+                payload_data=b'dummy',
+            )
+
+            yield data
+            yield Packet.ack(base_packet=data, is_duplicate=True)
+
+        yield Packet.sync(checksum_mode=checksum_mode)
+
+
+@pytest.mark.parametrize('packet', list(_packets()), ids=str)
+def test_from_packet(packet):
+
+    compact = CompactPacket.from_packet(packet)
+
+    for field in FIELDS:
+        assert getattr(compact, field) == getattr(packet, field), field
+
+
+@pytest.mark.parametrize('packet', list(_packets()), ids=str)
+def test_from_bytes(packet):
+
+    compact = CompactPacket.from_bytes(packet.as_bytes)
+
+    assert compact.header == packet.header
+    assert compact.to_packet().as_bytes == packet.as_bytes
+
+
+def test_from_bytes_invalid_checksum():
+
+    encoded = bytearray(Packet.sync(checksum_mode=ChecksumMode.Enabled).as_bytes)
+    encoded[0] ^= 0xFF
+
+    with pytest.raises(ValueError):
+        CompactPacket.from_bytes(bytes(encoded))
+
+
+def test_invalid_header():
+
+    header = Packet.sync(checksum_mode=ChecksumMode.Disabled).header
+
+    with pytest.raises(ValueError):
+        CompactPacket(header[:-1], b'')
+
+    with pytest.raises(ValueError):
+        CompactPacket(header[:4] + b'\x15' + header[5:], b'')
+
+
+def test_interned_members():
+
+    compact = CompactPacket.from_packet(Packet.sync(checksum_mode=ChecksumMode.Enabled))
+
+    assert compact.message_type is MessageType.Data
+    assert compact.transfer_mode is TransferMode.AckEveryPacket
+    assert compact.checksum_mode is ChecksumMode.Enabled
+
+
+def test_ack_from_compact():
+
+    compact = CompactPacket.from_packet(Packet.sync(checksum_mode=ChecksumMode.Enabled))
+
+    assert Packet.ack(base_packet=compact).is_ack
+
+
+def test_table():
+
+    packets = list(_packets())
+    table = PacketTable(packets)
+
+    assert len(table) == len(packets)
+
+    for stored, packet in zip(table, packets):
+        assert stored.as_bytes == packet.as_bytes
+
+    assert table[0].as_bytes == packets[0].as_bytes
+    assert table[-1].as_bytes == packets[-1].as_bytes
+
+    with pytest.raises(IndexError):
+        table[len(packets)]
+
+
+def test_table_pop():
+
+    packets = list(_packets())
+    table = PacketTable(packets)
+
+    assert table.pop().as_bytes == packets[-1].as_bytes
+    assert table.pop(0).as_bytes == packets[0].as_bytes
+    assert [packet.as_bytes for packet in table] == [packet.as_bytes for packet in packets[1:-1]]
+
+    table.clear()
+
+    assert len(table) == 0
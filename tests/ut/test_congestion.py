@@ -0,0 +1,266 @@
+import asyncio
+
+import pytest
+
+from udpcp import sim
+from udpcp.scheduler import Priority
+from udpcp.protocol import TransferMode
+from udpcp.congestion import CongestionControl, Pacer
+
+BOTTLENECK = sim.Link(latency=0.01, bandwidth=1e6, queue=20000)
+
+
+class _Released:
+
+    def __init__(self, loop):
+
+        self.loop = loop
+        self.packets = []
+
+    def __call__(self, address, packet, priority, token, number):
+
+        self.packets.append((self.loop.time(), address, packet, priority, token))
+
+        return token is not None
+
+
+def _pacer(config=None, capacities=None, datagram_size=100):
+
+    loop = sim.VirtualEventLoop()
+    released = _Released(loop)
+
+    pacer = Pacer(config or CongestionControl(), loop, released, datagram_size, capacities)
+
+    return loop, released, pacer
+
+
+def test_window():
+
+    _, released, pacer = _pacer(CongestionControl(initial_window=2, min_window=1))
+
+    for index in range(5):
+        pacer.enqueue('a', bytes([index]), Priority.Normal, 'message', index)
+
+    assert len(released.packets) == 2
+    assert len(pacer) == 3
+
+    pacer.acked('a', 1, None, False)
+
+    assert pacer.window('a') == 3
+    assert len(released.packets) == 4
+
+    pacer.enqueue('b', b'other', Priority.Normal, 'message')
+    pacer.enqueue('a', b'untracked', Priority.Normal)
+
+    assert [packet for _, _, packet, _, _ in released.packets[4:]] == [b'other']
+
+    pacer.forget('a', 3)
+
+    assert [packet for _, _, packet, _, _ in released.packets[5:]] == [b'\x04', b'untracked']
+    assert len(pacer) == 0
+
+
+def test_priority():
+
+    _, released, pacer = _pacer(CongestionControl(initial_window=1, min_window=1))
+
+    pacer.enqueue('a', b'first', Priority.Normal, 'message')
+    pacer.enqueue('a', b'bulk', Priority.Bulk, 'message')
+    pacer.enqueue('a', b'control', Priority.Control, 'message')
+    pacer.forget('a', 1)
+    pacer.forget('a', 1)
+
+    assert [packet for _, _, packet, _, _ in released.packets] == [b'first', b'control', b'bulk']
+
+
+def test_window_does_not_block_untracked():
+
+    _, released, pacer = _pacer(CongestionControl(initial_window=1, min_window=1))
+
+    pacer.enqueue('a', b'first', Priority.Normal, 'message')
+    pacer.enqueue('a', b'second', Priority.Normal, 'message')
+    pacer.enqueue('a', b'telemetry', Priority.Telemetry)
+
+    assert [packet for _, _, packet, _, _ in released.packets] == [b'first', b'telemetry']
+    assert len(pacer) == 1
+
+
+def test_idle_peers_expire():
+
+    loop, released, pacer = _pacer(CongestionControl(idle_timeout=10.0))
+
+    for address in range(5):
+        pacer.enqueue(address, b'data', Priority.Normal)
+
+    assert pacer.peers == 5
+
+    loop.run_until_complete(asyncio.sleep(5.0))
+    pacer.enqueue(0, b'data', Priority.Normal)
+
+    loop.run_until_complete(asyncio.sleep(6.0))
+    pacer.enqueue('new', b'data', Priority.Normal)
+
+    assert pacer.peers == 2
+    assert pacer.window(0) == pacer.window('new')
+
+
+def test_increase():
+
+    _, _, pacer = _pacer(CongestionControl(initial_window=4, min_window=2))
+
+    pacer.lost('a', 0)
+
+    assert pacer.window('a') == 2
+
+    pacer.acked('a', 0, None, False)
+    pacer.acked('a', 0, None, False)
+
+    assert pacer.window('a') == pytest.approx(2.9)
+
+
+def test_decrease():
+
+    loop, _, pacer = _pacer(CongestionControl(initial_window=16, min_window=3))
+
+    pacer.acked('a', 0, 0.5, False)
+    pacer.lost('a', 0)
+
+    assert pacer.window('a') == 8.5
+
+    pacer.lost('a', 0)
+
+    assert pacer.window('a') == 8.5
+
+    loop.run_until_complete(asyncio.sleep(0.5))
+
+    for expected in (4.25, 3, 3):
+        pacer.acked('a', 0, None, True)
+        assert pacer.window('a') == expected
+        loop.run_until_complete(asyncio.sleep(0.5))
+
+
+def test_rate():
+
+    loop, released, pacer = _pacer(CongestionControl(rate=1000, burst=2))
+
+    for _ in range(6):
+        pacer.enqueue('a', bytes(100), Priority.Telemetry)
+
+    loop.run_until_complete(asyncio.sleep(1))
+
+    times = [round(time, 6) for time, _, _, _, _ in released.packets]
+
+    assert times == [0, 0, 0, 0.1, 0.2, 0.3]
+    assert pacer.rate('a') == 1000
+    assert pacer.rate('b') == 1000
+
+
+def test_rate_from_window():
+
+    _, _, pacer = _pacer(CongestionControl(initial_window=10, gain=2), datagram_size=1000)
+
+    assert pacer.rate('a') is None
+
+    pacer.acked('a', 0, 0.1, False)
+
+    assert pacer.rate('a') == 2 * 11 * 1000 / 0.1
+
+
+def test_capacity():
+
+    _, released, pacer = _pacer(CongestionControl(rate=1, burst=1), {Priority.Telemetry: 2})
+
+    kept = [pacer.enqueue('a', bytes(100), Priority.Telemetry) for _ in range(6)]
+
+    assert kept == [True, True, True, True, False, False]
+    assert pacer.dropped == 2
+    assert len(pacer) == 2
+
+    pacer.clear()
+
+    assert len(pacer) == 0
+    assert len(released.packets) == 2
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'min_window': 0},
+    {'initial_window': 1},
+    {'initial_window': 2000},
+    {'beta': 1},
+    {'beta': 0},
+    {'gain': 0},
+    {'gain': -1.0},
+    {'rate': 0},
+    {'rate': -1.0},
+    {'burst': 0},
+    {'idle_timeout': 0},
+])
+def test_invalid(kwargs):
+
+    with pytest.raises(ValueError):
+        CongestionControl(**kwargs)
+
+
+def _goodput(congestion, messages=50, size=8000):
+
+    async def scenario(network):
+
+        sender = await network.open_endpoint(
+            fragment_size=1000, timeout=0.05, retries=10, congestion=congestion,
+        )
+        receiver = await network.open_endpoint(fragment_size=1000)
+
+        start = network.loop.time()
+        results = await asyncio.gather(
+            *[sender.send(receiver.local_address, bytes(size)) for _ in range(messages)],
+            return_exceptions=True,
+        )
+        elapsed = network.loop.time() - start
+
+        delivered = sum(result is None for result in results)
+        sender.close()
+
+        return delivered * size / elapsed, sender.statistics.retransmissions
+
+    return sim.run(scenario, link=BOTTLENECK)
+
+
+def test_goodput():
+
+    goodput, retransmissions = _goodput(None)
+    paced_goodput, paced_retransmissions = _goodput(CongestionControl())
+
+    assert paced_goodput > 10 * goodput
+    assert paced_retransmissions * 10 < retransmissions
+
+
+def test_unreliable_paced():
+
+    async def scenario(network):
+
+        sender = await network.open_endpoint(
+            fragment_size=100,
+            congestion=CongestionControl(rate=1000, burst=1),
+            telemetry_capacity=3,
+        )
+        receiver = await network.open_endpoint()
+        received = []
+
+        receiver.handler = lambda address, data: received.append(network.loop.time())
+
+        for _ in range(10):
+            await sender.send(receiver.local_address, bytes(100), TransferMode.AckNone)
+
+        assert sender.queued == 3
+        assert sender.statistics.dropped_packets == 5
+
+        await asyncio.sleep(1)
+
+        sender.close()
+
+        return received
+
+    received = sim.run(scenario)
+
+    assert len(received) == 5
+    assert received[-1] - received[0] > 0.3
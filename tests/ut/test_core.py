@@ -0,0 +1,352 @@
+import pytest
+
+from udpcp.core import (
+    Connection,
+    Statistics,
+    MessageReceived,
+    MessageAcknowledged,
+    MessageFailed,
+    MessageRetransmitted,
+    ReassemblyExpired,
+    PacketRejected,
+)
+from udpcp.delivery import BufferPool
+from udpcp.protocol import Packet, MessageType, ChecksumMode, TransferMode, DecodeStatus
+
+MESSAGE = bytes(range(256)) * 10
+
+
+def _exchange(sender, receiver, datagrams, now=0.0):
+
+    events = []
+
+    while datagrams:
+
+        replies = []
+
+        for datagram in datagrams:
+            sent, received = receiver.receive_datagram(datagram, now)
+            replies.extend(sent)
+            events.extend(received)
+
+        datagrams = replies
+        sender, receiver = receiver, sender
+
+    return events
+
+
+@pytest.mark.parametrize('mode', list(TransferMode))
+def test_round_trip(mode):
+
+    sender = Connection(fragment_size=100)
+    receiver = Connection(fragment_size=100)
+
+    message_id, datagrams = sender.send(MESSAGE, 0.0, mode)
+
+    assert len(datagrams) == 26
+
+    events = _exchange(sender, receiver, datagrams)
+    received = [event for event in events if isinstance(event, MessageReceived)]
+
+    assert len(received) == 1
+    assert received[0].message_id == message_id
+    assert received[0].transfer_mode is mode
+    assert received[0].data == MESSAGE
+
+    acknowledged = [event for event in events if isinstance(event, MessageAcknowledged)]
+
+    if mode is TransferMode.AckNone:
+        assert not acknowledged
+    else:
+        assert [event.message_id for event in acknowledged] == [message_id]
+        assert not acknowledged[0].retransmitted
+
+    assert sender.outstanding == 0
+    assert receiver.reassembling == 0
+    assert receiver.statistics.delivered_messages == 1
+
+
+def test_sync():
+
+    sender = Connection()
+    receiver = Connection()
+
+    datagrams = sender.sync(0.0)
+    events = _exchange(sender, receiver, datagrams)
+
+    assert [type(event) for event in events] == [MessageAcknowledged]
+    assert events[0].message_id == 0
+
+
+def test_message_ids():
+
+    connection = Connection()
+
+    assert [connection.send(b'data', 0.0)[0] for _ in range(3)] == [1, 2, 3]
+
+
+def test_message_too_large():
+
+    connection = Connection(fragment_size=10)
+
+    with pytest.raises(ValueError):
+        connection.send(bytes(connection.max_message_size + 1), 0.0)
+
+
+def test_invalid_fragment_size():
+
+    with pytest.raises(ValueError):
+        Connection(fragment_size=0)
+
+
+def test_retransmission():
+
+    sender = Connection(fragment_size=100, timeout=1.0)
+    receiver = Connection(fragment_size=100)
+
+    _, datagrams = sender.send(MESSAGE[:300], 0.0)
+
+    assert sender.get_timer() == 1.0
+    assert sender.timer_expired(0.5) == ([], [])
+
+    receiver.receive_datagram(datagrams[0], 0.5)
+
+    datagrams, events = sender.timer_expired(1.0)
+
+    assert not events
+    assert len(datagrams) == 3
+    assert sender.get_timer() == 3.0
+    assert sender.statistics.retransmissions == 3
+
+    events = _exchange(sender, receiver, datagrams, 1.5)
+
+    assert receiver.statistics.duplicate_packets == 1
+    assert [type(event) for event in events] == [MessageReceived, MessageAcknowledged]
+    assert events[1].retransmitted
+    assert sender.get_timer() is None
+
+
+def test_failure():
+
+    connection = Connection(timeout=1.0, retries=2)
+    message_id, _ = connection.send(b'data', 0.0)
+    now = 0.0
+    events = []
+
+    while connection.get_timer() is not None:
+        now = connection.get_timer()
+        events.extend(connection.timer_expired(now)[1])
+
+    assert now == 7.0
+    assert [type(event) for event in events] == [MessageFailed]
+    assert events[0].message_id == message_id
+    assert isinstance(events[0].error, TimeoutError)
+    assert connection.statistics.failed_messages == 1
+
+
+def test_reassembly_expired():
+
+    sender = Connection(fragment_size=100)
+    receiver = Connection(fragment_size=100, reassembly_timeout=2.0)
+
+    message_id, datagrams = sender.send(MESSAGE[:300], 0.0, TransferMode.AckNone)
+
+    receiver.receive_datagram(datagrams[0], 1.0)
+
+    assert receiver.reassembling == 1
+    assert receiver.get_timer() == 3.0
+
+    datagrams, events = receiver.timer_expired(3.0)
+
+    assert not datagrams
+    assert [type(event) for event in events] == [ReassemblyExpired]
+    assert events[0].message_id == message_id
+    assert events[0].missing == 2
+    assert receiver.reassembling == 0
+    assert receiver.get_timer() is None
+
+
+def test_duplicate_after_completion():
+
+    sender = Connection()
+    receiver = Connection(reassembly_timeout=2.0)
+
+    _, datagrams = sender.send(b'data', 0.0)
+
+    receiver.receive_datagram(datagrams[0], 0.0)
+    replies, events = receiver.receive_datagram(datagrams[0], 1.0)
+
+    assert not events
+    assert Packet.from_bytes(replies[0]).is_duplicate
+    assert receiver.get_timer() == 2.0
+
+    receiver.timer_expired(2.0)
+    _, events = receiver.receive_datagram(datagrams[0], 3.0)
+
+    assert [type(event) for event in events] == [MessageReceived]
+
+
+def test_rejected():
+
+    connection = Connection()
+
+    datagrams, events = connection.receive_datagram(b'\x00', 0.0)
+
+    assert not datagrams
+    assert [type(event) for event in events] == [PacketRejected]
+    assert events[0].status is DecodeStatus.Short
+    assert connection.statistics.invalid_packets == 1
+
+
+def test_message_id_reused():
+
+    connection = Connection()
+    message_id, _ = connection.send(b'first', 0.0)
+
+    connection._message_id = message_id - 1
+    connection.send(b'second', 0.0)
+
+    _, events = connection.timer_expired(0.0)
+
+    assert [type(event) for event in events] == [MessageFailed]
+    assert isinstance(events[0].error, ConnectionError)
+    assert connection.outstanding == 1
+
+
+@pytest.mark.parametrize('fragment_amount, fragment_number', [(2, 5), (0, 0), (1, 1)])
+def test_invalid_fragment(fragment_amount, fragment_number):
+
+    connection = Connection()
+
+    data = Packet(
+        MessageType.Data, TransferMode.AckEveryPacket, ChecksumMode.Enabled, False,
+        fragment_amount, fragment_number, 1, 5, b'dummy',
+    ).as_bytes
+
+    datagrams, events = connection.receive_datagram(data, 0.0)
+
+    assert not datagrams
+    assert [type(event) for event in events] == [PacketRejected]
+    assert events[0].status is DecodeStatus.InvalidFragment
+    assert connection.statistics.invalid_packets == 1
+    assert connection.reassembling == 0
+    assert connection.get_timer() is None
+
+
+def test_deferred():
+
+    connection = Connection(timeout=1.0, retries=1)
+    message_id, datagrams = connection.send(MESSAGE[:10], 0.0, deferred=True)
+
+    assert len(datagrams) == 1
+    assert connection.get_timer() is None
+
+    connection.released(message_id, 2.0)
+
+    assert connection.get_timer() == 3.0
+
+    datagrams, events = connection.timer_expired(3.0)
+
+    assert not datagrams
+    assert [type(event) for event in events] == [MessageRetransmitted]
+    assert list(events[0].numbers) == [0]
+    assert connection.get_timer() is None
+    assert connection.statistics.retransmissions == 1
+
+    connection.released(message_id, 4.0)
+    _, events = connection.timer_expired(6.0)
+
+    assert [type(event) for event in events] == [MessageFailed]
+
+
+def test_buffer_pool():
+
+    pool = BufferPool()
+    sender = Connection(fragment_size=100)
+    receiver = Connection(fragment_size=100, buffers=pool)
+
+    _, datagrams = sender.send(MESSAGE[:250], 0.0, TransferMode.AckNone)
+
+    for datagram in reversed(datagrams):
+        _, events = receiver.receive_datagram(datagram, 0.0)
+
+    assert bytes(events[0].data) == MESSAGE[:250]
+    assert events[0].buffer is not None
+    assert pool.allocated == 1
+
+    _, datagrams = sender.send(MESSAGE[:250], 0.0, TransferMode.AckNone)
+    receiver.receive_datagram(datagrams[0], 0.0)
+    receiver.abort(ConnectionError())
+
+    assert receiver.reassembling == 0
+    assert len(pool) == 1
+
+
+def test_fragment_size_mismatch():
+
+    receiver = Connection()
+    first = Connection(fragment_size=100).send(MESSAGE[:300], 0.0, TransferMode.AckNone)[1]
+    second = Connection(fragment_size=110).send(MESSAGE[:300], 0.0, TransferMode.AckNone)[1]
+
+    receiver.receive_datagram(first[0], 0.0)
+    datagrams, events = receiver.receive_datagram(second[1], 0.0)
+
+    assert not datagrams and not events
+    assert receiver.statistics.invalid_packets == 1
+
+    for datagram in first[1:]:
+        _, events = receiver.receive_datagram(datagram, 0.0)
+
+    assert events[0].data == MESSAGE[:300]
+
+
+def test_abort():
+
+    connection = Connection(fragment_size=100)
+    message_id, _ = connection.send(b'data', 0.0)
+    _, datagrams = Connection(fragment_size=100).send(MESSAGE[:300], 0.0)
+
+    connection.receive_datagram(datagrams[0], 0.0)
+    error = ConnectionError('closed')
+
+    datagrams, events = connection.abort(error)
+
+    assert not datagrams
+    assert [type(event) for event in events] == [MessageFailed]
+    assert events[0].message_id == message_id
+    assert events[0].error is error
+    assert connection.outstanding == connection.reassembling == 0
+    assert connection.get_timer() is None
+
+
+def test_idle():
+
+    sender = Connection(reassembly_timeout=2.0)
+    receiver = Connection(reassembly_timeout=2.0)
+
+    assert sender.idle(0.0)
+
+    _, datagrams = sender.send(b'data', 1.0)
+    _exchange(sender, receiver, datagrams, 1.0)
+
+    assert not sender.idle(2.0)
+    assert sender.idle(3.0)
+    assert not receiver.idle(3.0)
+
+    receiver.timer_expired(3.0)
+
+    assert receiver.idle(3.0)
+
+
+def test_shared_statistics():
+
+    statistics = Statistics()
+    first = Connection(statistics=statistics)
+    second = Connection(statistics=statistics)
+
+    first.send(b'data', 0.0)
+    second.send(b'data', 0.0)
+    second.receive_datagram(b'\x00', 0.0)
+
+    assert statistics.sent_messages == 2
+    assert statistics.as_dict()['decode_errors']['Short'] == 1
@@ -0,0 +1,103 @@
+import pytest
+
+from udpcp.protocol import Packet, MessageType, ChecksumMode, TransferMode, DecodeStatus
+from udpcp.protocol._utils import specification
+
+
+def _data(checksum_mode: ChecksumMode = ChecksumMode.Enabled) -> bytes:
+
+    return Packet.data(
+        checksum_mode=checksum_mode,
+        transfer_mode=TransferMode.AckEveryPacket,
+        fragment_amount=1,
+        fragment_number=0,
+        message_id=1,
+        payload_data=b'dummy',
+    ).as_bytes
+
+
+def _corrupted() -> bytes:
+
+    data = bytearray(_data())
+    data[-1] ^= 0xFF
+
+    return bytes(data)
+
+
+INVALID = [
+    (b'dummy', DecodeStatus.Short, 'invalid data length (5 < 12)'),
+    (b'000000000000', DecodeStatus.BadVersion, 'invalid packet protocol version (6 != 2)'),
+    (
+        bytes([0, 0, 0, 0, 0x15]) + bytes(7),
+        DecodeStatus.InvalidFlags,
+        'invalid packet flags (0x15)',
+    ),
+    (_data()[:-1], DecodeStatus.LengthMismatch, 'invalid message data length (5 > 4)'),
+    (_corrupted(), DecodeStatus.BadChecksum, 'invalid packet checksum'),
+]
+
+
+@pytest.mark.parametrize('checksum_mode', list(ChecksumMode))
+def test_try_decode(checksum_mode):
+
+    data = _data(checksum_mode)
+
+    assert specification.try_decode(data) == (DecodeStatus.Ok, specification.decode(data))
+
+
+@pytest.mark.parametrize('data, status, reason', INVALID)
+def test_try_decode_invalid(data, status, reason):
+
+    assert specification.try_decode(data) == (status, None)
+    assert specification._try_decode(data) == (status, None)
+
+
+@pytest.mark.parametrize('data, status, reason', INVALID)
+def test_describe(data, status, reason):
+
+    message = specification.describe(status, data)
+
+    assert reason in message
+
+    with pytest.raises(ValueError) as error:
+        specification._decode(data)
+
+    assert str(error.value) == message
+
+    with pytest.raises(ValueError) as error:
+        specification.decode(data)
+
+    assert str(error.value) == message
+
+
+def test_try_from_bytes():
+
+    data = _data()
+    status, packet = Packet.try_from_bytes(data)
+
+    assert status is DecodeStatus.Ok
+    assert packet.as_bytes == data
+
+    assert Packet.try_from_bytes(b'dummy') == (DecodeStatus.Short, None)
+
+
+def test_try_from_bytes_counters():
+
+    counters = [0] * len(DecodeStatus)
+
+    for data in [_data(), _data(), *(data for data, _, _ in INVALID)]:
+        counters[Packet.try_from_bytes(data)[0]] += 1
+
+    assert counters == [2, 1, 1, 1, 1, 1, 0]
+
+
+def test_describe_invalid_fragment():
+
+    data = Packet(
+        MessageType.Data, TransferMode.AckEveryPacket, ChecksumMode.Enabled, False,
+        2, 5, 1, 5, b'dummy',
+    ).as_bytes
+
+    message = specification.describe(DecodeStatus.InvalidFragment, data)
+
+    assert 'invalid fragment number (5 >= 2)' in message
@@ -0,0 +1,213 @@
+import asyncio
+
+import pytest
+
+from udpcp import sim
+from udpcp.endpoint import Endpoint
+from udpcp.delivery import BufferPool
+from udpcp.protocol import Packet, TransferMode, ChecksumMode
+
+MESSAGE = bytes(range(256)) * 10
+
+
+class _Transport(asyncio.DatagramTransport):
+
+    def __init__(self):
+
+        super().__init__()
+
+        self.sent = []
+
+    def sendto(self, data, addr=None):
+
+        self.sent.append((addr, data))
+
+    def get_extra_info(self, name, default=None):
+
+        return ('127.0.0.1', 10000) if name == 'sockname' else default
+
+    def close(self):
+
+        pass
+
+
+def _fragments(message, fragment_size, message_id=1, mode=TransferMode.AckEveryPacket):
+
+    chunks = [
+        message[index:index + fragment_size] for index in range(0, len(message), fragment_size)
+    ]
+
+    return [
+        Packet.data(
+            transfer_mode=mode,
+            checksum_mode=ChecksumMode.Enabled,
+            fragment_amount=len(chunks),
+            fragment_number=number,
+            message_id=message_id,
+            payload_data=chunk,
+        ).as_bytes
+        for number, chunk in enumerate(chunks)
+    ]
+
+
+@pytest.fixture
+def endpoint():
+
+    loop = sim.VirtualEventLoop()
+    asyncio.set_event_loop(loop)
+
+    endpoint = Endpoint(reassembly_timeout=1.0)
+    endpoint.connection_made(_Transport())
+
+    yield endpoint
+
+    asyncio.set_event_loop(None)
+    loop.close()
+
+
+def test_buffer_pool():
+
+    pool = BufferPool(size=1, max_capacity=4096)
+
+    first = pool.acquire(1000)
+    second = pool.acquire(1024)
+
+    assert len(first) == len(second) == 1024
+
+    pool.release(first)
+    pool.release(second)
+    pool.release(pool.acquire(5000))
+
+    assert len(pool) == 1
+    assert pool.acquire(513) is first
+    assert len(pool.acquire(0)) == 1
+    assert (pool.allocated, pool.reused) == (4, 1)
+
+
+def test_callback(endpoint):
+
+    received = []
+
+    def callback(message):
+
+        assert message.data.readonly or not hasattr(memoryview, 'toreadonly')
+
+        received.append((message.address, message.message_id, message.transfer_mode))
+        received.append(bytes(message.data))
+        received.append(message.data)
+
+    endpoint.callback = callback
+
+    for datagram in _fragments(MESSAGE, 1000, 7, TransferMode.AckLastFragmentOnly):
+        endpoint.datagram_received(datagram, 'peer')
+
+    for datagram in _fragments(b'single', 1000, 8, TransferMode.AckNone):
+        endpoint.datagram_received(datagram, 'peer')
+
+    assert received[0] == ('peer', 7, TransferMode.AckLastFragmentOnly)
+    assert received[1] == MESSAGE
+    assert received[3] == ('peer', 8, TransferMode.AckNone)
+    assert received[4] == b'single'
+
+    with pytest.raises(ValueError):
+        len(received[2])
+
+    assert len(endpoint.buffers) == 1
+    assert endpoint.statistics.delivered_messages == 2
+
+
+@pytest.mark.parametrize('order', [
+    [0, 1, 2],
+    [2, 1, 0],
+    [2, 0, 1],
+    [1, 2, 2, 0],
+])
+def test_reassembly_order(endpoint, order):
+
+    datagrams = _fragments(MESSAGE, 1000)
+
+    for index in order:
+        endpoint.datagram_received(datagrams[index], 'peer')
+
+    assert endpoint.statistics.duplicate_packets == len(order) - 3
+    assert endpoint._queue.popleft() == ('peer', MESSAGE)
+    assert endpoint.buffers.allocated == 1
+    assert len(endpoint.buffers) == 1
+
+
+def test_reassembly_invalid_size(endpoint):
+
+    first = _fragments(MESSAGE, 1000)
+    second = _fragments(MESSAGE, 900)
+
+    endpoint.datagram_received(first[0], 'peer')
+    endpoint.datagram_received(second[1], 'peer')
+    endpoint.datagram_received(_fragments(bytes(2002) + bytes(1001), 1001)[2], 'peer')
+
+    assert endpoint.statistics.invalid_packets == 2
+    assert endpoint.reassembling == 1
+
+    for datagram in first[1:]:
+        endpoint.datagram_received(datagram, 'peer')
+
+    assert endpoint._queue.popleft() == ('peer', MESSAGE)
+
+
+def test_completed_expiry(endpoint):
+
+    loop = asyncio.get_event_loop()
+    datagram = _fragments(b'data', 1000)[0]
+
+    endpoint.datagram_received(datagram, 'peer')
+    loop.run_until_complete(asyncio.sleep(0.5))
+    endpoint.datagram_received(datagram, 'peer')
+
+    assert endpoint.statistics.duplicate_packets == 1
+
+    loop.run_until_complete(asyncio.sleep(0.6))
+    endpoint.datagram_received(datagram, 'peer')
+
+    assert endpoint.statistics.delivered_messages == 2
+    assert endpoint._timers
+
+    loop.run_until_complete(asyncio.sleep(2.0))
+
+    assert not endpoint._timers
+    assert not endpoint._connections
+
+
+def test_consume():
+
+    async def scenario(network):
+
+        sender = await network.open_endpoint(fragment_size=100)
+        receiver = await network.open_endpoint(fragment_size=100)
+        batches = []
+
+        async def consumer(messages):
+
+            batches.append([(message.message_id, bytes(message.data)) for message in messages])
+            await asyncio.sleep(0.01)
+
+        consuming = asyncio.ensure_future(receiver.consume(consumer, batch=4))
+
+        await asyncio.gather(*(
+            sender.send(receiver.local_address, bytes([index]) * 150) for index in range(10)
+        ))
+        await asyncio.sleep(0.1)
+
+        with pytest.raises(RuntimeError):
+            await receiver.consume(consumer)
+
+        receiver.close()
+        await consuming
+
+        return batches, receiver.buffers
+
+    batches, buffers = sim.run(scenario)
+
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert sorted(data for batch in batches for _, data in batch) == [
+        bytes([index]) * 150 for index in range(10)
+    ]
+    assert len(buffers) == buffers.allocated == 10
@@ -0,0 +1,71 @@
+import pytest
+
+from udpcp.protocol import Packet, MessageType, ChecksumMode, TransferMode
+from udpcp.protocol._utils.flags import decode_table, encode_table
+
+
+def test_decode_table_size():
+
+    assert len(decode_table) == 256
+
+
+def test_decode_table_interned_members():
+
+    for value, flags in enumerate(decode_table):
+
+        assert flags.value == value
+        assert flags.checksum_mode is ChecksumMode.from_bits(bool(value & 0b010))
+
+        if flags.message_type is not None:
+            assert flags.message_type is MessageType(value >> 6)
+
+        if flags.transfer_mode is not None:
+            nbit, sbit = bool(value & 0b100), bool(value & 0b001)
+            assert flags.transfer_mode is TransferMode.from_bits(nbit, sbit)
+
+
+def test_decode_table_invalid_message_type():
+
+    for value in (0b00_010_000, 0b11_010_000):
+
+        assert decode_table[value].message_type is None
+        assert not decode_table[value].is_valid
+
+
+def test_decode_table_invalid_transfer_mode():
+
+    flags = decode_table[0b01_010_101]
+
+    assert flags.message_type is MessageType.Data
+    assert flags.transfer_mode is None
+    assert not flags.is_valid
+
+
+@pytest.mark.parametrize('message_type', list(MessageType))
+@pytest.mark.parametrize('transfer_mode', list(TransferMode))
+@pytest.mark.parametrize('checksum_mode', list(ChecksumMode))
+def test_encode_decode_table(message_type, transfer_mode, checksum_mode):
+
+    value = encode_table[message_type][transfer_mode][checksum_mode] | Packet.version << 3
+    flags = decode_table[value]
+
+    assert flags.is_valid
+    assert flags.version == Packet.version
+    assert flags.message_type is message_type
+    assert flags.transfer_mode is transfer_mode
+    assert flags.checksum_mode is checksum_mode
+
+
+def test_decode_invalid_packet_flags():
+
+    encoded = bytearray(Packet.sync(checksum_mode=ChecksumMode.Disabled).as_bytes)
+    encoded[4] |= 0b101
+
+    with pytest.raises(ValueError):
+        Packet.from_bytes(bytes(encoded))
+
+
+def test_transfer_mode_bits():
+
+    for transfer_mode in TransferMode:
+        assert TransferMode.from_bits(transfer_mode.nbit, transfer_mode.sbit) is transfer_mode
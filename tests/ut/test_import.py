@@ -0,0 +1,93 @@
+import sys
+import subprocess
+
+import pytest
+
+import udpcp
+
+FORBIDDEN_MODULES = {
+    'bitarray',
+    'typing',
+    're',
+    'asyncio',
+    'socket',
+    'selectors',
+    'mmap',
+    'multiprocessing',
+}
+
+# standard library modules udpcp.protocol may pull in beyond interpreter startup,
+# asserted instead of a wall-clock budget which depends on the machine's load
+ALLOWED_DEPENDENCIES = {
+    'collections',
+    'enum',
+    'functools',
+    'importlib',
+    'itertools',
+    'keyword',
+    'operator',
+    'reprlib',
+    'struct',
+    'types',
+    'warnings',
+    'zlib',
+}
+
+
+def _import_time(statement: str) -> dict:
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+        universal_newlines=True,
+    )
+
+    modules = {}
+
+    for line in result.stderr.splitlines():
+
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _, _, cumulative, name = (field.strip() for field in line.replace(':', '|', 1).split('|'))
+        modules[name] = int(cumulative)
+
+    return modules
+
+
+def test_import_udpcp_is_lazy():
+
+    modules = _import_time('import udpcp')
+
+    assert 'udpcp' in modules
+    assert not any(name.startswith('udpcp.') for name in modules)
+
+
+def test_import_udpcp_protocol_modules():
+
+    modules = _import_time('import udpcp.protocol')
+
+    assert 'udpcp.protocol' in modules
+    assert not FORBIDDEN_MODULES & set(modules)
+
+
+def test_import_udpcp_protocol_dependencies():
+
+    modules = set(_import_time('import udpcp.protocol')) - set(_import_time('pass'))
+    dependencies = {
+        name.partition('.')[0] for name in modules
+        if not name.startswith(('_', 'udpcp.')) and name != 'udpcp'
+        and not name.endswith('__mypyc')
+    }
+
+    assert dependencies <= ALLOWED_DEPENDENCIES
+
+
+def test_lazy_attribute():
+
+    assert udpcp.protocol is sys.modules['udpcp.protocol']
+
+    with pytest.raises(AttributeError):
+        udpcp.dummy
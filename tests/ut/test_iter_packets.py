@@ -0,0 +1,124 @@
+import pytest
+
+from udpcp.protocol import (
+    Packet,
+    ChecksumMode,
+    TransferMode,
+    CompactPacket,
+    PacketPool,
+    iter_packets,
+)
+
+
+def _packets():
+
+    for checksum_mode in ChecksumMode:
+
+        data = Packet.data(
+            checksum_mode=checksum_mode,
+            transfer_mode=TransferMode.AckEveryPacket,
+            fragment_amount=2,
+            fragment_number=1,
+            message_id=7,
+            payload_data=b'dummy',
+        )
+
+        yield data
+        yield Packet.ack(base_packet=data)
+        yield Packet.sync(checksum_mode=checksum_mode)
+
+        yield Packet.data(
+            checksum_mode=checksum_mode,
+            transfer_mode=TransferMode.AckNone,
+            fragment_amount=1,
+            fragment_number=0,
+            message_id=8,
+            payload_data=bytes(range(256)),
+        )
+
+
+def test_from_bytes_ignores_trailing_data():
+
+    packet = next(_packets())
+    decoded = Packet.from_bytes(packet.as_bytes + b'trailing')
+
+    assert decoded.payload_data == b'dummy'
+    assert decoded.as_bytes == packet.as_bytes
+
+
+def test_split_from_bytes():
+
+    first, second = list(_packets())[:2]
+
+    packet, remainder = Packet.split_from_bytes(first.as_bytes + second.as_bytes)
+
+    assert packet.as_bytes == first.as_bytes
+    assert remainder == second.as_bytes
+
+    packet, remainder = Packet.split_from_bytes(remainder)
+
+    assert packet.as_bytes == second.as_bytes
+    assert remainder == b''
+
+
+def test_iter_packets():
+
+    packets = list(_packets())
+    buffer = b''.join(packet.as_bytes for packet in packets)
+
+    decoded = list(iter_packets(buffer))
+
+    assert [packet.as_bytes for packet in decoded] == [packet.as_bytes for packet in packets]
+
+
+def test_iter_packets_zero_copy():
+
+    buffer = bytearray(b''.join(packet.as_bytes for packet in _packets()))
+
+    for packet in iter_packets(buffer):
+        assert isinstance(packet.payload_data, memoryview)
+        assert packet.payload_data.obj is buffer
+
+
+def test_iter_packets_empty():
+
+    assert list(iter_packets(b'')) == []
+
+
+def test_iter_packets_truncated():
+
+    buffer = b''.join(packet.as_bytes for packet in _packets())
+    packets = iter_packets(buffer[:-1])
+
+    for _ in range(7):
+        next(packets)
+
+    with pytest.raises(ValueError, match='invalid message data length'):
+        next(packets)
+
+
+def test_iter_packets_trailing_garbage():
+
+    packets = iter_packets(next(_packets()).as_bytes + b'dummy')
+
+    assert next(packets).payload_data == b'dummy'
+
+    with pytest.raises(ValueError, match='invalid data length'):
+        next(packets)
+
+
+def test_compact_from_bytes_ignores_trailing_data():
+
+    packet = next(_packets())
+    compact = CompactPacket.from_bytes(packet.as_bytes + b'trailing')
+
+    assert compact.as_bytes == packet.as_bytes
+
+
+def test_pool_ignores_trailing_data():
+
+    packet = next(_packets())
+
+    with PacketPool(size=1, capacity=64).decode(packet.as_bytes + b'trailing') as pooled:
+        assert pooled.as_bytes == packet.as_bytes
+        assert bytes(pooled.payload_data) == b'dummy'
@@ -0,0 +1,210 @@
+import pytest
+
+from udpcp import sim
+from udpcp.metrics import Registry
+
+
+def test_counter_and_gauge():
+
+    registry = Registry()
+    counter = registry.counter('packets_total', 'Packets.')
+    gauge = registry.gauge('backlog', 'Backlog.')
+
+    counter.inc()
+    counter.inc(2)
+    gauge.inc(5)
+    gauge.dec()
+
+    assert counter.value == 3
+    assert gauge.value == 4
+    assert registry.snapshot() == {'udpcp_packets_total': 3, 'udpcp_backlog': 4}
+
+
+def test_histogram():
+
+    registry = Registry(namespace='')
+    histogram = registry.histogram('latency_seconds', 'Latency.', buckets=[0.1, 0.01, 1.0])
+
+    for value in (0.005, 0.01, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.bounds == (0.01, 0.1, 1.0)
+    assert histogram.buckets == [2, 0, 1, 1]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(2.515)
+
+
+def test_histogram_observe_many():
+
+    registry = Registry(namespace='')
+    one = registry.histogram('one_seconds', 'One.', buckets=[0.01, 0.1, 1.0])
+    many = registry.histogram('many_seconds', 'Many.', buckets=[0.01, 0.1, 1.0])
+    observed = [2.0, 0.1, 0.005, 0.01, 0.5, 0.1, 1.0, 0.0, 7.5]
+
+    for value in observed:
+        one.observe(value)
+
+    many.observe_many(observed)
+    many.observe_many([])
+
+    assert many.buckets == one.buckets == [3, 2, 2, 2]
+    assert many.count == one.count == 9
+    assert many.sum == pytest.approx(one.sum)
+
+
+def test_preallocated_values():
+
+    registry = Registry()
+    first = registry.counter('first_total', 'First.')
+    histogram = registry.histogram('latency_seconds', 'Latency.', buckets=[1.0])
+    second = registry.counter('second_total', 'Second.')
+
+    first.inc()
+    histogram.observe(0.5)
+    second.inc(7)
+
+    assert list(registry.values) == [1, 1, 0, 0.5, 1, 7]
+
+
+def test_remove():
+
+    registry = Registry()
+    first = registry.counter('value_total', 'Value.', {'endpoint': 'a'})
+    histogram = registry.histogram('latency_seconds', 'Latency.', {'endpoint': 'a'}, [1.0])
+    second = registry.counter('value_total', 'Value.', {'endpoint': 'b'})
+
+    first.inc()
+    histogram.observe(0.5)
+    second.inc(7)
+
+    registry.remove({'endpoint': 'a'})
+    first.inc()
+    second.inc()
+
+    assert list(registry.values) == [8]
+    assert registry.snapshot() == {'udpcp_value_total{endpoint="b"}': 8}
+    assert first.value == 2
+
+
+def test_exposition():
+
+    registry = Registry()
+    registry.counter('packets_total', 'Packets.', {'endpoint': 'a'}).inc(3)
+    registry.counter('packets_total', 'Packets.', {'endpoint': 'b"\\'}).inc(1.5)
+    registry.histogram('latency_seconds', 'Latency.', buckets=[0.5, 1.0]).observe(0.75)
+
+    assert registry.exposition() == (
+        '# HELP udpcp_packets_total Packets.\n'
+        '# TYPE udpcp_packets_total counter\n'
+        'udpcp_packets_total{endpoint="a"} 3\n'
+        'udpcp_packets_total{endpoint="b\\"\\\\"} 1.5\n'
+        '# HELP udpcp_latency_seconds Latency.\n'
+        '# TYPE udpcp_latency_seconds histogram\n'
+        'udpcp_latency_seconds_bucket{le="0.5"} 0\n'
+        'udpcp_latency_seconds_bucket{le="1.0"} 1\n'
+        'udpcp_latency_seconds_bucket{le="+Inf"} 1\n'
+        'udpcp_latency_seconds_sum 0.75\n'
+        'udpcp_latency_seconds_count 1\n'
+    )
+
+
+def test_collectors_and_sinks(tmp_path):
+
+    registry = Registry()
+    gauge = registry.gauge('value', 'Value.')
+    flushed = []
+
+    def collector():
+
+        gauge.value = 42
+
+    registry.add_collector(collector)
+    registry.add_sink(lambda registry: flushed.append(registry.snapshot()))
+    registry.flush()
+
+    assert flushed == [{'udpcp_value': 42}]
+
+    registry.remove_collector(collector)
+    gauge.value = 1
+
+    path = tmp_path / 'udpcp.prom'
+    registry.write_textfile(str(path))
+
+    assert path.read_text().endswith('udpcp_value 1\n')
+    assert [entry.name for entry in tmp_path.iterdir()] == ['udpcp.prom']
+
+
+def test_endpoint_metrics():
+
+    registry = Registry()
+
+    async def scenario(network):
+
+        server = await network.open_endpoint(metrics=registry)
+        client = await network.open_endpoint(metrics=registry)
+
+        for _ in range(10):
+            await client.send(server.local_address, b'message')
+
+        client.datagram_received(b'short', server.local_address)
+
+        return client.local_address, server.local_address
+
+    client, server = sim.run(scenario, link=sim.Link(latency=0.01))
+    snapshot = registry.snapshot()
+    client_labels = f'{{endpoint="{client[0]}:{client[1]}"}}'
+    server_labels = f'{{endpoint="{server[0]}:{server[1]}"}}'
+
+    assert snapshot[f'udpcp_sent_messages_total{client_labels}'] == 10
+    assert snapshot[f'udpcp_received_acks_total{client_labels}'] == 10
+    assert snapshot[f'udpcp_invalid_packets_total{client_labels}'] == 1
+    assert snapshot[
+        f'udpcp_decode_errors_total{client_labels[:-1]},reason="Short"}}'
+    ] == 1
+    assert snapshot[f'udpcp_delivered_messages_total{server_labels}'] == 10
+    assert snapshot[f'udpcp_outstanding_messages{client_labels}'] == 0
+
+    latency = snapshot[f'udpcp_ack_latency_seconds{client_labels}']
+
+    assert latency['count'] == 10
+    assert latency['sum'] == pytest.approx(0.2)
+    assert latency['buckets'][0.025] == 10
+
+
+def test_endpoint_without_metrics():
+
+    async def scenario(network):
+
+        server = await network.open_endpoint()
+        client = await network.open_endpoint()
+
+        await client.send(server.local_address, b'message')
+
+        return client._ack_latency, client._collector
+
+    assert sim.run(scenario) == (None, None)
+
+
+def test_endpoint_metrics_detached_on_close():
+
+    registry = Registry()
+
+    async def scenario(network):
+
+        server = await network.open_endpoint(metrics=registry)
+        client = await network.open_endpoint(metrics=registry)
+        await client.send(server.local_address, b'message')
+
+        client.close()
+        await client.wait_closed()
+
+        return server.local_address
+
+    server = sim.run(scenario)
+
+    assert len(registry._collectors) == 1
+    assert registry.snapshot()
+    assert all(
+        f'endpoint="{server[0]}:{server[1]}"' in key
+        for key in registry.snapshot()
+    )
@@ -0,0 +1,241 @@
+import asyncio
+
+import pytest
+
+from udpcp import sim
+from udpcp.multicast import MulticastSender, MulticastReceiver, _encode_nack, _decode_nack
+from udpcp.protocol import Packet, MessageType, ChecksumMode, TransferMode
+
+GROUP = ('239.255.0.1', 5000)
+SENDER = ('10.0.0.1', 4000)
+MESSAGE = bytes(range(256)) * 4
+
+
+class _Transport(asyncio.DatagramTransport):
+
+    def __init__(self, address):
+
+        super().__init__()
+
+        self.address = address
+        self.sent = []
+
+    def sendto(self, data, addr=None):
+
+        self.sent.append((addr, data))
+
+    def get_extra_info(self, name, default=None):
+
+        return self.address if name == 'sockname' else default
+
+    def is_closing(self):
+
+        return False
+
+
+@pytest.fixture
+def loop():
+
+    loop = sim.VirtualEventLoop()
+    asyncio.set_event_loop(loop)
+
+    yield loop
+
+    asyncio.set_event_loop(None)
+    loop.close()
+
+
+def _connect(protocol, address):
+
+    transport = _Transport(address)
+    protocol.connection_made(transport)
+
+    return transport
+
+
+def _take(transport):
+
+    sent, transport.sent = transport.sent, []
+
+    return sent
+
+
+def test_nack_encoding():
+
+    assert _decode_nack(_encode_nack(7, [0, 5, 8, 254])) == (7, [0, 5, 8, 254])
+    assert _decode_nack(_encode_nack(7, None)) == (7, list(range(255)))
+    assert _decode_nack(b'NK') is None
+
+
+def test_send_once_to_group(loop):
+
+    sender = MulticastSender(GROUP, fragment_size=100)
+    transport = _connect(sender, SENDER)
+
+    message_id = sender.send(MESSAGE)
+
+    sent = _take(transport)
+
+    assert message_id == 1
+    assert len(sent) == 11
+    assert {address for address, _ in sent} == {GROUP}
+    assert sender.cached == 11
+
+
+def test_ack_every_packet_rejected(loop):
+
+    sender = MulticastSender(GROUP)
+    _connect(sender, SENDER)
+
+    with pytest.raises(ValueError):
+        sender.send(b'data', TransferMode.AckEveryPacket)
+
+
+def test_nack_repair(loop):
+
+    sender = MulticastSender(GROUP, fragment_size=100)
+    sender_transport = _connect(sender, SENDER)
+    receiver = MulticastReceiver(nack_delay=0.02)
+    receiver_transport = _connect(receiver, GROUP)
+
+    sender.send(MESSAGE)
+
+    for number, (_, data) in enumerate(_take(sender_transport)):
+        if number not in (3, 10):
+            receiver.datagram_received(data, SENDER)
+
+    assert receiver.reassembling == 1
+
+    loop.run_until_complete(asyncio.sleep(0.05))
+
+    nacks = _take(receiver_transport)
+
+    assert nacks == [(SENDER, _encode_nack(1, [3, 10]))]
+
+    sender.datagram_received(nacks[0][1], ('10.0.0.2', 5000))
+    sender.datagram_received(nacks[0][1], ('10.0.0.3', 5000))
+
+    repairs = _take(sender_transport)
+
+    assert len(repairs) == 2
+    assert sender.statistics.repairs == 2
+    assert sender.statistics.suppressed_repairs == 2
+
+    for _, data in repairs:
+        receiver.datagram_received(data, SENDER)
+
+    assert loop.run_until_complete(receiver.receive()) == (SENDER, MESSAGE)
+    assert receiver.reassembling == 0
+
+    receiver.datagram_received(repairs[0][1], SENDER)
+
+    assert receiver.statistics.duplicate_packets == 1
+
+
+def test_lost_message(loop):
+
+    sender = MulticastSender(GROUP)
+    sender_transport = _connect(sender, SENDER)
+    receiver = MulticastReceiver()
+    receiver_transport = _connect(receiver, GROUP)
+
+    for payload in (b'first', b'second', b'third'):
+        sender.send(payload)
+
+    sent = _take(sender_transport)
+
+    receiver.datagram_received(sent[0][1], SENDER)
+    receiver.datagram_received(sent[2][1], SENDER)
+
+    loop.run_until_complete(asyncio.sleep(0.05))
+
+    nacks = _take(receiver_transport)
+
+    assert nacks == [(SENDER, _encode_nack(2, None))]
+
+    sender.datagram_received(nacks[0][1], ('10.0.0.2', 5000))
+    receiver.datagram_received(_take(sender_transport)[0][1], SENDER)
+
+    assert [loop.run_until_complete(receiver.receive())[1] for _ in range(3)] == [
+        b'first', b'third', b'second',
+    ]
+
+
+def test_nack_retries(loop):
+
+    sender = MulticastSender(GROUP, fragment_size=100)
+    sender_transport = _connect(sender, SENDER)
+    receiver = MulticastReceiver(nack_delay=0.01, nack_interval=0.01, nack_retries=3)
+    receiver_transport = _connect(receiver, GROUP)
+
+    sender.send(MESSAGE)
+    receiver.datagram_received(_take(sender_transport)[0][1], SENDER)
+
+    loop.run_until_complete(asyncio.sleep(1.0))
+
+    assert len(_take(receiver_transport)) == 3
+    assert receiver.reassembling == 0
+    assert receiver.statistics.expired_reassemblies == 1
+
+
+@pytest.mark.parametrize('fragment_amount, fragment_number', [(2, 5), (0, 0), (1, 1)])
+def test_invalid_fragment(loop, fragment_amount, fragment_number):
+
+    receiver = MulticastReceiver(nack_delay=0.01, nack_interval=0.01)
+    receiver_transport = _connect(receiver, GROUP)
+
+    data = Packet(
+        MessageType.Data, TransferMode.AckNone, ChecksumMode.Enabled, False,
+        fragment_amount, fragment_number, 1, 5, b'dummy',
+    ).as_bytes
+
+    receiver.datagram_received(data, SENDER)
+
+    loop.run_until_complete(asyncio.sleep(1.0))
+
+    assert receiver.statistics.invalid_packets == 1
+    assert receiver.reassembling == 0
+    assert not _take(receiver_transport)
+
+
+def test_ack_last_fragment_only(loop):
+
+    sender = MulticastSender(GROUP, fragment_size=100)
+    sender_transport = _connect(sender, SENDER)
+    receivers = [MulticastReceiver() for _ in range(3)]
+    transports = [_connect(receiver, GROUP) for receiver in receivers]
+
+    message_id = sender.send(MESSAGE, TransferMode.AckLastFragmentOnly)
+    sent = _take(sender_transport)
+
+    for index, (receiver, transport) in enumerate(zip(receivers, transports)):
+
+        for _, data in reversed(sent):
+            receiver.datagram_received(data, SENDER)
+
+        (address, ack), = _take(transport)
+
+        assert address == SENDER
+        assert Packet.from_bytes(ack).fragment_number == 10
+
+        sender.datagram_received(ack, ('10.0.0.2', 5000 + index))
+
+    assert sender.acknowledged(message_id) == {('10.0.0.2', 5000 + index) for index in range(3)}
+
+
+def test_cache_eviction(loop):
+
+    sender = MulticastSender(GROUP, fragment_size=100, cache_size=255)
+    sender_transport = _connect(sender, SENDER)
+
+    sender.send(bytes(200 * 100))
+    sender.send(bytes(100 * 100))
+
+    assert sender.cached == 255
+
+    _take(sender_transport)
+    sender.datagram_received(_encode_nack(1, [0, 199]), ('10.0.0.2', 5000))
+
+    assert len(_take(sender_transport)) == 1
+    assert sender.statistics.missed_repairs == 1
+    assert sender.acknowledged(1) == frozenset()
@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+
+from udpcp import sim
+from udpcp.metrics import Registry
+from udpcp.endpoint import Endpoint
+from udpcp.overload import Shedding
+from udpcp.protocol import Packet, TransferMode, ChecksumMode
+
+
+class _Transport(asyncio.DatagramTransport):
+
+    def __init__(self):
+
+        super().__init__()
+
+        self.sent = []
+
+    def sendto(self, data, addr=None):
+
+        self.sent.append((addr, data))
+
+    def get_extra_info(self, name, default=None):
+
+        return ('127.0.0.1', 10000) if name == 'sockname' else default
+
+    def close(self):
+
+        pass
+
+
+def _data(message_id, fragment_number=0, fragment_amount=1, mode=TransferMode.AckEveryPacket):
+
+    return Packet.data(
+        transfer_mode=mode,
+        checksum_mode=ChecksumMode.Enabled,
+        fragment_amount=fragment_amount,
+        fragment_number=fragment_number,
+        message_id=message_id,
+        payload_data=bytes([message_id, fragment_number]),
+    ).as_bytes
+
+
+def _endpoint(loop, shedding, **kwargs):
+
+    asyncio.set_event_loop(loop)
+
+    transport = _Transport()
+    endpoint = Endpoint(shedding=shedding, **kwargs)
+    endpoint.connection_made(transport)
+
+    return endpoint, transport
+
+
+@pytest.fixture
+def loop():
+
+    loop = sim.VirtualEventLoop()
+
+    yield loop
+
+    asyncio.set_event_loop(None)
+    loop.close()
+
+
+def test_shed_new_reassemblies(loop):
+
+    endpoint, transport = _endpoint(loop, Shedding(max_reassemblies=1))
+
+    endpoint.datagram_received(_data(1, 0, 2), 'peer')
+    endpoint.datagram_received(_data(2, 0, 2), 'peer')
+
+    assert endpoint.overloaded
+    assert endpoint.reassembling == 1
+    assert endpoint.statistics.shed_reassemblies == 1
+    assert len(transport.sent) == 1
+
+    endpoint.datagram_received(_data(1, 1, 2), 'peer')
+    endpoint.datagram_received(_data(1, 1, 2), 'peer')
+
+    assert not endpoint.overloaded
+    assert endpoint.statistics.delivered_messages == 1
+    assert endpoint.statistics.duplicate_packets == 1
+
+    endpoint.datagram_received(_data(2, 0, 2), 'peer')
+
+    assert endpoint.reassembling == 1
+    assert len(transport.sent) == 4
+
+
+def test_shed_unreliable(loop):
+
+    endpoint, _ = _endpoint(loop, Shedding(max_backlog=2))
+
+    for message_id in range(1, 5):
+        endpoint.datagram_received(_data(message_id, mode=TransferMode.AckNone), 'peer')
+
+    endpoint.datagram_received(_data(20, 0, 2), 'peer')
+    endpoint.datagram_received(_data(21), 'peer')
+
+    assert endpoint.overloaded
+    assert endpoint.statistics.delivered_messages == 2
+    assert endpoint.statistics.shed_unreliable == 2
+    assert endpoint.statistics.shed_reassemblies == 2
+
+
+def test_kernel_drops(loop):
+
+    registry = Registry()
+    endpoint, _ = _endpoint(loop, Shedding(hold=0.5), metrics=registry)
+
+    assert not endpoint.overloaded
+
+    endpoint._overflowed(5)
+    endpoint.datagram_received(_data(1, mode=TransferMode.AckNone), 'peer')
+
+    snapshot = registry.snapshot()
+
+    assert endpoint.overloaded
+    assert endpoint.statistics.kernel_drops == 5
+    assert snapshot['udpcp_kernel_drops_total{endpoint="127.0.0.1:10000"}'] == 5
+    assert snapshot['udpcp_shed_unreliable_total{endpoint="127.0.0.1:10000"}'] == 1
+    assert snapshot['udpcp_receive_overloaded{endpoint="127.0.0.1:10000"}'] == 1
+
+    loop.run_until_complete(asyncio.sleep(0.5))
+
+    assert not endpoint.overloaded
+
+
+def test_no_shedding(loop):
+
+    endpoint, _ = _endpoint(loop, None)
+
+    endpoint._overflowed(5)
+
+    for message_id in range(1, 11):
+        endpoint.datagram_received(_data(message_id, 0, 2), 'peer')
+
+    assert not endpoint.overloaded
+    assert endpoint.reassembling == 10
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'max_reassemblies': 0},
+    {'max_backlog': 0},
+    {'hold': -1},
+])
+def test_invalid(kwargs):
+
+    with pytest.raises(ValueError):
+        Shedding(**kwargs)
+
+
+def test_invalid_buffer_size():
+
+    with pytest.raises(ValueError):
+        Endpoint(receive_buffer=-1)
@@ -1,6 +1,7 @@
 import pytest
 
 from udpcp.protocol import Packet, MessageType, ChecksumMode, TransferMode
+from udpcp.protocol._utils import specification
 
 
 def test_ack():
@@ -670,3 +671,43 @@ def test_decode_invalid_packet_checksum():
 
     with pytest.raises(ValueError):
         Packet.from_bytes(bytes(encoded))
+
+
+def test_decode_memoryview():
+
+    encoded = Packet.data(
+        checksum_mode=ChecksumMode.Enabled,
+        transfer_mode=TransferMode.AckEveryPacket,
+        fragment_amount=1,
+        fragment_number=0,
+        message_id=1,
+        payload_data=b'dummy',
+    )
+
+    packet = Packet.from_bytes(memoryview(bytes(encoded)))
+
+    assert bytes(packet.payload_data) == b'dummy'
+    assert packet.checksum == encoded.checksum
+    assert bytes(packet) == bytes(encoded)
+
+
+def test_raw_packet():
+
+    encoded = Packet.data(
+        checksum_mode=ChecksumMode.Enabled,
+        transfer_mode=TransferMode.AckEveryPacket,
+        fragment_amount=3,
+        fragment_number=1,
+        message_id=7,
+        payload_data=b'dummy',
+    )
+
+    raw = specification.from_bytes(bytes(encoded))
+
+    assert raw.checksum == encoded.checksum
+    assert raw.flags.message_type is MessageType.Data
+    assert raw.flags.version == Packet.version
+    assert not raw.dbit
+    assert (raw.fragment_amount, raw.fragment_number, raw.message_id) == (3, 1, 7)
+    assert raw.payload_data == b'dummy'
+    assert specification.as_bytes(encoded) == bytes(encoded)
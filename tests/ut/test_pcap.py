@@ -0,0 +1,252 @@
+import io
+import struct
+
+import pytest
+
+from udpcp import pcap
+from udpcp.protocol import Packet, ChecksumMode, TransferMode, CompactPacket
+
+
+def _packets(count: int = 10):
+
+    return [
+        Packet.data(
+            checksum_mode=ChecksumMode.Enabled,
+            transfer_mode=TransferMode.AckEveryPacket,
+            fragment_amount=count,
+            fragment_number=index,
+            message_id=1,
+            payload_data=bytes([index]) * index,
+        )
+        for index in range(count)
+    ]
+
+
+def _frames(path):
+
+    with open(path, 'rb') as handle:
+        data = handle.read()
+
+    offset = 24
+
+    while offset < len(data):
+        seconds, microseconds, captured, _ = struct.unpack_from('<IIII', data, offset)
+        yield seconds * 1000000 + microseconds, data[offset + 16:offset + 16 + captured]
+        offset += 16 + captured
+
+
+def _write(tmp_path) -> str:
+
+    path = str(tmp_path / 'capture.pcap')
+    pcap.write(path, _packets())
+
+    return path
+
+
+def _block(kind: int, body: bytes) -> bytes:
+
+    body += bytes(-len(body) % 4)
+
+    return struct.pack('<II', kind, len(body) + 12) + body + struct.pack('<I', len(body) + 12)
+
+
+def test_write_read(tmp_path):
+
+    path = str(tmp_path / 'capture.pcap')
+    packets = _packets()
+
+    assert pcap.write(path, packets, start=100.0, interval=0.5) == len(packets)
+
+    datagrams = list(pcap.read(path))
+
+    assert len(datagrams) == len(packets)
+
+    for index, (datagram, packet) in enumerate(zip(datagrams, packets)):
+        assert datagram.timestamp == pytest.approx(100.0 + index * 0.5)
+        assert datagram.source == ('127.0.0.1', 4000)
+        assert datagram.destination == ('127.0.0.1', 5000)
+        assert datagram.payload.tobytes() == packet.as_bytes
+
+
+def test_packets(tmp_path):
+
+    path = str(tmp_path / 'capture.pcap')
+    packets = _packets()
+
+    pcap.write(path, packets)
+
+    assert [packet.as_bytes for packet in pcap.packets(path)] == \
+        [packet.as_bytes for packet in packets]
+
+
+def test_views(tmp_path):
+
+    path = str(tmp_path / 'capture.pcap')
+    packets = _packets()
+
+    pcap.write(path, packets)
+
+    views = list(pcap.views(path))
+
+    assert all(isinstance(view, CompactPacket) for view in views)
+    assert [view.fragment_number for view in views] == list(range(len(packets)))
+
+
+def test_invalid_packets(tmp_path):
+
+    path = str(tmp_path / 'capture.pcap')
+
+    pcap.write(path, [b'dummy', _packets(1)[0]])
+
+    assert len(list(pcap.packets(path))) == 1
+
+    with pytest.raises(ValueError):
+        list(pcap.packets(path, strict=True))
+
+
+def test_ports(tmp_path):
+
+    path = str(tmp_path / 'capture.pcap')
+    handle = io.BytesIO()
+
+    with pcap.Writer(handle) as writer:
+        writer.write(b'first', ('10.0.0.1', 1000), ('10.0.0.2', 2000), 1.0)
+        writer.write(b'second', ('10.0.0.1', 3000), ('10.0.0.2', 4000), 2.0)
+
+    with open(path, 'wb') as output:
+        output.write(handle.getvalue())
+
+    assert [bytes(datagram.payload) for datagram in pcap.read(path, ports=[2000])] == [b'first']
+    assert [bytes(datagram.payload) for datagram in pcap.read(path, ports=[3000])] == [b'second']
+    assert len(list(pcap.read(path, ports=[5000]))) == 0
+
+
+def test_ipv6(tmp_path):
+
+    path = str(tmp_path / 'capture.pcap')
+
+    pcap.write(path, _packets(), source=('::1', 4000), destination=('fe80::1', 5000))
+
+    datagrams = list(pcap.read(path))
+
+    assert len(datagrams) == 10
+    assert datagrams[0].source == ('::1', 4000)
+    assert datagrams[0].destination == ('fe80::1', 5000)
+
+
+def test_pcapng(tmp_path):
+
+    source = str(tmp_path / 'capture.pcap')
+    path = str(tmp_path / 'capture.pcapng')
+    packets = _packets()
+
+    pcap.write(source, packets, start=10.0, interval=1.0)
+
+    blocks = [
+        _block(0x0A0D0D0A, struct.pack('<IHHq', 0x1A2B3C4D, 1, 0, -1)),
+        _block(1, struct.pack('<HHI', 1, 0, 0) + struct.pack('<HHB3x', 9, 1, 3) + bytes(4)),
+    ]
+
+    for microseconds, frame in _frames(source):
+        milliseconds = microseconds // 1000
+        blocks.append(_block(6, struct.pack(
+            '<IIIII', 0, milliseconds >> 32, milliseconds & 0xFFFFFFFF, len(frame), len(frame),
+        ) + frame))
+
+    with open(path, 'wb') as handle:
+        handle.write(b''.join(blocks))
+
+    datagrams = list(pcap.read(path))
+
+    assert [datagram.payload.tobytes() for datagram in datagrams] == \
+        [packet.as_bytes for packet in packets]
+    assert [datagram.timestamp for datagram in datagrams] == \
+        pytest.approx([10.0 + index for index in range(10)])
+
+
+@pytest.mark.parametrize('order', ['little', 'big'])
+@pytest.mark.parametrize('family, source, destination', [
+    (2, ('127.0.0.1', 4000), ('127.0.0.1', 5000)),
+    (30, ('::1', 4000), ('fe80::1', 5000)),
+])
+def test_null_linktype(tmp_path, order, family, source, destination):
+
+    ethernet = str(tmp_path / 'capture.pcap')
+    path = str(tmp_path / 'null.pcap')
+    packets = _packets()
+
+    pcap.write(ethernet, packets, source=source, destination=destination)
+
+    blocks = [struct.pack('<IHHiIII', 0xA1B2C3D4, 2, 4, 0, 0, 65535, pcap.LINKTYPE_NULL)]
+
+    for _, frame in _frames(ethernet):
+        frame = family.to_bytes(4, order) + frame[14:]
+        blocks.append(struct.pack('<IIII', 0, 0, len(frame), len(frame)) + frame)
+
+    with open(path, 'wb') as handle:
+        handle.write(b''.join(blocks))
+
+    datagrams = list(pcap.read(path))
+
+    assert [datagram.payload.tobytes() for datagram in datagrams] == \
+        [packet.as_bytes for packet in packets]
+    assert datagrams[0].source == source
+
+
+def test_pcapng_invalid_interface(tmp_path):
+
+    path = tmp_path / 'capture.pcapng'
+    frame = next(_frames(_write(tmp_path)))[1]
+
+    path.write_bytes(b''.join([
+        _block(0x0A0D0D0A, struct.pack('<IHHq', 0x1A2B3C4D, 1, 0, -1)),
+        _block(1, struct.pack('<HHI', 1, 0, 0)),
+        _block(6, struct.pack('<IIIII', 1, 0, 0, len(frame), len(frame)) + frame),
+    ]))
+
+    with pytest.raises(ValueError, match='invalid interface index'):
+        list(pcap.read(str(path)))
+
+
+def test_skip_truncated(tmp_path):
+
+    source = str(tmp_path / 'capture.pcap')
+    path = str(tmp_path / 'truncated.pcap')
+
+    pcap.write(source, _packets(3))
+
+    with open(source, 'rb') as handle:
+        header = handle.read(24)
+
+    frames = list(_frames(source))
+
+    with open(path, 'wb') as handle:
+
+        handle.write(header)
+
+        for timestamp, frame in frames:
+            frame = frame[:-1] if frame is frames[1][1] else frame
+            handle.write(struct.pack('<IIII', 0, 0, len(frame), len(frame)) + frame)
+
+    assert len(list(pcap.read(path))) == 2
+
+
+def test_invalid_file(tmp_path):
+
+    path = tmp_path / 'capture.pcap'
+
+    path.write_bytes(b'')
+
+    with pytest.raises(ValueError):
+        pcap.Reader(str(path))
+
+    path.write_bytes(b'dummy data')
+
+    with pytest.raises(ValueError):
+        pcap.Reader(str(path))
+
+
+def test_payload_too_large(tmp_path):
+
+    with pytest.raises(ValueError):
+        pcap.write(io.BytesIO(), [bytes(65536)])
@@ -0,0 +1,185 @@
+import socket
+
+import pytest
+
+from udpcp.protocol import Packet, ChecksumMode, TransferMode, PacketPool
+
+
+def _data(payload_data: bytes = b'dummy') -> Packet:
+
+    return Packet.data(
+        checksum_mode=ChecksumMode.Enabled,
+        transfer_mode=TransferMode.AckEveryPacket,
+        fragment_amount=10,
+        fragment_number=5,
+        message_id=12345,
+        payload_data=payload_data,
+    )
+
+
+def test_decode():
+
+    pool = PacketPool()
+    packet = _data()
+
+    pooled = pool.decode(packet.as_bytes)
+
+    assert pooled.is_data
+    assert pooled.header == packet.header
+    assert pooled.as_bytes == packet.as_bytes
+    assert bytes(pooled.payload_data) == b'dummy'
+    assert pooled.fragment_number == 5
+    assert pooled.message_id == 12345
+
+
+def test_reuse():
+
+    pool = PacketPool()
+
+    first = pool.decode(_data(b'first').as_bytes)
+    first.release()
+
+    second = pool.decode(_data(b'second').as_bytes)
+
+    assert second is first
+    assert bytes(second.payload_data) == b'second'
+    assert pool.allocated == 1
+    assert pool.reused == 1
+
+
+def test_size():
+
+    pool = PacketPool(size=1)
+
+    first = pool.acquire()
+    second = pool.acquire()
+
+    first.release()
+    second.release()
+
+    assert len(pool) == 1
+
+
+def test_context_manager():
+
+    pool = PacketPool()
+
+    with pool.decode(_data().as_bytes) as packet:
+        assert packet.is_data
+
+    assert len(pool) == 1
+
+
+def test_decode_invalid():
+
+    pool = PacketPool()
+    data = bytearray(_data().as_bytes)
+    data[0] ^= 0xFF
+
+    with pytest.raises(ValueError):
+        pool.decode(bytes(data))
+
+    assert len(pool) == 1
+
+
+def test_decode_too_large():
+
+    pool = PacketPool(capacity=16)
+
+    with pytest.raises(ValueError):
+        pool.decode(_data().as_bytes)
+
+
+def test_invalid_capacity():
+
+    with pytest.raises(ValueError):
+        PacketPool(capacity=4)
+
+
+def test_release_foreign():
+
+    packet = PacketPool().acquire()
+
+    with pytest.raises(ValueError):
+        PacketPool().release(packet)
+
+
+def test_debug_use_after_release():
+
+    pool = PacketPool(debug=True)
+    packet = pool.decode(_data().as_bytes)
+    payload_data = packet.payload_data
+
+    packet.release()
+
+    with pytest.raises(RuntimeError):
+        packet.message_id
+
+    with pytest.raises(RuntimeError):
+        bytes(packet.payload_data)
+
+    with pytest.raises(RuntimeError):
+        packet.load(0)
+
+    with pytest.raises(ValueError):
+        bytes(payload_data)
+
+
+def test_debug_double_release():
+
+    pool = PacketPool(debug=True)
+    packet = pool.acquire()
+
+    packet.release()
+
+    with pytest.raises(RuntimeError):
+        packet.release()
+
+
+def test_double_release():
+
+    pool = PacketPool()
+    packet = pool.acquire()
+
+    packet.release()
+
+    with pytest.raises(RuntimeError):
+        packet.release()
+
+    assert len(pool) == 1
+    assert pool.acquire() is not pool.acquire()
+
+
+def test_debug_reacquire():
+
+    pool = PacketPool(debug=True)
+
+    stale = pool.decode(_data().as_bytes)
+    stale.release()
+
+    packet = pool.decode(_data(b'again').as_bytes)
+
+    assert bytes(packet.payload_data) == b'again'
+    assert pool.reused == 1
+
+    with pytest.raises(RuntimeError):
+        stale.message_id
+
+    with pytest.raises(RuntimeError):
+        stale.buffer[0]
+
+    with pytest.raises(RuntimeError):
+        stale.release()
+
+
+def test_receive():
+
+    pool = PacketPool()
+    sender, receiver = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+    with sender, receiver:
+
+        sender.send(_data().as_bytes)
+        packet, _ = pool.receive(receiver)
+
+        assert packet.as_bytes == _data().as_bytes
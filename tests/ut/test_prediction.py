@@ -0,0 +1,203 @@
+import asyncio
+
+import pytest
+
+from udpcp import sim
+
+from udpcp.metrics import Registry
+from udpcp.endpoint import Endpoint
+from udpcp.protocol import (
+    Packet,
+    HeaderPredictor,
+    MessageType,
+    TransferMode,
+    ChecksumMode,
+    DecodeStatus,
+)
+
+PEER = ('127.0.0.1', 10000)
+
+
+def _stream(messages, fragments, checksum_mode=ChecksumMode.Enabled, first=1):
+
+    return [
+        Packet.data(
+            transfer_mode=TransferMode.AckEveryPacket,
+            checksum_mode=checksum_mode,
+            fragment_amount=fragments,
+            fragment_number=number,
+            message_id=message_id,
+            payload_data=bytes([number]) * (100 if number < fragments - 1 else 37),
+        ).as_bytes
+        for message_id in range(first, first + messages)
+        for number in range(fragments)
+    ]
+
+
+def _fields(packet):
+
+    return (
+        packet.checksum,
+        packet.message_type,
+        packet.transfer_mode,
+        packet.checksum_mode,
+        packet.is_duplicate,
+        packet.fragment_amount,
+        packet.fragment_number,
+        packet.message_id,
+        packet.message_data_length,
+        bytes(packet.payload_data),
+    )
+
+
+@pytest.mark.parametrize('checksum_mode', list(ChecksumMode), ids=lambda mode: mode.name)
+@pytest.mark.parametrize('fragments', [1, 10])
+def test_matches_full_decoder(checksum_mode, fragments):
+
+    predictor = HeaderPredictor()
+    stream = _stream(5, fragments, checksum_mode)
+
+    for data in stream:
+
+        status, packet = predictor.try_from_bytes(data, PEER)
+
+        assert status is DecodeStatus.Ok
+        assert _fields(packet) == _fields(Packet.from_bytes(data))
+        assert packet.as_bytes == data
+
+    assert predictor.misses == 1
+    assert predictor.hits == len(stream) - 1
+    assert predictor.hit_rate == pytest.approx((len(stream) - 1) / len(stream))
+
+
+def test_message_id_wraps():
+
+    predictor = HeaderPredictor()
+    stream = _stream(1, 1, first=0xFFFF) + _stream(1, 1, first=1)
+
+    assert [predictor.try_from_bytes(data, PEER)[1].message_id for data in stream] == [0xFFFF, 1]
+    assert predictor.hits == 1
+
+
+def test_reordered_fragments_miss():
+
+    predictor = HeaderPredictor()
+    stream = _stream(1, 4)
+
+    for data in (stream[0], stream[2], stream[3], stream[1]):
+        assert predictor.try_from_bytes(data, PEER)[0] is DecodeStatus.Ok
+
+    assert predictor.hits == 1
+    assert predictor.misses == 3
+
+
+def test_corrupted_packet_falls_back():
+
+    predictor = HeaderPredictor()
+    first, second = _stream(1, 2)
+
+    predictor.try_from_bytes(first, PEER)
+
+    corrupted = bytearray(second)
+    corrupted[-1] ^= 0xFF
+
+    assert predictor.try_from_bytes(bytes(corrupted), PEER) == (DecodeStatus.BadChecksum, None)
+    assert predictor.try_from_bytes(second[:20], PEER) == (DecodeStatus.LengthMismatch, None)
+    assert predictor.try_from_bytes(second, PEER)[0] is DecodeStatus.Ok
+    assert predictor.hits == 1
+
+
+def test_peers_are_separate():
+
+    predictor = HeaderPredictor(capacity=1)
+    first, second = _stream(1, 2)
+
+    predictor.try_from_bytes(first, PEER)
+    predictor.try_from_bytes(first, ('127.0.0.1', 20000))
+    predictor.try_from_bytes(second, PEER)
+
+    assert len(predictor) == 1
+    assert predictor.hits == 0
+
+    predictor.forget(PEER)
+
+    assert len(predictor) == 0
+
+
+def test_memoryview():
+
+    predictor = HeaderPredictor()
+
+    for data in _stream(2, 3):
+        _, packet = predictor.try_from_bytes(memoryview(data), PEER)
+
+    assert bytes(packet.payload_data) == bytes([2]) * 37
+    assert predictor.hits == 5
+
+
+def test_acks_not_predicted():
+
+    predictor = HeaderPredictor()
+    ack = Packet.ack(Packet.from_bytes(_stream(1, 1)[0])).as_bytes
+
+    predictor.try_from_bytes(ack, PEER)
+
+    assert len(predictor) == 0
+
+
+@pytest.mark.parametrize('fragment_amount, fragment_number', [(2, 255), (2, 5), (0, 0)])
+def test_invalid_fragment_not_predicted(fragment_amount, fragment_number):
+
+    predictor = HeaderPredictor()
+    data = Packet(
+        MessageType.Data, TransferMode.AckEveryPacket, ChecksumMode.Enabled, False,
+        fragment_amount, fragment_number, 1, 5, b'dummy',
+    ).as_bytes
+
+    status, packet = predictor.try_from_bytes(data, PEER)
+
+    assert status is DecodeStatus.Ok
+    assert not packet.is_fragment_valid
+    assert len(predictor) == 0
+
+
+class _Transport(asyncio.DatagramTransport):
+
+    def sendto(self, data, addr=None):
+
+        pass
+
+    def get_extra_info(self, name, default=None):
+
+        return PEER if name == 'sockname' else default
+
+
+def test_invalid_capacity():
+
+    with pytest.raises(ValueError):
+        HeaderPredictor(capacity=0)
+
+
+def test_endpoint_metric():
+
+    loop = sim.VirtualEventLoop()
+    asyncio.set_event_loop(loop)
+
+    try:
+        registry = Registry()
+        endpoint = Endpoint(metrics=registry)
+        endpoint.connection_made(_Transport())
+
+        for data in _stream(4, 5):
+            endpoint.datagram_received(data, ('127.0.0.1', 20000))
+
+        labels = '{endpoint="127.0.0.1:10000"}'
+        snapshot = registry.snapshot()
+
+        assert endpoint.statistics.delivered_messages == 4
+        assert snapshot[f'udpcp_predicted_packets_total{labels}'] == 19
+        assert snapshot[f'udpcp_header_prediction_hit_ratio{labels}'] == pytest.approx(19 / 20)
+        assert Endpoint(prediction=False).predictor is None
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
@@ -0,0 +1,222 @@
+import asyncio
+
+import pytest
+
+from udpcp.metrics import Registry
+from udpcp.endpoint import Endpoint
+from udpcp.scheduler import Scheduler, Priority
+from udpcp.protocol import Packet, TransferMode, ChecksumMode
+
+
+class _Transport(asyncio.DatagramTransport):
+
+    def __init__(self):
+
+        super().__init__()
+
+        self.sent = []
+
+    def sendto(self, data, addr=None):
+
+        self.sent.append((addr, data))
+
+    def get_extra_info(self, name, default=None):
+
+        return ('127.0.0.1', 10000) if name == 'sockname' else default
+
+    def close(self):
+
+        pass
+
+
+def _drain(scheduler):
+
+    items = []
+
+    while scheduler:
+        items.append(scheduler.pop())
+
+    return items
+
+
+def test_priority():
+
+    scheduler = Scheduler()
+
+    scheduler.push('a', b'bulk', Priority.Bulk)
+    scheduler.push('a', b'normal')
+    scheduler.push('b', b'telemetry', Priority.Telemetry)
+    scheduler.push('b', b'ack', Priority.Control)
+    scheduler.push('c', b'high', Priority.High)
+
+    assert len(scheduler) == 5
+    assert scheduler.queued_bytes == 26
+
+    assert _drain(scheduler) == [
+        ('b', b'ack'),
+        ('c', b'high'),
+        ('a', b'normal'),
+        ('a', b'bulk'),
+        ('b', b'telemetry'),
+    ]
+
+    assert scheduler.pop() is None
+    assert scheduler.queued_bytes == 0
+
+
+def test_fifo_per_peer():
+
+    scheduler = Scheduler()
+
+    for index in range(10):
+        scheduler.push('a', bytes([index]))
+
+    assert [packet for _, packet in _drain(scheduler)] == [bytes([index]) for index in range(10)]
+
+
+def test_deficit_round_robin():
+
+    scheduler = Scheduler(quantum=1000)
+
+    for _ in range(100):
+        scheduler.push('large', bytes(1000))
+
+    for _ in range(1000):
+        scheduler.push('small', bytes(100))
+
+    served = {'large': 0, 'small': 0}
+
+    for _ in range(550):
+        address, packet = scheduler.pop()
+        served[address] += len(packet)
+
+    assert served == {'large': 50000, 'small': 50000}
+
+
+def test_round_robin_peers():
+
+    scheduler = Scheduler(quantum=10)
+
+    for address in 'abc':
+        for _ in range(3):
+            scheduler.push(address, bytes(10))
+
+    assert ''.join(address for address, _ in _drain(scheduler)) == 'abcabcabc'
+
+
+def test_small_quantum():
+
+    scheduler = Scheduler(quantum=1)
+
+    scheduler.push('a', bytes(5))
+    scheduler.push('b', bytes(5))
+
+    assert sorted(address for address, _ in _drain(scheduler)) == ['a', 'b']
+
+
+def test_drop_oldest():
+
+    scheduler = Scheduler(capacities={Priority.Telemetry: 3})
+
+    for index in range(5):
+        kept = scheduler.push('a', bytes([index]), Priority.Telemetry)
+        assert kept == (index < 3)
+
+    scheduler.push('b', b'other', Priority.Telemetry)
+
+    assert scheduler.dropped[Priority.Telemetry] == 2
+    assert scheduler.queued(Priority.Telemetry) == 4
+    packets = sorted(packet for _, packet in _drain(scheduler))
+
+    assert packets == [b'\x02', b'\x03', b'\x04', b'other']
+
+
+def test_delays():
+
+    now = [0.0]
+    registry = Registry()
+
+    scheduler = Scheduler(clock=lambda: now[0])
+    scheduler.delays = [registry.histogram(f'delay_{index}', 'Delay.') for index in range(5)]
+
+    scheduler.push('a', b'data')
+    now[0] = 0.5
+    scheduler.pop()
+
+    assert scheduler.delays[Priority.Normal].count == 1
+    assert scheduler.delays[Priority.Normal].sum == 0.5
+
+
+def test_clear():
+
+    scheduler = Scheduler()
+
+    scheduler.push('a', b'data')
+    scheduler.push('b', b'data', Priority.Control)
+    scheduler.clear()
+
+    assert not scheduler
+    assert scheduler.dropped == [1, 0, 1, 0, 0]
+    assert scheduler.pop() is None
+
+
+@pytest.mark.parametrize('quantum, capacities', [
+    (0, None),
+    (1000, {Priority.Telemetry: 0}),
+])
+def test_invalid(quantum, capacities):
+
+    with pytest.raises(ValueError):
+        Scheduler(quantum, capacities)
+
+
+def test_endpoint_paused():
+
+    loop = asyncio.new_event_loop()
+
+    try:
+        asyncio.set_event_loop(loop)
+
+        transport = _Transport()
+        registry = Registry()
+        endpoint = Endpoint(fragment_size=100, telemetry_capacity=2, metrics=registry)
+        endpoint.connection_made(transport)
+
+        endpoint.pause_writing()
+
+        endpoint.send('bulk', bytes(1000), priority=Priority.Bulk)
+
+        for _ in range(5):
+            endpoint.send('telemetry', b'sample', TransferMode.AckNone)
+
+        endpoint.send('peer', b'data')
+
+        incoming = Packet.data(
+            transfer_mode=TransferMode.AckEveryPacket,
+            checksum_mode=ChecksumMode.Enabled,
+            fragment_amount=1,
+            fragment_number=0,
+            message_id=1,
+            payload_data=b'data',
+        )
+        endpoint.datagram_received(incoming.as_bytes, 'peer')
+
+        assert transport.sent == []
+        assert endpoint.queued == 14
+        assert endpoint.statistics.dropped_packets == 3
+
+        endpoint.resume_writing()
+
+        addresses = [address for address, _ in transport.sent]
+        snapshot = registry.snapshot()
+
+        assert Packet.from_bytes(transport.sent[0][1]).is_ack
+        assert addresses == ['peer', 'peer'] + ['bulk'] * 10 + ['telemetry'] * 2
+        assert endpoint.queued == 0
+        assert snapshot['udpcp_dropped_packets_total{endpoint="127.0.0.1:10000"}'] == 3
+        assert snapshot[
+            'udpcp_send_queue_delay_seconds{endpoint="127.0.0.1:10000",priority="Control"}'
+        ]['count'] == 1
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
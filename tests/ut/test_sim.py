@@ -0,0 +1,193 @@
+import asyncio
+
+import pytest
+
+from udpcp import sim
+from udpcp.protocol import TransferMode
+
+
+class _Recorder(asyncio.DatagramProtocol):
+
+    def __init__(self):
+
+        self.received = []
+        self.lost = False
+
+    def datagram_received(self, data, address):
+
+        self.received.append((asyncio.get_event_loop().time(), data, address))
+
+    def connection_lost(self, exc):
+
+        self.lost = True
+
+
+async def _pair(network):
+
+    sender, _ = await network.create_datagram_endpoint(_Recorder)
+    _, receiver = await network.create_datagram_endpoint(_Recorder, local_addr=('10.0.0.2', 5000))
+
+    return sender, receiver
+
+
+def test_virtual_clock():
+
+    async def scenario(network):
+
+        loop = asyncio.get_event_loop()
+
+        await asyncio.sleep(3600.0)
+
+        return loop.time()
+
+    assert sim.run(scenario) == pytest.approx(3600.0)
+
+
+def test_deadlock():
+
+    async def scenario(network):
+
+        await asyncio.get_event_loop().create_future()
+
+    with pytest.raises(RuntimeError):
+        sim.run(scenario)
+
+
+def test_latency():
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network)
+        sender.sendto(b'data', ('10.0.0.2', 5000))
+
+        await asyncio.sleep(1.0)
+
+        return sender.get_extra_info('sockname'), receiver.received
+
+    source, received = sim.run(scenario, link=sim.Link(latency=0.25))
+
+    assert received == [(pytest.approx(0.25), b'data', source)]
+
+
+def test_bandwidth():
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network)
+
+        for _ in range(3):
+            sender.sendto(bytes(1000), ('10.0.0.2', 5000))
+
+        await asyncio.sleep(1.0)
+
+        return [timestamp for timestamp, _, _ in receiver.received], network.statistics
+
+    link = sim.Link(latency=0.01, bandwidth=100_000.0, queue=2000)
+    timestamps, statistics = sim.run(scenario, link=link)
+
+    assert timestamps == [pytest.approx(0.02), pytest.approx(0.03)]
+    assert statistics.overflowed == 1
+
+
+def test_loss_and_duplication():
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network)
+
+        for index in range(1000):
+            sender.sendto(index.to_bytes(2, 'big'), ('10.0.0.2', 5000))
+
+        await asyncio.sleep(1.0)
+
+        return len(receiver.received), network.statistics
+
+    link = sim.Link(loss=0.1, duplicate=0.1, jitter=0.01, reorder=0.1)
+    received, statistics = sim.run(scenario, seed=1, link=link)
+
+    assert 0 < statistics.lost < 200
+    assert 0 < statistics.duplicated < 200
+    assert 0 < statistics.reordered < 200
+    assert received == statistics.delivered == 1000 - statistics.lost + statistics.duplicated
+
+
+def test_connect():
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network)
+        network.connect(sender.get_extra_info('sockname'), ('10.0.0.2', 5000), sim.Link(loss=1.0))
+        sender.sendto(b'data', ('10.0.0.2', 5000))
+        sender.sendto(b'data', ('10.0.0.3', 5000))
+
+        await asyncio.sleep(1.0)
+
+        return receiver.received, network.statistics
+
+    received, statistics = sim.run(scenario)
+
+    assert received == []
+    assert statistics.lost == 1
+    assert statistics.unreachable == 1
+
+
+def test_close():
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network)
+
+        with pytest.raises(OSError):
+            await network.create_datagram_endpoint(_Recorder, local_addr=('10.0.0.2', 5000))
+
+        sender.close()
+        await asyncio.sleep(0)
+
+        return sender.is_closing(), sender._protocol.lost
+
+    assert sim.run(scenario) == (True, True)
+
+
+def _transfer(seed):
+
+    async def scenario(network):
+
+        server = await network.open_endpoint()
+        client = await network.open_endpoint(fragment_size=100, timeout=0.05, retries=20)
+
+        await asyncio.gather(*(
+            client.send(server.local_address, bytes([index]) * 1000, mode)
+            for index in range(100)
+            for mode in (TransferMode.AckEveryPacket, TransferMode.AckLastFragmentOnly)
+        ))
+
+        messages = [(await server.receive())[1] for _ in range(200)]
+
+        return (
+            asyncio.get_event_loop().time(),
+            sorted(messages),
+            client.statistics.as_dict(),
+            server.statistics.as_dict(),
+            network.statistics.as_dict(),
+        )
+
+    link = sim.Link(latency=0.01, jitter=0.005, loss=0.05, duplicate=0.01, bandwidth=1e6)
+
+    return sim.run(scenario, seed=seed, link=link)
+
+
+def test_endpoint_transfer():
+
+    _, messages, client, server, network = _transfer(seed=1)
+
+    assert messages == sorted(bytes([index]) * 1000 for index in range(100) for _ in range(2))
+    assert client['failed_messages'] == 0
+    assert client['retransmissions'] > 0
+    assert server['delivered_messages'] == 200
+    assert network['lost'] > 0
+
+
+def test_endpoint_transfer_deterministic():
+
+    assert _transfer(seed=1) == _transfer(seed=1)
+    assert _transfer(seed=1) != _transfer(seed=2)
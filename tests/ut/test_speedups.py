@@ -0,0 +1,139 @@
+import pytest
+
+from udpcp.protocol import Packet, MessageType, ChecksumMode, TransferMode, DecodeStatus
+from udpcp.protocol._utils import specification
+
+pytestmark = pytest.mark.skipif(
+    specification._speedups is None,
+    reason='speedups extension is not available',
+)
+
+
+def _packets():
+
+    for checksum_mode in ChecksumMode:
+        for transfer_mode in TransferMode:
+            for payload_data in (b'', b'dummy', bytes(range(256)) * 64):
+
+                data = Packet.data(
+                    checksum_mode=checksum_mode,
+                    transfer_mode=transfer_mode,
+                    fragment_amount=255,
+                    fragment_number=254,
+                    message_id=0xFFFF,
+                    payload_data=payload_data,
+                )
+
+                yield data
+                yield Packet.ack(base_packet=data, is_duplicate=True)
+
+        yield Packet.sync(checksum_mode=checksum_mode)
+
+
+def _arguments(packet):
+
+    return (
+        packet.message_type,
+        packet.transfer_mode,
+        packet.checksum_mode,
+        packet.is_duplicate,
+        packet.fragment_amount,
+        packet.fragment_number,
+        packet.message_id,
+        packet.message_data_length,
+        packet.payload_data,
+    )
+
+
+@pytest.mark.parametrize('packet', list(_packets()), ids=str)
+def test_checksum(packet):
+
+    arguments = _arguments(packet)
+
+    assert specification._speedups.checksum(*arguments) == specification._checksum(*arguments)
+
+
+@pytest.mark.parametrize('packet', list(_packets()), ids=str)
+def test_encode(packet):
+
+    arguments = (packet.checksum, *_arguments(packet))
+
+    assert specification._speedups.encode(*arguments) == specification._encode(*arguments)
+
+
+@pytest.mark.parametrize('packet', list(_packets()), ids=str)
+def test_decode(packet):
+
+    data = packet.as_bytes
+
+    assert specification._speedups.decode(data) == specification._decode(data)
+
+
+@pytest.mark.parametrize('packet', list(_packets()), ids=str)
+def test_decode_trailing(packet):
+
+    data = packet.as_bytes + Packet.sync(checksum_mode=ChecksumMode.Enabled).as_bytes
+
+    assert specification._speedups.decode(data) == specification._decode(data)
+    assert specification._speedups.decode(data)[-1] == packet.payload_data
+
+
+@pytest.mark.parametrize('data', [
+    b'dummy',
+    b'000000000000',
+    b'\x00\x00\x00\x00\x15\x00\x01\x00\x00\x01\x00\x00',
+    b'\x00\x00\x00\x01\x50\x00\x01\x00\x00\x01\x00\x00',
+    b'\x00\x00\x00\x01\x52\x00\x01\x00\x00\x01\x00\x00',
+    b'\x00\x00\x00\x00\x50\x00\x01\x00\x00\x01\x00\x05dummy'[:-1],
+])
+def test_decode_invalid(data):
+
+    with pytest.raises(ValueError) as expected:
+        specification._decode(data)
+
+    with pytest.raises(ValueError) as actual:
+        specification._speedups.decode(data)
+
+    assert str(actual.value) == str(expected.value)
+
+
+@pytest.mark.parametrize('packet', list(_packets()), ids=str)
+def test_try_decode(packet):
+
+    data = packet.as_bytes
+
+    assert specification._speedups.try_decode(data) == specification._try_decode(data)
+
+
+@pytest.mark.parametrize('data', [
+    b'dummy',
+    b'000000000000',
+    b'\x00\x00\x00\x00\x15\x00\x01\x00\x00\x01\x00\x00',
+    b'\x00\x00\x00\x01\x50\x00\x01\x00\x00\x01\x00\x00',
+    b'\x00\x00\x00\x01\x52\x00\x01\x00\x00\x01\x00\x00',
+    b'\x00\x00\x00\x00\x50\x00\x01\x00\x00\x01\x00\x05dumm',
+])
+def test_try_decode_invalid(data):
+
+    status, decoded = specification._speedups.try_decode(data)
+
+    assert decoded is None
+    assert (status, decoded) == specification._try_decode(data)
+    assert type(status) is DecodeStatus
+
+
+def test_decode_memoryview():
+
+    data = Packet.data(
+        checksum_mode=ChecksumMode.Enabled,
+        transfer_mode=TransferMode.AckEveryPacket,
+        fragment_amount=1,
+        fragment_number=0,
+        message_id=1,
+        payload_data=b'dummy',
+    ).as_bytes
+
+    decoded = specification._speedups.decode(memoryview(data))
+
+    assert decoded[1] is MessageType.Data
+    assert bytes(decoded[-1]) == b'dummy'
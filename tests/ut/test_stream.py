@@ -0,0 +1,273 @@
+import io
+import asyncio
+
+import pytest
+
+from udpcp import sim
+from udpcp.stream import Streams, _FRAME, _DATA
+
+BLOB = bytes(range(256)) * 4096
+
+
+async def _pair(network, window=4, chunk_size=None, **kwargs):
+
+    sender = await network.open_endpoint(fragment_size=512, timeout=0.01, retries=10, **kwargs)
+    receiver = await network.open_endpoint(fragment_size=512, timeout=0.01, retries=10, **kwargs)
+
+    return (
+        Streams(sender, window, chunk_size),
+        Streams(receiver, window, chunk_size),
+    )
+
+
+async def _transfer(network, source, window=4, chunk_size=None):
+
+    sender, receiver = await _pair(network, window, chunk_size)
+
+    return await _transfer_to(sender, receiver, source)
+
+
+async def _transfer_to(sender, receiver, source):
+
+    send = asyncio.ensure_future(sender.send(receiver.endpoint.local_address, source))
+    reader = await receiver.accept()
+
+    data = await reader.read()
+    await send
+
+    assert reader.at_eof()
+    assert reader.address == sender.endpoint.local_address
+
+    return data
+
+
+def test_bytes():
+
+    async def scenario(network):
+
+        return await _transfer(network, BLOB)
+
+    assert sim.run(scenario) == BLOB
+
+
+def test_file():
+
+    async def scenario(network):
+
+        return await _transfer(network, io.BytesIO(BLOB), chunk_size=10000)
+
+    assert sim.run(scenario) == BLOB
+
+
+def test_async_iterator():
+
+    async def source():
+
+        for offset in range(0, len(BLOB), 3000):
+            yield BLOB[offset:offset + 3000]
+
+    async def scenario(network):
+
+        return await _transfer(network, source(), chunk_size=4096)
+
+    assert sim.run(scenario) == BLOB
+
+
+def test_empty():
+
+    async def scenario(network):
+
+        return await _transfer(network, b'')
+
+    assert sim.run(scenario) == b''
+
+
+def test_lossy_link():
+
+    link = sim.Link(latency=0.001, jitter=0.002, loss=0.05, duplicate=0.05, reorder=0.1)
+
+    async def scenario(network):
+
+        return await _transfer(network, BLOB, window=8, chunk_size=5000)
+
+    assert sim.run(scenario, seed=1, link=link) == BLOB
+
+
+def test_bounded_by_window():
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network, window=4, chunk_size=1000)
+
+        writer = sender.open(receiver.endpoint.local_address)
+
+        async def send():
+
+            await writer.write_from(BLOB[:100000])
+            await writer.close()
+
+        sending = asyncio.ensure_future(send())
+        reader = await receiver.accept()
+        received = []
+        backlog = 0
+
+        while not reader.at_eof():
+
+            await asyncio.sleep(0.1)
+
+            assert writer.in_flight <= 4
+            assert sender.endpoint.outstanding <= 4
+
+            backlog = max(backlog, len(reader._chunks) + len(reader._reorder))
+            received.append(await reader.read(1500))
+
+        await sending
+
+        return b''.join(received), backlog
+
+    data, backlog = sim.run(scenario)
+
+    assert data == BLOB[:100000]
+    assert 0 < backlog <= 4
+
+
+def test_concurrent_streams():
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network, chunk_size=2000)
+        address = receiver.endpoint.local_address
+
+        sends = [
+            asyncio.ensure_future(sender.send(address, bytes([index]) * 20000))
+            for index in range(3)
+        ]
+
+        readers = [await receiver.accept() for _ in range(3)]
+        data = [await reader.read() for reader in readers]
+
+        await asyncio.gather(*sends)
+
+        return {reader.stream_id: chunk for reader, chunk in zip(readers, data)}
+
+    assert sim.run(scenario) == {index + 1: bytes([index]) * 20000 for index in range(3)}
+
+
+def test_iteration():
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network, chunk_size=1000)
+
+        send = asyncio.ensure_future(sender.send(receiver.endpoint.local_address, BLOB[:4500]))
+        reader = await receiver.accept()
+
+        chunks = [chunk async for chunk in reader]
+        await send
+
+        return chunks
+
+    assert [len(chunk) for chunk in sim.run(scenario)] == [1000, 1000, 1000, 1000, 500]
+
+
+def test_endpoint_closed():
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network, chunk_size=1000)
+
+        writer = sender.open(receiver.endpoint.local_address)
+        await writer.write(b'dummy' * 300)
+
+        reader = await receiver.accept()
+        assert await reader.read(1000) == (b'dummy' * 300)[:1000]
+
+        receiver.endpoint.close()
+
+        with pytest.raises(ConnectionError):
+            await reader.read()
+
+        with pytest.raises(ConnectionError):
+            await receiver.accept()
+
+        with pytest.raises(TimeoutError):
+            await writer.close()
+
+    sim.run(scenario)
+
+
+def test_reorder_bounded_by_window():
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network, window=4, chunk_size=1000)
+        address = sender.endpoint.local_address
+
+        receiver._message(address, _FRAME.pack(_DATA, 1, 1) + b'dummy')
+        receiver._message(address, _FRAME.pack(_DATA, 1, 4) + b'dummy')
+        receiver._message(address, _FRAME.pack(_DATA, 1, 1 << 30) + b'dummy')
+
+        reader = await receiver.accept()
+
+        return sorted(reader._reorder)
+
+    assert sim.run(scenario) == [1]
+
+
+def test_late_frame_after_finish():
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network, chunk_size=1000)
+        address = sender.endpoint.local_address
+
+        await _transfer_to(sender, receiver, b'dummy')
+
+        receiver._message(address, _FRAME.pack(_DATA, 1, 0) + b'dummy')
+
+        return len(receiver._readers), len(receiver._accepted)
+
+    assert sim.run(scenario) == (0, 0)
+
+
+def test_credit_failure():
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network, window=2, chunk_size=1000)
+
+        writer = sender.open(receiver.endpoint.local_address)
+        writing = asyncio.ensure_future(writer.write(BLOB[:4000]))
+
+        reader = await receiver.accept()
+        await asyncio.sleep(0.1)
+
+        sender.endpoint.close()
+
+        with pytest.raises(ConnectionError):
+            await writing
+
+        assert await reader.read(1000) == BLOB[:1000]
+        assert await reader.read(1000) == BLOB[1000:2000]
+
+        with pytest.raises(TimeoutError):
+            await reader.read(1000)
+
+        return len(receiver._readers)
+
+    assert sim.run(scenario) == 0
+
+
+def test_invalid_arguments():
+
+    async def scenario(network):
+
+        endpoint = await network.open_endpoint(fragment_size=512)
+
+        with pytest.raises(ValueError):
+            Streams(endpoint, chunk_size=512 * 255)
+
+        with pytest.raises(ValueError):
+            Streams(endpoint, window=0)
+
+    sim.run(scenario)
@@ -0,0 +1,288 @@
+import os
+import asyncio
+
+import pytest
+
+from udpcp import sim
+from udpcp.transfer import send_file, FileReceiver, DEFAULT_MAX_SIZE, _OFFER, _CHUNK
+
+DATA = os.urandom(1 << 20) + b'tail'
+
+
+def _source(tmp_path, data=DATA, name='source.bin'):
+
+    path = tmp_path / name
+    path.write_bytes(data)
+
+    return str(path)
+
+
+async def _pair(network, directory, **kwargs):
+
+    sender = await network.open_endpoint(fragment_size=1000, timeout=0.01, retries=10)
+    endpoint = await network.open_endpoint(fragment_size=1000, timeout=0.01, retries=10)
+
+    return sender, FileReceiver(endpoint, str(directory), **kwargs)
+
+
+def _transfer(tmp_path, data=DATA, link=None, **kwargs):
+
+    source = _source(tmp_path, data)
+    destination = tmp_path / 'received'
+    destination.mkdir()
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network, destination)
+        address = receiver.endpoint.local_address
+
+        sending = asyncio.ensure_future(send_file(sender, address, source, **kwargs))
+        received = await receiver.receive()
+
+        assert await sending == len(data)
+        assert receiver.receiving == 0
+
+        return received
+
+    received = sim.run(scenario, seed=1, link=link)
+
+    assert received.name == 'source.bin'
+    assert received.size == len(data)
+    assert received.path == str(destination / 'source.bin')
+    assert os.listdir(str(destination)) == ['source.bin']
+
+    with open(received.path, 'rb') as handle:
+        return handle.read()
+
+
+def test_transfer(tmp_path):
+
+    assert _transfer(tmp_path) == DATA
+
+
+def test_transfer_small_chunks(tmp_path):
+
+    assert _transfer(tmp_path, chunk_size=3000, window=3) == DATA
+
+
+def test_transfer_empty(tmp_path):
+
+    assert _transfer(tmp_path, b'') == b''
+
+
+def test_transfer_lossy_link(tmp_path):
+
+    link = sim.Link(latency=0.001, jitter=0.002, loss=0.05, duplicate=0.05, reorder=0.1)
+
+    assert _transfer(tmp_path, link=link, chunk_size=20000) == DATA
+
+
+def _offer(transfer_id, size, chunk_size, name):
+
+    return _OFFER.pack(0, transfer_id, size, chunk_size) + name
+
+
+def test_transfer_sanitizes_name(tmp_path):
+
+    source = _source(tmp_path)
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network, tmp_path)
+        address = receiver.endpoint.local_address
+
+        await sender.send(address, _offer(1, 0, 1000, b'../../escape'))
+        await sender.send(address, _offer(2, 0, 1000, b'..'))
+        await send_file(sender, address, source)
+
+        return [await receiver.receive() for _ in range(3)]
+
+    escaped, parent, received = sim.run(scenario)
+
+    assert escaped.path == str(tmp_path / 'escape')
+    assert parent.path == str(tmp_path / 'unnamed')
+    assert received.name == 'source.bin'
+    assert received.path == str(tmp_path / 'source-1.bin')
+
+    with open(source, 'rb') as handle:
+        assert handle.read() == DATA
+
+
+@pytest.mark.parametrize('size, chunk_size', [
+    (DEFAULT_MAX_SIZE + 1, 100000),
+    (1 << 30, 1),
+    (1000, 0),
+    (1000, 1 << 20),
+])
+def test_offer_rejected(tmp_path, size, chunk_size):
+
+    source = _source(tmp_path, b'data')
+    destination = tmp_path / 'received'
+    destination.mkdir()
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network, destination)
+        address = receiver.endpoint.local_address
+
+        await sender.send(address, _offer(1, size, chunk_size, b'rejected'))
+        await send_file(sender, address, source)
+
+        received = await receiver.receive()
+
+        assert receiver.rejected == 1
+        assert receiver.receiving == 0
+
+        return received
+
+    received = sim.run(scenario)
+
+    assert os.listdir(str(destination)) == ['source.bin']
+    assert received.size == 4
+
+
+def test_send_file_rejected(tmp_path):
+
+    source = _source(tmp_path)
+    destination = tmp_path / 'received'
+    destination.mkdir()
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network, destination, max_size=1000)
+        address = receiver.endpoint.local_address
+
+        with pytest.raises(ConnectionRefusedError):
+            await send_file(sender, address, source)
+
+        assert receiver.rejected == 1
+        assert sender.handler is None
+
+    sim.run(scenario)
+
+    assert os.listdir(str(destination)) == []
+
+
+def test_send_file_keeps_handler(tmp_path):
+
+    source = _source(tmp_path, b'data')
+    destination = tmp_path / 'received'
+    destination.mkdir()
+    received = []
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network, destination)
+        sender.handler = lambda address, message: received.append(message)
+
+        sending = asyncio.ensure_future(
+            send_file(sender, receiver.endpoint.local_address, source),
+        )
+        await receiver.endpoint.send(sender.local_address, b'hello')
+
+        assert await sending == 4
+        assert sender.handler is not None
+        assert received == [b'hello']
+
+    sim.run(scenario)
+
+
+def test_send_file_no_reply(tmp_path):
+
+    source = _source(tmp_path)
+
+    async def scenario(network):
+
+        sender = await network.open_endpoint(timeout=0.01, retries=10)
+        endpoint = await network.open_endpoint()
+
+        with pytest.raises(TimeoutError):
+            await send_file(sender, endpoint.local_address, source, reply_timeout=0.5)
+
+        assert sender.handler is None
+
+    sim.run(scenario)
+
+
+def test_stalled_transfer_expires(tmp_path):
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network, tmp_path, idle_timeout=1.0)
+        address = receiver.endpoint.local_address
+
+        await sender.send(address, _offer(1, 3000, 1000, b'stalled'))
+        await sender.send(address, _CHUNK.pack(1, 1, 0) + b'x' * 1000)
+
+        assert receiver.receiving == 1
+        assert os.listdir(str(tmp_path)) == ['stalled.part']
+
+        await asyncio.sleep(0.5)
+        await sender.send(address, _CHUNK.pack(1, 1, 1) + b'x' * 1000)
+        await asyncio.sleep(0.8)
+
+        assert receiver.receiving == 1
+
+        await asyncio.sleep(0.5)
+
+        assert receiver.receiving == 0
+        assert receiver.expired == 1
+
+    sim.run(scenario)
+
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_invalid_idle_timeout(tmp_path):
+
+    async def scenario(network):
+
+        endpoint = await network.open_endpoint()
+
+        with pytest.raises(ValueError):
+            FileReceiver(endpoint, str(tmp_path), idle_timeout=0)
+
+    sim.run(scenario)
+
+
+def test_invalid_chunk_size(tmp_path):
+
+    source = _source(tmp_path)
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network, tmp_path)
+
+        with pytest.raises(ValueError):
+            await send_file(sender, receiver.endpoint.local_address, source, chunk_size=0)
+
+    sim.run(scenario)
+
+
+def test_receiver_closed(tmp_path):
+
+    source = _source(tmp_path)
+    destination = tmp_path / 'received'
+    destination.mkdir()
+
+    async def scenario(network):
+
+        sender, receiver = await _pair(network, destination)
+        address = receiver.endpoint.local_address
+
+        sending = asyncio.ensure_future(send_file(sender, address, source, chunk_size=10000))
+
+        while not receiver.receiving:
+            await asyncio.sleep(0.001)
+
+        receiver.endpoint.close()
+
+        with pytest.raises(ConnectionError):
+            await receiver.receive()
+
+        with pytest.raises(TimeoutError):
+            await sending
+
+    sim.run(scenario)
+
+    assert os.listdir(str(destination)) == []